@@ -6,7 +6,7 @@ from typing import Literal
 from browser_use.agent.message_manager.views import (
 	HistoryItem,
 )
-from browser_use.agent.prompts import AgentMessagePrompt
+from browser_use.agent.prompts import AgentMessagePrompt, get_dom_listing_message, viewport_of
 from browser_use.agent.views import (
 	ActionResult,
 	AgentOutput,
@@ -14,6 +14,7 @@ from browser_use.agent.views import (
 	MessageManagerState,
 )
 from browser_use.browser.views import BrowserStateSummary
+from browser_use.dom.serializer.delta import DOMDeltaSerializer
 from browser_use.filesystem.file_system import FileSystem
 from browser_use.llm.messages import (
 	BaseMessage,
@@ -108,6 +109,10 @@ class MessageManager:
 		vision_detail_level: Literal['auto', 'low', 'high'] = 'auto',
 		include_tool_call_examples: bool = False,
 		include_recent_events: bool = False,
+		dom_delta: bool = False,
+		dom_full_refresh_every: int = 10,
+		max_dom_tokens: int | None = None,
+		max_clickable_elements_length: int = 40000,
 	):
 		self.task = task
 		self.state = state
@@ -119,6 +124,10 @@ class MessageManager:
 		self.vision_detail_level = vision_detail_level
 		self.include_tool_call_examples = include_tool_call_examples
 		self.include_recent_events = include_recent_events
+		# Sends DOM changes against the last full listing instead of the full listing on every step
+		self.max_dom_tokens = max_dom_tokens
+		self.max_clickable_elements_length = max_clickable_elements_length
+		self.dom_delta_serializer = DOMDeltaSerializer(full_refresh_every=dom_full_refresh_every) if dom_delta else None
 
 		assert max_history_items is None or max_history_items > 5, 'max_history_items must be None or greater than 5'
 
@@ -279,6 +288,29 @@ class MessageManager:
 		if browser_state_summary.screenshot:
 			screenshots.append(browser_state_summary.screenshot)
 
+		# Within a token budget, the elements that matter for the task and the current goal are kept first
+		dom_query = None
+		if self.max_dom_tokens is not None:
+			next_goal = (model_output.next_goal or '') if model_output else ''
+			dom_query = f'{self.task}\n{next_goal}'.strip()
+
+		# In delta mode the full element listing lives in its own message and is only replaced when it is refreshed
+		# (the listing is cut to a number of characters only without a token budget)
+		dom_delta = None
+		if self.dom_delta_serializer is not None:
+			max_length = self.max_clickable_elements_length if self.max_dom_tokens is None else None
+			dom_delta = self.dom_delta_serializer.serialize(
+				browser_state_summary.dom_state,
+				browser_state_summary.url,
+				self.include_attributes,
+				max_tokens=self.max_dom_tokens,
+				viewport=viewport_of(browser_state_summary),
+				query=dom_query,
+				max_length=max_length,
+			)
+			if dom_delta.full is not None:
+				self._set_message_with_type(get_dom_listing_message(dom_delta.full, max_length), 'dom')
+
 		# Create single state message with all content
 		assert browser_state_summary
 		state_message = AgentMessagePrompt(
@@ -295,6 +327,10 @@ class MessageManager:
 			screenshots=screenshots,
 			vision_detail_level=self.vision_detail_level,
 			include_recent_events=self.include_recent_events,
+			dom_delta=dom_delta,
+			max_clickable_elements_length=self.max_clickable_elements_length,
+			max_dom_tokens=self.max_dom_tokens,
+			dom_query=dom_query,
 		).get_user_message(use_vision)
 
 		# Set the state message with caching enabled
@@ -346,7 +382,7 @@ class MessageManager:
 		self.last_input_messages = self.state.history.get_messages()
 		return self.last_input_messages
 
-	def _set_message_with_type(self, message: BaseMessage, message_type: Literal['system', 'state']) -> None:
+	def _set_message_with_type(self, message: BaseMessage, message_type: Literal['system', 'dom', 'state']) -> None:
 		"""Replace a specific state message slot with a new message"""
 		# filter out sensitive data from the message
 		if self.sensitive_data:
@@ -354,6 +390,8 @@ class MessageManager:
 
 		if message_type == 'system':
 			self.state.history.system_message = message
+		elif message_type == 'dom':
+			self.state.history.dom_message = message
 		elif message_type == 'state':
 			self.state.history.state_message = message
 		else:
@@ -71,15 +71,19 @@ class MessageHistory(BaseModel):
 	"""History of messages"""
 
 	system_message: BaseMessage | None = None
+	dom_message: BaseMessage | None = None
+	"""Full element listing the state message lists the DOM changes against, only set in DOM delta mode"""
 	state_message: BaseMessage | None = None
 	context_messages: list[BaseMessage] = Field(default_factory=list)
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
 	def get_messages(self) -> list[BaseMessage]:
-		"""Get all messages in the correct order: system -> state -> contextual"""
+		"""Get all messages in the correct order: system -> dom -> state -> contextual"""
 		messages = []
 		if self.system_message:
 			messages.append(self.system_message)
+		if self.dom_message:
+			messages.append(self.dom_message)
 		if self.state_message:
 			messages.append(self.state_message)
 		messages.extend(self.context_messages)
@@ -2,6 +2,7 @@ import importlib.resources
 from datetime import datetime
 from typing import TYPE_CHECKING, Literal, Optional
 
+from browser_use.dom.views import DOMRect
 from browser_use.llm.messages import ContentPartImageParam, ContentPartTextParam, ImageURL, SystemMessage, UserMessage
 from browser_use.observability import observe_debug
 from browser_use.utils import is_new_tab_page
@@ -9,6 +10,7 @@ from browser_use.utils import is_new_tab_page
 if TYPE_CHECKING:
 	from browser_use.agent.views import AgentStepInfo
 	from browser_use.browser.views import BrowserStateSummary
+	from browser_use.dom.serializer.delta import DOMDelta
 	from browser_use.filesystem.file_system import FileSystem
 
 
@@ -74,6 +76,13 @@ class SystemPrompt:
 # {self.default_action_description}
 
 
+def viewport_of(browser_state: 'BrowserStateSummary') -> DOMRect | None:
+	"""The viewport in the coordinates of the element positions of the DOM state."""
+	if not browser_state.page_info:
+		return None
+	return DOMRect(x=0, y=0, width=browser_state.page_info.viewport_width, height=browser_state.page_info.viewport_height)
+
+
 class AgentMessagePrompt:
 	vision_detail_level: Literal['auto', 'low', 'high']
 
@@ -93,6 +102,9 @@ class AgentMessagePrompt:
 		screenshots: list[str] | None = None,
 		vision_detail_level: Literal['auto', 'low', 'high'] = 'auto',
 		include_recent_events: bool = False,
+		dom_delta: 'DOMDelta | None' = None,
+		max_dom_tokens: int | None = None,
+		dom_query: str | None = None,
 	):
 		self.browser_state: 'BrowserStateSummary' = browser_state_summary
 		self.file_system: 'FileSystem | None' = file_system
@@ -108,13 +120,29 @@ class AgentMessagePrompt:
 		self.screenshots = screenshots or []
 		self.vision_detail_level = vision_detail_level
 		self.include_recent_events = include_recent_events
+		self.dom_delta = dom_delta
+		"""Set in delta mode: the elements are given as changes against the full listing of an earlier message"""
+		self.max_dom_tokens = max_dom_tokens
+		"""Token budget of the element listing, which then replaces the character truncation"""
+		self.dom_query = dom_query
+		"""What the agent is after, elements relevant to it are the last to be left out of a token budgeted listing"""
 		assert self.browser_state
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='_get_browser_state_description')
 	def _get_browser_state_description(self) -> str:
-		elements_text = self.browser_state.dom_state.llm_representation(include_attributes=self.include_attributes)
-
-		if len(elements_text) > self.max_clickable_elements_length:
+		if self.dom_delta is not None:
+			elements_text = self.dom_delta.llm_representation()
+			elements_title = 'Changes to the interactive elements since the full listing above (+ added, ~ changed, - removed)'
+		else:
+			elements_text = self.browser_state.dom_state.llm_representation(
+				include_attributes=self.include_attributes,
+				max_tokens=self.max_dom_tokens,
+				viewport=viewport_of(self.browser_state),
+				query=self.dom_query,
+			)
+			elements_title = 'Interactive elements from top layer of the current page inside the viewport'
+
+		if self.max_dom_tokens is None and len(elements_text) > self.max_clickable_elements_length:
 			elements_text = elements_text[: self.max_clickable_elements_length]
 			truncated_text = f' (truncated to {self.max_clickable_elements_length} characters)'
 		else:
@@ -134,7 +162,8 @@ class AgentMessagePrompt:
 			current_page_position = pi.scroll_y / max(pi.page_height - pi.viewport_height, 1)
 			page_info_text = f'Page info: {pi.viewport_width}x{pi.viewport_height}px viewport, {pi.page_width}x{pi.page_height}px total page size, {pages_above:.1f} pages above, {pages_below:.1f} pages below, {total_pages:.1f} total pages, at {current_page_position:.0%} of page'
 
-		if elements_text != '':
+		# The changes of delta mode are no listing of the page, they have no start, end or content above and below
+		if self.dom_delta is None and elements_text != '':
 			if has_content_above:
 				if self.browser_state.page_info:
 					pi = self.browser_state.page_info
@@ -153,7 +182,7 @@ class AgentMessagePrompt:
 					elements_text = f'{elements_text}\n... {self.browser_state.pixels_below} pixels below - scroll to see more or extract structured data if you are looking for specific information ...'
 			else:
 				elements_text = f'{elements_text}\n[End of page]'
-		else:
+		elif elements_text == '':
 			elements_text = 'empty page'
 
 		tabs_text = ''
@@ -187,7 +216,7 @@ class AgentMessagePrompt:
 Available tabs:
 {tabs_text}
 {page_info_text}
-{recent_events_text}{pdf_message}Interactive elements from top layer of the current page inside the viewport{truncated_text}:
+{recent_events_text}{pdf_message}{elements_title}{truncated_text}:
 {elements_text}
 """
 		return browser_state
@@ -283,3 +312,18 @@ Available tabs:
 			return UserMessage(content=content_parts, cache=True)
 
 		return UserMessage(content=state_description, cache=True)
+
+
+def get_dom_listing_message(listing: str, max_length: int | None = 40000) -> UserMessage:
+	"""The full element listing that the browser state of delta mode steps lists the changes against.
+
+	`max_length` should be None when the listing was already fit into a token budget.
+	"""
+	truncated_text = ''
+	if max_length is not None and len(listing) > max_length:
+		listing = listing[:max_length]
+		truncated_text = f' (truncated to {max_length} characters)'
+	return UserMessage(
+		content=f'<dom_listing>\nInteractive elements from top layer of the current page inside the viewport{truncated_text}:\n{listing}\n</dom_listing>',
+		cache=True,
+	)
@@ -187,6 +187,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		step_timeout: int = 120,
 		preload: bool = True,
 		include_recent_events: bool = False,
+		dom_delta: bool = False,
+		dom_full_refresh_every: int = 10,
+		max_dom_tokens: int | None = None,
 		**kwargs,
 	):
 		if not isinstance(llm, BaseChatModel):
@@ -273,6 +276,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			include_tool_call_examples=include_tool_call_examples,
 			llm_timeout=llm_timeout,
 			step_timeout=step_timeout,
+			dom_delta=dom_delta,
+			dom_full_refresh_every=dom_full_refresh_every,
+			max_dom_tokens=max_dom_tokens,
 		)
 
 		# Token cost service
@@ -353,6 +359,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			vision_detail_level=self.settings.vision_detail_level,
 			include_tool_call_examples=self.settings.include_tool_call_examples,
 			include_recent_events=self.include_recent_events,
+			dom_delta=self.settings.dom_delta,
+			dom_full_refresh_every=self.settings.dom_full_refresh_every,
+			max_dom_tokens=self.settings.max_dom_tokens,
 		)
 
 		browser_profile = browser_profile or DEFAULT_BROWSER_PROFILE
@@ -866,10 +875,13 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			return
 
 		if browser_state_summary:
+			dom_watchdog = self.browser_session._dom_watchdog if self.browser_session else None
 			metadata = StepMetadata(
 				step_number=self.state.n_steps,
 				step_start_time=self.step_start_time,
 				step_end_time=step_end_time,
+				browser_state_cache_hits=dom_watchdog.state_cache_hits if dom_watchdog else 0,
+				browser_state_cache_misses=dom_watchdog.state_cache_misses if dom_watchdog else 0,
 			)
 
 			# Use _make_history_item like main branch
@@ -1579,9 +1591,13 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 					)
 					break
 
-				# Check for new elements that appeared
+				# Check for new elements that appeared, with stable indices they can't change what the planned indices point to
 				new_element_hashes = {e.parent_branch_hash() for e in new_selector_map.values()}
-				if check_for_new_elements and not new_element_hashes.issubset(cached_element_hashes):
+				if (
+					check_for_new_elements
+					and not self.browser_profile.stable_element_indices
+					and not new_element_hashes.issubset(cached_element_hashes)
+				):
 					# next action requires index but there are new elements on the page
 					remaining_actions_str = get_remaining_actions_str(actions, i)
 					msg = f'Something new appeared after action {i} / {total_actions}: actions {remaining_actions_str} were not executed'
@@ -1595,9 +1611,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 					)
 					break
 
-			# wait between actions (only after first action)
-			if i > 0:
-				await asyncio.sleep(self.browser_profile.wait_between_actions)
+			# No fixed wait between actions: browser actions return once what they triggered has settled,
+			# waiting at most browser_profile.wait_between_actions, and indexed actions wait for the page above
 
 			red = '\033[91m'
 			green = '\033[92m'
@@ -1756,18 +1771,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		if not historical_element or not browser_state_summary.dom_state.selector_map:
 			return action
 
-		# selector_hash_map = {hash(e): e for e in browser_state_summary.dom_state.selector_map.values()}
-
-		highlight_index, current_element = next(
-			(
-				(highlight_index, element)
-				for highlight_index, element in browser_state_summary.dom_state.selector_map.items()
-				if element.element_hash == historical_element.element_hash
-			),
-			(None, None),
-		)
-
-		if not current_element or highlight_index is None:
+		highlight_index = browser_state_summary.dom_state.index_of_hash(historical_element.element_hash)
+		if highlight_index is None:
 			return None
 
 		old_index = action.get_index()
@@ -56,6 +56,9 @@ class AgentSettings(BaseModel):
 	include_tool_call_examples: bool = False
 	llm_timeout: int = 60  # Timeout in seconds for LLM calls
 	step_timeout: int = 180  # Timeout in seconds for each step
+	dom_delta: bool = False  # Send the changes of the interactive elements instead of all of them on same-page steps
+	dom_full_refresh_every: int = 10  # In delta mode, send the full element listing again at least every N steps
+	max_dom_tokens: int | None = None  # Token budget of the element listing, the least important elements are left out
 
 
 class AgentState(BaseModel):
@@ -133,12 +136,21 @@ class StepMetadata(BaseModel):
 	step_start_time: float
 	step_end_time: float
 	step_number: int
+	# Browser states reused because the page was unchanged vs. rebuilt, counted over the whole session so far
+	browser_state_cache_hits: int = 0
+	browser_state_cache_misses: int = 0
 
 	@property
 	def duration_seconds(self) -> float:
 		"""Calculate step duration in seconds"""
 		return self.step_end_time - self.step_start_time
 
+	@property
+	def browser_state_cache_hit_rate(self) -> float:
+		"""Share of browser state requests answered from the cached state"""
+		total = self.browser_state_cache_hits + self.browser_state_cache_misses
+		return self.browser_state_cache_hits / total if total else 0.0
+
 
 class AgentBrain(BaseModel):
 	thinking: str | None = None
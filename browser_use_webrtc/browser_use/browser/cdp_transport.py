@@ -0,0 +1,122 @@
+"""Multiplexed CDP transport: one WebSocket shared by the sessions of all targets, and a bounded pool of those sessions."""
+
+import asyncio
+import inspect
+import logging
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from cdp_use import CDPClient
+from cdp_use.cdp.registration_library import CDPRegistrationLibrary
+from cdp_use.cdp.registry import EventRegistry
+from cdp_use.cdp.target import SessionID, TargetID
+
+if TYPE_CHECKING:
+	from browser_use.browser.session import CDPSession
+
+logger = logging.getLogger(__name__)
+
+
+class MultiplexedEventRegistry(EventRegistry):
+	"""Event registry for a WebSocket that carries the flattened sessions of many targets.
+
+	The cdp-use registry keeps one handler per event method and awaits it inside the WebSocket read loop. On a shared
+	socket a handler registered for one tab would replace the handler of another, and a handler awaiting a CDP response
+	would block the loop that has to deliver it. This registry calls every handler registered for a method, in the order
+	they were registered, and runs the coroutines they return as tasks. Handlers get the session id of every event and
+	filter on it (or on the target id in the event) when they only care about one target.
+
+	Like in cdp-use, registering again replaces a handler instead of adding one: a bound method replaces the handler
+	its object registered for the method before, any other callable only the very same callable. Callers that create
+	a new closure per registration have to register it once per client (or unregister the previous one).
+	"""
+
+	def __init__(self):
+		super().__init__()
+		self._handler_lists: dict[str, list[Callable[[Any, str | None], Any]]] = {}
+		self._tasks: set[asyncio.Task] = set()
+
+	def register(self, method: str, callback: Callable[[Any, str | None], Any]) -> None:
+		super().register(method, callback)
+		handlers = self._handler_lists.setdefault(method, [])
+		owner = _handler_owner(callback)
+		for i, handler in enumerate(handlers):
+			if _handler_owner(handler) is owner:
+				handlers[i] = callback
+				return
+		handlers.append(callback)
+
+	def unregister(self, method: str, callback: Callable[[Any, str | None], Any] | None = None) -> None:
+		"""Remove the handler `callback` registered (or the handler its object registered) for `method`, or all of them."""
+		handlers = self._handler_lists.get(method, [])
+		if callback is not None:
+			owner = _handler_owner(callback)
+			handlers[:] = [handler for handler in handlers if _handler_owner(handler) is not owner]
+		if callback is None or not handlers:
+			super().unregister(method)
+			self._handler_lists.pop(method, None)
+		else:
+			super().register(method, handlers[-1])
+
+	def clear(self) -> None:
+		super().clear()
+		self._handler_lists.clear()
+
+	async def handle_event(self, method: str, params: Any, session_id: str | None = None) -> bool:
+		handlers = self._handler_lists.get(method)
+		if not handlers:
+			return False
+		for handler in tuple(handlers):
+			try:
+				result = handler(params, session_id)
+			except Exception as e:
+				logger.error(f'Error in event handler for {method}: {type(e).__name__}: {e}')
+				continue
+			if inspect.isawaitable(result):
+				task = asyncio.ensure_future(result)
+				self._tasks.add(task)
+				task.add_done_callback(lambda task, method=method: self._handler_done(method, task))
+		return True
+
+	def _handler_done(self, method: str, task: asyncio.Task) -> None:
+		self._tasks.discard(task)
+		if not task.cancelled() and (error := task.exception()):
+			logger.error(f'Error in event handler for {method}: {type(error).__name__}: {error}')
+
+
+def _handler_owner(callback: Callable) -> object:
+	"""The object a bound method belongs to, or the callable itself."""
+	return getattr(callback, '__self__', callback)
+
+
+class MultiplexedCDPClient(CDPClient):
+	"""CDP client whose event handlers can be shared by all the target sessions attached over its WebSocket."""
+
+	def __init__(self, url: str, **kwargs):
+		super().__init__(url, **kwargs)
+		self._event_registry = MultiplexedEventRegistry()
+		self.register = CDPRegistrationLibrary(self._event_registry)
+
+
+class CDPSessionPool(dict[TargetID, 'CDPSession']):
+	"""CDP sessions by target id, from the least to the most recently used."""
+
+	def touch(self, target_id: TargetID) -> None:
+		"""Mark the session of a target as the most recently used."""
+		self[target_id] = self.pop(target_id)
+
+	def pop_session(self, session_id: SessionID) -> 'CDPSession | None':
+		"""Remove the session with this session id, whatever target it belongs to."""
+		for target_id, session in self.items():
+			if session.session_id == session_id:
+				return self.pop(target_id)
+		return None
+
+	def evict(self, max_size: int, keep: Iterable[TargetID] = ()) -> list['CDPSession']:
+		"""Remove and return the least recently used sessions beyond `max_size`, never the sessions of `keep`."""
+		keep = set(keep)
+		excess = len(self) - max_size
+		if excess <= 0:
+			return []
+		evicted_targets = [target_id for target_id in self if target_id not in keep][:excess]
+		return [self.pop(target_id) for target_id in evicted_targets]
@@ -2,10 +2,12 @@
 
 import asyncio
 import time
+import weakref
 from typing import TYPE_CHECKING, ClassVar
 
 import psutil
 from bubus import BaseEvent
+from cdp_use import CDPClient
 from cdp_use.cdp.target import SessionID, TargetID
 from cdp_use.cdp.target.events import TargetCrashedEvent
 from pydantic import Field, PrivateAttr
@@ -53,7 +55,9 @@ class CrashWatchdog(BaseWatchdog):
 	_monitoring_task: asyncio.Task | None = PrivateAttr(default=None)
 	_last_responsive_checks: dict[str, float] = PrivateAttr(default_factory=dict)  # target_url -> timestamp
 	_cdp_event_tasks: set[asyncio.Task] = PrivateAttr(default_factory=set)  # Track CDP event handler tasks
-	_sessions_with_listeners: set[str] = PrivateAttr(default_factory=set)  # Track sessions that already have event listeners
+	_clients_with_listeners: weakref.WeakSet[CDPClient] = PrivateAttr(
+		default_factory=weakref.WeakSet
+	)  # Track CDP clients that already have event listeners, one client may carry the sessions of many targets
 
 	async def on_BrowserConnectedEvent(self, event: BrowserConnectedEvent) -> None:
 		"""Start monitoring when browser is connected."""
@@ -78,8 +82,8 @@ class CrashWatchdog(BaseWatchdog):
 			# Create temporary session for monitoring without switching focus
 			cdp_session = await self.browser_session.get_or_create_cdp_session(target_id, focus=False)
 
-			# Check if we already have listeners for this session
-			if cdp_session.session_id in self._sessions_with_listeners:
+			# Check if we already have listeners on this connection
+			if cdp_session.cdp_client in self._clients_with_listeners:
 				self.logger.debug(f'[CrashWatchdog] Event listeners already exist for session: {cdp_session.session_id}')
 				return
 
@@ -109,19 +113,18 @@ class CrashWatchdog(BaseWatchdog):
 
 			def on_target_crashed(event: TargetCrashedEvent, session_id: SessionID | None = None):
 				# Create and track the task
-				task = asyncio.create_task(self._on_target_crash_cdp(target_id))
+				task = asyncio.create_task(self._on_target_crash_cdp(event.get('targetId') or target_id))
 				self._cdp_event_tasks.add(task)
 				# Remove from set when done
 				task.add_done_callback(lambda t: self._cdp_event_tasks.discard(t))
 
 			cdp_session.cdp_client.register.Target.targetCrashed(on_target_crashed)
 
-			# Track that we've added listeners to this session
-			self._sessions_with_listeners.add(cdp_session.session_id)
+			# Track that we've added listeners to this connection
+			self._clients_with_listeners.add(cdp_session.cdp_client)
 
 			# Get target info for logging
-			targets = await cdp_session.cdp_client.send.Target.getTargets()
-			target_info = next((t for t in targets['targetInfos'] if t['targetId'] == target_id), None)
+			target_info = await self.browser_session.get_target_info(target_id)
 			if target_info:
 				self.logger.debug(f'[CrashWatchdog] Added target to monitoring: {target_info.get("url", "unknown")}')
 
@@ -174,9 +177,7 @@ class CrashWatchdog(BaseWatchdog):
 			self.logger.debug(f'[CrashWatchdog] Removed crashed session from pool: {target_id}')
 
 		# Get target info
-		cdp_client = self.browser_session.cdp_client
-		targets = await cdp_client.send.Target.getTargets()
-		target_info = next((t for t in targets['targetInfos'] if t['targetId'] == target_id), None)
+		target_info = await self.browser_session.get_target_info(target_id)
 		if (
 			target_info
 			and self.browser_session.agent_focus
@@ -232,7 +233,7 @@ class CrashWatchdog(BaseWatchdog):
 
 		# Clear tracking (CDP sessions are cached and managed by BrowserSession)
 		self._active_requests.clear()
-		self._sessions_with_listeners.clear()
+		self._clients_with_listeners.clear()
 
 	async def _monitoring_loop(self) -> None:
 		"""Main monitoring loop."""
@@ -304,7 +305,7 @@ class CrashWatchdog(BaseWatchdog):
 					target_id=self.agent_focus.target_id, new_socket=True, focus=True
 				)
 
-			for target in (await self.browser_session.cdp_client.send.Target.getTargets()).get('targetInfos', []):
+			for target in await self.browser_session._cdp_get_all_targets():
 				if target.get('type') == 'page':
 					cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target.get('targetId'))
 					if self._is_new_tab_page(target.get('url')) and target.get('url') != 'about:blank':
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import platform
+import time
 from typing import Any
 
 from browser_use.browser.events import (
@@ -63,6 +64,7 @@ class DefaultActionWatchdog(BaseWatchdog):
 
 			# Perform the actual click using internal implementation
 			click_metadata = None
+			started_at = time.monotonic()
 			click_metadata = await self._click_element_node_impl(element_node, while_holding_ctrl=event.while_holding_ctrl)
 			download_path = None  # moved to downloads_watchdog.py
 
@@ -75,9 +77,9 @@ class DefaultActionWatchdog(BaseWatchdog):
 				self.logger.debug(f'🖱️ {msg}')
 			self.logger.debug(f'Element xpath: {element_node.xpath}')
 
-			# Wait a bit for potential new tab to be created
-			# This is necessary because tab creation is async and might not be immediate
-			await asyncio.sleep(0.5)
+			# Wait for what the click triggered (navigation, new tab, dialog, requests, DOM changes) to settle, a tab it
+			# opens within the grace period extends the wait, so the new tab is among the pages listed below
+			await self.browser_session._wait_for_action_to_settle(started_at)
 
 			# Note: We don't clear cached state here - let multi_act handle DOM change detection
 			# by explicitly rebuilding and comparing when needed
@@ -117,12 +119,15 @@ class DefaultActionWatchdog(BaseWatchdog):
 			# Use the provided node
 			element_node = event.node
 			index_for_logging = element_node.element_index or 'unknown'
+			started_at = time.monotonic()
 
 			# Check if this is index 0 or a falsy index - type to the page (whatever has focus)
 			if not element_node.element_index or element_node.element_index == 0:
 				# Type to the page without focusing any specific element
 				await self._type_to_page(event.text)
 				self.logger.info(f'⌨️ Typed "{event.text}" to the page (current focus)')
+				# Wait for what typing triggered (autocomplete, validation, search as you type) to settle
+				await self.browser_session._wait_for_action_to_settle(started_at)
 				return None  # No coordinates available for page typing
 			else:
 				try:
@@ -132,6 +137,7 @@ class DefaultActionWatchdog(BaseWatchdog):
 					)
 					self.logger.info(f'⌨️ Typed "{event.text}" into element with index {index_for_logging}')
 					self.logger.debug(f'Element xpath: {element_node.xpath}')
+					await self.browser_session._wait_for_action_to_settle(started_at)
 					return input_metadata  # Return coordinates if available
 				except Exception as e:
 					# Element not found or error - fall back to typing to the page
@@ -142,6 +148,7 @@ class DefaultActionWatchdog(BaseWatchdog):
 						pass
 					await self._type_to_page(event.text)
 					self.logger.info(f'⌨️ Typed "{event.text}" to the page as fallback')
+					await self.browser_session._wait_for_action_to_settle(started_at)
 					return None  # No coordinates available for fallback typing
 
 			# Note: We don't clear cached state here - let multi_act handle DOM change detection
@@ -175,6 +182,7 @@ class DefaultActionWatchdog(BaseWatchdog):
 				is_iframe = element_node.tag_name and element_node.tag_name.upper() == 'IFRAME'
 
 				# Try to scroll the element's container
+				started_at = time.monotonic()
 				success = await self._scroll_element_container(element_node, pixels)
 				if success:
 					self.logger.debug(
@@ -188,8 +196,8 @@ class DefaultActionWatchdog(BaseWatchdog):
 						# Note: We don't clear cached state here - let multi_act handle DOM change detection
 						# by explicitly rebuilding and comparing when needed
 
-						# Wait a bit for the scroll to settle and DOM to update
-						await asyncio.sleep(0.5)
+						# Wait for the scroll to settle and DOM to update
+						await self.browser_session._wait_for_action_to_settle(started_at)
 
 					return None
 
@@ -363,7 +371,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 						},
 						session_id=session_id,
 					)
-					await asyncio.sleep(0.5)
 					# Navigation is handled by BrowserSession via events
 					return None
 				except Exception as js_e:
@@ -420,7 +427,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 				await cdp_session.cdp_client.send.DOM.scrollIntoViewIfNeeded(
 					params={'backendNodeId': backend_node_id}, session_id=session_id
 				)
-				await asyncio.sleep(0.1)  # Wait for scroll to complete
 			except Exception as e:
 				self.logger.debug(f'Failed to scroll element into view: {e}')
 
@@ -438,7 +444,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 					},
 					session_id=session_id,
 				)
-				await asyncio.sleep(0.123)
 
 				# Calculate modifier bitmask for CDP
 				# CDP Modifier bits: Alt=1, Control=2, Meta/Command=4, Shift=8
@@ -469,10 +474,8 @@ class DefaultActionWatchdog(BaseWatchdog):
 						),
 						timeout=1.0,  # 1 second timeout for mousePressed
 					)
-					await asyncio.sleep(0.145)
 				except TimeoutError:
 					self.logger.debug('⏱️ Mouse down timed out (likely due to dialog), continuing...')
-					# Don't sleep if we timed out
 
 				# Mouse up
 				try:
@@ -517,7 +520,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 						},
 						session_id=session_id,
 					)
-					await asyncio.sleep(0.5)
 					# Navigation is handled by BrowserSession via events
 					return None
 				except Exception as js_e:
@@ -577,8 +579,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 					},
 					session_id=cdp_session.session_id,
 				)
-				# Add 18ms delay between keystrokes
-				await asyncio.sleep(0.018)
 
 		except Exception as e:
 			raise Exception(f'Failed to type to page: {str(e)}')
@@ -682,7 +682,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 				await cdp_session.cdp_client.send.DOM.scrollIntoViewIfNeeded(
 					params={'backendNodeId': backend_node_id}, session_id=cdp_session.session_id
 				)
-				await asyncio.sleep(0.1)
 			except Exception as e:
 				self.logger.warning(
 					f'⚠️ Failed to focus the page {cdp_session} and scroll element {element_node} into view before typing in text: {type(e).__name__}: {e}'
@@ -835,8 +834,6 @@ class DefaultActionWatchdog(BaseWatchdog):
 					},
 					session_id=cdp_session.session_id,
 				)
-				# Small delay between characters
-				await asyncio.sleep(0.01)
 			
 			# Return coordinates metadata if available
 			return input_coordinates
@@ -988,10 +985,10 @@ class DefaultActionWatchdog(BaseWatchdog):
 			# Element is in an iframe, need to get session for that frame
 			try:
 				# Get all targets
-				targets = await self.browser_session.cdp_client.send.Target.getTargets()
+				targets = await self.browser_session._cdp_get_all_targets()
 
 				# Find the target for this frame
-				for target in targets['targetInfos']:
+				for target in targets:
 					if target['type'] == 'iframe' and element_node.frame_id in str(target.get('targetId', '')):
 						# Create temporary session for iframe target without switching focus
 						target_id = target['targetId']
@@ -1024,13 +1021,15 @@ class DefaultActionWatchdog(BaseWatchdog):
 				return
 
 			# Navigate to the previous entry
+			page = await self.browser_session._track_page_readiness(cdp_session)
+			navigations = page.navigations if page else None
 			previous_entry_id = entries[current_index - 1]['id']
 			await cdp_session.cdp_client.send.Page.navigateToHistoryEntry(
 				params={'entryId': previous_entry_id}, session_id=cdp_session.session_id
 			)
 
 			# Wait for navigation
-			await asyncio.sleep(0.5)
+			await self.browser_session._wait_for_navigation_start(cdp_session, navigations, timeout=0.5)
 			# Navigation is handled by BrowserSession via events
 
 			self.logger.info(f'🔙 Navigated back to {entries[current_index - 1]["url"]}')
@@ -1052,13 +1051,15 @@ class DefaultActionWatchdog(BaseWatchdog):
 				return
 
 			# Navigate to the next entry
+			page = await self.browser_session._track_page_readiness(cdp_session)
+			navigations = page.navigations if page else None
 			next_entry_id = entries[current_index + 1]['id']
 			await cdp_session.cdp_client.send.Page.navigateToHistoryEntry(
 				params={'entryId': next_entry_id}, session_id=cdp_session.session_id
 			)
 
 			# Wait for navigation
-			await asyncio.sleep(0.5)
+			await self.browser_session._wait_for_navigation_start(cdp_session, navigations, timeout=0.5)
 			# Navigation is handled by BrowserSession via events
 
 			self.logger.info(f'🔜 Navigated forward to {entries[current_index + 1]["url"]}')
@@ -1070,10 +1071,12 @@ class DefaultActionWatchdog(BaseWatchdog):
 		cdp_session = await self.browser_session.get_or_create_cdp_session()
 		try:
 			# Reload the target
+			page = await self.browser_session._track_page_readiness(cdp_session)
+			navigations = page.navigations if page else None
 			await cdp_session.cdp_client.send.Page.reload(session_id=cdp_session.session_id)
 
 			# Wait for reload
-			await asyncio.sleep(1.0)
+			await self.browser_session._wait_for_navigation_start(cdp_session, navigations, timeout=1.0)
 
 			# Note: We don't clear cached state here - let the next state fetch rebuild as needed
 
@@ -1100,6 +1103,7 @@ class DefaultActionWatchdog(BaseWatchdog):
 	async def on_SendKeysEvent(self, event: SendKeysEvent) -> None:
 		"""Handle send keys request with CDP."""
 		cdp_session = await self.browser_session.get_or_create_cdp_session(focus=True)
+		started_at = time.monotonic()
 		try:
 			# Parse key combination
 			keys = event.keys.lower()
@@ -1254,9 +1258,8 @@ class DefaultActionWatchdog(BaseWatchdog):
 			self.logger.info(f'⌨️ Sent keys: {event.keys}')
 
 			# Note: We don't clear cached state on Enter; multi_act will detect DOM changes
-			# and rebuild explicitly. We still wait briefly for potential navigation.
-			if 'enter' in event.keys.lower() or 'return' in event.keys.lower():
-				await asyncio.sleep(0.5)
+			# and rebuild explicitly. We still wait for a potential navigation or form submission to settle.
+			await self.browser_session._wait_for_action_to_settle(started_at)
 		except Exception as e:
 			raise
 
@@ -1,15 +1,21 @@
 """DOM watchdog for browser DOM tree management using CDP."""
 
 import asyncio
+import dataclasses
+import json
 import time
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
+from pydantic import PrivateAttr
+
 from browser_use.browser.events import (
 	BrowserErrorEvent,
 	BrowserStateRequestEvent,
 	ScreenshotEvent,
 	TabCreatedEvent,
 )
+from browser_use.browser.readiness import WAIT_FOR_LAYOUT_QUIET_JS
 from browser_use.browser.watchdog_base import BaseWatchdog
 from browser_use.dom.service import DomService
 from browser_use.dom.views import (
@@ -20,6 +26,56 @@ from browser_use.dom.views import (
 if TYPE_CHECKING:
 	from browser_use.browser.views import BrowserStateSummary, PageInfo
 
+# Bumps the page version of window.top on every DOM mutation (ignoring our own highlight overlay) and on every
+# input/scroll/focus event, in this frame and all same-origin child frames. Runs as an init script on every new
+# document and again before each fingerprint, so pages that were open before the script was added are covered too.
+# The state of every frame is kept under a non-enumerable symbol, which page scripts that walk the properties of window
+# do not see.
+TRACK_PAGE_VERSION_JS = """
+(function trackPageVersion(win) {
+	try {
+		const key = Symbol.for('browser-use.page-version');
+		const stateOf = (w) => w[key] || Object.defineProperty(w, key, { value: { tracked: false, version: 0 } })[key];
+		const state = stateOf(win);
+		if (!state.tracked) {
+			state.tracked = true;
+			const bump = () => {
+				try {
+					stateOf(win.top).version++;
+				} catch (e) {}
+			};
+			const isHighlight = (node) =>
+				!!(node?.nodeType === 1 ? node : node?.parentElement)?.closest('[data-browser-use-highlight]');
+			const isOwnMutation = (record) =>
+				isHighlight(record.target) ||
+				(record.type === 'childList' && [...record.addedNodes, ...record.removedNodes].every(isHighlight));
+			new win.MutationObserver((records) => {
+				if (!records.every(isOwnMutation)) bump();
+			}).observe(win.document, { subtree: true, childList: true, attributes: true, characterData: true });
+			for (const type of ['pointerdown', 'keydown', 'input', 'change', 'submit', 'scroll', 'wheel', 'focusin', 'focusout']) {
+				win.addEventListener(type, bump, { capture: true, passive: true });
+			}
+		}
+		for (let i = 0; i < win.frames.length; i++) trackPageVersion(win.frames[i]);
+	} catch (e) {}
+})(window);
+"""
+
+PAGE_FINGERPRINT_JS = (
+	TRACK_PAGE_VERSION_JS
+	+ """
+({
+	version: window[Symbol.for('browser-use.page-version')]?.version || 0,
+	scrollX: window.scrollX,
+	scrollY: window.scrollY,
+	width: window.innerWidth,
+	height: window.innerHeight,
+	devicePixelRatio: window.devicePixelRatio,
+	childFrames: window.frames.length,
+});
+"""
+)
+
 
 class DOMWatchdog(BaseWatchdog):
 	"""Handles DOM tree building, serialization, and element access via CDP.
@@ -37,8 +93,14 @@ class DOMWatchdog(BaseWatchdog):
 	current_dom_state: SerializedDOMState | None = None
 	enhanced_dom_tree: EnhancedDOMTreeNode | None = None
 
+	# How often a browser state request was answered from the cached state because the page was unchanged
+	state_cache_hits: int = 0
+	state_cache_misses: int = 0
+
 	# Internal DOM service
 	_dom_service: DomService | None = None
+	# Page fingerprint taken right before building the cached BrowserStateSummary it belongs to
+	_page_fingerprint: tuple[str, 'BrowserStateSummary'] | None = PrivateAttr(default=None)
 
 	async def on_TabCreatedEvent(self, event: TabCreatedEvent) -> None:
 		# self.logger.debug('Setting up init scripts in browser')
@@ -94,6 +156,8 @@ class DOMWatchdog(BaseWatchdog):
 				})();
 			}
 		"""
+		if self.browser_session.browser_profile.reuse_unchanged_browser_state:
+			init_script += TRACK_PAGE_VERSION_JS
 
 		# Try to inject the script, but don't fail if the Page domain isn't ready yet
 		# This can happen when a new tab is created and the CDP session isn't fully attached
@@ -161,6 +225,13 @@ class DOMWatchdog(BaseWatchdog):
 		# check if we should skip DOM tree build for pointless pages
 		not_a_meaningful_website = page_url.lower().split(':', 1)[0] not in ('http', 'https')
 
+		# Fast path: nothing happened on the page since the cached state was built, skip the stability wait and DOM rebuild
+		reuse_unchanged_state = self.browser_session.browser_profile.reuse_unchanged_browser_state
+		if reuse_unchanged_state and not not_a_meaningful_website and event.include_dom:
+			unchanged_state = await self._get_unchanged_cached_state(event)
+			if unchanged_state is not None:
+				return unchanged_state
+
 		# Wait for page stability using browser profile settings (main branch pattern)
 		if not not_a_meaningful_website:
 			self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: ⏳ Waiting for page stability...')
@@ -233,9 +304,17 @@ class DOMWatchdog(BaseWatchdog):
 				)
 
 			# Normal path: Build DOM tree if requested
+			page_fingerprint = None
 			if event.include_dom:
 				self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: 🌳 Building DOM tree...')
 
+				# Fingerprint the page before building, so anything that changes it during the build invalidates the new state
+				if reuse_unchanged_state:
+					try:
+						page_fingerprint = await self._get_page_fingerprint()
+					except Exception as e:
+						self.logger.debug(f'🔍 DOMWatchdog.on_BrowserStateRequestEvent: Failed to fingerprint page: {e}')
+
 				# Build the DOM directly using the internal method
 				previous_state = (
 					self.browser_session._cached_browser_state_summary.dom_state
@@ -356,6 +435,8 @@ class DOMWatchdog(BaseWatchdog):
 
 			# Cache the state
 			self.browser_session._cached_browser_state_summary = browser_state
+			self._page_fingerprint = (page_fingerprint, browser_state) if page_fingerprint else None
+			self._release_previous_states(browser_state)
 
 			self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: ✅ COMPLETED - Returning browser state')
 			return browser_state
@@ -411,7 +492,23 @@ class DOMWatchdog(BaseWatchdog):
 			# Create or reuse DOM service
 			if self._dom_service is None:
 				# self.logger.debug('🔍 DOMWatchdog._build_dom_tree: Creating DomService...')
-				self._dom_service = DomService(browser_session=self.browser_session, logger=self.logger)
+				browser_profile = self.browser_session.browser_profile
+				self._dom_service = DomService(
+					browser_session=self.browser_session,
+					logger=self.logger,
+					incremental=browser_profile.incremental_dom,
+					# a negative viewport expansion means the whole page
+					window_margin=browser_profile.viewport_expansion
+					if browser_profile.windowed_dom and browser_profile.viewport_expansion >= 0
+					else None,
+					prune_hidden=browser_profile.prune_hidden_dom,
+					max_nodes=browser_profile.max_dom_nodes,
+					snapshot_only=browser_profile.snapshot_dom,
+					ax_strategy=browser_profile.accessibility_tree,
+					stable_indices=browser_profile.stable_element_indices,
+					collapse_repeated=browser_profile.collapse_repeated_dom,
+					paint_order_filtering=browser_profile.paint_order_filtering,
+				)
 				# self.logger.debug('🔍 DOMWatchdog._build_dom_tree: ✅ DomService created')
 			# else:
 			# self.logger.debug('🔍 DOMWatchdog._build_dom_tree: Reusing existing DomService')
@@ -463,24 +560,132 @@ class DOMWatchdog(BaseWatchdog):
 			raise
 
 	async def _wait_for_stable_network(self):
-		"""Wait for page stability - simplified for CDP-only branch."""
-		start_time = time.time()
+		"""Wait until the page has loaded, its network is idle and its DOM and layout stopped changing.
 
-		# Apply minimum wait time first (let page settle)
-		min_wait = self.browser_session.browser_profile.minimum_wait_page_load_time
-		if min_wait > 0:
-			self.logger.debug(f'⏳ Minimum wait: {min_wait}s')
-			await asyncio.sleep(min_wait)
-
-		# Apply network idle wait time (for dynamic content like iframes)
-		network_idle_wait = self.browser_session.browser_profile.wait_for_network_idle_page_load_time
-		if network_idle_wait > 0:
-			self.logger.debug(f'⏳ Network idle wait: {network_idle_wait}s')
-			await asyncio.sleep(network_idle_wait)
+		Returns as soon as the page is settled, so a page that settled before the call takes no wait at all. Loading is
+		waited for up to maximum_wait_page_load_time, but a request and the layout changes that go on after that
+		(long-polling, animations, tickers) at most as long as the former fixed minimum and network idle waits.
+		"""
+		start_time = time.time()
+		assert self.browser_session.agent_focus is not None, 'CDP session not initialized - browser may not be connected yet'
+		cdp_session = self.browser_session.agent_focus
+		profile = self.browser_session.browser_profile
+		deadline = time.monotonic() + profile.maximum_wait_page_load_time
+
+		if await self.browser_session._track_page_readiness(cdp_session) is None:
+			# requests of a session on a dedicated socket are not seen, wait the fixed network idle time instead
+			self.logger.debug(f'⏳ Network idle wait: {profile.wait_for_network_idle_page_load_time}s')
+			await asyncio.sleep(profile.wait_for_network_idle_page_load_time)
+		elif not await self.browser_session._readiness.wait_until_idle(
+			cdp_session.session_id,
+			profile.wait_for_network_idle_page_load_time,
+			deadline - time.monotonic(),
+			request_timeout=profile.minimum_wait_page_load_time + profile.wait_for_network_idle_page_load_time,
+		):
+			self.logger.debug(f'⏳ Page still loading after {profile.maximum_wait_page_load_time}s, continuing anyway')
+
+		layout_timeout = min(
+			profile.minimum_wait_page_load_time + profile.wait_for_network_idle_page_load_time,
+			max(deadline - time.monotonic(), 0),
+		)
+		try:
+			result = await asyncio.wait_for(
+				cdp_session.cdp_client.send.Runtime.evaluate(
+					params={
+						'expression': f'({WAIT_FOR_LAYOUT_QUIET_JS})({profile.minimum_wait_page_load_time * 1000}, {layout_timeout * 1000})',
+						'awaitPromise': True,
+						'returnByValue': True,
+					},
+					session_id=cdp_session.session_id,
+				),
+				timeout=layout_timeout + 1.0,
+			)
+			if not result.get('result', {}).get('value'):
+				self.logger.debug(f'⏳ Page layout still changing after {layout_timeout:.2f}s, continuing anyway')
+		except Exception as e:
+			self.logger.debug(f'⏳ Failed to wait for the page layout to settle: {type(e).__name__}: {e}')
 
 		elapsed = time.time() - start_time
 		self.logger.debug(f'✅ Page stability wait completed in {elapsed:.2f}s')
 
+	async def _get_unchanged_cached_state(self, event: BrowserStateRequestEvent) -> 'BrowserStateSummary | None':
+		"""Return the cached BrowserStateSummary if the page fingerprint and tabs still match what it was built from.
+
+		Counts a cache hit or miss either way, see state_cache_hit_rate.
+		"""
+		cached_state = self.browser_session._cached_browser_state_summary
+		unchanged = False
+		if (
+			self._page_fingerprint is not None
+			and self._page_fingerprint[1] is cached_state
+			and (cached_state.screenshot or not event.include_screenshot)
+		):
+			try:
+				page_fingerprint, tabs_info = await asyncio.gather(self._get_page_fingerprint(), self.browser_session.get_tabs())
+				unchanged = page_fingerprint == self._page_fingerprint[0] and tabs_info == cached_state.tabs
+			except Exception as e:
+				self.logger.debug(f'🔍 DOMWatchdog: Failed to fingerprint page, rebuilding browser state: {e}')
+
+		if not unchanged:
+			self.state_cache_misses += 1
+			return None
+
+		self.state_cache_hits += 1
+		self.logger.debug(
+			f'⚡ Page unchanged since the last browser state, reusing it (hit rate {self.state_cache_hit_rate:.0%})'
+		)
+		return dataclasses.replace(
+			cached_state, recent_events=self._get_recent_events_str() if event.include_recent_events else None
+		)
+
+	async def _get_page_fingerprint(self) -> str | None:
+		"""Get a cheap page-version fingerprint: mutation counter, scroll position, viewport size and frame tree.
+
+		Returns:
+			The fingerprint, or None if the page has frames from another origin whose changes the counter can't see
+		"""
+		if not self.browser_session.agent_focus:
+			return None
+
+		cdp_session = await self.browser_session.get_or_create_cdp_session(
+			target_id=self.browser_session.agent_focus.target_id, focus=True
+		)
+		frame_tree, page_state = await asyncio.wait_for(
+			asyncio.gather(
+				cdp_session.cdp_client.send.Page.getFrameTree(session_id=cdp_session.session_id),
+				cdp_session.cdp_client.send.Runtime.evaluate(
+					params={'expression': PAGE_FINGERPRINT_JS, 'returnByValue': True}, session_id=cdp_session.session_id
+				),
+			),
+			timeout=2.0,
+		)
+		state = page_state.get('result', {}).get('value')
+		if not state:
+			return None
+
+		root = frame_tree['frameTree']
+		origin = root['frame'].get('securityOrigin')
+		if state['childFrames'] != len(root.get('childFrames', [])):
+			return None  # some child frames live in another process (cross-origin), the frame tree doesn't show them
+
+		frames = []
+		stack = [root]
+		while stack:
+			tree = stack.pop()
+			frame = tree['frame']
+			if frame.get('securityOrigin') != origin:
+				return None
+			frames.append((frame['id'], frame['loaderId'], frame['url']))
+			stack.extend(tree.get('childFrames', []))
+
+		return json.dumps([cdp_session.target_id, state, sorted(frames)])
+
+	@property
+	def state_cache_hit_rate(self) -> float:
+		"""Share of browser state requests answered from the cached state because the page was unchanged."""
+		total = self.state_cache_hits + self.state_cache_misses
+		return self.state_cache_hits / total if total else 0.0
+
 	async def _get_page_info(self) -> 'PageInfo':
 		"""Get comprehensive page information using a single CDP call.
 
@@ -572,19 +777,39 @@ class DOMWatchdog(BaseWatchdog):
 
 		return self.selector_map.get(index) if self.selector_map else None
 
+	def _release_previous_states(self, current: 'BrowserStateSummary') -> None:
+		"""Detach the DOM trees of older states that finished events in the event bus history still hold.
+
+		Once a newer state is built, the is-new marking and index matching of the next step only use the current one,
+		and history recording only needs the selector map elements of older ones, not the trees of their pages.
+		"""
+		for event in list(self.event_bus.event_history.values()):
+			if not isinstance(event, BrowserStateRequestEvent):
+				continue
+			for event_result in event.event_results.values():
+				state = event_result.result
+				dom_state = getattr(state, 'dom_state', None)
+				if isinstance(dom_state, SerializedDOMState) and dom_state is not current.dom_state and dom_state._root:
+					state.dom_state = dom_state.detached()  # type: ignore[union-attr]
+
 	def clear_cache(self) -> None:
 		"""Clear cached DOM state to force rebuild on next access."""
 		self.selector_map = None
 		self.current_dom_state = None
 		self.enhanced_dom_tree = None
-		# Keep the DOM service instance to reuse its CDP client connection
+		self._page_fingerprint = None
+		# Keep the DOM service instance to reuse its CDP client connection, but not the tree it tracks
+		if self._dom_service:
+			self._dom_service.invalidate_tracked_tree()
 
 	def is_file_input(self, element: EnhancedDOMTreeNode) -> bool:
 		"""Check if element is a file input."""
 		return element.node_name.upper() == 'INPUT' and element.attributes.get('type', '').lower() == 'file'
 
 	@staticmethod
-	def is_element_visible_according_to_all_parents(node: EnhancedDOMTreeNode, html_frames: list[EnhancedDOMTreeNode]) -> bool:
+	def is_element_visible_according_to_all_parents(
+		node: EnhancedDOMTreeNode, html_frames: Sequence[EnhancedDOMTreeNode]
+	) -> bool:
 		"""Check if the element is visible according to all its parent HTML frames.
 
 		Delegates to the DomService static method.
@@ -511,9 +511,7 @@ class DownloadsWatchdog(BaseWatchdog):
 		self.logger.debug(f'[DownloadsWatchdog] Checking if target {target_id} is PDF viewer...')
 
 		# Get target info to get URL
-		cdp_client = self.browser_session.cdp_client
-		targets = await cdp_client.send.Target.getTargets()
-		target_info = next((t for t in targets['targetInfos'] if t['targetId'] == target_id), None)
+		target_info = await self.browser_session.get_target_info(target_id)
 		if not target_info:
 			self.logger.warning(f'[DownloadsWatchdog] No target info found for {target_id}')
 			return False
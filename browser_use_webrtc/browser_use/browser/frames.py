@@ -0,0 +1,61 @@
+"""Cache of frame trees and frame owners, invalidated by the frame events of the page."""
+
+from cdp_use.cdp.dom.commands import GetFrameOwnerReturns
+from cdp_use.cdp.page.commands import GetFrameTreeReturns
+from cdp_use.cdp.page.events import FrameAttachedEvent, FrameDetachedEvent, FrameNavigatedEvent
+from cdp_use.cdp.target import SessionID
+
+
+class FrameTreeCache:
+	"""Page.getFrameTree results by CDP session and DOM.getFrameOwner results by frame id.
+
+	A frame tree stays valid until a Page.frameAttached, frameNavigated or frameDetached event arrives on its session,
+	or the session detaches. A frame owner stays valid until its frame detaches: the iframe element of a frame does not
+	change while the frame lives, moving or replacing it detaches the frame (its nodeId is the one of when it was
+	resolved, the backendNodeId is stable).
+
+	Results are stored with the generation read before their request was sent, and dropped if a frame event arrived
+	in between, since the response may predate it.
+	"""
+
+	def __init__(self) -> None:
+		self._trees: dict[SessionID, GetFrameTreeReturns] = {}
+		self._owners: dict[str, GetFrameOwnerReturns] = {}
+		self.generation = 0
+
+	def get_tree(self, session_id: SessionID) -> GetFrameTreeReturns | None:
+		return self._trees.get(session_id)
+
+	def set_tree(self, session_id: SessionID, frame_tree: GetFrameTreeReturns, generation: int) -> None:
+		if generation == self.generation:
+			self._trees[session_id] = frame_tree
+
+	def get_owner(self, frame_id: str) -> GetFrameOwnerReturns | None:
+		return self._owners.get(frame_id)
+
+	def set_owner(self, frame_id: str, frame_owner: GetFrameOwnerReturns, generation: int) -> None:
+		if generation == self.generation:
+			self._owners[frame_id] = frame_owner
+
+	def invalidate(self, session_id: SessionID | None) -> None:
+		"""Forget the frame tree of a session, or of all sessions for an event without one."""
+		self.generation += 1
+		if session_id is None:
+			self._trees.clear()
+		else:
+			self._trees.pop(session_id, None)
+
+	def clear(self) -> None:
+		self.generation += 1
+		self._trees.clear()
+		self._owners.clear()
+
+	def on_frame_attached(self, event: FrameAttachedEvent, session_id: SessionID | None = None) -> None:
+		self.invalidate(session_id)
+
+	def on_frame_navigated(self, event: FrameNavigatedEvent, session_id: SessionID | None = None) -> None:
+		self.invalidate(session_id)
+
+	def on_frame_detached(self, event: FrameDetachedEvent, session_id: SessionID | None = None) -> None:
+		self.invalidate(session_id)
+		self._owners.pop(event['frameId'], None)
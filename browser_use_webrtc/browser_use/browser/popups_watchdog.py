@@ -1,9 +1,11 @@
 """Watchdog for handling JavaScript dialogs (alert, confirm, prompt) automatically."""
 
 import asyncio
+import weakref
 from typing import ClassVar
 
 from bubus import BaseEvent
+from cdp_use import CDPClient
 from pydantic import PrivateAttr
 
 from browser_use.browser.events import DialogOpenedEvent, TabCreatedEvent
@@ -19,6 +21,8 @@ class PopupsWatchdog(BaseWatchdog):
 
 	# Track which targets have dialog handlers registered
 	_dialog_listeners_registered: set[str] = PrivateAttr(default_factory=set)
+	# Track which CDP clients have the dialog handler, the sessions of many targets can share one client
+	_clients_with_dialog_handler: weakref.WeakSet[CDPClient] = PrivateAttr(default_factory=weakref.WeakSet)
 
 	def __init__(self, **kwargs):
 		super().__init__(**kwargs)
@@ -77,10 +81,13 @@ class PopupsWatchdog(BaseWatchdog):
 				except Exception as e:
 					self.logger.error(f'Failed to accept dialog: {e}')
 
-			cdp_session.cdp_client.register.Page.javascriptDialogOpening(handle_dialog)  # type: ignore[arg-type]
-			self.logger.debug(
-				f'Successfully registered Page.javascriptDialogOpening handler for session {cdp_session.session_id}'
-			)
+			# The handler accepts dialogs of any session on the client, register it once per client
+			if cdp_session.cdp_client not in self._clients_with_dialog_handler:
+				cdp_session.cdp_client.register.Page.javascriptDialogOpening(handle_dialog)  # type: ignore[arg-type]
+				self._clients_with_dialog_handler.add(cdp_session.cdp_client)
+				self.logger.debug(
+					f'Successfully registered Page.javascriptDialogOpening handler for session {cdp_session.session_id}'
+				)
 
 			# Mark this target as having dialog handling set up
 			self._dialog_listeners_registered.add(target_id)
@@ -635,18 +635,97 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 		description='Enable cross-origin iframe support (OOPIF/Out-of-Process iframes). When False (default), only same-origin frames are processed to avoid complexity and hanging.',
 	)
 
+	# --- CDP connection ---
+	cdp_dedicated_sockets: bool = Field(
+		default=False,
+		description='Open a dedicated CDP WebSocket connection for every tab instead of sharing the root connection between all of them.',
+	)
+	cdp_session_pool_size: int = Field(
+		default=64,
+		ge=1,
+		description='Maximum number of CDP sessions to keep attached, the least recently used ones beyond it are detached (the focused tab never is).',
+	)
+
 	# --- Page load/wait timings ---
 	default_navigation_timeout: float | None = Field(default=None, description='Default page navigation timeout.')
 	default_timeout: float | None = Field(default=None, description='Default playwright call timeout.')
-	minimum_wait_page_load_time: float = Field(default=0.25, description='Minimum time to wait before capturing page state.')
-	wait_for_network_idle_page_load_time: float = Field(default=0.5, description='Time to wait for network idle.')
+	minimum_wait_page_load_time: float = Field(
+		default=0.25, description='Time the DOM and layout of the page must have stayed unchanged before capturing page state.'
+	)
+	wait_for_network_idle_page_load_time: float = Field(
+		default=0.5,
+		description='Time the page must have gone without starting or finishing a request before capturing page state.',
+	)
 	maximum_wait_page_load_time: float = Field(default=5.0, description='Maximum time to wait for page load.')
-	wait_between_actions: float = Field(default=0.5, description='Time to wait between actions.')
+	network_idle_ignored_urls: list[str] = Field(
+		default_factory=lambda: [
+			'google-analytics.com',
+			'googletagmanager.com',
+			'doubleclick.net',
+			'facebook.com/tr',
+			'hotjar.com',
+			'clarity.ms',
+			'segment.io',
+			'mixpanel.com',
+			'sentry.io',
+			'/socket.io/',
+			'/sockjs',
+			'longpoll',
+		],
+		description='Substrings of request URLs (long-polling, analytics, ads) that page load waits do not wait for.',
+	)
+	wait_between_actions: float = Field(
+		default=0.5, description='Maximum time to wait for what an action triggered to settle before the next action.'
+	)
+	action_grace_period: float = Field(
+		default=0.1,
+		description='Time an action has to trigger requests, navigation, dialogs, new tabs or DOM changes, an action that triggers none is done after it.',
+	)
 
 	# --- UI/viewport/DOM ---
 	include_dynamic_attributes: bool = Field(default=True, description='Include dynamic attributes in selectors.')
 	highlight_elements: bool = Field(default=True, description='Highlight interactive elements on the page.')
 	viewport_expansion: int = Field(default=500, description='Viewport expansion in pixels for LLM context.')
+	incremental_dom: bool = Field(
+		default=False,
+		description='Keep the DOM tree between steps and patch it from CDP DOM mutation events instead of rebuilding the whole page every step (experimental).',
+	)
+	windowed_dom: bool = Field(
+		default=False,
+		description='Only build the DOM tree within viewport_expansion pixels of the viewport, off-screen regions are kept as placeholders (experimental).',
+	)
+	prune_hidden_dom: bool = Field(
+		default=False,
+		description='Skip building DOM subtrees that are not rendered (display: none), except menus, popups and form controls revealed on hover or focus (experimental).',
+	)
+	reuse_unchanged_browser_state: bool = Field(
+		default=False,
+		description='Return the previous browser state, screenshot included, without waiting for the page or rebuilding the DOM when no DOM mutation, input, scroll or tab change happened since (experimental, canvas, video, running animations and form values set by scripts are not seen as changes).',
+	)
+	snapshot_dom: bool = Field(
+		default=False,
+		description='Build the DOM tree from DOMSnapshot.captureSnapshot alone instead of also transferring the whole document with DOM.getDocument every step (experimental, not combined with incremental_dom).',
+	)
+	accessibility_tree: Literal['full', 'cached', 'partial'] = Field(
+		default='full',
+		description="How accessibility data is fetched: 'full' fetches the accessibility tree of every frame every step, 'cached' reuses it until DOM mutations or navigation invalidate it, 'partial' only fetches the accessibility nodes of visible interactive candidates (experimental).",
+	)
+	stable_element_indices: bool = Field(
+		default=False,
+		description='Keep the index of interactive elements that are still on the page between steps and give new elements unused numbers, instead of numbering all elements from 1 every step.',
+	)
+	collapse_repeated_dom: bool = Field(
+		default=False,
+		description='Serialize long runs of structurally identical siblings (product grids, search results, table rows) past the first few as one compact line each, keeping every interactive index.',
+	)
+	paint_order_filtering: bool = Field(
+		default=False,
+		description='Leave out elements that an opaque element painted after them covers completely, such as the page behind a modal or an overlay.',
+	)
+	max_dom_nodes: int | None = Field(
+		default=None,
+		description='Maximum number of DOM nodes to process per page, the rest of larger pages is left out in document order (possibly including the viewport) and their DOM is rebuilt on every step. None for no limit.',
+	)
 
 	# --- Downloads ---
 	auto_download_pdfs: bool = Field(default=True, description='Automatically download PDFs when navigating to PDF viewer pages.')
@@ -0,0 +1,209 @@
+"""Page readiness tracking from lifecycle and network events, and an in-page wait for the layout to stop changing."""
+
+import asyncio
+import time
+from collections.abc import Iterable
+
+from cdp_use.cdp.network.events import LoadingFailedEvent, LoadingFinishedEvent, RequestWillBeSentEvent
+from cdp_use.cdp.page.events import JavascriptDialogOpeningEvent, LifecycleEventEvent, NavigatedWithinDocumentEvent
+from cdp_use.cdp.target import SessionID, TargetCreatedEvent
+
+# Requests that stay open for as long as the page lives or that the page never waits for
+IGNORED_RESOURCE_TYPES = frozenset({'WebSocket', 'EventSource', 'Ping', 'CSPViolationReport', 'Prefetch'})
+
+# Resolves once the document has loaded and neither its DOM (ignoring our own highlight overlay) nor its layout changed
+# for quietMs, or with false after timeoutMs. The observers stay installed in the document, so a page that has been
+# quiet since the last call resolves at once. Their state is kept under a non-enumerable symbol, which page scripts that
+# walk the properties of window do not see.
+WAIT_FOR_LAYOUT_QUIET_JS = """
+(quietMs, timeoutMs) => new Promise((resolve) => {
+	const key = Symbol.for('browser-use.layout-quiet');
+	let quiet = window[key];
+	if (!quiet) {
+		quiet = { lastChange: 0 };
+		Object.defineProperty(window, key, { value: quiet });
+		const isHighlight = (node) =>
+			!!(node?.nodeType === 1 ? node : node?.parentElement)?.closest('[data-browser-use-highlight]');
+		new MutationObserver((records) => {
+			if (!records.every((record) => isHighlight(record.target))) quiet.lastChange = performance.now();
+		}).observe(document, { subtree: true, childList: true, characterData: true });
+		try {
+			new PerformanceObserver((list) => {
+				for (const entry of list.getEntries()) quiet.lastChange = Math.max(quiet.lastChange, entry.startTime);
+			}).observe({ type: 'layout-shift', buffered: true });
+		} catch (e) {}
+	}
+	const deadline = performance.now() + timeoutMs;
+	const check = () => {
+		const now = performance.now();
+		const quietFor = document.readyState === 'complete' ? now - quiet.lastChange : 0;
+		if (quietFor >= quietMs || now >= deadline) {
+			resolve(quietFor >= quietMs);
+		} else {
+			setTimeout(check, Math.max(Math.min(quietMs - quietFor, deadline - now, 50), 1));
+		}
+	};
+	check();
+})
+"""
+
+
+class PageLoadState:
+	"""What the readiness tracker knows about the document of one CDP session."""
+
+	def __init__(self, frame_id: str):
+		self.frame_id = frame_id  # main frame, the target id of a page
+		self.navigations = 0  # new documents and same-document navigations of the main frame
+		self.loaded = True  # the load event of a document committed before tracking started is not seen
+		self.requests: dict[str, float] = {}  # request id -> time.monotonic() it was sent, requests in flight
+		self.last_activity = 0.0  # time.monotonic() of the last request start or end, navigation, dialog or opened tab
+		self.changed = asyncio.Event()
+
+	def notify(self) -> None:
+		"""Wake the coroutines waiting on this page."""
+		self.last_activity = time.monotonic()
+		self.changed.set()
+		self.changed = asyncio.Event()
+
+
+class PageReadinessTracker:
+	"""Load and network state of the pages of CDP sessions, by session id.
+
+	Kept current by Page.lifecycleEvent, Page.navigatedWithinDocument, Page.javascriptDialogOpening, Target.targetCreated
+	(of the tabs a page opens) and the Network.requestWillBeSent, loadingFinished and loadingFailed events, so waiting for
+	a page that is already settled takes no time. Requests to URLs containing one of `ignored_urls` (long-polling,
+	analytics, ads) and streaming resource types are not waited for.
+	"""
+
+	def __init__(self, ignored_urls: Iterable[str] = ()) -> None:
+		self._pages: dict[SessionID, PageLoadState] = {}
+		self.ignored_urls = tuple(ignored_urls)
+
+	def __contains__(self, session_id: object) -> bool:
+		return session_id in self._pages
+
+	def get(self, session_id: SessionID) -> PageLoadState | None:
+		return self._pages.get(session_id)
+
+	def track(self, session_id: SessionID, frame_id: str) -> PageLoadState:
+		"""Start tracking the page of a session, the caller enables its Network and lifecycle events."""
+		if session_id not in self._pages:
+			self._pages[session_id] = PageLoadState(frame_id)
+		return self._pages[session_id]
+
+	def forget(self, session_id: SessionID) -> None:
+		self._pages.pop(session_id, None)
+
+	def clear(self) -> None:
+		self._pages.clear()
+
+	def is_ignored(self, url: str, resource_type: str | None = None) -> bool:
+		return (
+			resource_type in IGNORED_RESOURCE_TYPES
+			or url.startswith(('data:', 'blob:'))
+			or any(pattern in url for pattern in self.ignored_urls)
+		)
+
+	async def wait_until_idle(
+		self,
+		session_id: SessionID,
+		idle_time: float,
+		timeout: float,
+		since: float = 0.0,
+		request_timeout: float | None = None,
+	) -> bool:
+		"""Wait until the page has loaded and no request started or ended for `idle_time` seconds.
+
+		With `since` (a time.monotonic() value), the idle time counts from it at the earliest: after an action started at
+		`since`, this waits `idle_time` for the action to trigger anything, and then for what it triggered to settle.
+		Requests in flight for longer than `request_timeout` seconds (long-polling, stalled requests) are not waited for.
+
+		Returns:
+			False if the page was still loading after `timeout` seconds, True otherwise (also for untracked pages)
+		"""
+		page = self._pages.get(session_id)
+		deadline = time.monotonic() + timeout
+		while page is not None:
+			changed = page.changed
+			now = time.monotonic()
+			pending = [sent for sent in page.requests.values() if request_timeout is None or now - sent < request_timeout]
+			if page.loaded and not pending:
+				idle_for = now - max(page.last_activity, since)
+				if idle_for >= idle_time:
+					return True
+				wake_in = idle_time - idle_for
+			elif page.loaded and request_timeout is not None:
+				wake_in = min(pending) + request_timeout - now  # when the oldest request stops being waited for
+			else:
+				wake_in = deadline - now
+			if now >= deadline:
+				return False
+			try:
+				await asyncio.wait_for(changed.wait(), timeout=min(wake_in, deadline - now))
+			except TimeoutError:
+				pass
+			page = self._pages.get(session_id)
+		return True
+
+	async def wait_for_navigation(self, session_id: SessionID, navigations: int, timeout: float) -> bool:
+		"""Wait until the page of a session navigated since it had counted `navigations`, at most `timeout` seconds."""
+		deadline = time.monotonic() + timeout
+		while (page := self._pages.get(session_id)) is not None and page.navigations <= navigations:
+			if (remaining := deadline - time.monotonic()) <= 0:
+				return False
+			try:
+				await asyncio.wait_for(page.changed.wait(), timeout=remaining)
+			except TimeoutError:
+				pass
+		return page is not None
+
+	def on_lifecycle_event(self, event: LifecycleEventEvent, session_id: SessionID | None = None) -> None:
+		page = self._pages.get(session_id) if session_id else None
+		if page is None or event['frameId'] != page.frame_id:
+			return
+		if event['name'] == 'init':
+			page.navigations += 1
+			page.loaded = False
+		elif event['name'] == 'load':
+			page.loaded = True
+		else:
+			return
+		page.notify()
+
+	def on_navigated_within_document(self, event: NavigatedWithinDocumentEvent, session_id: SessionID | None = None) -> None:
+		page = self._pages.get(session_id) if session_id else None
+		if page is not None and event['frameId'] == page.frame_id:
+			page.navigations += 1
+			page.notify()
+
+	def on_javascript_dialog_opening(self, event: JavascriptDialogOpeningEvent, session_id: SessionID | None = None) -> None:
+		page = self._pages.get(session_id) if session_id else None
+		if page is not None:
+			page.notify()
+
+	def on_target_created(self, event: TargetCreatedEvent, session_id: SessionID | None = None) -> None:
+		"""A tab opened by a tracked page is activity of that page, the target id of a page is its main frame id."""
+		target_info = event['targetInfo']
+		if target_info['type'] != 'page' or not (opener_id := target_info.get('openerId')):
+			return
+		for page in self._pages.values():
+			if page.frame_id == opener_id:
+				page.notify()
+
+	def on_request_will_be_sent(self, event: RequestWillBeSentEvent, session_id: SessionID | None = None) -> None:
+		page = self._pages.get(session_id) if session_id else None
+		if page is None or self.is_ignored(event['request']['url'], event.get('type')):
+			return
+		page.requests[event['requestId']] = time.monotonic()
+		page.notify()
+
+	def on_loading_finished(self, event: LoadingFinishedEvent, session_id: SessionID | None = None) -> None:
+		self._request_done(event['requestId'], session_id)
+
+	def on_loading_failed(self, event: LoadingFailedEvent, session_id: SessionID | None = None) -> None:
+		self._request_done(event['requestId'], session_id)
+
+	def _request_done(self, request_id: str, session_id: SessionID | None) -> None:
+		page = self._pages.get(session_id) if session_id else None
+		if page is not None and page.requests.pop(request_id, None) is not None:
+			page.notify()
@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import time
 from typing import Any, Self, cast
 
 import httpx
@@ -9,12 +10,14 @@ from bubus import EventBus
 from cdp_use import CDPClient
 from cdp_use.cdp.fetch import AuthRequiredEvent, RequestPausedEvent
 from cdp_use.cdp.network import Cookie
-from cdp_use.cdp.target import AttachedToTargetEvent, SessionID, TargetID
+from cdp_use.cdp.page.commands import GetFrameTreeReturns
+from cdp_use.cdp.target import AttachedToTargetEvent, DetachedFromTargetEvent, SessionID, TargetDestroyedEvent, TargetID
 from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from uuid_extensions import uuid7str
 
 # CDP logging is now handled by setup_logging() in logging_config.py
 # It automatically sets CDP logs to the same level as browser_use logs
+from browser_use.browser.cdp_transport import CDPSessionPool, MultiplexedCDPClient
 from browser_use.browser.events import (
 	AgentFocusChangedEvent,
 	BrowserConnectedEvent,
@@ -34,10 +37,13 @@ from browser_use.browser.events import (
 	TabClosedEvent,
 	TabCreatedEvent,
 )
+from browser_use.browser.frames import FrameTreeCache
 from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.readiness import WAIT_FOR_LAYOUT_QUIET_JS, PageLoadState, PageReadinessTracker
+from browser_use.browser.targets import TargetRegistry
 from browser_use.browser.views import BrowserStateSummary, TabInfo
 from browser_use.dom.views import EnhancedDOMTreeNode, TargetInfo
-from browser_use.utils import _log_pretty_url, is_new_tab_page
+from browser_use.utils import is_new_tab_page
 
 DEFAULT_BROWSER_PROFILE = BrowserProfile()
 
@@ -48,7 +54,8 @@ MAX_SCREENSHOT_WIDTH = 1920
 class CDPSession(BaseModel):
 	"""Info about a single CDP session bound to a specific target.
 
-	Can optionally use its own WebSocket connection for better isolation.
+	Shares the WebSocket connection of the root CDP client by default, routed by session id, and can optionally use its
+	own WebSocket connection for better isolation.
 	"""
 
 	model_config = ConfigDict(arbitrary_types_allowed=True, revalidate_instances='never')
@@ -165,6 +172,16 @@ class CDPSession(BaseModel):
 			except Exception:
 				pass  # Ignore errors during cleanup
 
+	async def detach(self) -> None:
+		"""Detach from the target, closing the WebSocket connection too if this session owns it."""
+		if self.owns_cdp_client:
+			await self.disconnect()
+			return
+		try:
+			await self.cdp_client.send.Target.detachFromTarget(params={'sessionId': self.session_id})
+		except Exception:
+			pass  # The target may already be gone
+
 	async def get_tab_info(self) -> TabInfo:
 		target_info = await self.get_target_info()
 		return TabInfo(
@@ -213,7 +230,10 @@ class BrowserSession(BaseModel):
 
 	# Mutable private state shared between watchdogs
 	_cdp_client_root: CDPClient | None = PrivateAttr(default=None)
-	_cdp_session_pool: dict[str, CDPSession] = PrivateAttr(default_factory=dict)
+	_cdp_session_pool: CDPSessionPool = PrivateAttr(default_factory=CDPSessionPool)  # least recently used first
+	_targets: TargetRegistry = PrivateAttr(default_factory=TargetRegistry)  # kept current by target discovery events
+	_frame_trees: FrameTreeCache = PrivateAttr(default_factory=FrameTreeCache)  # invalidated by Page frame events
+	_readiness: PageReadinessTracker = PrivateAttr(default_factory=PageReadinessTracker)  # page load and network state
 	_cached_browser_state_summary: Any = PrivateAttr(default=None)
 	_cached_selector_map: dict[int, EnhancedDOMTreeNode] = PrivateAttr(default_factory=dict)
 	_downloaded_files: list[str] = PrivateAttr(default_factory=list)  # Track files downloaded during this session
@@ -261,6 +281,9 @@ class BrowserSession(BaseModel):
 			if hasattr(session, 'disconnect'):
 				await session.disconnect()
 		self._cdp_session_pool.clear()
+		self._targets.clear()
+		self._frame_trees.clear()
+		self._readiness.clear()
 
 		self._cdp_client_root = None  # type: ignore
 		self._cached_browser_state_summary = None
@@ -427,7 +450,6 @@ class BrowserSession(BaseModel):
 			self.logger.debug(f'[on_NavigateToUrlEvent] Processing new_tab={event.new_tab}')
 			if event.new_tab:
 				# Look for existing about:blank tab that's not the current one
-				targets = await self._cdp_get_all_pages()
 				self.logger.debug(f'[on_NavigateToUrlEvent] Found {len(targets)} existing tabs')
 				current_target_id = self.agent_focus.target_id if self.agent_focus else None
 				self.logger.debug(f'[on_NavigateToUrlEvent] Current target_id: {current_target_id}')
@@ -447,7 +469,6 @@ class BrowserSession(BaseModel):
 					try:
 						target_id = await self._cdp_create_new_page('about:blank')
 						self.logger.debug(f'[on_NavigateToUrlEvent] Created new page with target_id: {target_id}')
-						targets = await self._cdp_get_all_pages()
 
 						self.logger.debug(f'Created new tab #{target_id[-4:]}')
 						# Dispatch TabCreatedEvent for new tab
@@ -471,6 +492,8 @@ class BrowserSession(BaseModel):
 
 			# Dispatch navigation started
 			await self.event_bus.dispatch(NavigationStartedEvent(target_id=target_id, url=event.url))
+			page = await self._track_page_readiness(self.agent_focus)
+			navigations = page.navigations if page else None
 
 			# Navigate to URL
 			await self.agent_focus.cdp_client.send.Page.navigate(
@@ -482,8 +505,8 @@ class BrowserSession(BaseModel):
 				session_id=self.agent_focus.session_id,
 			)
 
-			# Wait a bit to ensure page starts loading
-			await asyncio.sleep(0.5)
+			# Wait until the page starts loading (at most as long as the former fixed wait)
+			await self._wait_for_navigation_start(self.agent_focus, navigations, timeout=0.5)
 
 			# Dispatch navigation complete
 			self.logger.debug(f'Dispatching NavigationCompleteEvent for {event.url} (tab #{target_id[-4:]})')
@@ -676,7 +699,7 @@ class BrowserSession(BaseModel):
 		Args:
 				target_id: Target ID to get session for. If None, uses current agent focus.
 				focus: If True, switches agent focus to this target. If False, just returns session without changing focus.
-				new_socket: If True, create a dedicated WebSocket connection. If None (default), creates new socket for new targets only.
+				new_socket: If True, create a dedicated WebSocket connection. If None (default), follows browser_profile.cdp_dedicated_sockets.
 
 		Returns:
 				CDPSession for the specified target.
@@ -691,6 +714,7 @@ class BrowserSession(BaseModel):
 
 		# Check if we already have a session for this target in the pool
 		if target_id in self._cdp_session_pool:
+			self._cdp_session_pool.touch(target_id)
 			session = self._cdp_session_pool[target_id]
 			if focus and self.agent_focus.target_id != target_id:
 				self.logger.debug(
@@ -710,8 +734,8 @@ class BrowserSession(BaseModel):
 			return self.agent_focus
 
 		# Create new session for this target
-		# Default to True for new sessions (each new target gets its own WebSocket)
-		should_use_new_socket = True if new_socket is None else new_socket
+		# By default it is multiplexed over the root WebSocket, flattened sessions are routed by session id
+		should_use_new_socket = self.browser_profile.cdp_dedicated_sockets if new_socket is None else new_socket
 		self.logger.debug(
 			f'[get_or_create_cdp_session] Creating new CDP session for target {target_id} (new_socket={should_use_new_socket})'
 		)
@@ -736,8 +760,98 @@ class BrowserSession(BaseModel):
 				f'[get_or_create_cdp_session] Created session for {target_id} without changing focus (still on {self.agent_focus.target_id})'
 			)
 
+		await self._evict_cdp_sessions()
 		return session
 
+	async def _evict_cdp_sessions(self) -> None:
+		"""Detach the least recently used CDP sessions beyond browser_profile.cdp_session_pool_size, except the focused one."""
+		keep = [self.agent_focus.target_id] if self.agent_focus else []
+		for session in self._cdp_session_pool.evict(self.browser_profile.cdp_session_pool_size, keep):
+			self.logger.debug(
+				f'[get_or_create_cdp_session] Detaching least recently used CDP session for target {session.target_id}'
+			)
+			await session.detach()
+
+	def _on_target_destroyed(self, event: TargetDestroyedEvent, session_id: SessionID | None = None) -> None:
+		"""Drop a closed tab or iframe from the target registry and its CDP session from the pool."""
+		self._targets.on_target_destroyed(event)
+		if session := self._cdp_session_pool.pop(event['targetId'], None):
+			self.logger.debug(f'Removed CDP session of destroyed target {session.target_id} from the pool')
+			if session.owns_cdp_client:
+				asyncio.create_task(session.disconnect())
+
+	def _on_detached_from_target(self, event: DetachedFromTargetEvent, session_id: SessionID | None = None) -> None:
+		"""Drop a CDP session the browser detached (target closed or crashed, or detached by someone else) from the pool."""
+		self._frame_trees.invalidate(event['sessionId'])
+		self._readiness.forget(event['sessionId'])
+		if session := self._cdp_session_pool.pop_session(event['sessionId']):
+			self.logger.debug(f'Removed detached CDP session of target {session.target_id} from the pool')
+
+	async def _track_page_readiness(self, cdp_session: CDPSession) -> PageLoadState | None:
+		"""Start following the lifecycle and network events of a page, returns None for a session on a dedicated socket."""
+		if cdp_session.cdp_client is not self._cdp_client_root:
+			return None  # its events are not seen by the root client
+		if page := self._readiness.get(cdp_session.session_id):
+			return page
+		page = self._readiness.track(cdp_session.session_id, cdp_session.target_id)
+		try:
+			await asyncio.gather(
+				cdp_session.cdp_client.send.Network.enable(session_id=cdp_session.session_id),
+				cdp_session.cdp_client.send.Page.setLifecycleEventsEnabled(
+					params={'enabled': True}, session_id=cdp_session.session_id
+				),
+			)
+		except Exception as e:
+			self.logger.debug(f'Failed to enable page readiness events for target {cdp_session.target_id}: {e}')
+			self._readiness.forget(cdp_session.session_id)
+			return None
+		return page
+
+	async def _wait_for_navigation_start(self, cdp_session: CDPSession, navigations: int | None, timeout: float) -> None:
+		"""Wait until a page tracked with _track_page_readiness navigated since it had counted `navigations`."""
+		if navigations is None:
+			await asyncio.sleep(timeout)  # navigations of untracked pages are not seen
+		elif not await self._readiness.wait_for_navigation(cdp_session.session_id, navigations, timeout):
+			self.logger.debug(f'No navigation of target {cdp_session.target_id} started within {timeout}s')
+
+	async def _wait_for_action_to_settle(self, started_at: float) -> None:
+		"""Wait until the requests, navigation, dialogs, new tabs and DOM changes an action triggered in the focused page settled.
+
+		An action that triggers nothing within browser_profile.action_grace_period is done after it, and the wait never
+		lasts longer than browser_profile.wait_between_actions from `started_at` (a time.monotonic() value).
+		"""
+		if not self.agent_focus:
+			return
+		cdp_session = self.agent_focus
+		grace_period = self.browser_profile.action_grace_period
+		deadline = started_at + max(self.browser_profile.wait_between_actions, grace_period)
+
+		if await self._track_page_readiness(cdp_session) is None:
+			# what happens in a session on a dedicated socket is not seen, wait the whole time
+			await asyncio.sleep(max(deadline - time.monotonic(), 0))
+			return
+		await self._readiness.wait_until_idle(
+			cdp_session.session_id, grace_period, timeout=deadline - time.monotonic(), since=started_at
+		)
+
+		# then for a burst of DOM changes (menus, validation messages, client-side rendering) to end
+		if (remaining := deadline - time.monotonic()) <= 0:
+			return
+		try:
+			await asyncio.wait_for(
+				cdp_session.cdp_client.send.Runtime.evaluate(
+					params={
+						'expression': f'({WAIT_FOR_LAYOUT_QUIET_JS})({grace_period * 1000}, {remaining * 1000})',
+						'awaitPromise': True,
+						'returnByValue': True,
+					},
+					session_id=cdp_session.session_id,
+				),
+				timeout=remaining + 1.0,
+			)
+		except Exception as e:
+			self.logger.debug(f'Failed to wait for the DOM to settle after an action: {type(e).__name__}: {e}')
+
 	@property
 	def current_target_id(self) -> str | None:
 		return self.agent_focus.target_id if self.agent_focus else None
@@ -938,16 +1052,36 @@ class BrowserSession(BaseModel):
 			# Convert HTTP URL to WebSocket URL if needed
 
 			# Create and store the CDP client for direct CDP communication
-			self._cdp_client_root = CDPClient(self.cdp_url)
+			self._cdp_client_root = MultiplexedCDPClient(self.cdp_url)
 			assert self._cdp_client_root is not None
 			await self._cdp_client_root.start()
 			await self._cdp_client_root.send.Target.setAutoAttach(
 				params={'autoAttach': True, 'waitForDebuggerOnStart': False, 'flatten': True}
 			)
+			# Keep the target registry and the session pool in sync with opened and closed tabs and iframes
+			self._cdp_client_root.register.Target.targetCreated(self._targets.on_target_created)
+			self._cdp_client_root.register.Target.targetInfoChanged(self._targets.on_target_info_changed)
+			self._cdp_client_root.register.Target.targetDestroyed(self._on_target_destroyed)
+			self._cdp_client_root.register.Target.detachedFromTarget(self._on_detached_from_target)
+			await self._cdp_client_root.send.Target.setDiscoverTargets(params={'discover': True})
+			# Frame trees are cached until the frames of their target change
+			self._cdp_client_root.register.Page.frameAttached(self._frame_trees.on_frame_attached)
+			self._cdp_client_root.register.Page.frameNavigated(self._frame_trees.on_frame_navigated)
+			self._cdp_client_root.register.Page.frameDetached(self._frame_trees.on_frame_detached)
+			# Page readiness follows the lifecycle and network events of the pages it tracks
+			self._readiness.ignored_urls = tuple(self.browser_profile.network_idle_ignored_urls)
+			self._cdp_client_root.register.Page.lifecycleEvent(self._readiness.on_lifecycle_event)
+			self._cdp_client_root.register.Page.navigatedWithinDocument(self._readiness.on_navigated_within_document)
+			self._cdp_client_root.register.Page.javascriptDialogOpening(self._readiness.on_javascript_dialog_opening)
+			self._cdp_client_root.register.Target.targetCreated(self._readiness.on_target_created)
+			self._cdp_client_root.register.Network.requestWillBeSent(self._readiness.on_request_will_be_sent)
+			self._cdp_client_root.register.Network.loadingFinished(self._readiness.on_loading_finished)
+			self._cdp_client_root.register.Network.loadingFailed(self._readiness.on_loading_failed)
 			self.logger.debug('CDP client connected successfully')
 
 			# Get browser targets to find available contexts/pages
 			targets = await self._cdp_client_root.send.Target.getTargets()
+			self._targets.seed(targets['targetInfos'])
 
 			# Find main browser pages (avoiding iframes, workers, extensions, etc.)
 			page_targets: list[TargetInfo] = [
@@ -1153,7 +1287,7 @@ class BrowserSession(BaseModel):
 			try:
 				self._cdp_client_root.register.Fetch.authRequired(_on_auth_required)
 				self._cdp_client_root.register.Fetch.requestPaused(_on_request_paused)
-				if self.agent_focus:
+				if self.agent_focus and self.agent_focus.cdp_client is not self._cdp_client_root:
 					self.agent_focus.cdp_client.register.Fetch.authRequired(_on_auth_required)
 					self.agent_focus.cdp_client.register.Fetch.requestPaused(_on_request_paused)
 				self.logger.debug('Registered Fetch.authRequired handlers')
@@ -1198,58 +1332,43 @@ class BrowserSession(BaseModel):
 			self.logger.debug(f'Skipping proxy auth setup: {type(e).__name__}: {e}')
 
 	async def get_tabs(self) -> list[TabInfo]:
-		"""Get information about all open tabs using CDP Target.getTargetInfo for speed."""
+		"""Get information about all open tabs from the target registry, without any CDP roundtrip."""
 		tabs = []
 
 		# Safety check - return empty list if browser not connected yet
 		if not self._cdp_client_root:
 			return tabs
 
-		# Get all page targets using CDP
+		# Get all page targets from the target registry
 		pages = await self._cdp_get_all_pages()
 
-		for i, page_target in enumerate(pages):
+		for page_target in pages:
 			target_id = page_target['targetId']
 			url = page_target['url']
 
-			# Try to get the title directly from Target.getTargetInfo - much faster!
-			# The initial getTargets() doesn't include title, but getTargetInfo does
-			try:
-				target_info = await self.cdp_client.send.Target.getTargetInfo(params={'targetId': target_id})
-				# The title is directly available in targetInfo
-				title = target_info.get('targetInfo', {}).get('title', '')
-
-				# Skip JS execution for chrome:// pages and new tab pages
-				if is_new_tab_page(url) or url.startswith('chrome://'):
-					# Use URL as title for chrome pages, or mark new tabs as unusable
-					if is_new_tab_page(url):
-						title = 'ignore this tab and do not use it'
-					elif not title:
-						# For chrome:// pages without a title, use the URL itself
-						title = url
-
-				# Special handling for PDF pages without titles
-				if (not title or title == '') and (url.endswith('.pdf') or 'pdf' in url):
-					# PDF pages might not have a title, use URL filename
-					try:
-						from urllib.parse import urlparse
-
-						filename = urlparse(url).path.split('/')[-1]
-						if filename:
-							title = filename
-					except Exception:
-						pass
-
-			except Exception as e:
-				# Fallback to basic title handling
-				self.logger.debug(f'⚠️ Failed to get target info for tab #{i}: {_log_pretty_url(url)} - {type(e).__name__}')
+			# The registry keeps the title current from Target.targetInfoChanged events
+			title = page_target.get('title', '')
 
+			# Skip JS execution for chrome:// pages and new tab pages
+			if is_new_tab_page(url) or url.startswith('chrome://'):
+				# Use URL as title for chrome pages, or mark new tabs as unusable
 				if is_new_tab_page(url):
 					title = 'ignore this tab and do not use it'
-				elif url.startswith('chrome://'):
+				elif not title:
+					# For chrome:// pages without a title, use the URL itself
 					title = url
-				else:
-					title = ''
+
+			# Special handling for PDF pages without titles
+			if (not title or title == '') and (url.endswith('.pdf') or 'pdf' in url):
+				# PDF pages might not have a title, use URL filename
+				try:
+					from urllib.parse import urlparse
+
+					filename = urlparse(url).path.split('/')[-1]
+					if filename:
+						title = filename
+				except Exception:
+					pass
 
 			tab_info = TabInfo(
 				target_id=target_id,
@@ -1263,27 +1382,32 @@ class BrowserSession(BaseModel):
 
 	# ========== ID Lookup Methods ==========
 
+	async def get_target_info(self, target_id: TargetID) -> TargetInfo | None:
+		"""Get info about a target from the target registry, or CDP Target.getTargets before the registry is synced."""
+		if self._targets.synced:
+			return self._targets.get(target_id)
+		for target in await self._cdp_get_all_targets():
+			if target.get('targetId') == target_id:
+				return target
+		return None
+
 	async def get_current_target_info(self) -> TargetInfo | None:
-		"""Get info about the current active target using CDP."""
+		"""Get info about the current active target."""
 		if not self.agent_focus or not self.agent_focus.target_id:
 			return None
 
-		targets = await self.cdp_client.send.Target.getTargets()
-		for target in targets.get('targetInfos', []):
-			if target.get('targetId') == self.agent_focus.target_id:
-				# Still return even if it's not a "valid" target since we're looking for a specific ID
-				return target
-		return None
+		# Still return even if it's not a "valid" target since we're looking for a specific ID
+		return await self.get_target_info(self.agent_focus.target_id)
 
 	async def get_current_page_url(self) -> str:
-		"""Get the URL of the current page using CDP."""
+		"""Get the URL of the current page from the target registry."""
 		target = await self.get_current_target_info()
 		if target:
 			return target.get('url', '')
 		return 'about:blank'
 
 	async def get_current_page_title(self) -> str:
-		"""Get the title of the current page using CDP."""
+		"""Get the title of the current page from the target registry."""
 		target_info = await self.get_current_target_info()
 		if target_info:
 			return target_info.get('title', 'Unknown page title')
@@ -1330,9 +1454,7 @@ class BrowserSession(BaseModel):
 				return full_target_id
 
 		# may not have a cached session, so we need to get all pages and find the target id
-		all_targets = await self.cdp_client.send.Target.getTargets()
-		# Filter for valid page/tab targets only
-		for target in all_targets.get('targetInfos', []):
+		for target in await self._cdp_get_all_targets():
 			if target['targetId'].endswith(tab_id):
 				return target['targetId']
 
@@ -1340,13 +1462,13 @@ class BrowserSession(BaseModel):
 
 	async def get_target_id_from_url(self, url: str) -> TargetID:
 		"""Get the TargetID from a URL."""
-		all_targets = await self.cdp_client.send.Target.getTargets()
-		for target in all_targets.get('targetInfos', []):
+		all_targets = await self._cdp_get_all_targets()
+		for target in all_targets:
 			if target['url'] == url and target['type'] == 'page':
 				return target['targetId']
 
 		# still not found, try substring match as fallback
-		for target in all_targets.get('targetInfos', []):
+		for target in all_targets:
 			if url in target['url'] and target['type'] == 'page':
 				return target['targetId']
 
@@ -1354,7 +1476,6 @@ class BrowserSession(BaseModel):
 
 	async def get_most_recently_opened_target_id(self) -> TargetID:
 		"""Get the most recently opened target ID."""
-		all_targets = await self.cdp_client.send.Target.getTargets()
 		return (await self._cdp_get_all_pages())[-1]['targetId']
 
 	def is_file_input(self, element: Any) -> bool:
@@ -1472,15 +1593,11 @@ class BrowserSession(BaseModel):
 		include_chrome_extensions: bool = False,
 		include_chrome_error: bool = False,
 	) -> list[TargetInfo]:
-		"""Get all browser pages/tabs using CDP Target.getTargets."""
-		# Safety check - return empty list if browser not connected yet
-		if not self._cdp_client_root:
-			return []
-		targets = await self.cdp_client.send.Target.getTargets()
+		"""Get all browser pages/tabs from the target registry."""
 		# Filter for valid page/tab targets only
 		return [
 			t
-			for t in targets.get('targetInfos', [])
+			for t in await self._cdp_get_all_targets()
 			if self._is_valid_target(
 				t,
 				include_http=include_http,
@@ -1494,6 +1611,19 @@ class BrowserSession(BaseModel):
 			)
 		]
 
+	async def _cdp_get_all_targets(self) -> list[TargetInfo]:
+		"""Get all browser targets, oldest first, from the target registry.
+
+		Before the registry is synced (while connecting) this falls back to CDP Target.getTargets.
+		"""
+		# Safety check - return empty list if browser not connected yet
+		if not self._cdp_client_root:
+			return []
+		if self._targets.synced:
+			return self._targets.targets()
+		targets = await self.cdp_client.send.Target.getTargets()
+		return targets.get('targetInfos', [])
+
 	async def _cdp_create_new_page(self, url: str = 'about:blank', background: bool = False, new_window: bool = False) -> str:
 		"""Create a new page/tab using CDP Target.createTarget. Returns target ID."""
 		# Use the root CDP client to create tabs at the browser level
@@ -1506,11 +1636,16 @@ class BrowserSession(BaseModel):
 			result = await self.cdp_client.send.Target.createTarget(
 				params={'url': url, 'newWindow': new_window, 'background': background}
 			)
+		# Register the page right away in case its Target.targetCreated event is still on the way
+		self._targets.add(
+			TargetInfo(targetId=result['targetId'], type='page', title='', url=url, attached=False, canAccessOpener=False)
+		)
 		return result['targetId']
 
 	async def _cdp_close_page(self, target_id: TargetID) -> None:
 		"""Close a page/tab using CDP Target.closeTarget."""
 		await self.cdp_client.send.Target.closeTarget(params={'targetId': target_id})
+		self._targets.remove(target_id)
 
 	async def _cdp_get_cookies(self) -> list[Cookie]:
 		"""Get cookies using CDP Network.getCookies."""
@@ -1722,7 +1857,7 @@ class BrowserSession(BaseModel):
 
 				try:
 					# Try to get frame tree (not all target types support this)
-					frame_tree_result = await cdp_session.cdp_client.send.Page.getFrameTree(session_id=cdp_session.session_id)
+					frame_tree_result = await self._get_frame_tree(cdp_session)
 
 					# Process the frame tree recursively
 					def process_frame_tree(node, parent_frame_id=None):
@@ -1806,13 +1941,30 @@ class BrowserSession(BaseModel):
 
 		return all_frames, target_sessions
 
+	async def _get_frame_tree(self, cdp_session: CDPSession) -> GetFrameTreeReturns:
+		"""Get the frame tree of a target, from the cache until a frame event of the target invalidates it.
+
+		Only sessions on the root connection are cached, the frame events of sessions with their own WebSocket are not seen.
+		"""
+		cacheable = cdp_session.cdp_client is self._cdp_client_root
+		if cacheable and (frame_tree := self._frame_trees.get_tree(cdp_session.session_id)):
+			return frame_tree
+		generation = self._frame_trees.generation
+		frame_tree = await cdp_session.cdp_client.send.Page.getFrameTree(session_id=cdp_session.session_id)
+		if cacheable:
+			self._frame_trees.set_tree(cdp_session.session_id, frame_tree, generation)
+		return frame_tree
+
 	async def _populate_frame_metadata(self, all_frames: dict[str, dict], target_sessions: dict[str, str]) -> None:
 		"""Populate additional frame metadata like backend node IDs and parent target IDs.
 
+		Frame owners are cached per frame, only frames seen for the first time are resolved, all of them in parallel.
+
 		Args:
 			all_frames: Frame hierarchy dict to populate
 			target_sessions: Active target sessions
 		"""
+		unresolved: list[tuple[str, dict, str]] = []  # (frame_id, frame_info, parent_session_id)
 		for frame_id_iter, frame_info in all_frames.items():
 			parent_frame_id = frame_info.get('parentFrameId')
 
@@ -1826,23 +1978,36 @@ class BrowserSession(BaseModel):
 				# Try to get backend node ID from parent context
 				if parent_target_id in target_sessions:
 					assert parent_target_id is not None
-					parent_session_id = target_sessions[parent_target_id]
-					try:
-						# Enable DOM domain
-						await self.cdp_client.send.DOM.enable(session_id=parent_session_id)
+					if frame_owner := self._frame_trees.get_owner(frame_id_iter):
+						frame_info['backendNodeId'] = frame_owner.get('backendNodeId')
+						frame_info['nodeId'] = frame_owner.get('nodeId')
+					else:
+						unresolved.append((frame_id_iter, frame_info, target_sessions[parent_target_id]))
 
-						# Get frame owner info to find backend node ID
-						frame_owner = await self.cdp_client.send.DOM.getFrameOwner(
-							params={'frameId': frame_id_iter}, session_id=parent_session_id
-						)
-
-						if frame_owner:
-							frame_info['backendNodeId'] = frame_owner.get('backendNodeId')
-							frame_info['nodeId'] = frame_owner.get('nodeId')
+		if not unresolved:
+			return
 
-					except Exception:
-						# Frame owner not available (likely cross-origin)
-						pass
+		generation = self._frame_trees.generation
+		# Enable DOM domain once per parent session
+		await asyncio.gather(
+			*(self.cdp_client.send.DOM.enable(session_id=session_id) for session_id in {session for _, _, session in unresolved}),
+			return_exceptions=True,
+		)
+		# Get frame owner info to find backend node IDs
+		frame_owners = await asyncio.gather(
+			*(
+				self.cdp_client.send.DOM.getFrameOwner(params={'frameId': frame_id}, session_id=session_id)
+				for frame_id, _, session_id in unresolved
+			),
+			return_exceptions=True,
+		)
+		for (frame_id, frame_info, _), frame_owner in zip(unresolved, frame_owners):
+			if isinstance(frame_owner, BaseException) or not frame_owner:
+				# Frame owner not available (likely cross-origin)
+				continue
+			self._frame_trees.set_owner(frame_id, frame_owner, generation)
+			frame_info['backendNodeId'] = frame_owner.get('backendNodeId')
+			frame_info['nodeId'] = frame_owner.get('nodeId')
 
 	async def find_frame_target(self, frame_id: str, all_frames: dict[str, dict] | None = None) -> dict | None:
 		"""Find the frame info for a specific frame ID.
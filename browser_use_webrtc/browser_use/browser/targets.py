@@ -0,0 +1,61 @@
+"""In-memory registry of the browser's CDP targets, kept current by target discovery events."""
+
+from collections.abc import Iterable
+
+from cdp_use.cdp.target import SessionID, TargetCreatedEvent, TargetDestroyedEvent, TargetID, TargetInfoChangedEvent
+from cdp_use.cdp.target.types import TargetInfo
+
+
+class TargetRegistry:
+	"""Target infos by target id, in the order the targets were created.
+
+	Seeded once with Target.getTargets when the browser connects and updated from then on by the targetCreated,
+	targetInfoChanged and targetDestroyed events of Target.setDiscoverTargets, so reading it takes no CDP roundtrip.
+	"""
+
+	def __init__(self) -> None:
+		self._targets: dict[TargetID, TargetInfo] = {}
+		self.synced = False
+
+	def __len__(self) -> int:
+		return len(self._targets)
+
+	def __contains__(self, target_id: object) -> bool:
+		return target_id in self._targets
+
+	def get(self, target_id: TargetID) -> TargetInfo | None:
+		return self._targets.get(target_id)
+
+	def targets(self) -> list[TargetInfo]:
+		"""All known targets, oldest first."""
+		return list(self._targets.values())
+
+	def seed(self, target_infos: Iterable[TargetInfo]) -> None:
+		"""Fill the registry from a Target.getTargets result, events that arrived meanwhile are at least as recent."""
+		for target_info in target_infos:
+			self._targets.setdefault(target_info['targetId'], target_info)
+		self.synced = True
+
+	def update(self, target_info: TargetInfo) -> None:
+		"""Add a target or replace its info, a known target keeps its position."""
+		self._targets[target_info['targetId']] = target_info
+
+	def add(self, target_info: TargetInfo) -> None:
+		"""Add a target unless its (more recent) info is already known."""
+		self._targets.setdefault(target_info['targetId'], target_info)
+
+	def remove(self, target_id: TargetID) -> None:
+		self._targets.pop(target_id, None)
+
+	def clear(self) -> None:
+		self._targets.clear()
+		self.synced = False
+
+	def on_target_created(self, event: TargetCreatedEvent, session_id: SessionID | None = None) -> None:
+		self.update(event['targetInfo'])
+
+	def on_target_info_changed(self, event: TargetInfoChangedEvent, session_id: SessionID | None = None) -> None:
+		self.update(event['targetInfo'])
+
+	def on_target_destroyed(self, event: TargetDestroyedEvent, session_id: SessionID | None = None) -> None:
+		self.remove(event['targetId'])
@@ -336,12 +336,9 @@ class Registry(Generic[Context]):
 				current_url = None
 				if browser_session and browser_session.current_target_id:
 					try:
-						# Get current page info using CDP
-						targets = await browser_session.cdp_client.send.Target.getTargets()
-						for target in targets.get('targetInfos', []):
-							if target.get('targetId') == browser_session.current_target_id:
-								current_url = target.get('url')
-								break
+						# Get current page info from the target registry
+						target_info = await browser_session.get_current_target_info()
+						current_url = target_info.get('url') if target_info else None
 					except Exception:
 						pass
 				validated_params = self._replace_sensitive_data(validated_params, sensitive_data, current_url)
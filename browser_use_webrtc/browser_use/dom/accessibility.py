@@ -0,0 +1,146 @@
+"""
+Cached accessibility data for the DOM tree.
+
+`AXTreeCache` keeps the `Accessibility.getFullAXTree` result of every frame of a target and the
+`Accessibility.getPartialAXTree` nodes of single elements between agent steps. Entries are dropped when CDP events
+say they may be stale: `Accessibility.nodesUpdated` drops the frame of the updated nodes, DOM mutations, a document
+update or `Accessibility.loadComplete` drop everything, and `Page.frameNavigated` drops the navigated frame.
+
+Fetches remember the cache generation they started in, so a result that was invalidated while it was in flight is
+used for the current step but not stored.
+"""
+
+from collections.abc import Iterable
+
+from cdp_use.cdp.accessibility.types import AXNode
+from cdp_use.cdp.target import SessionID, TargetID
+
+from browser_use.dom.incremental import DOM_MUTATION_EVENTS
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType
+
+AX_EVENTS = ('nodesUpdated', 'loadComplete')
+"""`Accessibility.*` events the cache is invalidated by, each one is handled by `AXTreeCache._on_<event>`"""
+
+# `DOM.setChildNodes` only delivers nodes the client asked for, it does not change the page
+AX_INVALIDATING_DOM_EVENTS = frozenset(DOM_MUTATION_EVENTS) - {'setChildNodes'}
+
+# In partial mode, fetching more elements than this one by one is slower than the full tree of every frame
+MAX_PARTIAL_AX_REQUESTS = 300
+
+# Elements whose accessibility role or state can decide whether the serializer shows them
+AX_CANDIDATE_TAGS = frozenset(
+	{'a', 'button', 'input', 'select', 'textarea', 'label', 'details', 'summary', 'option', 'optgroup', 'iframe'}
+)
+AX_CANDIDATE_ATTRIBUTES = frozenset(
+	{
+		'role',
+		'tabindex',
+		'contenteditable',
+		'href',
+		'disabled',
+		'required',
+		'autocomplete',
+		'onclick',
+		'onmousedown',
+		'onmouseup',
+		'onkeydown',
+		'onkeyup',
+	}
+)
+
+
+def is_ax_candidate(node: EnhancedDOMTreeNode) -> bool:
+	"""Whether the accessibility node of an element can change how the serializer shows it.
+
+	Only visible elements are shown, and accessibility data only matters for elements that are focusable,
+	editable or carry an ARIA role or state, which shows in their tag, attributes or cursor.
+	"""
+	if node.node_type != NodeType.ELEMENT_NODE or not node.is_visible:
+		return False
+	if node.tag_name in AX_CANDIDATE_TAGS:
+		return True
+	if node.snapshot_node and node.snapshot_node.cursor_style == 'pointer':
+		return True
+	return any(name in AX_CANDIDATE_ATTRIBUTES or name.startswith('aria-') for name in node.attributes)
+
+
+class AXTreeCache:
+	"""Accessibility nodes of one target, kept until CDP events of its session invalidate them."""
+
+	def __init__(self, target_id: TargetID, session_id: SessionID):
+		self.target_id = target_id
+		self.session_id = session_id
+
+		self.frames: dict[str, list[AXNode]] = {}
+		"""Frame id -> nodes of its full accessibility tree"""
+		self.partial: dict[int, AXNode] = {}
+		"""Backend node id -> accessibility node of a single element"""
+		self.generation = 0
+		"""Bumped on every invalidation"""
+		self._node_frames: dict[int, str] = {}
+		"""Backend node id -> frame id of the full tree it is in"""
+
+	def store_frame(self, frame_id: str, nodes: list[AXNode], generation: int) -> None:
+		"""Keep the full tree of a frame, unless the cache was invalidated since `generation`."""
+		if generation != self.generation:
+			return
+		self.frames[frame_id] = nodes
+		for ax_node in nodes:
+			if 'backendDOMNodeId' in ax_node:
+				self._node_frames[ax_node['backendDOMNodeId']] = frame_id
+
+	def store_partial(self, ax_nodes: dict[int, AXNode], generation: int) -> None:
+		"""Keep the accessibility nodes of single elements, unless the cache was invalidated since `generation`."""
+		if generation == self.generation:
+			self.partial.update(ax_nodes)
+
+	def lookup(self) -> dict[int, AXNode]:
+		"""Backend node id -> accessibility node over all cached frames and elements."""
+		ax_tree_lookup = dict(self.partial)
+		for nodes in self.frames.values():
+			ax_tree_lookup.update((ax_node['backendDOMNodeId'], ax_node) for ax_node in nodes if 'backendDOMNodeId' in ax_node)
+		return ax_tree_lookup
+
+	def invalidate(self, frame_ids: Iterable[str] | None = None) -> None:
+		"""Drop the given frames, or everything if None. Single elements are always dropped."""
+		self.generation += 1
+		self.partial.clear()
+		if frame_ids is None:
+			self.frames.clear()
+			self._node_frames.clear()
+			return
+
+		for frame_id in frame_ids:
+			for ax_node in self.frames.pop(frame_id, ()):
+				self._node_frames.pop(ax_node.get('backendDOMNodeId', -1), None)
+
+	# --- CDP event handlers ---
+
+	def handle_event(self, method: str, event: dict, session_id: SessionID | None) -> None:
+		"""Dispatch a `DOM.*`, `Accessibility.*` or `Page.frameNavigated` event of the cached session."""
+		if session_id != self.session_id:
+			return
+
+		domain, _, name = method.rpartition('.')
+		if domain == 'DOM' and name in AX_INVALIDATING_DOM_EVENTS:
+			self.invalidate()
+		elif domain in ('Accessibility', 'Page'):
+			handler = getattr(self, f'_on_{name}', None)
+			if handler is not None:
+				handler(event)
+
+	def _on_nodesUpdated(self, event: dict) -> None:
+		frame_ids: set[str] = set()
+		for ax_node in event.get('nodes', []):
+			frame_id = ax_node.get('frameId') or self._node_frames.get(ax_node.get('backendDOMNodeId', -1))
+			if frame_id is None:
+				self.invalidate()
+				return
+			frame_ids.add(frame_id)
+		self.invalidate(frame_ids)
+
+	def _on_loadComplete(self, event: dict) -> None:
+		self.invalidate()
+
+	def _on_frameNavigated(self, event: dict) -> None:
+		self.invalidate([event['frame']['id']])
@@ -0,0 +1,59 @@
+"""
+Adaptive deadlines for the CDP requests behind a DOM build.
+
+`CDPDeadlines` remembers how long each request (snapshot, DOM tree, accessibility tree, device pixel ratio) took on
+every site and derives its next deadline from that history: a multiple of a high percentile of the recent
+latencies, clamped to [`min_deadline`, `max_deadline`]. Requests that timed out are recorded with the time they
+were given, so a site that keeps timing out works its way up to `max_deadline` instead of being cut off ever earlier.
+"""
+
+from collections import deque
+from urllib.parse import urlparse
+
+# CDP requests a DOM build can't do without, the others are dropped when they are too slow
+REQUIRED_CDP_REQUESTS = frozenset({'snapshot', 'dom_tree'})
+
+
+def site_of(url: str) -> str:
+	"""The key latencies are grouped by: the host of a URL (the scheme for URLs without one, e.g. about:blank)."""
+	parsed = urlparse(url)
+	return parsed.netloc or parsed.scheme
+
+
+class CDPDeadlines:
+	"""Latency history of CDP requests per (site, request), and the deadlines derived from it."""
+
+	def __init__(
+		self,
+		default_deadline: float = 10.0,
+		min_deadline: float = 2.0,
+		max_deadline: float = 10.0,
+		multiplier: float = 3.0,
+		percentile: float = 0.9,
+		history_size: int = 20,
+	):
+		self.default_deadline = default_deadline
+		"""Deadline of requests that were never seen on a site"""
+		self.min_deadline = min_deadline
+		self.max_deadline = max_deadline
+		self.multiplier = multiplier
+		self.percentile = percentile
+		self.history_size = history_size
+		self._latencies: dict[tuple[str, str], deque[float]] = {}
+
+	def deadline(self, site: str, request: str) -> float:
+		"""Seconds to wait for a request on a site."""
+		history = self._latencies.get((site, request))
+		if not history:
+			return self.default_deadline
+
+		latencies = sorted(history)
+		typical = latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile))]
+		return min(self.max_deadline, max(self.min_deadline, typical * self.multiplier))
+
+	def record(self, site: str, request: str, seconds: float) -> None:
+		"""Remember how long a request took (or how long it was waited for before it timed out)."""
+		history = self._latencies.get((site, request))
+		if history is None:
+			history = self._latencies[(site, request)] = deque(maxlen=self.history_size)
+		history.append(seconds)
@@ -1,15 +1,22 @@
 """
 Enhanced snapshot processing for browser-use DOM tree extraction.
 
-This module provides stateless functions for parsing Chrome DevTools Protocol (CDP) DOMSnapshot data
-to extract visibility, clickability, cursor styles, and other layout information.
+This module parses Chrome DevTools Protocol (CDP) DOMSnapshot data to extract visibility, clickability,
+cursor styles, and other layout information.
+
+The snapshot is indexed once per document into compact numpy columns (bounds, rects, paint order, style
+indices) plus a nodeIndex -> layout index inverse map, so building the lookup is linear in the node count.
+`EnhancedSnapshotNode` / `DOMRect` objects are only materialized when a node is actually looked up.
 """
 
+from collections.abc import Iterator, Mapping, Sequence
+
+import numpy as np
 from cdp_use.cdp.domsnapshot.commands import CaptureSnapshotReturns
 from cdp_use.cdp.domsnapshot.types import (
+	DocumentSnapshot,
 	LayoutTreeSnapshot,
 	NodeTreeSnapshot,
-	RareBooleanData,
 )
 
 from browser_use.dom.views import DOMRect, EnhancedSnapshotNode
@@ -45,12 +52,7 @@ REQUIRED_COMPUTED_STYLES = [
 ]
 
 
-def _parse_rare_boolean_data(rare_data: RareBooleanData, index: int) -> bool | None:
-	"""Parse rare boolean data from snapshot - returns True if index is in the rare data."""
-	return index in rare_data['index']
-
-
-def _parse_computed_styles(strings: list[str], style_indices: list[int]) -> dict[str, str]:
+def _parse_computed_styles(strings: list[str], style_indices: Sequence[int]) -> dict[str, str]:
 	"""Parse computed styles from layout tree using string indices."""
 	styles = {}
 	for i, style_index in enumerate(style_indices):
@@ -59,111 +61,279 @@ def _parse_computed_styles(strings: list[str], style_indices: list[int]) -> dict
 	return styles
 
 
-def build_snapshot_lookup(
-	snapshot: CaptureSnapshotReturns,
-	device_pixel_ratio: float = 1.0,
-) -> dict[int, EnhancedSnapshotNode]:
-	"""Build a lookup table of backend node ID to enhanced snapshot data with everything calculated upfront."""
-	snapshot_lookup: dict[int, EnhancedSnapshotNode] = {}
+def _rect_column(rects: list, count: int) -> tuple[np.ndarray, np.ndarray]:
+	"""Pack a list of CDP rectangles into an (count, 4) float array plus a mask of rows that hold a full rect.
 
-	if not snapshot['documents']:
-		return snapshot_lookup
+	CDP sends empty lists for layout nodes without client/scroll rects, so the rows are ragged.
+	"""
+	values = np.zeros((count, 4), dtype=np.float64)
+	present = np.zeros(count, dtype=np.bool_)
+	rows = rects[:count]
+	if not rows:
+		return values, present
 
-	strings = snapshot['strings']
+	present[: len(rows)] = np.fromiter((len(rect) >= 4 for rect in rows), dtype=np.bool_, count=len(rows))
+	if present.all():
+		values[:] = np.asarray([rect[:4] for rect in rows], dtype=np.float64)
+	elif present.any():
+		values[present] = np.asarray([rect[:4] for rect in rows if len(rect) >= 4], dtype=np.float64)
+	return values, present
+
+
+def _style_column(styles: list, count: int) -> np.ndarray:
+	"""Pack the per-layout-node style string indices into a (count, n_styles) int array padded with -1."""
+	width = max((len(row) for row in styles[:count]), default=0)
+	column = np.full((count, width), -1, dtype=np.int32)
+	if not width:
+		return column
+
+	rows = styles[:count]
+	if all(len(row) == width for row in rows):
+		column[: len(rows)] = np.asarray(rows, dtype=np.int32)
+	else:
+		for i, row in enumerate(rows):
+			column[i, : len(row)] = row
+	return column
+
+
+def _fold_into_ancestors(extents: np.ndarray, parent_index: np.ndarray) -> np.ndarray:
+	"""Grow the [left, top, right, bottom] extent of every node by the extents of all its descendants.
 
-	for document in snapshot['documents']:
+	Node depths come from pointer jumping and the nodes are folded into their parents one depth level at a time,
+	deepest first, so the cost is O(n log depth) numpy work instead of a Python loop over the nodes.
+	"""
+	depth = (parent_index >= 0).astype(np.int64)
+	ancestor = parent_index.copy()
+	for _ in range(64):  # 2**64 levels, also stops on (malformed) parent cycles
+		jumping = np.flatnonzero(ancestor >= 0)
+		if not len(jumping):
+			break
+		depth[jumping] += depth[ancestor[jumping]]
+		ancestor[jumping] = ancestor[ancestor[jumping]]
+
+	order = np.argsort(depth, kind='stable')
+	level_starts = np.searchsorted(depth[order], np.arange(int(depth.max(initial=0)) + 2))
+	for level in range(len(level_starts) - 2, 0, -1):
+		level_nodes = order[level_starts[level] : level_starts[level + 1]]
+		parents = parent_index[level_nodes]
+		np.minimum.at(extents[:, 0], parents, extents[level_nodes, 0])
+		np.minimum.at(extents[:, 1], parents, extents[level_nodes, 1])
+		np.maximum.at(extents[:, 2], parents, extents[level_nodes, 2])
+		np.maximum.at(extents[:, 3], parents, extents[level_nodes, 3])
+	return extents
+
+
+class DocumentSnapshotIndex:
+	"""Columnar index over a single DOMSnapshot document.
+
+	All per-node data lives in numpy arrays addressed either by snapshot node index (`layout_index`,
+	`is_clickable`) or by layout index (everything else). Bounds are already converted to CSS pixels.
+	"""
+
+	__slots__ = (
+		'strings',
+		'node_count',
+		'backend_node_ids',
+		'has_clickable_data',
+		'is_clickable',
+		'layout_index',
+		'bounds',
+		'has_bounds',
+		'client_rects',
+		'has_client_rects',
+		'scroll_rects',
+		'has_scroll_rects',
+		'paint_orders',
+		'has_paint_order',
+		'style_indices',
+		'has_styles',
+		'stacking_context',
+		'parent_index',
+		'_subtree_extents',
+	)
+
+	def __init__(self, document: DocumentSnapshot, strings: list[str], device_pixel_ratio: float = 1.0):
 		nodes: NodeTreeSnapshot = document['nodes']
 		layout: LayoutTreeSnapshot = document['layout']
 
-		# Build backend node id to snapshot index lookup
-		backend_node_to_snapshot_index = {}
-		if 'backendNodeId' in nodes:
-			for i, backend_node_id in enumerate(nodes['backendNodeId']):
-				backend_node_to_snapshot_index[backend_node_id] = i
-
-		# Build snapshot lookup for each backend node id
-		for backend_node_id, snapshot_index in backend_node_to_snapshot_index.items():
-			is_clickable = None
-			if 'isClickable' in nodes:
-				is_clickable = _parse_rare_boolean_data(nodes['isClickable'], snapshot_index)
-
-			# Find corresponding layout node
-			cursor_style = None
-			is_visible = None
-			bounding_box = None
-			computed_styles = {}
-
-			# Look for layout tree node that corresponds to this snapshot node
-			paint_order = None
-			client_rects = None
-			scroll_rects = None
-			stacking_contexts = None
-			for layout_idx, node_index in enumerate(layout.get('nodeIndex', [])):
-				if node_index == snapshot_index and layout_idx < len(layout.get('bounds', [])):
-					# Parse bounding box
-					bounds = layout['bounds'][layout_idx]
-					if len(bounds) >= 4:
-						# IMPORTANT: CDP coordinates are in device pixels, convert to CSS pixels
-						# by dividing by the device pixel ratio
-						raw_x, raw_y, raw_width, raw_height = bounds[0], bounds[1], bounds[2], bounds[3]
-
-						# Apply device pixel ratio scaling to convert device pixels to CSS pixels
-						bounding_box = DOMRect(
-							x=raw_x / device_pixel_ratio,
-							y=raw_y / device_pixel_ratio,
-							width=raw_width / device_pixel_ratio,
-							height=raw_height / device_pixel_ratio,
-						)
-
-					# Parse computed styles for this layout node
-					if layout_idx < len(layout.get('styles', [])):
-						style_indices = layout['styles'][layout_idx]
-						computed_styles = _parse_computed_styles(strings, style_indices)
-						cursor_style = computed_styles.get('cursor')
-
-					# Extract paint order if available
-					if layout_idx < len(layout.get('paintOrders', [])):
-						paint_order = layout.get('paintOrders', [])[layout_idx]
-
-					# Extract client rects if available
-					client_rects_data = layout.get('clientRects', [])
-					if layout_idx < len(client_rects_data):
-						client_rect_data = client_rects_data[layout_idx]
-						if client_rect_data and len(client_rect_data) >= 4:
-							client_rects = DOMRect(
-								x=client_rect_data[0],
-								y=client_rect_data[1],
-								width=client_rect_data[2],
-								height=client_rect_data[3],
-							)
-
-					# Extract scroll rects if available
-					scroll_rects_data = layout.get('scrollRects', [])
-					if layout_idx < len(scroll_rects_data):
-						scroll_rect_data = scroll_rects_data[layout_idx]
-						if scroll_rect_data and len(scroll_rect_data) >= 4:
-							scroll_rects = DOMRect(
-								x=scroll_rect_data[0],
-								y=scroll_rect_data[1],
-								width=scroll_rect_data[2],
-								height=scroll_rect_data[3],
-							)
-
-					# Extract stacking contexts if available
-					if layout_idx < len(layout.get('stackingContexts', [])):
-						stacking_contexts = layout.get('stackingContexts', {}).get('index', [])[layout_idx]
-
-					break
-
-			snapshot_lookup[backend_node_id] = EnhancedSnapshotNode(
+		self.strings = strings
+		backend_node_ids = nodes.get('backendNodeId', [])
+		self.node_count = len(backend_node_ids)
+		self.backend_node_ids = np.asarray(backend_node_ids, dtype=np.int64)
+
+		parent_index = nodes.get('parentIndex', [])[: self.node_count]
+		self.parent_index = np.full(self.node_count, -1, dtype=np.int64)
+		self.parent_index[: len(parent_index)] = parent_index
+		self.parent_index[(self.parent_index < 0) | (self.parent_index >= self.node_count)] = -1
+
+		# isClickable is rare boolean data: turn the index list into a per-node mask once
+		self.has_clickable_data = 'isClickable' in nodes
+		self.is_clickable = np.zeros(self.node_count, dtype=np.bool_)
+		if self.has_clickable_data:
+			clickable_indices = np.asarray(nodes['isClickable']['index'], dtype=np.int64)
+			clickable_indices = clickable_indices[(clickable_indices >= 0) & (clickable_indices < self.node_count)]
+			self.is_clickable[clickable_indices] = True
+
+		# Layout nodes are only usable if they come with bounds
+		layout_bounds = layout.get('bounds', [])
+		node_index = np.asarray(layout.get('nodeIndex', [])[: len(layout_bounds)], dtype=np.int64)
+		layout_count = len(node_index)
+
+		# Inverse map snapshot node index -> first layout index that references it (-1 = no layout node)
+		self.layout_index = np.full(self.node_count, -1, dtype=np.int64)
+		in_range = (node_index >= 0) & (node_index < self.node_count)
+		unique_nodes, first_layout = np.unique(node_index[in_range], return_index=True)
+		self.layout_index[unique_nodes] = np.flatnonzero(in_range)[first_layout]
+
+		# IMPORTANT: CDP coordinates are in device pixels, convert bounds to CSS pixels by dividing by the device pixel ratio
+		self.bounds, self.has_bounds = _rect_column(layout_bounds, layout_count)
+		self.bounds /= device_pixel_ratio
+		self.client_rects, self.has_client_rects = _rect_column(layout.get('clientRects', []), layout_count)
+		self.scroll_rects, self.has_scroll_rects = _rect_column(layout.get('scrollRects', []), layout_count)
+
+		paint_orders = layout.get('paintOrders', [])[:layout_count]
+		self.paint_orders = np.zeros(layout_count, dtype=np.int64)
+		self.paint_orders[: len(paint_orders)] = paint_orders
+		self.has_paint_order = np.arange(layout_count) < len(paint_orders)
+
+		styles = layout.get('styles', [])
+		self.style_indices = _style_column(styles, layout_count)
+		self.has_styles = np.arange(layout_count) < min(len(styles), layout_count)
+
+		# stackingContexts is RareBooleanData; the original per-node lookup compared layout_idx against len() of that
+		# dict, so only its first entries ever got a value. Keep that behaviour so snapshot nodes stay identical.
+		stacking_contexts = layout.get('stackingContexts', {})
+		stacking_index = stacking_contexts.get('index', []) if stacking_contexts else []
+		self.stacking_context = {
+			layout_idx: stacking_index[layout_idx]
+			for layout_idx in range(min(len(stacking_contexts), layout_count, len(stacking_index)))
+		}
+		self._subtree_extents: np.ndarray | None = None
+
+	@property
+	def subtree_extents(self) -> np.ndarray:
+		"""(node_count, 4) array of [left, top, right, bottom] over the bounds of every node and all its descendants.
+
+		Rows of subtrees without any layout box are [inf, inf, -inf, -inf]. Computed on first access.
+		"""
+		if self._subtree_extents is None:
+			extents = np.empty((self.node_count, 4), dtype=np.float64)
+			extents[:, :2] = np.inf
+			extents[:, 2:] = -np.inf
+			with_layout = self.layout_index >= 0
+			layout_idx = self.layout_index[with_layout]
+			has_bounds = self.has_bounds[layout_idx]
+			own = np.flatnonzero(with_layout)[has_bounds]
+			bounds = self.bounds[layout_idx[has_bounds]]
+			extents[own, :2] = bounds[:, :2]
+			extents[own, 2:] = bounds[:, :2] + bounds[:, 2:]
+			self._subtree_extents = _fold_into_ancestors(extents, self.parent_index)
+		return self._subtree_extents
+
+	def computed_styles(self, layout_idx: int) -> dict[str, str]:
+		"""Decode the computed styles of a layout node from the string table."""
+		if layout_idx < 0 or not self.has_styles[layout_idx]:
+			return {}
+		return _parse_computed_styles(self.strings, self.style_indices[layout_idx].tolist())
+
+	def materialize(self, snapshot_index: int) -> EnhancedSnapshotNode:
+		"""Build the `EnhancedSnapshotNode` for a snapshot node index."""
+		is_clickable = bool(self.is_clickable[snapshot_index]) if self.has_clickable_data else None
+		layout_idx = int(self.layout_index[snapshot_index])
+
+		if layout_idx < 0:
+			return EnhancedSnapshotNode(
 				is_clickable=is_clickable,
-				cursor_style=cursor_style,
-				bounds=bounding_box,
-				clientRects=client_rects,
-				scrollRects=scroll_rects,
-				computed_styles=computed_styles if computed_styles else None,
-				paint_order=paint_order,
-				stacking_contexts=stacking_contexts,
+				cursor_style=None,
+				bounds=None,
+				clientRects=None,
+				scrollRects=None,
+				computed_styles=None,
+				paint_order=None,
+				stacking_contexts=None,
+			)
+
+		computed_styles = self.computed_styles(layout_idx)
+		return EnhancedSnapshotNode(
+			is_clickable=is_clickable,
+			cursor_style=computed_styles.get('cursor'),
+			bounds=self._rect(self.bounds, self.has_bounds, layout_idx),
+			clientRects=self._rect(self.client_rects, self.has_client_rects, layout_idx),
+			scrollRects=self._rect(self.scroll_rects, self.has_scroll_rects, layout_idx),
+			computed_styles=computed_styles if computed_styles else None,
+			paint_order=int(self.paint_orders[layout_idx]) if self.has_paint_order[layout_idx] else None,
+			stacking_contexts=self.stacking_context.get(layout_idx),
+		)
+
+	@staticmethod
+	def _rect(values: np.ndarray, present: np.ndarray, layout_idx: int) -> DOMRect | None:
+		if not present[layout_idx]:
+			return None
+		x, y, width, height = values[layout_idx].tolist()
+		return DOMRect(x=x, y=y, width=width, height=height)
+
+
+class SnapshotLookup(Mapping[int, EnhancedSnapshotNode]):
+	"""Backend node id -> `EnhancedSnapshotNode` mapping backed by per-document columnar indexes.
+
+	Nodes are materialized on first access and cached, so repeated lookups return the same object.
+	"""
+
+	def __init__(self, documents: list[DocumentSnapshotIndex]):
+		self.documents = documents
+		self._positions: dict[int, tuple[int, int]] = {}
+		"""backend node id -> (document index, snapshot node index); later documents win on duplicate ids"""
+		for document_idx, document in enumerate(documents):
+			self._positions.update(
+				zip(document.backend_node_ids.tolist(), ((document_idx, i) for i in range(document.node_count)))
 			)
+		self._materialized: dict[int, EnhancedSnapshotNode] = {}
 
-	return snapshot_lookup
+	def position(self, backend_node_id: int) -> tuple[int, int] | None:
+		"""Return (document index, snapshot node index) for a backend node id without materializing it."""
+		return self._positions.get(backend_node_id)
+
+	def subtree_extent(self, backend_node_id: int) -> DOMRect | None:
+		"""Bounding box of a node and all its descendants in its document (without iframe content documents).
+
+		Returns None if the node is unknown or nothing in its subtree has a layout box.
+		"""
+		position = self._positions.get(backend_node_id)
+		if position is None:
+			return None
+		document_idx, snapshot_index = position
+		left, top, right, bottom = self.documents[document_idx].subtree_extents[snapshot_index].tolist()
+		if left > right:
+			return None
+		return DOMRect(x=left, y=top, width=right - left, height=bottom - top)
+
+	def __getitem__(self, backend_node_id: int) -> EnhancedSnapshotNode:
+		node = self._materialized.get(backend_node_id)
+		if node is None:
+			document_idx, snapshot_index = self._positions[backend_node_id]
+			node = self.documents[document_idx].materialize(snapshot_index)
+			self._materialized[backend_node_id] = node
+		return node
+
+	def __contains__(self, backend_node_id: object) -> bool:
+		return backend_node_id in self._positions
+
+	def __iter__(self) -> Iterator[int]:
+		return iter(self._positions)
+
+	def __len__(self) -> int:
+		return len(self._positions)
+
+
+def build_snapshot_lookup(
+	snapshot: CaptureSnapshotReturns,
+	device_pixel_ratio: float = 1.0,
+) -> SnapshotLookup:
+	"""Build a lookup table of backend node ID to enhanced snapshot data.
+
+	Indexing is done once per document in linear time; the per-node objects are created lazily on lookup.
+	"""
+	strings = snapshot['strings']
+	return SnapshotLookup(
+		[DocumentSnapshotIndex(document, strings, device_pixel_ratio) for document in snapshot['documents'] or []]
+	)
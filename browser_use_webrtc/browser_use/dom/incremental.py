@@ -0,0 +1,359 @@
+"""
+Incremental DOM maintenance for long-lived pages.
+
+`DOMMutationTracker` keeps the enhanced DOM tree built by `DomService` alive between agent steps and patches it in
+place from CDP `DOM.*` mutation events (child insertions/removals, attribute and character data changes, shadow
+roots). Every patched node is marked dirty, so the next step only has to re-measure the layout of the dirty subtrees
+and re-serialize the regions above them instead of rebuilding the whole page.
+
+Anything the tracker cannot follow (a document reload, an event about a node it never saw) invalidates it, and
+`DomService` falls back to a full rebuild. Events about nodes of off-screen regions a windowed build skipped (see
+`browser_use.dom.windowed`) first build the region they are in.
+"""
+
+import logging
+from collections.abc import Callable, Iterator
+
+from cdp_use.cdp.dom.events import (
+	AttributeModifiedEvent,
+	AttributeRemovedEvent,
+	CharacterDataModifiedEvent,
+	ChildNodeCountUpdatedEvent,
+	ChildNodeInsertedEvent,
+	ChildNodeRemovedEvent,
+	SetChildNodesEvent,
+	ShadowRootPoppedEvent,
+	ShadowRootPushedEvent,
+)
+from cdp_use.cdp.dom.types import Node
+from cdp_use.cdp.target import SessionID, TargetID
+
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType, SimplifiedNode, invalidate_element_identities
+
+logger = logging.getLogger(__name__)
+
+FrameContext = tuple[tuple[EnhancedDOMTreeNode, ...], float, float]
+"""(html frames, accumulated frame offset x, accumulated frame offset y) that the descendants of a node are built with"""
+
+SubtreeCache = dict[int, tuple[bool, SimplifiedNode | None]]
+"""NodeId -> (whether the serializer created a simplified node for it, the optimized simplified subtree)"""
+
+DOM_MUTATION_EVENTS = (
+	'documentUpdated',
+	'childNodeInserted',
+	'childNodeRemoved',
+	'setChildNodes',
+	'childNodeCountUpdated',
+	'attributeModified',
+	'attributeRemoved',
+	'characterDataModified',
+	'shadowRootPushed',
+	'shadowRootPopped',
+)
+"""`DOM.*` events the tracker patches the tree from, each one is handled by `DOMMutationTracker._on_<event>`"""
+
+# Fall back to a full rebuild when more than this share of the tracked nodes is dirty: one DOMSnapshot is cheaper
+# than measuring that many nodes one by one.
+MAX_DIRTY_NODE_RATIO = 0.25
+
+# Clean nodes keep the layout they had at the last full build (e.g. content pushed down by an inserted banner), so
+# the tree is rebuilt from scratch after this many incremental refreshes at the latest.
+MAX_INCREMENTAL_REFRESHES = 20
+
+
+class DOMMutationTracker:
+	"""Cached enhanced DOM tree of one target, kept in sync with the CDP DOM mutation events of its session."""
+
+	def __init__(
+		self,
+		root: EnhancedDOMTreeNode,
+		target_id: TargetID,
+		session_id: SessionID,
+		nodes: dict[int, EnhancedDOMTreeNode],
+		frame_contexts: dict[int, FrameContext],
+		root_context: FrameContext,
+		build_subtree: Callable[[Node, FrameContext], EnhancedDOMTreeNode],
+		materialize: Callable[[int], list[EnhancedDOMTreeNode]] | None = None,
+	):
+		self.root = root
+		self.target_id = target_id
+		self.session_id = session_id
+
+		self.nodes = nodes
+		"""NodeId (NOT backend node id) -> enhanced dom tree node, for every node in the tree"""
+		self.frame_contexts = frame_contexts
+		"""NodeId of HTML frame / IFRAME nodes -> frame context of their descendants"""
+		self.root_context = root_context
+		self._build_subtree = build_subtree
+		self._materialize = materialize
+		"""NodeId -> builds the skipped descendants of the windowed placeholder that is or holds it, returns the placeholders"""
+
+		self.subtree_cache: SubtreeCache = {}
+		"""Serializer results of clean subtrees, reused by `DOMTreeSerializer` between steps"""
+		self.frame_layouts: dict[int, tuple] = {}
+		"""NodeId of HTML frame nodes -> viewport and scroll position measured at the last refresh"""
+
+		self.invalidated = False
+		self.refresh_count = 0
+		self._replaying = False
+		self._dirty: set[int] = set()
+		"""nodes whose whole subtree needs a new layout and accessibility info"""
+		self._changed: set[int] = set()
+		"""nodes whose children changed, their serialized subtree (and all ancestors') is stale"""
+		self._pending_children: set[int] = set()
+		"""nodes that were inserted without their children, they have to be requested with `DOM.requestChildNodes`"""
+
+	# --- CDP event handlers ---
+
+	def handle_event(self, method: str, event: dict, session_id: SessionID | None) -> None:
+		"""Dispatch a `DOM.*` event from the tracked session to its handler."""
+		if self.invalidated or session_id != self.session_id:
+			return
+
+		handler = getattr(self, f'_on_{method}', None)
+		if handler is None:
+			return
+
+		# the xpath of elements depends on their siblings and the hash on their attributes
+		invalidate_element_identities(self.root)
+		try:
+			handler(event)
+		except Exception as e:
+			logger.debug(f'Failed to apply DOM.{method} to the cached DOM tree, rebuilding it next step: {type(e).__name__}: {e}')
+			self.invalidated = True
+
+	def replay(self, events: list[tuple[str, dict, SessionID | None]]) -> None:
+		"""Apply events that arrived while the tree was being built.
+
+		Events about nodes that are not in the tree were sent before `DOM.getDocument` re-bound the node ids and
+		are already reflected in it, so they are skipped instead of invalidating the tracker.
+		"""
+		self._replaying = True
+		try:
+			for method, event, session_id in events:
+				self.handle_event(method, event, session_id)
+		finally:
+			self._replaying = False
+
+	def _on_documentUpdated(self, event: dict) -> None:
+		self.invalidated = True
+
+	def _on_childNodeInserted(self, event: ChildNodeInsertedEvent) -> None:
+		parent = self._get_node(event['parentNodeId'])
+		if parent is None:
+			return
+
+		node = self._build_node(event['node'], parent)
+		children = parent.children_nodes if parent.children_nodes is not None else []
+		position = 0
+		if event['previousNodeId']:
+			position = next(
+				(i + 1 for i, child in enumerate(children) if child.node_id == event['previousNodeId']), len(children)
+			)
+		children.insert(position, node)
+		parent.children_nodes = children
+
+		self._changed.add(parent.node_id)
+
+	def _on_childNodeRemoved(self, event: ChildNodeRemovedEvent) -> None:
+		parent = self._get_node(event['parentNodeId'])
+		node = self._get_node(event['nodeId'])
+		if parent is None or node is None:
+			return
+
+		_remove_by_identity(parent.children_nodes, node)
+		self._forget_subtree(node)
+		self._changed.add(parent.node_id)
+
+	def _on_setChildNodes(self, event: SetChildNodesEvent) -> None:
+		parent = self._get_node(event['parentId'])
+		if parent is None:
+			return
+
+		for child in parent.children_nodes or []:
+			self._forget_subtree(child)
+		parent.children_nodes = [self._build_node(child, parent) for child in event['nodes']]
+		self._pending_children.discard(parent.node_id)
+		self._changed.add(parent.node_id)
+
+	def _on_childNodeCountUpdated(self, event: ChildNodeCountUpdatedEvent) -> None:
+		# only sent for nodes whose children were never requested, i.e. nodes inserted without children
+		node = self._get_node(event['nodeId'])
+		if node is None:
+			return
+
+		self._pending_children.add(node.node_id)
+
+	def _on_attributeModified(self, event: AttributeModifiedEvent) -> None:
+		node = self._get_node(event['nodeId'])
+		if node is None:
+			return
+
+		node.attributes[event['name']] = event['value']
+		self._dirty.add(node.node_id)
+
+	def _on_attributeRemoved(self, event: AttributeRemovedEvent) -> None:
+		node = self._get_node(event['nodeId'])
+		if node is None:
+			return
+
+		node.attributes.pop(event['name'], None)
+		self._dirty.add(node.node_id)
+
+	def _on_characterDataModified(self, event: CharacterDataModifiedEvent) -> None:
+		node = self._get_node(event['nodeId'])
+		if node is None:
+			return
+
+		node.node_value = event['characterData']
+		# the text can change the size and accessible name of its element too
+		self._dirty.add(node.parent_node.node_id if node.parent_node else node.node_id)
+
+	def _on_shadowRootPushed(self, event: ShadowRootPushedEvent) -> None:
+		host = self._get_node(event['hostId'])
+		if host is None:
+			return
+
+		shadow_root = self._build_node(event['root'], host)
+		host.shadow_roots = [*(host.shadow_roots or []), shadow_root]
+		self._changed.add(host.node_id)
+
+	def _on_shadowRootPopped(self, event: ShadowRootPoppedEvent) -> None:
+		host = self._get_node(event['hostId'])
+		shadow_root = self._get_node(event['rootId'])
+		if host is None or shadow_root is None:
+			return
+
+		_remove_by_identity(host.shadow_roots, shadow_root)
+		self._forget_subtree(shadow_root)
+		self._changed.add(host.node_id)
+
+	# --- helpers ---
+
+	def _get_node(self, node_id: int) -> EnhancedDOMTreeNode | None:
+		node = self.nodes.get(node_id)
+		# windowed placeholders are built without children, and the nodes below them not at all
+		if self._materialize is not None and (
+			node is None or not (node.children_nodes or node.shadow_roots or node.content_document)
+		):
+			self.mark_changed(self._materialize(node_id))
+			node = self.nodes.get(node_id)
+
+		if node is None and not self._replaying:
+			# the event is about a node we never saw (e.g. someone else called DOM.getDocument and reset the node ids)
+			self.invalidated = True
+		return node
+
+	def _build_node(self, payload: Node, parent: EnhancedDOMTreeNode) -> EnhancedDOMTreeNode:
+		node = self._build_subtree(payload, self.frame_context_of(parent, inclusive=True))
+		node.parent_node = parent
+		self._dirty.add(node.node_id)
+
+		# inserted nodes usually come without their descendants, those are requested before the next refresh
+		stack = [payload]
+		while stack:
+			current = stack.pop()
+			if current.get('childNodeCount') and not current.get('children'):
+				self._pending_children.add(current['nodeId'])
+			stack.extend(current.get('children') or [])
+			stack.extend(current.get('shadowRoots') or [])
+			if current.get('contentDocument'):
+				stack.append(current['contentDocument'])
+		return node
+
+	def _forget_subtree(self, node: EnhancedDOMTreeNode) -> None:
+		for removed in iter_subtree(node):
+			self.nodes.pop(removed.node_id, None)
+			self.frame_contexts.pop(removed.node_id, None)
+			self.frame_layouts.pop(removed.node_id, None)
+			self.subtree_cache.pop(removed.node_id, None)
+			self._dirty.discard(removed.node_id)
+			self._changed.discard(removed.node_id)
+			self._pending_children.discard(removed.node_id)
+
+	def frame_context_of(self, node: EnhancedDOMTreeNode, inclusive: bool = False) -> FrameContext:
+		"""Frame context `node` was built with (or, with `inclusive`, the one its descendants are built with)."""
+		current = node if inclusive else node.parent_node
+		while current is not None:
+			context = self.frame_contexts.get(current.node_id)
+			if context is not None:
+				return context
+			current = current.parent_node
+		return self.root_context
+
+	@property
+	def html_frames(self) -> list[EnhancedDOMTreeNode]:
+		"""HTML frame nodes of all documents in the tree, their scroll position decides what is visible."""
+		return [
+			node
+			for node_id in self.frame_contexts
+			if (node := self.nodes.get(node_id)) is not None
+			and node.node_type == NodeType.ELEMENT_NODE
+			and node.node_name == 'HTML'
+			and node.frame_id is not None
+		]
+
+	def mark_changed(self, nodes: list[EnhancedDOMTreeNode]) -> None:
+		"""Drop the serializer cache of nodes whose children were replaced outside of the tracker."""
+		self._changed.update(node.node_id for node in nodes)
+
+	def take_pending_children(self) -> list[int]:
+		"""Node ids of nodes whose children still have to be requested."""
+		pending = [node_id for node_id in self._pending_children if node_id in self.nodes]
+		self._pending_children.clear()
+		return pending
+
+	def take_dirty_subtrees(self) -> list[EnhancedDOMTreeNode]:
+		"""Roots of the dirty subtrees since the last call, and drop the serializer cache of everything they touch.
+
+		A dirty node whose ancestor is dirty as well is covered by that ancestor's subtree.
+		"""
+		dirty = {node_id for node_id in self._dirty if node_id in self.nodes}
+		roots: list[EnhancedDOMTreeNode] = []
+		for node_id in dirty:
+			node = self.nodes[node_id]
+			ancestor = node.parent_node
+			while ancestor is not None and ancestor.node_id not in dirty:
+				ancestor = ancestor.parent_node
+			if ancestor is None:
+				roots.append(node)
+
+		# a changed subtree invalidates the serialized result of every ancestor up to the document root
+		invalidated: set[int] = set()
+		for root in roots:
+			for node in iter_subtree(root):
+				self.subtree_cache.pop(node.node_id, None)
+		for node_id in dirty | self._changed:
+			current = self.nodes.get(node_id)
+			while current is not None and current.node_id not in invalidated:
+				invalidated.add(current.node_id)
+				self.subtree_cache.pop(current.node_id, None)
+				current = current.parent_node
+
+		self._dirty.clear()
+		self._changed.clear()
+		return roots
+
+
+def iter_subtree(node: EnhancedDOMTreeNode) -> Iterator[EnhancedDOMTreeNode]:
+	"""Pre-order walk over a node, its children, shadow roots and content document."""
+	stack = [node]
+	while stack:
+		current = stack.pop()
+		yield current
+		if current.content_document:
+			stack.append(current.content_document)
+		if current.shadow_roots:
+			stack.extend(reversed(current.shadow_roots))
+		if current.children_nodes:
+			stack.extend(reversed(current.children_nodes))
+
+
+def _remove_by_identity(nodes: list[EnhancedDOMTreeNode] | None, node: EnhancedDOMTreeNode) -> None:
+	# `list.remove` would compare the dataclasses field by field, including their whole subtrees
+	if nodes is None:
+		return
+	for i, candidate in enumerate(nodes):
+		if candidate is node:
+			del nodes[i]
+			return
@@ -0,0 +1,197 @@
+# @file purpose: Serializes the simplified tree within a token budget, keeping the most important nodes
+"""
+Token-budgeted serialization.
+
+`serialize_tree_within_budget` renders the same lines as `DOMTreeSerializer.serialize_tree`, but only as many as fit
+into `max_tokens`. Every line is ranked by what it is (interactive element, scroll container or iframe, text), whether
+it is inside the viewport, whether it is new since the previous step and, optionally, how relevant it is to the task.
+The best lines are kept greedily together with the lines of the containers they are in, and every run of dropped
+lines is replaced by a single `... N more items ...` placeholder at the place it was cut from.
+
+Tokens are estimated at `CHARS_PER_TOKEN` characters each, close enough for the tokenizers of the supported models to
+keep prompt size predictable without tokenizing.
+"""
+
+from dataclasses import dataclass
+
+from browser_use.dom.serializer.collapse import carried_indices
+from browser_use.dom.serializer.relevance import line_relevance
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DOMRect, NodeType, SimplifiedNode
+
+CHARS_PER_TOKEN = 4
+
+# Score of a line by kind, interactive elements always rank above the text around them
+INTERACTIVE_SCORE = 8.0
+CONTAINER_SCORE = 2.0
+TEXT_SCORE = 1.0
+# Added to the kind score
+IN_VIEWPORT_BONUS = 4.0
+NEW_BONUS = 2.0
+RELEVANCE_WEIGHT = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+	return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass(slots=True)
+class _Line:
+	node: SimplifiedNode
+	text: str
+	depth: int
+	parent: int
+	"""Position of the line of the closest ancestor that has one, -1 for none"""
+	tokens: int
+	labels: list[int]
+	"""Positions of the text lines right after an interactive element and inside it, which are kept or dropped with it"""
+	interactive: int
+	"""Interactive indices on the line, all those of its subtree for the compact line of a collapsed node"""
+
+
+def _collect_lines(root: SimplifiedNode, include_attributes: list[str]) -> list[_Line]:
+	"""The lines `serialize_tree` would render, in document order."""
+	lines: list[_Line] = []
+	stack: list[tuple[SimplifiedNode, int, int]] = [(root, 0, -1)]
+	while stack:
+		node, depth, parent = stack.pop()
+		text = None if node.excluded_by_parent else DOMTreeSerializer.serialize_node_line(node, include_attributes)
+		if text is not None:
+			line_text = depth * '\t' + text
+			interactive = len(carried_indices(node)) if node.collapsed else int(node.interactive_index is not None)
+			lines.append(
+				_Line(
+					node=node,
+					text=line_text,
+					depth=depth,
+					parent=parent,
+					tokens=estimate_tokens(line_text),
+					labels=[],
+					interactive=interactive,
+				)
+			)
+			position = len(lines) - 1
+			if (
+				parent != -1
+				and node.original_node.node_type == NodeType.TEXT_NODE
+				and lines[parent].node.interactive_index is not None
+				and position == parent + 1 + len(lines[parent].labels)
+			):
+				lines[parent].labels.append(position)
+			depth, parent = depth + 1, len(lines) - 1
+		if not node.collapsed:
+			stack.extend((child, depth, parent) for child in reversed(node.children))
+	return lines
+
+
+def _in_viewport(node: SimplifiedNode, viewport: DOMRect) -> bool:
+	position = node.original_node.absolute_position
+	if position is None:
+		return False
+	return (
+		position.x < viewport.x + viewport.width
+		and position.x + position.width > viewport.x
+		and position.y < viewport.y + viewport.height
+		and position.y + position.height > viewport.y
+	)
+
+
+def score_line(node: SimplifiedNode, viewport: DOMRect | None = None, relevance: float = 0.0) -> float:
+	"""How important it is to keep the line of a node, `relevance` is that of the line to the task (0 to 1)."""
+	if node.interactive_index is not None:
+		score = INTERACTIVE_SCORE
+	elif node.original_node.node_type == NodeType.TEXT_NODE:
+		score = TEXT_SCORE
+	else:
+		score = CONTAINER_SCORE
+	if viewport is not None and _in_viewport(node, viewport):
+		score += IN_VIEWPORT_BONUS
+	if node.is_new:
+		score += NEW_BONUS
+	score += RELEVANCE_WEIGHT * relevance
+	return score
+
+
+def _placeholder(depth: int, dropped: int, dropped_interactive: int) -> str:
+	depth_str = depth * '\t'
+	items = 'item' if dropped == 1 else 'items'
+	interactive = f' ({dropped_interactive} interactive)' if dropped_interactive else ''
+	return f'{depth_str}... {dropped} more {items}{interactive} ...'
+
+
+def serialize_tree_within_budget(
+	root: SimplifiedNode | None,
+	include_attributes: list[str],
+	max_tokens: int,
+	viewport: DOMRect | None = None,
+	query: str | None = None,
+) -> str:
+	"""Serialize the optimized tree, keeping the most important lines that fit into `max_tokens`.
+
+	Args:
+		viewport: Rectangle in the coordinates of `EnhancedDOMTreeNode.absolute_position` whose nodes rank higher
+		query: Lines relevant to it (normally the task) rank higher, see `line_relevance`
+	"""
+	return '\n'.join(text for _, text in render_lines(root, include_attributes, max_tokens, viewport, query))
+
+
+def render_lines(
+	root: SimplifiedNode | None,
+	include_attributes: list[str],
+	max_tokens: int | None = None,
+	viewport: DOMRect | None = None,
+	query: str | None = None,
+) -> list[tuple[SimplifiedNode | None, str]]:
+	"""The lines `serialize_tree_within_budget` renders, with their node (None for the placeholders of dropped lines)."""
+	if not root:
+		return []
+
+	lines = _collect_lines(root, include_attributes)
+	if max_tokens is None or sum(line.tokens for line in lines) <= max_tokens:
+		return [(line.node, line.text) for line in lines]
+
+	# every kept line can split a dropped run in two, so each one pays for a placeholder up front (labels right after
+	# their element can't)
+	placeholder_tokens = estimate_tokens(_placeholder(max(line.depth for line in lines), len(lines), len(lines)))
+	budget = max_tokens - placeholder_tokens
+	labels = {label for line in lines for label in line.labels}
+	kept = [False] * len(lines)
+	relevance = (
+		line_relevance([line.text for line in lines], [line.parent for line in lines], query) if query else [0.0] * len(lines)
+	)
+	ranked = sorted(range(len(lines)), key=lambda position: -score_line(lines[position].node, viewport, relevance[position]))
+	for position in ranked:
+		if kept[position]:
+			continue
+		# the containers a line is in are kept with it, and interactive elements with their labels
+		chain = []
+		ancestor = position
+		while ancestor != -1 and not kept[ancestor]:
+			chain.append(ancestor)
+			chain.extend(label for label in lines[ancestor].labels if label != position and not kept[label])
+			ancestor = lines[ancestor].parent
+		cost = sum(lines[member].tokens for member in chain) + placeholder_tokens * sum(
+			1 for member in chain if member not in labels
+		)
+		if cost <= budget:
+			budget -= cost
+			for member in chain:
+				kept[member] = True
+
+	rendered: list[tuple[SimplifiedNode | None, str]] = []
+	dropped = dropped_interactive = 0
+	dropped_depth = 0
+	for line, keep in zip(lines, kept):
+		if keep:
+			if dropped:
+				rendered.append((None, _placeholder(dropped_depth, dropped, dropped_interactive)))
+				dropped = dropped_interactive = 0
+			rendered.append((line.node, line.text))
+			continue
+		if not dropped:
+			dropped_depth = line.depth
+		dropped += 1
+		dropped_interactive += line.interactive
+	if dropped:
+		rendered.append((None, _placeholder(dropped_depth, dropped, dropped_interactive)))
+	return rendered
@@ -0,0 +1,123 @@
+# @file purpose: Table-driven version of ClickableElementDetector.is_interactive, same decisions at a fraction of the cost
+"""
+Compiled interactivity classifier.
+
+`ClickableElementDetector.is_interactive` walks a long chain of checks with early returns, building sets and joined
+strings for every node. `InteractiveElementClassifier` computes the features those checks look at once per node into
+a bitmask (through lookup tables for tags, attribute names, roles and accessibility properties, and one regex for the
+search indicators) and decides by indexing a table precomputed from the rule order of the detector.
+
+`ClickableElementDetector` stays the reference for the rules, a differential test checks that both agree.
+"""
+
+import re
+
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType
+
+# Feature bits
+NEVER = 1 << 0  # not an element, or html/body
+LARGE_IFRAME = 1 << 1  # iframe larger than 100x100px
+SEARCH = 1 << 2  # class, id or data attributes look like a search control
+AX_FALSE = 1 << 3  # first decisive accessibility property: disabled or hidden
+AX_TRUE = 1 << 4  # first decisive accessibility property: focusable, editable, a widget state, ...
+TAG = 1 << 5  # interactive tag
+HANDLER = 1 << 6  # event handler or tabindex attribute
+ROLE = 1 << 7  # interactive role attribute
+AX_ROLE = 1 << 8  # interactive accessibility role
+ICON = 1 << 9  # icon-sized with an attribute icons usually have
+POINTER = 1 << 10  # cursor: pointer
+FEATURE_COUNT = 11
+
+_TAG_FEATURES = {
+	'html': NEVER,
+	'body': NEVER,
+	**dict.fromkeys(('button', 'input', 'select', 'textarea', 'a', 'label', 'details', 'summary', 'option', 'optgroup'), TAG),
+}
+_HANDLER_ATTRIBUTES = frozenset({'onclick', 'onmousedown', 'onmouseup', 'onkeydown', 'onkeyup', 'tabindex'})
+_ICON_ATTRIBUTES = frozenset({'class', 'role', 'onclick', 'data-action', 'aria-label'})
+_INTERACTIVE_ROLES = frozenset(
+	{'button', 'link', 'menuitem', 'option', 'radio', 'checkbox', 'tab', 'textbox', 'combobox', 'slider', 'spinbutton'}
+	| {'search', 'searchbox'}
+)
+_INTERACTIVE_AX_ROLES = _INTERACTIVE_ROLES | {'listbox'}
+# every other search indicator of the detector ('search-icon', 'searchbox', ...) contains one of these
+_SEARCH_INDICATOR = re.compile('search|magnify|glass|lookup|find|query')
+
+# Accessibility property -> (feature if the property is set, whether it also needs a truthy value)
+_AX_PROPERTY_FEATURES: dict[str, tuple[int, bool]] = {
+	'disabled': (AX_FALSE, True),
+	'hidden': (AX_FALSE, True),
+	**dict.fromkeys(('focusable', 'editable', 'settable', 'required', 'autocomplete', 'keyshortcuts'), (AX_TRUE, True)),
+	**dict.fromkeys(('checked', 'expanded', 'pressed', 'selected'), (AX_TRUE, False)),
+}
+
+
+def _decide(features: int) -> bool:
+	"""The rule order of `ClickableElementDetector.is_interactive` over a feature bitmask."""
+	if features & NEVER:
+		return False
+	if features & (LARGE_IFRAME | SEARCH):
+		return True
+	if features & AX_FALSE:
+		return False
+	return bool(features & (AX_TRUE | TAG | HANDLER | ROLE | AX_ROLE | ICON | POINTER))
+
+
+_DECISIONS = bytes(_decide(features) for features in range(1 << FEATURE_COUNT))
+
+
+class InteractiveElementClassifier:
+	@staticmethod
+	def features(node: EnhancedDOMTreeNode) -> int:
+		"""Bitmask of the features of a node the interactivity rules look at."""
+		if node.node_type != NodeType.ELEMENT_NODE:
+			return NEVER
+
+		tag = node.tag_name
+		features = _TAG_FEATURES.get(tag, 0)
+		if features & NEVER:
+			return features
+
+		snapshot = node.snapshot_node
+		bounds = snapshot.bounds if snapshot else None
+		if tag == 'iframe' and bounds and bounds.width > 100 and bounds.height > 100:
+			features |= LARGE_IFRAME
+
+		attributes = node.attributes
+		has_icon_attribute = False
+		if attributes:
+			if (
+				_SEARCH_INDICATOR.search(attributes.get('class', '').lower())
+				or _SEARCH_INDICATOR.search(attributes.get('id', '').lower())
+				or any(name.startswith('data-') and _SEARCH_INDICATOR.search(value.lower()) for name, value in attributes.items())
+			):
+				features |= SEARCH
+			if not _HANDLER_ATTRIBUTES.isdisjoint(attributes):
+				features |= HANDLER
+			if attributes.get('role') in _INTERACTIVE_ROLES:
+				features |= ROLE
+			has_icon_attribute = not _ICON_ATTRIBUTES.isdisjoint(attributes)
+
+		ax_node = node.ax_node
+		if ax_node:
+			for prop in ax_node.properties or ():
+				try:
+					rule = _AX_PROPERTY_FEATURES.get(prop.name)
+					if rule and (prop.value or not rule[1]):
+						features |= rule[0]
+						break
+				except (AttributeError, ValueError):
+					continue
+			if ax_node.role in _INTERACTIVE_AX_ROLES:
+				features |= AX_ROLE
+
+		if has_icon_attribute and bounds and 10 <= bounds.width <= 50 and 10 <= bounds.height <= 50:
+			features |= ICON
+		if snapshot and snapshot.cursor_style == 'pointer':
+			features |= POINTER
+		return features
+
+	@staticmethod
+	def is_interactive(node: EnhancedDOMTreeNode) -> bool:
+		"""Same decision as `ClickableElementDetector.is_interactive`."""
+		return bool(_DECISIONS[InteractiveElementClassifier.features(node)])
@@ -0,0 +1,112 @@
+# @file purpose: Collapses runs of structurally identical siblings (product grids, result lists, table rows)
+"""
+Repeated-structure collapsing.
+
+Listing pages repeat the same subtree for every item. `collapse_repeated_siblings` gives every subtree a shape (tag,
+attribute names and the shapes of its children, ignoring attribute values and text) and looks for runs of at least
+`min_run` consecutive siblings with the same shape. The first `keep` siblings of a run are serialized in full, the
+rest are marked `collapsed` and serialized as one compact line each: the interactive elements in them with their
+indices and the start of their text, e.g. `[57]<a /> [58]<button /> Blue widget $19.99`. The first compact line of a
+run says how many follow. Every interactive index stays in the listing and in the selector map, so item 57 can still
+be clicked.
+"""
+
+from browser_use.dom.views import NodeType, SimplifiedNode
+
+MIN_RUN = 6
+KEEP = 3
+# Characters of text a compact line keeps of its item
+COMPACT_TEXT_LENGTH = 80
+
+
+def _shapes(root: SimplifiedNode) -> dict[int, int]:
+	"""id(node) -> hash of its shape, for every node of the tree. Clears what a previous pass marked on reused nodes."""
+	shapes: dict[int, int] = {}
+	stack: list[tuple[SimplifiedNode, bool]] = [(root, False)]
+	while stack:
+		node, children_done = stack.pop()
+		if not children_done:
+			node.collapsed = False
+			node.collapsed_run = 0
+			stack.append((node, True))
+			stack.extend((child, False) for child in node.children)
+			continue
+
+		original = node.original_node
+		if original.node_type == NodeType.TEXT_NODE:
+			shapes[id(node)] = hash('#text')
+		else:
+			attribute_names = tuple(sorted(original.attributes)) if original.attributes else ()
+			child_shapes = tuple(shapes[id(child)] for child in node.children)
+			shapes[id(node)] = hash((original.tag_name, attribute_names, child_shapes))
+	return shapes
+
+
+def collapse_repeated_siblings(root: SimplifiedNode | None, min_run: int = MIN_RUN, keep: int = KEEP) -> int:
+	"""Mark the repeated siblings past the first `keep` of every run of at least `min_run`. Returns how many were marked."""
+	if not root:
+		return 0
+
+	shapes = _shapes(root)
+	collapsed_count = 0
+	stack = [root]
+	while stack:
+		node = stack.pop()
+		children = node.children
+		run_start = 0
+		for position in range(1, len(children) + 1):
+			if position < len(children) and shapes[id(children[position])] == shapes[id(children[run_start])]:
+				continue
+			run = [
+				child
+				for child in children[run_start:position]
+				if child.original_node.node_type == NodeType.ELEMENT_NODE and not child.excluded_by_parent
+			]
+			if len(run) >= min_run:
+				for child in run[keep:]:
+					child.collapsed = True
+				run[keep].collapsed_run = len(run) - keep
+				collapsed_count += len(run) - keep
+			run_start = position
+
+		stack.extend(child for child in children if not child.collapsed)
+	return collapsed_count
+
+
+def carried_indices(node: SimplifiedNode) -> list[int]:
+	"""Interactive indices a collapsed node lists on its compact line, those of the elements in its whole subtree."""
+	indices: list[int] = []
+	stack = [node]
+	while stack:
+		current = stack.pop()
+		if not current.excluded_by_parent and current.interactive_index is not None:
+			indices.append(current.interactive_index)
+		stack.extend(reversed(current.children))
+	return indices
+
+
+def compact_line(node: SimplifiedNode, include_attributes: list[str]) -> str | None:
+	"""The one line a collapsed node is serialized as, None if it has neither interactive elements nor text."""
+	from browser_use.dom.serializer.serializer import DOMTreeSerializer
+
+	elements: list[str] = []
+	texts: list[str] = []
+	stack = [node]
+	while stack:
+		current = stack.pop()
+		if not current.excluded_by_parent:
+			if current.interactive_index is not None:
+				elements.append(f'[{current.interactive_index}]<{current.original_node.tag_name} />')
+			elif current.original_node.node_type == NodeType.TEXT_NODE:
+				text = DOMTreeSerializer.serialize_node_line(current, include_attributes)
+				if text:
+					texts.append(text)
+		stack.extend(reversed(current.children))
+
+	text = ' '.join(texts)
+	if len(text) > COMPACT_TEXT_LENGTH:
+		text = text[:COMPACT_TEXT_LENGTH] + '...'
+	line = ' '.join(part for part in (' '.join(elements), text) if part)
+	if line and node.collapsed_run:
+		line += f' (this and the next {node.collapsed_run - 1} similar items are shortened)'
+	return line or None
@@ -0,0 +1,147 @@
+# @file purpose: Serializes DOM states as changes against the last full listing the LLM was given
+"""
+Delta serialization of `SerializedDOMState`s for the agent prompt.
+
+The agent only keeps the state message of the current step, so a delta against the previous step would lose the
+changes of every step before it. `DOMDeltaSerializer` instead remembers the last full listing it handed out (the
+base, which the agent keeps in its own prompt-cached message) and describes every later state as the lines that were
+added, changed or removed since that base. The base holds only the lines the listing showed, so elements that were
+left out of it for its token budget or length limit are reported as added once they appear. Lines are keyed by the
+backend node id of the node they render, which stays the same for an element across steps of the same document.
+
+A full listing is sent again on the first step, after navigation, every `full_refresh_every` steps and whenever the
+delta would be more than `max_delta_ratio` of the size of a full listing.
+"""
+
+from dataclasses import dataclass, field
+
+from browser_use.dom.serializer.budget import render_lines
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, DOMRect, SerializedDOMState
+
+
+def serialized_lines(dom_state: SerializedDOMState, include_attributes: list[str] | None = None) -> dict[int, str]:
+	"""Backend node id -> line of every node in the LLM representation of a state, in document order."""
+	include_attributes = include_attributes or DEFAULT_INCLUDE_ATTRIBUTES
+	lines: dict[int, str] = {}
+	stack = [dom_state._root] if dom_state._root else []
+	while stack:
+		node = stack.pop()
+		if not node.excluded_by_parent:
+			line = DOMTreeSerializer.serialize_node_line(node, include_attributes, mark_new=False)
+			if line is not None:
+				lines[node.original_node.backend_node_id] = line
+		if not node.collapsed:
+			stack.extend(reversed(node.children))
+	return lines
+
+
+def shown_lines(
+	dom_state: SerializedDOMState,
+	include_attributes: list[str] | None = None,
+	max_tokens: int | None = None,
+	viewport: DOMRect | None = None,
+	query: str | None = None,
+	max_length: int | None = None,
+) -> dict[int, str]:
+	"""Like `serialized_lines`, but only the lines the listing keeps within `max_tokens`, or that end within its first
+	`max_length` characters."""
+	include_attributes = include_attributes or DEFAULT_INCLUDE_ATTRIBUTES
+	lines: dict[int, str] = {}
+	end = -1
+	for node, text in render_lines(dom_state._root, include_attributes, max_tokens, viewport, query):
+		end += len(text) + 1
+		if max_length is not None and end > max_length:
+			break
+		if node is None:
+			continue
+		line = DOMTreeSerializer.serialize_node_line(node, include_attributes, mark_new=False)
+		if line is not None:
+			lines[node.original_node.backend_node_id] = line
+	return lines
+
+
+@dataclass
+class DOMDelta:
+	"""Changes of the serialized DOM since the last full listing, or a full listing (`full` is set)."""
+
+	full: str | None = None
+	"""The full listing, when this step refreshes the base"""
+	added: list[str] = field(default_factory=list)
+	changed: list[str] = field(default_factory=list)
+	"""New lines of nodes whose line changed"""
+	removed: list[str] = field(default_factory=list)
+	"""Last lines of nodes that are gone"""
+
+	def llm_representation(self) -> str:
+		if self.full is not None:
+			return 'Unchanged since the full listing above, which was just refreshed'
+		if not (self.added or self.changed or self.removed):
+			return 'No changes since the full listing above'
+		return '\n'.join(
+			[f'+ {line}' for line in self.added] + [f'~ {line}' for line in self.changed] + [f'- {line}' for line in self.removed]
+		)
+
+
+class DOMDeltaSerializer:
+	"""Turns the DOM state of every agent step into a full listing or a delta against the last full listing."""
+
+	def __init__(self, full_refresh_every: int = 10, max_delta_ratio: float = 0.5):
+		self.full_refresh_every = full_refresh_every
+		self.max_delta_ratio = max_delta_ratio
+
+		self._base_lines: dict[int, str] | None = None
+		self._base_url: str | None = None
+		self._steps_since_full = 0
+
+	def serialize(
+		self,
+		dom_state: SerializedDOMState,
+		url: str,
+		include_attributes: list[str] | None = None,
+		max_tokens: int | None = None,
+		viewport: DOMRect | None = None,
+		query: str | None = None,
+		max_length: int | None = None,
+	) -> DOMDelta:
+		"""A delta against the last full listing, or a new full listing (within `max_tokens`, if given).
+
+		Args:
+			max_length: Characters of the full listing that are shown, the base leaves out the lines past it
+		"""
+		lines = serialized_lines(dom_state, include_attributes)
+		if max_tokens is None and max_length is None:
+			shown = lines
+		else:
+			shown = shown_lines(dom_state, include_attributes, max_tokens, viewport, query, max_length)
+		self._steps_since_full += 1
+
+		if self._base_lines is not None and url == self._base_url and self._steps_since_full < self.full_refresh_every:
+			delta = self._diff(self._base_lines, shown, lines)
+			full_size = sum(len(line) for line in shown.values())
+			delta_size = sum(len(line) for line in delta.added + delta.changed + delta.removed)
+			if delta_size <= full_size * self.max_delta_ratio:
+				return delta
+
+		self._base_lines = shown
+		self._base_url = url
+		self._steps_since_full = 0
+		return DOMDelta(
+			full=dom_state.llm_representation(
+				include_attributes=include_attributes, max_tokens=max_tokens, viewport=viewport, query=query
+			)
+		)
+
+	@staticmethod
+	def _diff(base: dict[int, str], shown: dict[int, str], lines: dict[int, str]) -> DOMDelta:
+		"""Changes from `base` to the current `lines`, of which only those in `shown` would be in a full listing."""
+		delta = DOMDelta()
+		for key, line in lines.items():
+			base_line = base.get(key)
+			if base_line is None:
+				if key in shown:
+					delta.added.append(line)
+			elif base_line != line:
+				delta.changed.append(line)
+		delta.removed = [line for key, line in base.items() if key not in lines]
+		return delta
@@ -0,0 +1,63 @@
+# @file purpose: Hands out interactive indices that stay the same for an element across agent steps
+"""
+Stable interactive indices.
+
+Numbering the interactive elements from 1 on every step shifts the index of every element after one that appears
+or disappears, so actions the LLM planned against the previous state hit the wrong element and the whole listing
+changes. `ElementIndexAllocator` keeps the index an element had in the previous state and gives elements that were
+not in it numbers that were never used on the page before.
+
+Elements are matched by backend node id, then by `element_hash` (the `parent_element_hash` path of tags plus the
+attributes) for elements that were re-rendered as a new node, as long as that hash is unique among the unmatched
+elements of both states. When no element kept its backend node id, the page was replaced (navigation) and numbering
+starts from 1 again.
+"""
+
+from collections import Counter
+
+from browser_use.dom.views import EnhancedDOMTreeNode, SerializedDOMState
+
+
+class ElementIndexAllocator:
+	"""Interactive indices of the elements of one step, given the state of the previous step."""
+
+	def __init__(self, previous_state: SerializedDOMState | None = None):
+		self._previous = previous_state.selector_map if previous_state else {}
+		self._next_index = previous_state.next_index if previous_state else 1
+
+	def assign(self, nodes: list[EnhancedDOMTreeNode]) -> list[int]:
+		"""Index of each interactive element, `nodes` are in document order."""
+		previous_indices = {node.backend_node_id: index for index, node in self._previous.items()}
+		indices: list[int | None] = [previous_indices.get(node.backend_node_id) for node in nodes]
+
+		if not any(index is not None for index in indices):
+			self._next_index = 1
+			return self._fresh_indices(indices)
+
+		# re-rendered elements: match by tag path and attributes if only one unmatched element on each side has them
+		taken = {index for index in indices if index is not None}
+		unmatched_previous = {index: node.element_hash for index, node in self._previous.items() if index not in taken}
+		unmatched_current = {position: nodes[position].element_hash for position, index in enumerate(indices) if index is None}
+		previous_counts = Counter(unmatched_previous.values())
+		current_counts = Counter(unmatched_current.values())
+		previous_by_hash = {element_hash: index for index, element_hash in unmatched_previous.items()}
+		for position, element_hash in unmatched_current.items():
+			if previous_counts[element_hash] == 1 and current_counts[element_hash] == 1:
+				indices[position] = previous_by_hash[element_hash]
+
+		return self._fresh_indices(indices)
+
+	@property
+	def next_index(self) -> int:
+		"""Lowest index that was never handed out on the current page"""
+		return self._next_index
+
+	def _fresh_indices(self, indices: list[int | None]) -> list[int]:
+		self._next_index = max([self._next_index, *(index + 1 for index in indices if index is not None)])
+		assigned = []
+		for index in indices:
+			if index is None:
+				index = self._next_index
+				self._next_index += 1
+			assigned.append(index)
+		return assigned
@@ -0,0 +1,109 @@
+# @file purpose: Hides elements that an opaque element painted after them covers completely (modals, overlays, sticky headers)
+"""
+Paint-order occlusion.
+
+An element is occluded when another element of the same document that is painted after it (a higher paint order
+from `DOMSnapshot.captureSnapshot`) covers its whole rectangle with an opaque background and takes pointer events.
+Clicks on an occluded element land on the element on top, so `mark_occluded` excludes it from the listing and from
+the interactive indices.
+
+Any element covering a rectangle also covers its center, so candidates are looked up in a `SpatialGrid` of the opaque
+elements at that point only, which keeps the pass linear in the size of the page. Ancestors and descendants of an
+element never occlude it: a button whose label fills it is not hidden by the label.
+"""
+
+import re
+
+from browser_use.dom.serializer.spatial import SpatialGrid
+from browser_use.dom.views import DOMRect, NodeType, SimplifiedNode
+
+# Backgrounds and opacities below this don't hide what is painted under them
+MIN_OPACITY = 0.8
+
+_NUMBER = re.compile(r'[\d.]+')
+
+
+def _background_alpha(color: str) -> float:
+	"""Alpha of a computed `background-color`, e.g. 'rgb(255, 255, 255)' -> 1.0, 'rgba(0, 0, 0, 0.5)' -> 0.5."""
+	if not color.startswith('rgb'):
+		return 0.0
+	values = _NUMBER.findall(color)
+	return float(values[3]) if len(values) > 3 else 1.0
+
+
+def _is_opaque(styles: dict[str, str] | None) -> bool:
+	if not styles or styles.get('visibility') in ('hidden', 'collapse') or styles.get('pointer-events') == 'none':
+		return False
+	try:
+		if float(styles.get('opacity') or 1) < MIN_OPACITY:
+			return False
+	except ValueError:
+		pass
+	return _background_alpha(styles.get('background-color', '')) >= MIN_OPACITY
+
+
+def _rect(node: SimplifiedNode) -> DOMRect | None:
+	original = node.original_node
+	rect = original.absolute_position or (original.snapshot_node.bounds if original.snapshot_node else None)
+	return rect if rect and rect.width > 0 and rect.height > 0 else None
+
+
+def mark_occluded(root: SimplifiedNode | None) -> int:
+	"""Exclude every node an opaque node painted after it covers completely. Returns how many were excluded."""
+	if not root:
+		return 0
+
+	# Pre-order positions: the descendants of the node at position p are at p + 1 .. subtree_end[p]
+	nodes: list[SimplifiedNode] = []
+	documents: list[int] = []
+	subtree_end: list[int] = []
+	stack: list[tuple[SimplifiedNode, int, int]] = [(root, id(root), -1)]
+	while stack:
+		node, document, position = stack.pop()
+		if position != -1:
+			subtree_end[position] = len(nodes) - 1
+			continue
+		if node.original_node.node_type == NodeType.DOCUMENT_NODE:
+			document = id(node)
+		position = len(nodes)
+		nodes.append(node)
+		documents.append(document)
+		subtree_end.append(position)
+		stack.append((node, document, position))
+		stack.extend((child, document, -1) for child in reversed(node.children))
+
+	grids: dict[int, SpatialGrid] = {}
+	paint_orders: dict[int, int] = {}
+	candidates: list[tuple[int, DOMRect, int]] = []
+	for position, node in enumerate(nodes):
+		snapshot = node.original_node.snapshot_node
+		rect = _rect(node)
+		if not snapshot or snapshot.paint_order is None or not rect:
+			continue
+		candidates.append((position, rect, snapshot.paint_order))
+		paint_orders[position] = snapshot.paint_order
+		if _is_opaque(snapshot.computed_styles):
+			grids.setdefault(documents[position], SpatialGrid()).insert(position, rect)
+
+	occluded_count = 0
+	for position, rect, paint_order in candidates:
+		grid = grids.get(documents[position])
+		node = nodes[position]
+		if not grid or node.excluded_by_parent:
+			continue
+		for other in grid.at_point(rect.x + rect.width / 2, rect.y + rect.height / 2):
+			cover = grid.rects[other]
+			if (
+				other != position
+				and not position < other <= subtree_end[position]
+				and not other < position <= subtree_end[other]
+				and paint_orders[other] > paint_order
+				and cover.x <= rect.x
+				and cover.y <= rect.y
+				and cover.x + cover.width >= rect.x + rect.width
+				and cover.y + cover.height >= rect.y + rect.height
+			):
+				node.excluded_by_parent = True
+				occluded_count += 1
+				break
+	return occluded_count
@@ -0,0 +1,88 @@
+# @file purpose: Scores the serialized lines of the page against the task with BM25, locally and without dependencies
+"""
+Query-aware relevance of page content.
+
+`line_relevance` treats every line the serializer renders as a document (tag, attributes and text, as serialized)
+and scores it against a query, normally the task plus the agent's current goal, with BM25. Scores are normalized to
+[0, 1] by the best line of the page, and a line inherits half of the relevance of the line of the container it is in,
+so the content around a matching heading or product ranks up with it.
+
+`serialize_tree_within_budget` scores the lines it already collected, and only when they don't fit into the budget,
+to keep relevant lines over irrelevant ones of the same kind. Nothing leaves the machine.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Sequence
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Share of the relevance of the enclosing line a line inherits
+INHERITED_RELEVANCE = 0.5
+
+_WORD = re.compile(r'\w+')
+STOPWORDS = frozenset(
+	'a an and are as at be by for from go has have in is it of on or the this that to was were will with'
+	' i me my you your we our please then find get open click page website'.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+	"""Lowercased words without stopwords, with a plural 's' stripped."""
+	terms = []
+	for word in _WORD.findall(text.lower()):
+		if len(word) < 2 or word in STOPWORDS:
+			continue
+		if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+			word = word[:-1]
+		terms.append(word)
+	return terms
+
+
+def bm25_scores(documents: list[list[str]], query_terms: list[str]) -> list[float]:
+	"""BM25 score of every tokenized document for the query terms."""
+	if not documents or not query_terms:
+		return [0.0] * len(documents)
+
+	document_frequency: Counter[str] = Counter()
+	for terms in documents:
+		document_frequency.update(set(terms))
+	average_length = sum(len(terms) for terms in documents) / len(documents) or 1.0
+	idf = {
+		term: math.log((len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5) + 1)
+		for term in set(query_terms)
+	}
+
+	scores = []
+	for terms in documents:
+		frequencies = Counter(terms)
+		length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / average_length)
+		scores.append(
+			sum(
+				idf[term] * frequencies[term] * (BM25_K1 + 1) / (frequencies[term] + length_norm)
+				for term in idf
+				if frequencies[term]
+			)
+		)
+	return scores
+
+
+def line_relevance(lines: Sequence[str], parents: Sequence[int], query: str) -> list[float]:
+	"""Relevance between 0 and 1 of every serialized line to a query.
+
+	Args:
+		lines: Lines in document order, as the serializer renders them
+		parents: Position of the line of the closest container that has one, -1 for none
+	"""
+	scores = bm25_scores([tokenize(line) for line in lines], tokenize(query))
+	best = max(scores, default=0.0)
+	if best <= 0:
+		return [0.0] * len(lines)
+
+	# parents come before their children, so the inherited part of a parent is final when its children are reached
+	relevance: list[float] = []
+	for score, parent in zip(scores, parents):
+		inherited = INHERITED_RELEVANCE * relevance[parent] if parent != -1 else 0.0
+		relevance.append(max(score / best, inherited))
+	return relevance
@@ -1,7 +1,10 @@
 # @file purpose: Serializes enhanced DOM trees to string format for LLM consumption
 
 
-from browser_use.dom.serializer.clickable_elements import ClickableElementDetector
+from browser_use.dom.serializer.classifier import InteractiveElementClassifier
+from browser_use.dom.serializer.collapse import collapse_repeated_siblings, compact_line
+from browser_use.dom.serializer.indices import ElementIndexAllocator
+from browser_use.dom.serializer.paint_order import mark_occluded
 from browser_use.dom.utils import cap_text_length
 from browser_use.dom.views import (
 	DOMRect,
@@ -11,6 +14,7 @@ from browser_use.dom.views import (
 	PropagatingBounds,
 	SerializedDOMState,
 	SimplifiedNode,
+	compute_element_identities,
 )
 
 DISABLED_ELEMENTS = {'style', 'script', 'head', 'meta', 'link', 'title'}
@@ -40,11 +44,21 @@ class DOMTreeSerializer:
 		previous_cached_state: SerializedDOMState | None = None,
 		enable_bbox_filtering: bool = True,
 		containment_threshold: float | None = None,
+		subtree_cache: dict[int, tuple[bool, SimplifiedNode | None]] | None = None,
+		stable_indices: bool = False,
+		collapse_repeated: bool = False,
+		paint_order_filtering: bool = False,
 	):
 		self.root_node = root_node
 		self._interactive_counter = 1
 		self._selector_map: DOMSelectorMap = {}
 		self._previous_cached_selector_map = previous_cached_state.selector_map if previous_cached_state else None
+		# Keeps the indices elements had in the previous state instead of numbering them from 1
+		self._index_allocator = ElementIndexAllocator(previous_cached_state) if stable_indices else None
+		# Serialize runs of similar siblings past the first few as one compact line each
+		self.collapse_repeated = collapse_repeated
+		# Exclude elements an opaque element painted after them covers completely
+		self.paint_order_filtering = paint_order_filtering
 		# Add timing tracking
 		self.timing_info: dict[str, float] = {}
 		# Cache for clickable element detection to avoid redundant calls
@@ -52,6 +66,10 @@ class DOMTreeSerializer:
 		# Bounding box filtering configuration
 		self.enable_bbox_filtering = enable_bbox_filtering
 		self.containment_threshold = containment_threshold or self.DEFAULT_CONTAINMENT_THRESHOLD
+		# Optimized simplified subtrees of a previous pass over the same (incrementally patched) tree, by node id.
+		# The owner drops the entries of changed nodes and their ancestors, everything left is reused as is.
+		self._subtree_cache = subtree_cache
+		self._reused_subtrees: set[int] = set()
 
 	def serialize_accessible_elements(self) -> tuple[SerializedDOMState, dict[str, float]]:
 		import time
@@ -63,6 +81,7 @@ class DOMTreeSerializer:
 		self._selector_map = {}
 		self._semantic_groups = []
 		self._clickable_cache = {}  # Clear cache for new serialization
+		self._reused_subtrees = set()
 
 		# Step 1: Create simplified tree (includes clickable element detection)
 		start_step1 = time.time()
@@ -89,16 +108,32 @@ class DOMTreeSerializer:
 		else:
 			filtered_tree = optimized_tree
 
+		# Step 3b: Exclude elements hidden under opaque elements painted after them (modals, overlays)
+		if self.paint_order_filtering and filtered_tree:
+			start_occlusion = time.time()
+			mark_occluded(filtered_tree)
+			self.timing_info['paint_order_filtering'] = time.time() - start_occlusion
+
 		# Step 4: Assign interactive indices to clickable elements
 		start_step4 = time.time()
 		self._assign_interactive_indices_and_mark_new_nodes(filtered_tree)
 		end_step4 = time.time()
 		self.timing_info['assign_interactive_indices'] = end_step4 - start_step4
 
+		# Step 5: Collapse repeated sibling structures, after indexing so that every index stays addressable
+		if self.collapse_repeated:
+			start_step5 = time.time()
+			collapse_repeated_siblings(filtered_tree)
+			end_step5 = time.time()
+			self.timing_info['collapse_repeated'] = end_step5 - start_step5
+
 		end_total = time.time()
 		self.timing_info['serialize_accessible_elements_total'] = end_total - start_total
 
-		return SerializedDOMState(_root=filtered_tree, selector_map=self._selector_map), self.timing_info
+		return (
+			SerializedDOMState(_root=filtered_tree, selector_map=self._selector_map, next_index=self._interactive_counter),
+			self.timing_info,
+		)
 
 	def _is_interactive_cached(self, node: EnhancedDOMTreeNode) -> bool:
 		"""Cached version of clickable element detection to avoid redundant calls."""
@@ -106,7 +141,7 @@ class DOMTreeSerializer:
 			import time
 
 			start_time = time.time()
-			result = ClickableElementDetector.is_interactive(node)
+			result = InteractiveElementClassifier.is_interactive(node)
 			end_time = time.time()
 
 			if 'clickable_detection_time' not in self.timing_info:
@@ -120,6 +155,24 @@ class DOMTreeSerializer:
 	def _create_simplified_tree(self, node: EnhancedDOMTreeNode) -> SimplifiedNode | None:
 		"""Step 1: Create a simplified tree with enhanced element detection."""
 
+		if self._subtree_cache is None or node.node_type == NodeType.DOCUMENT_NODE:
+			return self._create_simplified_node(node)
+
+		cached = self._subtree_cache.get(node.node_id)
+		if cached is None:
+			simplified = self._create_simplified_node(node)
+			if simplified is None:
+				self._subtree_cache[node.node_id] = (False, None)
+			return simplified
+
+		created, simplified = cached
+		if simplified is not None:
+			self._reused_subtrees.add(id(simplified))
+			return simplified
+		# dropped by `_optimize_tree` last time: hand out an empty node so it is dropped at the same place again
+		return SimplifiedNode(original_node=node, children=[]) if created else None
+
+	def _create_simplified_node(self, node: EnhancedDOMTreeNode) -> SimplifiedNode | None:
 		if node.node_type == NodeType.DOCUMENT_NODE:
 			# for all cldren including shadow roots
 			for child in node.children_and_shadow_roots:
@@ -188,6 +241,15 @@ class DOMTreeSerializer:
 		if not node:
 			return None
 
+		if id(node) in self._reused_subtrees:
+			return node
+
+		optimized = self._optimize_node(node)
+		if self._subtree_cache is not None:
+			self._subtree_cache[node.original_node.node_id] = (True, optimized)
+		return optimized
+
+	def _optimize_node(self, node: SimplifiedNode) -> SimplifiedNode | None:
 		# Process children
 		optimized_children = []
 		for child in node.children:
@@ -225,31 +287,54 @@ class DOMTreeSerializer:
 
 	def _assign_interactive_indices_and_mark_new_nodes(self, node: SimplifiedNode | None) -> None:
 		"""Assign interactive indices to clickable elements that are also visible."""
-		if not node:
-			return
-
-		# Skip assigning index to excluded nodes
-		if not (hasattr(node, 'excluded_by_parent') and node.excluded_by_parent):
-			# Assign index to clickable elements that are also visible
-			is_interactive_assign = self._is_interactive_cached(node.original_node)
-			is_visible = node.original_node.snapshot_node and node.original_node.is_visible
-
-			# Only add to selector map if element is both interactive AND visible
-			if is_interactive_assign and is_visible:
-				node.interactive_index = self._interactive_counter
-				node.original_node.element_index = self._interactive_counter
-				self._selector_map[self._interactive_counter] = node.original_node
-				self._interactive_counter += 1
+		interactive_nodes = self._collect_interactive_nodes(node)
+		# xpath and hashes of the selector map in one pass, instead of per element on every access
+		compute_element_identities(node.original_node for node in interactive_nodes)
 
-				# Check if node is new
-				if self._previous_cached_selector_map:
-					previous_backend_node_ids = {node.backend_node_id for node in self._previous_cached_selector_map.values()}
-					if node.original_node.backend_node_id not in previous_backend_node_ids:
-						node.is_new = True
-
-		# Process children
-		for child in node.children:
-			self._assign_interactive_indices_and_mark_new_nodes(child)
+		if self._index_allocator is not None:
+			indices = self._index_allocator.assign([node.original_node for node in interactive_nodes])
+		else:
+			indices = list(range(self._interactive_counter, self._interactive_counter + len(interactive_nodes)))
+
+		previous_backend_node_ids = (
+			{node.backend_node_id for node in self._previous_cached_selector_map.values()}
+			if self._previous_cached_selector_map
+			else None
+		)
+		for node, index in zip(interactive_nodes, indices):
+			node.interactive_index = index
+			node.original_node.element_index = index
+			self._selector_map[index] = node.original_node
+
+			# Check if node is new
+			if previous_backend_node_ids is not None and node.original_node.backend_node_id not in previous_backend_node_ids:
+				node.is_new = True
+
+		self._interactive_counter = (
+			self._index_allocator.next_index if self._index_allocator is not None else self._interactive_counter + len(indices)
+		)
+
+	def _collect_interactive_nodes(self, node: SimplifiedNode | None) -> list[SimplifiedNode]:
+		"""Clickable elements that are also visible, in document order."""
+		interactive_nodes: list[SimplifiedNode] = []
+		stack = [node] if node else []
+		while stack:
+			node = stack.pop()
+
+			# nodes reused from a previous pass still carry its results
+			node.interactive_index = None
+			node.is_new = False
+			node.attributes_cache = None
+
+			# Skip assigning index to excluded nodes
+			if not node.excluded_by_parent:
+				# Only add to selector map if element is both interactive AND visible
+				is_visible = node.original_node.snapshot_node and node.original_node.is_visible
+				if self._is_interactive_cached(node.original_node) and is_visible:
+					interactive_nodes.append(node)
+
+			stack.extend(reversed(node.children))
+		return interactive_nodes
 
 	def _apply_bounding_box_filtering(self, node: SimplifiedNode | None) -> SimplifiedNode | None:
 		"""Filter children contained within propagating parent bounds."""
@@ -275,6 +360,7 @@ class DOMTreeSerializer:
 		"""
 
 		# Check if this node should be excluded by active bounds
+		node.excluded_by_parent = False
 		if active_bounds and self._should_exclude_child(node, active_bounds):
 			node.excluded_by_parent = True
 			# Important: Still check if this node starts NEW propagation
@@ -406,70 +492,85 @@ class DOMTreeSerializer:
 
 	@staticmethod
 	def serialize_tree(node: SimplifiedNode | None, include_attributes: list[str], depth: int = 0) -> str:
-		"""Serialize the optimized tree to string format."""
+		"""Serialize the optimized tree to string format.
+
+		Walks the tree with an explicit stack, so deeply nested markup can't hit the recursion limit, and appends every
+		line to a single list that is joined once.
+		"""
 		if not node:
 			return ''
 
-		# Skip rendering excluded nodes, but process their children
-		if hasattr(node, 'excluded_by_parent') and node.excluded_by_parent:
-			formatted_text = []
-			for child in node.children:
-				child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, depth)
-				if child_text:
-					formatted_text.append(child_text)
-			return '\n'.join(formatted_text)
+		lines: list[str] = []
+		stack: list[tuple[SimplifiedNode, int]] = [(node, depth)]
+		while stack:
+			node, depth = stack.pop()
+
+			# Skip rendering excluded nodes, but process their children
+			line = None if node.excluded_by_parent else DOMTreeSerializer.serialize_node_line(node, include_attributes)
+			if line is not None:
+				lines.append('\t' * depth + line)
+				depth += 1
+
+			# Process children in order, collapsed nodes stand for their whole subtree
+			if not node.collapsed:
+				stack.extend((child, depth) for child in reversed(node.children))
+
+		return '\n'.join(lines)
 
-		formatted_text = []
-		depth_str = depth * '\t'
-		next_depth = depth
+	@staticmethod
+	def serialize_node_line(node: SimplifiedNode, include_attributes: list[str], mark_new: bool = True) -> str | None:
+		"""The line of a single node in the serialized tree, without indentation. None for nodes that have no line."""
+		if node.collapsed:
+			return compact_line(node, include_attributes)
 
 		if node.original_node.node_type == NodeType.ELEMENT_NODE:
 			# Skip displaying nodes marked as should_display=False
 			if not node.should_display:
-				for child in node.children:
-					child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, depth)
-					if child_text:
-						formatted_text.append(child_text)
-				return '\n'.join(formatted_text)
+				return None
 
 			# Add element with interactive_index if clickable, scrollable, or iframe
 			is_any_scrollable = node.original_node.is_actually_scrollable or node.original_node.is_scrollable
 			should_show_scroll = node.original_node.should_show_scroll_info
-			if node.interactive_index is not None or is_any_scrollable or node.original_node.tag_name.upper() == 'IFRAME':
-				next_depth += 1
+			if node.interactive_index is None and not is_any_scrollable and node.original_node.tag_name.upper() != 'IFRAME':
+				return None
 
-				# Build attributes string
+			# Build attributes string, cached on the node for the include_attributes of the last call
+			cache = node.attributes_cache
+			if cache is not None and cache[0] is include_attributes:
+				attributes_html_str = cache[1]
+			else:
 				attributes_html_str = DOMTreeSerializer._build_attributes_string(node.original_node, include_attributes, '')
+				node.attributes_cache = (include_attributes, attributes_html_str)
+
+			# Build the line
+			if should_show_scroll and node.interactive_index is None:
+				# Scrollable container but not clickable
+				line = f'|SCROLL|<{node.original_node.tag_name}'
+			elif node.interactive_index is not None:
+				# Clickable (and possibly scrollable)
+				new_prefix = '*' if node.is_new and mark_new else ''
+				scroll_prefix = '|SCROLL+' if should_show_scroll else '['
+				line = f'{new_prefix}{scroll_prefix}{node.interactive_index}]<{node.original_node.tag_name}'
+			elif node.original_node.tag_name.upper() == 'IFRAME':
+				# Iframe element (not interactive)
+				line = f'|IFRAME|<{node.original_node.tag_name}'
+			else:
+				line = f'<{node.original_node.tag_name}'
+
+			if attributes_html_str:
+				line += f' {attributes_html_str}'
+
+			line += ' />'
+
+			# Add scroll information only when we should show it
+			if should_show_scroll:
+				scroll_info_text = node.original_node.get_scroll_info_text()
+				if scroll_info_text:
+					line += f' ({scroll_info_text})'
+
+			return line
 
-				# Build the line
-				if should_show_scroll and node.interactive_index is None:
-					# Scrollable container but not clickable
-					line = f'{depth_str}|SCROLL|<{node.original_node.tag_name}'
-				elif node.interactive_index is not None:
-					# Clickable (and possibly scrollable)
-					new_prefix = '*' if node.is_new else ''
-					scroll_prefix = '|SCROLL+' if should_show_scroll else '['
-					line = f'{depth_str}{new_prefix}{scroll_prefix}{node.interactive_index}]<{node.original_node.tag_name}'
-				elif node.original_node.tag_name.upper() == 'IFRAME':
-					# Iframe element (not interactive)
-					line = f'{depth_str}|IFRAME|<{node.original_node.tag_name}'
-				else:
-					line = f'{depth_str}<{node.original_node.tag_name}'
-
-				if attributes_html_str:
-					line += f' {attributes_html_str}'
-
-				line += ' />'
-
-				# Add scroll information only when we should show it
-				if should_show_scroll:
-					scroll_info_text = node.original_node.get_scroll_info_text()
-					if scroll_info_text:
-						line += f' ({scroll_info_text})'
-
-				formatted_text.append(line)
-
-		elif node.original_node.node_type == NodeType.TEXT_NODE:
+		if node.original_node.node_type == NodeType.TEXT_NODE:
 			# Include visible text
 			is_visible = node.original_node.snapshot_node and node.original_node.is_visible
 			if (
@@ -478,16 +579,9 @@ class DOMTreeSerializer:
 				and node.original_node.node_value.strip()
 				and len(node.original_node.node_value.strip()) > 1
 			):
-				clean_text = node.original_node.node_value.strip()
-				formatted_text.append(f'{depth_str}{clean_text}')
+				return node.original_node.node_value.strip()
 
-		# Process children
-		for child in node.children:
-			child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, next_depth)
-			if child_text:
-				formatted_text.append(child_text)
-
-		return '\n'.join(formatted_text)
+		return None
 
 	@staticmethod
 	def _build_attributes_string(node: EnhancedDOMTreeNode, include_attributes: list[str], text: str) -> str:
@@ -0,0 +1,57 @@
+# @file purpose: Uniform grid over element rectangles, so that point lookups over a whole page stay linear
+"""
+Spatial index of element rectangles.
+
+Comparing every element with every other one is quadratic on dense pages (spreadsheets, maps, product grids).
+`SpatialGrid` buckets rectangles into square cells once, so a lookup only looks at the rectangles of the cells it
+touches. With cells about the size of a typical element, every lookup sees a bounded number of rectangles no matter
+how large the page is.
+"""
+
+import math
+from collections import defaultdict
+from collections.abc import Iterator
+
+from browser_use.dom.views import DOMRect
+
+DEFAULT_CELL_SIZE = 128.0
+# A single rectangle is never spread over more cells than this, larger ones go to the overflow list
+MAX_CELLS_PER_RECT = 4096
+
+
+class SpatialGrid:
+	"""Rectangles of items, bucketed into square cells of `cell_size` pixels."""
+
+	def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+		self.cell_size = cell_size
+		self._cells: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+		self._overflow: list[int] = []
+		"""Items whose rectangle covers too many cells, checked by every lookup"""
+		self.rects: dict[int, DOMRect] = {}
+
+	def __len__(self) -> int:
+		return len(self.rects)
+
+	def _cell_range(self, rect: DOMRect) -> tuple[range, range]:
+		return (
+			range(math.floor(rect.x / self.cell_size), math.floor((rect.x + rect.width) / self.cell_size) + 1),
+			range(math.floor(rect.y / self.cell_size), math.floor((rect.y + rect.height) / self.cell_size) + 1),
+		)
+
+	def insert(self, item: int, rect: DOMRect) -> None:
+		self.rects[item] = rect
+		columns, rows = self._cell_range(rect)
+		if len(columns) * len(rows) > MAX_CELLS_PER_RECT:
+			self._overflow.append(item)
+			return
+		for column in columns:
+			for row in rows:
+				self._cells[(column, row)].append(item)
+
+	def at_point(self, x: float, y: float) -> Iterator[int]:
+		"""Items whose rectangle contains a point."""
+		cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+		for item in (*self._cells.get(cell, ()), *self._overflow):
+			rect = self.rects[item]
+			if rect.x <= x <= rect.x + rect.width and rect.y <= y <= rect.y + rect.height:
+				yield item
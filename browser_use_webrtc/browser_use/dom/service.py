@@ -1,36 +1,97 @@
 import asyncio
 import logging
 import time
-from typing import TYPE_CHECKING
+import weakref
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Literal
 
+from cdp_use import CDPClient
 from cdp_use.cdp.accessibility.commands import GetFullAXTreeReturns
 from cdp_use.cdp.accessibility.types import AXNode
 from cdp_use.cdp.dom.types import Node
-from cdp_use.cdp.target import TargetID
+from cdp_use.cdp.target import SessionID, TargetID
 
+from browser_use.dom.accessibility import AX_EVENTS, MAX_PARTIAL_AX_REQUESTS, AXTreeCache, is_ax_candidate
+from browser_use.dom.deadlines import REQUIRED_CDP_REQUESTS, CDPDeadlines, site_of
 from browser_use.dom.enhanced_snapshot import (
 	REQUIRED_COMPUTED_STYLES,
 	build_snapshot_lookup,
 )
+from browser_use.dom.incremental import (
+	DOM_MUTATION_EVENTS,
+	MAX_DIRTY_NODE_RATIO,
+	MAX_INCREMENTAL_REFRESHES,
+	DOMMutationTracker,
+	FrameContext,
+	iter_subtree,
+)
 from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.snapshot_tree import build_dom_tree_from_snapshot
+from browser_use.dom.utils import intern_string
 from browser_use.dom.views import (
 	CurrentPageTargets,
 	DOMRect,
 	EnhancedAXNode,
 	EnhancedAXProperty,
 	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
 	NodeType,
 	SerializedDOMState,
 	TargetAllTrees,
 )
+from browser_use.dom.visibility import compute_visibility
+from browser_use.dom.windowed import DOMWindow, LazySubtree, viewport_window
 
 if TYPE_CHECKING:
-	from browser_use.browser.session import BrowserSession
+	from browser_use.browser.session import BrowserSession, CDPSession
 
 
 # TODO: enable cross origin iframes -> experimental for now
 ENABLE_CROSS_ORIGIN_IFRAMES = False
 
+LAYOUT_OBJECT_GROUP = 'browser-use-incremental-dom'
+
+# Measures nodes the way DOMSnapshot reports them: bounds relative to their document (ignoring scroll), client and
+# scroll rects for the document element and scrollable elements, and the REQUIRED_COMPUTED_STYLES of elements.
+MEASURE_LAYOUT_FUNCTION = """
+function(styleNames, ...nodes) {
+	return nodes.map((node) => {
+		try {
+			const doc = node.ownerDocument;
+			const view = doc.defaultView;
+			let rects;
+			if (node.nodeType === 3) {
+				const range = doc.createRange();
+				range.selectNodeContents(node);
+				rects = range.getClientRects();
+			} else if (node.nodeType === 1) {
+				rects = node.getClientRects();
+			} else {
+				return null;
+			}
+			if (!rects.length) return {bounds: null};
+
+			const rect = node.nodeType === 3 ? rects[0] : node.getBoundingClientRect();
+			const layout = {bounds: [rect.x + view.scrollX, rect.y + view.scrollY, rect.width, rect.height]};
+			if (node.nodeType !== 1) return layout;
+
+			const computed = view.getComputedStyle(node);
+			layout.styles = styleNames.map((name) => computed.getPropertyValue(name));
+			if (node === doc.documentElement) {
+				layout.clientRects = [0, 0, view.innerWidth, view.innerHeight];
+				layout.scrollRects = [view.scrollX, view.scrollY, node.scrollWidth, node.scrollHeight];
+			} else if (node.scrollHeight > node.clientHeight || node.scrollWidth > node.clientWidth) {
+				layout.clientRects = [node.clientLeft, node.clientTop, node.clientWidth, node.clientHeight];
+				layout.scrollRects = [node.scrollLeft, node.scrollTop, node.scrollWidth, node.scrollHeight];
+			}
+			return layout;
+		} catch (e) {
+			return null;
+		}
+	});
+}
+"""
+
 
 class DomService:
 	"""
@@ -43,9 +104,68 @@ class DomService:
 
 	logger: logging.Logger
 
-	def __init__(self, browser_session: 'BrowserSession', logger: logging.Logger | None = None):
+	def __init__(
+		self,
+		browser_session: 'BrowserSession',
+		logger: logging.Logger | None = None,
+		incremental: bool = False,
+		window_margin: float | None = None,
+		prune_hidden: bool = False,
+		max_nodes: int | None = None,
+		snapshot_only: bool = False,
+		ax_strategy: Literal['full', 'cached', 'partial'] = 'full',
+		stable_indices: bool = False,
+		collapse_repeated: bool = False,
+		paint_order_filtering: bool = False,
+	):
 		self.browser_session = browser_session
 		self.logger = logger or browser_session.logger
+		self.incremental = incremental
+		"""Patch the tree of the previous step from DOM mutation events instead of rebuilding it every step"""
+		self.window_margin = window_margin
+		"""Only build the parts of the page within this many pixels of the viewport, None builds the whole page"""
+		self.prune_hidden = prune_hidden
+		"""Don't build subtrees that can't be visible (`display: none`, `opacity: 0`), unless hover or focus reveals them"""
+		self.max_nodes = max_nodes
+		"""Node budget of the tree of a page, the rest of the page is left out"""
+		self.snapshot_only = snapshot_only
+		"""Build the tree from `DOMSnapshot.captureSnapshot` alone, `DOM.getDocument` is only fetched as a fallback"""
+		self.ax_strategy = ax_strategy
+		"""'full' fetches the accessibility tree of every frame every step, 'cached' keeps it until DOM mutation or
+		navigation events invalidate it, 'partial' only fetches the accessibility nodes of visible candidate elements"""
+		self.stable_indices = stable_indices
+		"""Keep the interactive index of elements that were in the previous state, new elements get unused numbers"""
+		self.collapse_repeated = collapse_repeated
+		"""Serialize runs of structurally identical siblings past the first few as one compact line each"""
+		self.paint_order_filtering = paint_order_filtering
+		"""Leave out elements that an opaque element painted after them covers completely"""
+		self._ax_cache: AXTreeCache | None = None
+		self._ax_event_handlers = {
+			**{f'Accessibility.{method}': self._ax_event_handler(f'Accessibility.{method}') for method in AX_EVENTS},
+			'Page.frameNavigated': self._ax_event_handler('Page.frameNavigated'),
+		}
+		self._clients_with_ax_listeners: weakref.WeakSet[CDPClient] = weakref.WeakSet()
+		"""CDP clients the accessibility cache handlers are registered on, they invalidate whichever cache is current"""
+		self._ax_timing: dict[str, float] = {}
+		"""Accessibility work of the last `get_dom_tree` call, reported with the serializer timing"""
+		self._cdp_deadlines = CDPDeadlines()
+		self._device_pixel_ratio = 1.0
+		"""Last device pixel ratio that was measured, used when measuring it takes too long"""
+		self._degraded: list[str] = []
+		"""Optional CDP requests the last top level `get_dom_tree` call had to do without"""
+		self._window: DOMWindow | None = None
+		"""Limits of the last build (see `DOMWindow`) if it skipped any subtrees, holds their placeholders"""
+		self._truncated = False
+		"""Whether the last top level `get_dom_tree` call stopped at the node budget"""
+		self._build_lazy_subtree: Callable[[LazySubtree], list | None] | None = None
+		self._lazy_owners: dict[int, int] | None = None
+		"""NodeId of every unbuilt node -> NodeId of the placeholder it hangs off, built on demand"""
+		self._mutation_tracker: DOMMutationTracker | None = None
+		self._mutation_buffer: list[tuple[str, dict, SessionID | None]] | None = None
+		"""DOM mutation events received while the tree to apply them to is still being built"""
+		self._dom_event_handlers = {method: self._mutation_event_handler(method) for method in DOM_MUTATION_EVENTS}
+		self._clients_with_dom_listeners: weakref.WeakSet[CDPClient] = weakref.WeakSet()
+		"""CDP clients the DOM event handlers are registered on, once each since one client carries many targets"""
 
 	async def __aenter__(self):
 		return self
@@ -59,7 +179,7 @@ class DomService:
 		Args:
 			target_id: The target ID to get info for. If None, uses current_target_id.
 		"""
-		targets = await self.browser_session.cdp_client.send.Target.getTargets()
+		targets = await self.browser_session._cdp_get_all_targets()
 
 		# Use provided target_id or fall back to current_target_id
 		if target_id is None:
@@ -68,7 +188,7 @@ class DomService:
 				raise ValueError('No current target ID set in browser session')
 
 		# Find main page target by ID
-		main_target = next((t for t in targets['targetInfos'] if t['targetId'] == target_id), None)
+		main_target = next((t for t in targets if t['targetId'] == target_id), None)
 
 		if not main_target:
 			raise ValueError(f'No target found for target ID: {target_id}')
@@ -85,9 +205,7 @@ class DomService:
 				parent_target = frame_info.get('parentTargetId', frame_info.get('frameTargetId'))
 				if parent_target == target_id:
 					# Find the target info for this iframe
-					iframe_target = next(
-						(t for t in targets['targetInfos'] if t['targetId'] == frame_info['frameTargetId']), None
-					)
+					iframe_target = next((t for t in targets if t['targetId'] == frame_info['frameTargetId']), None)
 					if iframe_target:
 						iframe_targets.append(iframe_target)
 
@@ -154,93 +272,20 @@ class DomService:
 
 	@classmethod
 	def is_element_visible_according_to_all_parents(
-		cls, node: EnhancedDOMTreeNode, html_frames: list[EnhancedDOMTreeNode]
+		cls, node: EnhancedDOMTreeNode, html_frames: Sequence[EnhancedDOMTreeNode]
 	) -> bool:
-		"""Check if the element is visible according to all its parent HTML frames."""
-
-		if not node.snapshot_node:
-			return False
-
-		computed_styles = node.snapshot_node.computed_styles or {}
-
-		display = computed_styles.get('display', '').lower()
-		visibility = computed_styles.get('visibility', '').lower()
-		opacity = computed_styles.get('opacity', '1')
-
-		if display == 'none' or visibility == 'hidden':
-			return False
-
-		try:
-			if float(opacity) <= 0:
-				return False
-		except (ValueError, TypeError):
-			pass
-
-		# Start with the element's local bounds (in its own frame's coordinate system)
-		current_bounds = node.snapshot_node.bounds
-
-		if not current_bounds:
-			return False  # If there are no bounds, the element is not visible
+		"""Check if the element is visible according to all its parent HTML frames.
 
+		The html frames can be either an iframe (the bounds are moved by the iframe offset) or a document (the bounds
+		have to intersect its viewport, taking scroll into account). See `compute_visibility` for whole trees.
 		"""
-		Reverse iterate through the html frames (that can be either iframe or document -> if it's a document frame compare if the current bounds interest with it (taking scroll into account) otherwise move the current bounds by the iframe offset)
-		"""
-		for frame in reversed(html_frames):
-			if (
-				frame.node_type == NodeType.ELEMENT_NODE
-				and frame.node_name.upper() == 'IFRAME'
-				and frame.snapshot_node
-				and frame.snapshot_node.bounds
-			):
-				iframe_bounds = frame.snapshot_node.bounds
-
-				# negate the values added in `_construct_enhanced_node`
-				current_bounds.x += iframe_bounds.x
-				current_bounds.y += iframe_bounds.y
-
-			if (
-				frame.node_type == NodeType.ELEMENT_NODE
-				and frame.node_name == 'HTML'
-				and frame.snapshot_node
-				and frame.snapshot_node.scrollRects
-				and frame.snapshot_node.clientRects
-			):
-				# For iframe content, we need to check visibility within the iframe's viewport
-				# The scrollRects represent the current scroll position
-				# The clientRects represent the viewport size
-				# Elements are visible if they fall within the viewport after accounting for scroll
-
-				# The viewport of the frame (what's actually visible)
-				viewport_left = 0  # Viewport always starts at 0 in frame coordinates
-				viewport_top = 0
-				viewport_right = frame.snapshot_node.clientRects.width
-				viewport_bottom = frame.snapshot_node.clientRects.height
-
-				# Adjust element bounds by the scroll offset to get position relative to viewport
-				# When scrolled down, scrollRects.y is positive, so we subtract it from element's y
-				adjusted_x = current_bounds.x - frame.snapshot_node.scrollRects.x
-				adjusted_y = current_bounds.y - frame.snapshot_node.scrollRects.y
-
-				frame_intersects = (
-					adjusted_x < viewport_right
-					and adjusted_x + current_bounds.width > viewport_left
-					and adjusted_y < viewport_bottom
-					and adjusted_y + current_bounds.height > viewport_top
-				)
-
-				if not frame_intersects:
-					return False
-
-				# Keep the original coordinate adjustment to maintain consistency
-				# This adjustment is needed for proper coordinate transformation
-				current_bounds.x -= frame.snapshot_node.scrollRects.x
-				current_bounds.y -= frame.snapshot_node.scrollRects.y
-
-		# If we reach here, element is visible in main viewport and all containing iframes
-		return True
+		return bool(compute_visibility([(node, html_frames)])[0])
 
 	async def _get_ax_tree_for_all_frames(self, target_id: TargetID) -> GetFullAXTreeReturns:
-		"""Recursively collect all frames and merge their accessibility trees into a single array."""
+		"""Recursively collect all frames and merge their accessibility trees into a single array.
+
+		Unless the accessibility strategy is 'full', the trees of frames that are still cached are reused.
+		"""
 
 		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
 		frame_tree = await cdp_session.cdp_client.send.Page.getFrameTree(session_id=cdp_session.session_id)
@@ -258,27 +303,100 @@ class DomService:
 		# Collect all frame IDs recursively
 		all_frame_ids = collect_all_frame_ids(frame_tree['frameTree'])
 
+		cache = await self._get_ax_cache(target_id) if self.ax_strategy != 'full' else None
+		generation = cache.generation if cache else 0
+		missing_frame_ids = [frame_id for frame_id in all_frame_ids if cache is None or frame_id not in cache.frames]
+
 		# Get accessibility tree for each frame
 		ax_tree_requests = []
-		for frame_id in all_frame_ids:
+		for frame_id in missing_frame_ids:
 			ax_tree_request = cdp_session.cdp_client.send.Accessibility.getFullAXTree(
 				params={'frameId': frame_id}, session_id=cdp_session.session_id
 			)
 			ax_tree_requests.append(ax_tree_request)
 
 		# Wait for all requests to complete
-		ax_trees = await asyncio.gather(*ax_tree_requests)
+		ax_trees = dict(zip(missing_frame_ids, await asyncio.gather(*ax_tree_requests)))
+		self._ax_timing['ax_frames_fetched'] = len(missing_frame_ids)
+		self._ax_timing['ax_frames_cached'] = len(all_frame_ids) - len(missing_frame_ids)
 
 		# Merge all AX nodes into a single array
 		merged_nodes: list[AXNode] = []
-		for ax_tree in ax_trees:
-			merged_nodes.extend(ax_tree['nodes'])
+		for frame_id in all_frame_ids:
+			if frame_id in ax_trees:
+				merged_nodes.extend(ax_trees[frame_id]['nodes'])
+				if cache:
+					cache.store_frame(frame_id, ax_trees[frame_id]['nodes'], generation)
+			elif cache:
+				merged_nodes.extend(cache.frames.get(frame_id, []))
 
 		return {'nodes': merged_nodes}
 
-	async def _get_all_trees(self, target_id: TargetID) -> TargetAllTrees:
+	async def _get_ax_cache(self, target_id: TargetID) -> AXTreeCache:
+		"""Accessibility cache of a target, listening to the CDP events that invalidate it."""
 		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
-
+		cache = self._ax_cache
+		if cache is None or cache.target_id != target_id or cache.session_id != cdp_session.session_id:
+			cache = self._ax_cache = AXTreeCache(target_id, cdp_session.session_id)
+			self._listen_for_dom_events(cdp_session)
+			self._listen_for_ax_events(cdp_session)
+		return cache
+
+	def _listen_for_ax_events(self, cdp_session: 'CDPSession') -> None:
+		"""Route the events that invalidate accessibility nodes to the current accessibility cache, once per CDP client."""
+		client = cdp_session.cdp_client
+		if client in self._clients_with_ax_listeners:
+			return
+		for method, handler in self._ax_event_handlers.items():
+			domain, event = method.split('.')
+			getattr(getattr(client.register, domain), event)(handler)  # type: ignore[arg-type]
+		self._clients_with_ax_listeners.add(client)
+
+	def _ax_event_handler(self, method: str) -> Callable[[dict, SessionID | None], None]:
+		def handle_ax_event(event: dict, session_id: SessionID | None) -> None:
+			if self._ax_cache is not None:
+				self._ax_cache.handle_event(method, event, session_id)
+
+		return handle_ax_event
+
+	async def _attach_partial_ax_nodes(
+		self, target_id: TargetID, nodes: Iterable[EnhancedDOMTreeNode], ax_tree_lookup: dict[int, AXNode]
+	) -> None:
+		"""Fetch the accessibility nodes of the visible candidate elements that are not cached yet and attach them.
+
+		Falls back to the (cached) full accessibility trees of all frames when there are too many to fetch one by one.
+		`ax_tree_lookup` is updated with everything that was fetched.
+		"""
+		start = time.time()
+		elements = [node for node in nodes if node.node_type == NodeType.ELEMENT_NODE]
+		candidates = [node for node in elements if is_ax_candidate(node)]
+		missing = [node for node in candidates if node.backend_node_id not in ax_tree_lookup]
+
+		cache = await self._get_ax_cache(target_id)
+		generation = cache.generation
+		if len(missing) > MAX_PARTIAL_AX_REQUESTS:
+			ax_tree = await self._get_ax_tree_for_all_frames(target_id)
+			ax_tree_lookup.update(
+				(ax_node['backendDOMNodeId'], ax_node) for ax_node in ax_tree['nodes'] if 'backendDOMNodeId' in ax_node
+			)
+		elif missing:
+			cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+			fetched = await self._get_partial_ax_trees(cdp_session, missing)
+			cache.store_partial(fetched, generation)
+			ax_tree_lookup.update(fetched)
+
+		for node in candidates:
+			ax_node = ax_tree_lookup.get(node.backend_node_id)
+			if node.ax_node is None and ax_node is not None:
+				node.ax_node = self._build_enhanced_ax_node(ax_node)
+
+		self._ax_timing['ax_partial_fetch'] = time.time() - start
+		self._ax_timing['ax_nodes_fetched'] = len(missing)
+		self._ax_timing['ax_nodes_cached'] = len(candidates) - len(missing)
+		self._ax_timing['ax_nodes_skipped'] = len(elements) - len(candidates)
+
+	async def _log_page_state(self, cdp_session: 'CDPSession', target_id: TargetID) -> None:
+		"""Wait for the page to answer and log the scroll positions of its iframes (debug only)."""
 		# Wait for the page to be ready first
 		try:
 			ready_state = await cdp_session.cdp_client.send.Runtime.evaluate(
@@ -327,7 +445,19 @@ class DomService:
 		except Exception as e:
 			self.logger.debug(f'Failed to get iframe scroll positions: {e}')
 
-		# Define CDP request factories to avoid duplication
+	async def _get_all_trees(self, target_id: TargetID, snapshot_only: bool = False) -> TargetAllTrees:
+		"""Fetch the DOM snapshot, DOM tree, accessibility tree and device pixel ratio of a target concurrently.
+
+		Args:
+			snapshot_only: Rebuild the DOM tree from the snapshot instead of fetching it with `DOM.getDocument`, which
+				transfers the whole document a second time. `DOM.getDocument` is only fetched when the snapshot lacks
+				shadow root metadata. Also skips the page state debug evaluations.
+		"""
+		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+
+		if not snapshot_only:
+			await self._log_page_state(cdp_session, target_id)
+
 		def create_snapshot_request():
 			return cdp_session.cdp_client.send.DOMSnapshot.captureSnapshot(
 				params={
@@ -345,69 +475,59 @@ class DomService:
 				params={'depth': -1, 'pierce': True}, session_id=cdp_session.session_id
 			)
 
-		start = time.time()
-
-		# Create initial tasks
-		tasks = {
-			'snapshot': asyncio.create_task(create_snapshot_request()),
-			'dom_tree': asyncio.create_task(create_dom_tree_request()),
-			'ax_tree': asyncio.create_task(self._get_ax_tree_for_all_frames(target_id)),
-			'device_pixel_ratio': asyncio.create_task(self._get_viewport_ratio(target_id)),
+		# Define CDP request factories to avoid duplication
+		requests: dict[str, Callable[[], Awaitable[Any]]] = {
+			'snapshot': create_snapshot_request,
+			'device_pixel_ratio': lambda: self._get_viewport_ratio(target_id),
 		}
+		# partial accessibility data is fetched once the visible elements are known
+		if self.ax_strategy != 'partial':
+			requests['ax_tree'] = lambda: self._get_ax_tree_for_all_frames(target_id)
+		if not snapshot_only:
+			requests['dom_tree'] = create_dom_tree_request
 
-		# Wait for all tasks with timeout
-		done, pending = await asyncio.wait(tasks.values(), timeout=10.0)
-
-		# Retry any failed or timed out tasks
-		if pending:
-			for task in pending:
-				task.cancel()
-
-			# Retry mapping for pending tasks
-			retry_map = {
-				tasks['snapshot']: lambda: asyncio.create_task(create_snapshot_request()),
-				tasks['dom_tree']: lambda: asyncio.create_task(create_dom_tree_request()),
-				tasks['ax_tree']: lambda: asyncio.create_task(self._get_ax_tree_for_all_frames(target_id)),
-				tasks['device_pixel_ratio']: lambda: asyncio.create_task(self._get_viewport_ratio(target_id)),
-			}
-
-			# Create new tasks only for the ones that didn't complete
-			for key, task in tasks.items():
-				if task in pending and task in retry_map:
-					tasks[key] = retry_map[task]()
-
-			# Wait again with shorter timeout
-			done2, pending2 = await asyncio.wait([t for t in tasks.values() if not t.done()], timeout=2.0)
+		try:
+			target_info = await self.browser_session.get_target_info(target_id)
+			site = site_of(target_info['url']) if target_info else ''
+		except Exception:
+			site = ''
 
-			if pending2:
-				for task in pending2:
-					task.cancel()
+		start = time.time()
+		results, failed = await self._run_cdp_requests(requests, site)
 
-		# Extract results, tracking which ones failed
-		results = {}
-		failed = []
-		for key, task in tasks.items():
-			if task.done() and not task.cancelled():
-				try:
-					results[key] = task.result()
-				except Exception as e:
-					self.logger.warning(f'CDP request {key} failed with exception: {e}')
-					failed.append(key)
-			else:
-				self.logger.warning(f'CDP request {key} timed out')
-				failed.append(key)
+		# Required requests get one more try with the longest deadline, the build can't go on without them
+		retry = [key for key in failed if key in REQUIRED_CDP_REQUESTS]
+		if retry:
+			retry_results, failed_again = await self._run_cdp_requests(
+				{key: requests[key] for key in retry}, site, deadline=self._cdp_deadlines.max_deadline
+			)
+			results.update(retry_results)
+			if failed_again:
+				raise TimeoutError(f'CDP requests failed or timed out: {", ".join(failed_again)}')
 
-		# If any required tasks failed, raise an exception
-		if failed:
-			raise TimeoutError(f'CDP requests failed or timed out: {", ".join(failed)}')
+		# Optional requests degrade the state instead of failing the step
+		degraded = [key for key in failed if key not in REQUIRED_CDP_REQUESTS]
+		if degraded:
+			self.logger.warning(f'Building the DOM tree without: {", ".join(degraded)} (too slow or failed)')
+		if 'device_pixel_ratio' in results:
+			self._device_pixel_ratio = results['device_pixel_ratio']
 
 		snapshot = results['snapshot']
-		dom_tree = results['dom_tree']
-		ax_tree = results['ax_tree']
-		device_pixel_ratio = results['device_pixel_ratio']
+		ax_tree = results.get('ax_tree', {'nodes': []})
+		device_pixel_ratio = self._device_pixel_ratio
 		end = time.time()
 		cdp_timing = {'cdp_calls_total': end - start}
 
+		if snapshot_only:
+			dom_tree = build_dom_tree_from_snapshot(snapshot)
+			cdp_timing['snapshot_dom_tree'] = time.time() - end
+			if dom_tree is None:
+				self.logger.debug('DOM snapshot lacks shadow root metadata, falling back to DOM.getDocument')
+				dom_tree = await asyncio.wait_for(create_dom_tree_request(), timeout=10.0)
+				cdp_timing['dom_tree_fallback'] = time.time() - end
+		else:
+			dom_tree = results['dom_tree']
+
 		# DEBUG: Log snapshot info
 		if snapshot and 'documents' in snapshot:
 			total_nodes = sum(len(doc.get('nodes', [])) for doc in snapshot['documents'])
@@ -425,13 +545,327 @@ class DomService:
 			ax_tree=ax_tree,
 			device_pixel_ratio=device_pixel_ratio,
 			cdp_timing=cdp_timing,
+			degraded=degraded,
+		)
+
+	async def _run_cdp_requests(
+		self, requests: dict[str, Callable[[], Awaitable[Any]]], site: str, deadline: float | None = None
+	) -> tuple[dict[str, Any], list[str]]:
+		"""Run CDP requests concurrently, giving up on each one at its own deadline.
+
+		Deadlines adapt to the latencies observed for the same request on the same site (see `CDPDeadlines`), unless
+		a fixed `deadline` is given. Every completed or timed out request is recorded in the latency history.
+
+		Returns:
+			Tuple of (results by request name, names of the requests that failed or timed out)
+		"""
+		start = time.time()
+		deadlines = {key: deadline or self._cdp_deadlines.deadline(site, key) for key in requests}
+		pending = {key: asyncio.create_task(request()) for key, request in requests.items()}
+		finished_at: dict[str, float] = {}
+		for key, task in pending.items():
+			task.add_done_callback(lambda _, key=key: finished_at.setdefault(key, time.time()))
+
+		results: dict[str, Any] = {}
+		failed: list[str] = []
+		while pending:
+			next_deadline = min(deadlines[key] for key in pending)
+			await asyncio.wait(
+				pending.values(), timeout=max(0.0, next_deadline - (time.time() - start)), return_when=asyncio.FIRST_COMPLETED
+			)
+			elapsed = time.time() - start
+
+			for key, task in list(pending.items()):
+				if task.done():
+					del pending[key]
+					self._cdp_deadlines.record(site, key, finished_at.get(key, time.time()) - start)
+					try:
+						results[key] = task.result()
+					except Exception as e:
+						self.logger.warning(f'CDP request {key} failed with exception: {e}')
+						failed.append(key)
+				elif elapsed >= deadlines[key]:
+					del pending[key]
+					task.cancel()
+					self._cdp_deadlines.record(site, key, elapsed)
+					self.logger.warning(f'CDP request {key} timed out after {elapsed:.1f}s')
+					failed.append(key)
+
+		return results, failed
+
+	def _construct_enhanced_tree(
+		self,
+		root: Node,
+		target_id: TargetID,
+		ax_tree_lookup: dict[int, AXNode],
+		snapshot_lookup: Mapping[int, EnhancedSnapshotNode],
+		initial_html_frames: Sequence[EnhancedDOMTreeNode] | None = None,
+		initial_total_frame_offset: DOMRect | None = None,
+		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] | None = None,
+		frame_contexts: dict[int, FrameContext] | None = None,
+		window: DOMWindow | None = None,
+	) -> tuple[EnhancedDOMTreeNode, list[tuple[EnhancedDOMTreeNode, Node, DOMRect]]]:
+		"""Build the enhanced DOM tree for a `DOM.getDocument` payload.
+
+		The payload is walked with an explicit stack, so there is no coroutine per node and no Python recursion
+		limit to hit on deeply nested pages. Frame state (`html_frames` and the accumulated frame offset) is shared
+		between siblings and only copied when an HTML document or IFRAME node changes it.
+
+		Args:
+			enhanced_dom_tree_node_lookup: NodeId -> node map to register the new nodes in (and to look parents up in)
+			frame_contexts: Filled with the frame context that the descendants of HTML frame / IFRAME nodes are built with
+			window: Only build the descendants of elements that have some layout inside this window and are not hidden,
+				the others are recorded in `window.lazy_subtrees`. Stops after `window.max_nodes` nodes.
+
+		Returns:
+			Tuple of (root node, pending cross-origin iframes as (iframe node, DOM payload, frame offset)). The
+			pending iframes have to be filled in by the caller because they live in another target.
+		"""
+		if enhanced_dom_tree_node_lookup is None:
+			enhanced_dom_tree_node_lookup = {}
+			""" NodeId (NOT backend node id) -> enhanced dom tree node"""  # way to get the parent/content node
+
+		session_id = self.browser_session.agent_focus.session_id if self.browser_session.agent_focus else None
+
+		initial_offset = initial_total_frame_offset or DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
+		root_frames: tuple[EnhancedDOMTreeNode, ...] = tuple(initial_html_frames or ())
+
+		# (node payload, node it hangs off, how it hangs off it, html frames, frame offset x, frame offset y)
+		stack: list[tuple[Node, EnhancedDOMTreeNode | None, str, tuple[EnhancedDOMTreeNode, ...], float, float]] = [
+			(root, None, 'root', root_frames, initial_offset.x, initial_offset.y)
+		]
+		# pre-order list of (node, html frames it is checked against), used for the visibility pass
+		visited: list[tuple[EnhancedDOMTreeNode, tuple[EnhancedDOMTreeNode, ...]]] = []
+		pending_iframes: list[tuple[EnhancedDOMTreeNode, Node, DOMRect]] = []
+		root_node: EnhancedDOMTreeNode | None = None
+
+		while stack:
+			if window is not None and window.max_nodes is not None and len(visited) >= window.max_nodes:
+				self.logger.warning(f'DOM tree has more than {window.max_nodes} nodes, leaving out the rest of the page')
+				window.truncated = True
+				break
+
+			node, owner, relation, html_frames, offset_x, offset_y = stack.pop()
+
+			# memoize the mf (I don't know if some nodes are duplicated)
+			dom_tree_node = enhanced_dom_tree_node_lookup.get(node['nodeId'])
+			if dom_tree_node is None:
+				dom_tree_node = self._construct_enhanced_node(
+					node,
+					target_id,
+					session_id,
+					ax_tree_lookup,
+					snapshot_lookup,
+					enhanced_dom_tree_node_lookup,
+					offset_x,
+					offset_y,
+				)
+
+				child_context = self._frame_context_for_descendants(dom_tree_node, html_frames, offset_x, offset_y)
+				if frame_contexts is not None and child_context[0] is not html_frames:
+					frame_contexts[dom_tree_node.node_id] = child_context
+				visited.append((dom_tree_node, child_context[0]))
+
+				# off-window elements stay in the tree as placeholders, their descendants are built on demand
+				if window is None or not window.skip(dom_tree_node, node, child_context, offset_x, offset_y):
+					html_frames, offset_x, offset_y = child_context
+
+					# push in reverse so the content document, then shadow roots, then children are built in document order
+					if 'children' in node and node['children']:
+						dom_tree_node.children_nodes = []
+						for child in reversed(node['children']):
+							stack.append((child, dom_tree_node, 'child', html_frames, offset_x, offset_y))
+
+					if 'shadowRoots' in node and node['shadowRoots']:
+						dom_tree_node.shadow_roots = []
+						for shadow_root in reversed(node['shadowRoots']):
+							stack.append((shadow_root, dom_tree_node, 'shadow_root', html_frames, offset_x, offset_y))
+
+					if 'contentDocument' in node and node['contentDocument']:
+						stack.append(
+							(node['contentDocument'], dom_tree_node, 'content_document', html_frames, offset_x, offset_y)
+						)
+					elif ENABLE_CROSS_ORIGIN_IFRAMES and node['nodeName'].upper() == 'IFRAME':
+						# handle cross origin iframe (no content document means it lives in another target)
+						pending_iframes.append((dom_tree_node, node, DOMRect(x=offset_x, y=offset_y, width=0.0, height=0.0)))
+
+			if owner is None:
+				root_node = dom_tree_node
+			elif relation == 'content_document':
+				# forcefully set the parent node to the content document node (helps traverse the tree)
+				owner.content_document = dom_tree_node
+				dom_tree_node.parent_node = owner
+			elif relation == 'shadow_root':
+				# forcefully set the parent node to the shadow root node (helps traverse the tree)
+				dom_tree_node.parent_node = owner
+				assert owner.shadow_roots is not None
+				owner.shadow_roots.append(dom_tree_node)
+			else:
+				assert owner.children_nodes is not None
+				owner.children_nodes.append(dom_tree_node)
+
+		# Set visibility using the collected HTML frames
+		self._set_visibility(visited)
+
+		assert root_node is not None
+		return root_node, pending_iframes
+
+	def _set_visibility(self, visited: list[tuple[EnhancedDOMTreeNode, tuple[EnhancedDOMTreeNode, ...]]]) -> None:
+		"""Set `is_visible` of (node, html frames) pairs in one batched pass over their bounds."""
+		for (dom_tree_node, _), is_visible in zip(visited, compute_visibility(visited).tolist()):
+			dom_tree_node.is_visible = is_visible
+
+		if not self.logger.isEnabledFor(logging.DEBUG):
+			return
+
+		# DEBUG: Log visibility info for form elements in iframes
+		for dom_tree_node, _ in visited:
+			if dom_tree_node.tag_name and dom_tree_node.tag_name.upper() in ['INPUT', 'SELECT', 'TEXTAREA', 'LABEL']:
+				attrs = dom_tree_node.attributes or {}
+				elem_id = attrs.get('id', '')
+				elem_name = attrs.get('name', '')
+				if (
+					'city' in elem_id.lower()
+					or 'city' in elem_name.lower()
+					or 'state' in elem_id.lower()
+					or 'state' in elem_name.lower()
+					or 'zip' in elem_id.lower()
+					or 'zip' in elem_name.lower()
+				):
+					self.logger.debug(
+						f"🔍 DEBUG: Form element {dom_tree_node.tag_name} id='{elem_id}' name='{elem_name}' - visible={dom_tree_node.is_visible}, bounds={dom_tree_node.snapshot_node.bounds if dom_tree_node.snapshot_node else 'NO_SNAPSHOT'}"
+					)
+
+	def _construct_enhanced_node(
+		self,
+		node: Node,
+		target_id: TargetID,
+		session_id: SessionID | None,
+		ax_tree_lookup: dict[int, AXNode],
+		snapshot_lookup: Mapping[int, EnhancedSnapshotNode],
+		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode],
+		offset_x: float,
+		offset_y: float,
+	) -> EnhancedDOMTreeNode:
+		"""
+		Construct a single enhanced DOM tree node (without its children).
+
+		Args:
+			node: The DOM node to construct
+			offset_x, offset_y: Accumulated coordinate translation from parent iframes (includes scroll corrections)
+		"""
+		ax_node = ax_tree_lookup.get(node['backendNodeId'])
+		if ax_node:
+			enhanced_ax_node = self._build_enhanced_ax_node(ax_node)
+		else:
+			enhanced_ax_node = None
+
+		# To make attributes more readable
+		attributes: dict[str, str] | None = None
+		if 'attributes' in node and node['attributes']:
+			attributes = {}
+			for i in range(0, len(node['attributes']), 2):
+				attributes[intern_string(node['attributes'][i])] = intern_string(node['attributes'][i + 1])
+
+		shadow_root_type = None
+		if 'shadowRootType' in node and node['shadowRootType']:
+			try:
+				shadow_root_type = node['shadowRootType']
+			except ValueError:
+				pass
+
+		# Get snapshot data and calculate absolute position
+		snapshot_data = snapshot_lookup.get(node['backendNodeId'], None)
+		absolute_position = self._absolute_position(snapshot_data, offset_x, offset_y)
+
+		dom_tree_node = EnhancedDOMTreeNode(
+			node_id=node['nodeId'],
+			backend_node_id=node['backendNodeId'],
+			node_type=NodeType(node['nodeType']),
+			node_name=intern_string(node['nodeName']),
+			node_value=node['nodeValue'],
+			attributes=attributes or {},
+			is_scrollable=node.get('isScrollable', None),
+			frame_id=node.get('frameId', None),
+			session_id=session_id,
+			target_id=target_id,
+			content_document=None,
+			shadow_root_type=shadow_root_type,
+			shadow_roots=None,
+			parent_node=None,
+			children_nodes=None,
+			ax_node=enhanced_ax_node,
+			snapshot_node=snapshot_data,
+			is_visible=None,
+			absolute_position=absolute_position,
+			element_index=None,
 		)
 
+		enhanced_dom_tree_node_lookup[node['nodeId']] = dom_tree_node
+
+		if 'parentId' in node and node['parentId']:
+			dom_tree_node.parent_node = enhanced_dom_tree_node_lookup[node['parentId']]  # parents should always be in the lookup
+
+		return dom_tree_node
+
+	@staticmethod
+	def _absolute_position(snapshot_data: EnhancedSnapshotNode | None, offset_x: float, offset_y: float) -> DOMRect | None:
+		"""Position of a node in the top level document, given the accumulated offset of the frames it is in."""
+		if not snapshot_data or not snapshot_data.bounds:
+			return None
+
+		return DOMRect(
+			x=snapshot_data.bounds.x + offset_x,
+			y=snapshot_data.bounds.y + offset_y,
+			width=snapshot_data.bounds.width,
+			height=snapshot_data.bounds.height,
+		)
+
+	def _frame_context_for_descendants(
+		self,
+		dom_tree_node: EnhancedDOMTreeNode,
+		html_frames: tuple[EnhancedDOMTreeNode, ...],
+		offset_x: float,
+		offset_y: float,
+	) -> FrameContext:
+		"""Frame state (html frames, offset x, offset y) that the descendants of a node are built with.
+
+		Returns `html_frames` itself when the node does not start a new frame.
+		"""
+		snapshot_data = dom_tree_node.snapshot_node
+
+		# Check if this is an HTML frame node and add it to the list
+		if (
+			dom_tree_node.node_type == NodeType.ELEMENT_NODE
+			and dom_tree_node.node_name == 'HTML'
+			and dom_tree_node.frame_id is not None
+		):
+			html_frames = (*html_frames, dom_tree_node)
+
+			# and adjust the total frame offset by scroll
+			if snapshot_data and snapshot_data.scrollRects:
+				offset_x -= snapshot_data.scrollRects.x
+				offset_y -= snapshot_data.scrollRects.y
+				# DEBUG: Log iframe scroll information
+				self.logger.debug(
+					f'🔍 DEBUG: HTML frame scroll - scrollY={snapshot_data.scrollRects.y}, scrollX={snapshot_data.scrollRects.x}, frameId={dom_tree_node.frame_id}, nodeId={dom_tree_node.node_id}'
+				)
+
+		# Calculate new iframe offset for content documents, accounting for iframe scroll
+		if dom_tree_node.node_name.upper() == 'IFRAME' and snapshot_data and snapshot_data.bounds:
+			html_frames = (*html_frames, dom_tree_node)
+
+			offset_x += snapshot_data.bounds.x
+			offset_y += snapshot_data.bounds.y
+
+		return html_frames, offset_x, offset_y
+
 	async def get_dom_tree(
 		self,
 		target_id: TargetID,
 		initial_html_frames: list[EnhancedDOMTreeNode] | None = None,
 		initial_total_frame_offset: DOMRect | None = None,
+		track_mutations: bool = False,
 	) -> EnhancedDOMTreeNode:
 		"""Get the DOM tree for a specific target.
 
@@ -439,9 +873,17 @@ class DomService:
 			target_id: Target ID of the page to get the DOM tree for.
 			initial_html_frames: List of HTML frame nodes encountered so far
 			initial_total_frame_offset: Accumulated coordinate offset
+			track_mutations: Keep the tree and patch it from DOM mutation events, see `get_serialized_dom_tree`
 		"""
 
-		trees = await self._get_all_trees(target_id)
+		self._ax_timing = {}
+		if track_mutations:
+			await self._listen_for_mutations(target_id)
+
+		# mutation events and cross origin iframes refer to the node ids of `DOM.getDocument`
+		trees = await self._get_all_trees(
+			target_id, snapshot_only=self.snapshot_only and not track_mutations and not ENABLE_CROSS_ORIGIN_IFRAMES
+		)
 
 		dom_tree = trees.dom_tree
 		ax_tree = trees.ax_tree
@@ -451,229 +893,486 @@ class DomService:
 		ax_tree_lookup: dict[int, AXNode] = {
 			ax_node['backendDOMNodeId']: ax_node for ax_node in ax_tree['nodes'] if 'backendDOMNodeId' in ax_node
 		}
-
-		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] = {}
-		""" NodeId (NOT backend node id) -> enhanced dom tree node"""  # way to get the parent/content node
+		if self.ax_strategy == 'partial':
+			ax_tree_lookup = (await self._get_ax_cache(target_id)).lookup()
 
 		# Parse snapshot data with everything calculated upfront
 		snapshot_lookup = build_snapshot_lookup(snapshot, device_pixel_ratio)
 
-		async def _construct_enhanced_node(
-			node: Node, html_frames: list[EnhancedDOMTreeNode] | None, total_frame_offset: DOMRect | None
-		) -> EnhancedDOMTreeNode:
-			"""
-			Recursively construct enhanced DOM tree nodes.
-
-			Args:
-				node: The DOM node to construct
-				html_frames: List of HTML frame nodes encountered so far
-				accumulated_iframe_offset: Accumulated coordinate translation from parent iframes (includes scroll corrections)
-			"""
-
-			# Initialize lists if not provided
-			if html_frames is None:
-				html_frames = []
-
-			# to get rid of the pointer references
-			if total_frame_offset is None:
-				total_frame_offset = DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
-			else:
-				total_frame_offset = DOMRect(
-					total_frame_offset.x, total_frame_offset.y, total_frame_offset.width, total_frame_offset.height
+		# cross origin iframes are built by recursive calls, they are windowed as part of their top level page
+		window = None
+		is_top_level = initial_html_frames is None and initial_total_frame_offset is None
+		if is_top_level:
+			self._degraded = trees.degraded
+			self._truncated = False
+			self._window = self._build_lazy_subtree = self._lazy_owners = None
+			window_rect = (
+				viewport_window(dom_tree['root'], snapshot_lookup, self.window_margin) if self.window_margin is not None else None
+			)
+			if window_rect is not None or self.prune_hidden or self.max_nodes is not None:
+				window = DOMWindow(
+					window_rect, snapshot_lookup.subtree_extent, prune_hidden=self.prune_hidden, max_nodes=self.max_nodes
 				)
 
-			# memoize the mf (I don't know if some nodes are duplicated)
-			if node['nodeId'] in enhanced_dom_tree_node_lookup:
-				return enhanced_dom_tree_node_lookup[node['nodeId']]
+		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] = {}
+		frame_contexts: dict[int, FrameContext] = {}
+		enhanced_dom_tree_node, pending_iframes = self._construct_enhanced_tree(
+			dom_tree['root'],
+			target_id,
+			ax_tree_lookup,
+			snapshot_lookup,
+			initial_html_frames,
+			initial_total_frame_offset,
+			enhanced_dom_tree_node_lookup=enhanced_dom_tree_node_lookup,
+			frame_contexts=frame_contexts,
+			window=window,
+		)
 
-			ax_node = ax_tree_lookup.get(node['backendNodeId'])
-			if ax_node:
-				enhanced_ax_node = self._build_enhanced_ax_node(ax_node)
-			else:
-				enhanced_ax_node = None
+		if self.ax_strategy == 'partial':
+			await self._attach_partial_ax_nodes(target_id, enhanced_dom_tree_node_lookup.values(), ax_tree_lookup)
+
+		if window is not None:
+			self._truncated = window.truncated
+
+		# the lazy builder keeps the payloads and lookups of the whole build alive, only keep it for skipped subtrees
+		if window is not None and window.lazy_subtrees:
+			self.logger.debug(f'Skipped the descendants of {len(window.lazy_subtrees)} off-screen or hidden elements')
+
+			def build_lazy_subtree(lazy: LazySubtree) -> list | None:
+				# the placeholder was removed from the tree by DOM mutations in the meantime
+				if enhanced_dom_tree_node_lookup.get(lazy.node.node_id) is not lazy.node:
+					return None
+
+				html_frames, offset_x, offset_y = lazy.frame_context
+				pending: list[tuple[EnhancedDOMTreeNode, Node, DOMRect]] = []
+
+				def build(payload: Node) -> EnhancedDOMTreeNode:
+					subtree, subtree_pending = self._construct_enhanced_tree(
+						payload,
+						target_id,
+						ax_tree_lookup,
+						snapshot_lookup,
+						html_frames,
+						DOMRect(x=offset_x, y=offset_y, width=0.0, height=0.0),
+						enhanced_dom_tree_node_lookup=enhanced_dom_tree_node_lookup,
+						frame_contexts=frame_contexts,
+					)
+					subtree.parent_node = lazy.node
+					pending.extend(subtree_pending)
+					return subtree
 
-			# To make attributes more readable
-			attributes: dict[str, str] | None = None
-			if 'attributes' in node and node['attributes']:
-				attributes = {}
-				for i in range(0, len(node['attributes']), 2):
-					attributes[node['attributes'][i]] = node['attributes'][i + 1]
+				if lazy.payload.get('children'):
+					lazy.node.children_nodes = [build(child) for child in lazy.payload['children']]
+				if lazy.payload.get('shadowRoots'):
+					lazy.node.shadow_roots = [build(shadow_root) for shadow_root in lazy.payload['shadowRoots']]
+				if lazy.payload.get('contentDocument'):
+					lazy.node.content_document = build(lazy.payload['contentDocument'])
+				return pending
 
-			shadow_root_type = None
-			if 'shadowRootType' in node and node['shadowRootType']:
-				try:
-					shadow_root_type = node['shadowRootType']
-				except ValueError:
-					pass
+			self._window = window
+			self._build_lazy_subtree = build_lazy_subtree
+
+		# the only awaits in tree construction: cross origin iframes are built from their own target
+		if pending_iframes:
+			await self._attach_cross_origin_iframes(pending_iframes)
+
+		# nodes of cross origin iframes live in another session, their mutations can't be followed from this one
+		if track_mutations and not pending_iframes and not (window and window.truncated):
+			await self._track_mutations(target_id, enhanced_dom_tree_node, enhanced_dom_tree_node_lookup, frame_contexts)
 
-			# Get snapshot data and calculate absolute position
-			snapshot_data = snapshot_lookup.get(node['backendNodeId'], None)
-			absolute_position = None
-			if snapshot_data and snapshot_data.bounds:
-				absolute_position = DOMRect(
-					x=snapshot_data.bounds.x + total_frame_offset.x,
-					y=snapshot_data.bounds.y + total_frame_offset.y,
-					width=snapshot_data.bounds.width,
-					height=snapshot_data.bounds.height,
+		return enhanced_dom_tree_node
+
+	def _materialize_lazy_node(self, node_id: int) -> list[EnhancedDOMTreeNode]:
+		"""Build the placeholder that is, or holds, a node, so DOM mutations of off-screen regions can be applied.
+
+		Returns the placeholder elements whose descendants were built (empty if the node is not in one).
+		"""
+		window = self._window
+		if window is None or self._build_lazy_subtree is None or not window.lazy_subtrees:
+			return []
+
+		placeholder_id: int | None = node_id
+		if node_id not in window.lazy_subtrees:
+			if self._lazy_owners is None:
+				self._lazy_owners = {}
+				for owner_id, lazy in window.lazy_subtrees.items():
+					stack = [*(lazy.payload.get('children') or []), *(lazy.payload.get('shadowRoots') or [])]
+					if lazy.payload.get('contentDocument'):
+						stack.append(lazy.payload['contentDocument'])
+					while stack:
+						current = stack.pop()
+						self._lazy_owners[current['nodeId']] = owner_id
+						stack.extend(current.get('children') or [])
+						stack.extend(current.get('shadowRoots') or [])
+						if current.get('contentDocument'):
+							stack.append(current['contentDocument'])
+			placeholder_id = self._lazy_owners.get(node_id)
+
+		lazy = window.lazy_subtrees.pop(placeholder_id, None) if placeholder_id is not None else None
+		if lazy is None or self._build_lazy_subtree(lazy) is None:
+			return []
+		return [lazy.node]
+
+	async def _attach_cross_origin_iframes(self, pending_iframes: list[tuple[EnhancedDOMTreeNode, Node, DOMRect]]) -> None:
+		"""Build the content documents of cross origin iframes from the targets they live in."""
+		all_frames, _ = await self.browser_session.get_all_frames()
+		targets = await self.browser_session._cdp_get_all_targets()
+
+		for dom_tree_node, node, total_frame_offset in pending_iframes:
+			# Use get_all_frames to find the iframe's target
+			frame_id = node.get('frameId', None)
+			frame_info = all_frames.get(frame_id) if frame_id else None
+			iframe_document_target = None
+			if frame_info and frame_info.get('frameTargetId'):
+				iframe_document_target = next((t for t in targets if t['targetId'] == frame_info['frameTargetId']), None)
+
+			# if target actually exists in one of the frames, just build the dom tree for it
+			if iframe_document_target:
+				self.logger.debug(f'Getting content document for iframe {frame_id}')
+				content_document = await self.get_dom_tree(
+					target_id=iframe_document_target.get('targetId'),
+					# TODO: experiment with this values -> not sure whether the whole cross origin iframe should be ALWAYS included as soon as some part of it is visible or not.
+					# Current config: if the cross origin iframe is AT ALL visible, then just include everything inside of it!
+					# initial_html_frames=updated_html_frames,
+					initial_total_frame_offset=total_frame_offset,
 				)
 
-			dom_tree_node = EnhancedDOMTreeNode(
-				node_id=node['nodeId'],
-				backend_node_id=node['backendNodeId'],
-				node_type=NodeType(node['nodeType']),
-				node_name=node['nodeName'],
-				node_value=node['nodeValue'],
-				attributes=attributes or {},
-				is_scrollable=node.get('isScrollable', None),
-				frame_id=node.get('frameId', None),
-				session_id=self.browser_session.agent_focus.session_id if self.browser_session.agent_focus else None,
-				target_id=target_id,
-				content_document=None,
-				shadow_root_type=shadow_root_type,
-				shadow_roots=None,
-				parent_node=None,
-				children_nodes=None,
-				ax_node=enhanced_ax_node,
-				snapshot_node=snapshot_data,
-				is_visible=None,
-				absolute_position=absolute_position,
-				element_index=None,
+				dom_tree_node.content_document = content_document
+				dom_tree_node.content_document.parent_node = dom_tree_node
+
+	async def _listen_for_mutations(self, target_id: TargetID) -> None:
+		"""Buffer the DOM mutation events of a target until the tree that is about to be built can track them."""
+		self._mutation_tracker = None
+		self._mutation_buffer = []
+
+		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+		self._listen_for_dom_events(cdp_session)
+
+	def _listen_for_dom_events(self, cdp_session: 'CDPSession') -> None:
+		"""Route the DOM mutation events of a session to the current mutation tracker and accessibility cache."""
+		if cdp_session.cdp_client in self._clients_with_dom_listeners:
+			return
+		for method, handler in self._dom_event_handlers.items():
+			getattr(cdp_session.cdp_client.register.DOM, method)(handler)  # type: ignore[arg-type]
+		self._clients_with_dom_listeners.add(cdp_session.cdp_client)
+
+	def _mutation_event_handler(self, method: str) -> Callable[[dict, SessionID | None], None]:
+		def handle_mutation_event(event: dict, session_id: SessionID | None) -> None:
+			if self._ax_cache is not None:
+				self._ax_cache.handle_event(f'DOM.{method}', event, session_id)
+			if self._mutation_tracker is not None:
+				self._mutation_tracker.handle_event(method, event, session_id)
+			elif self._mutation_buffer is not None:
+				self._mutation_buffer.append((method, event, session_id))
+
+		return handle_mutation_event
+
+	async def _track_mutations(
+		self,
+		target_id: TargetID,
+		root: EnhancedDOMTreeNode,
+		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode],
+		frame_contexts: dict[int, FrameContext],
+	) -> None:
+		"""Start patching a freshly built tree from the DOM mutation events of its CDP session."""
+		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=False)
+
+		def build_subtree(node: Node, frame_context: FrameContext) -> EnhancedDOMTreeNode:
+			html_frames, offset_x, offset_y = frame_context
+			subtree, _ = self._construct_enhanced_tree(
+				node,
+				target_id,
+				{},
+				{},
+				html_frames,
+				DOMRect(x=offset_x, y=offset_y, width=0.0, height=0.0),
+				enhanced_dom_tree_node_lookup=tracker.nodes,
+				frame_contexts=tracker.frame_contexts,
 			)
+			return subtree
+
+		tracker = DOMMutationTracker(
+			root=root,
+			target_id=target_id,
+			session_id=cdp_session.session_id,
+			nodes=enhanced_dom_tree_node_lookup,
+			frame_contexts=frame_contexts,
+			root_context=((), 0.0, 0.0),
+			build_subtree=build_subtree,
+			materialize=self._materialize_lazy_node if self._window is not None else None,
+		)
 
-			enhanced_dom_tree_node_lookup[node['nodeId']] = dom_tree_node
+		# the scroll position of every document is remembered, scrolling moves everything and needs a full rebuild
+		try:
+			frame_layouts = await self._measure_layout(cdp_session, tracker.html_frames)
+		except Exception as e:
+			self.logger.debug(f'Failed to measure frames, not tracking DOM mutations: {type(e).__name__}: {e}')
+			return
+		tracker.frame_layouts = {node_id: self._frame_layout_key(layout) for node_id, layout in frame_layouts.items()}
 
-			if 'parentId' in node and node['parentId']:
-				dom_tree_node.parent_node = enhanced_dom_tree_node_lookup[
-					node['parentId']
-				]  # parents should always be in the lookup
+		tracker.replay(self._mutation_buffer or [])
+		self._mutation_tracker = tracker
 
-			# Check if this is an HTML frame node and add it to the list
-			updated_html_frames = html_frames.copy()
-			if node['nodeType'] == NodeType.ELEMENT_NODE.value and node['nodeName'] == 'HTML' and node.get('frameId') is not None:
-				updated_html_frames.append(dom_tree_node)
+	def invalidate_tracked_tree(self) -> None:
+		"""Forget the tracked DOM tree, the next `get_serialized_dom_tree` call builds it from scratch."""
+		self._mutation_tracker = None
 
-				# and adjust the total frame offset by scroll
-				if snapshot_data and snapshot_data.scrollRects:
-					total_frame_offset.x -= snapshot_data.scrollRects.x
-					total_frame_offset.y -= snapshot_data.scrollRects.y
-					# DEBUG: Log iframe scroll information
-					self.logger.debug(
-						f'🔍 DEBUG: HTML frame scroll - scrollY={snapshot_data.scrollRects.y}, scrollX={snapshot_data.scrollRects.x}, frameId={node.get("frameId")}, nodeId={node["nodeId"]}'
+	async def _refresh_tracked_tree(
+		self, tracker: DOMMutationTracker, previous_cached_state: SerializedDOMState | None
+	) -> EnhancedDOMTreeNode | None:
+		"""Bring the tracked tree up to date with the DOM mutations seen since the last step.
+
+		Only the dirty subtrees get a new layout (measured in the page) and accessibility info, clean nodes are kept as
+		they are. Returns None when the tree has to be rebuilt from scratch instead.
+		"""
+		if tracker.invalidated or tracker.refresh_count >= MAX_INCREMENTAL_REFRESHES:
+			return None
+
+		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=tracker.target_id, focus=False)
+		if cdp_session.session_id != tracker.session_id:
+			return None
+
+		# children of inserted nodes are delivered as DOM.setChildNodes events before the request returns
+		pending_children = tracker.take_pending_children()
+		if pending_children:
+			await asyncio.gather(
+				*(
+					cdp_session.cdp_client.send.DOM.requestChildNodes(
+						params={'nodeId': node_id, 'depth': -1, 'pierce': True}, session_id=cdp_session.session_id
 					)
+					for node_id in pending_children
+				)
+			)
+		if tracker.invalidated:
+			return None
+
+		dirty_subtrees = tracker.take_dirty_subtrees()
+		dirty_nodes = [node for root in dirty_subtrees for node in iter_subtree(root)]
+		if len(dirty_nodes) > MAX_DIRTY_NODE_RATIO * len(tracker.nodes):
+			self.logger.debug(f'{len(dirty_nodes)} of {len(tracker.nodes)} DOM nodes changed, rebuilding the DOM tree')
+			return None
+
+		html_frames = tracker.html_frames
+		layouts, ax_tree_lookup = await asyncio.gather(
+			self._measure_layout(cdp_session, [*html_frames, *dirty_nodes]),
+			self._get_partial_ax_trees(cdp_session, dirty_nodes),
+		)
 
-			# Calculate new iframe offset for content documents, accounting for iframe scroll
-			if node['nodeName'].upper() == 'IFRAME' and snapshot_data and snapshot_data.bounds:
-				if snapshot_data.bounds:
-					updated_html_frames.append(dom_tree_node)
+		for frame in html_frames:
+			if self._frame_layout_key(layouts.get(frame.node_id)) != tracker.frame_layouts.get(frame.node_id):
+				self.logger.debug(f'Frame {frame.frame_id} scrolled or resized, rebuilding the DOM tree')
+				return None
 
-					total_frame_offset.x += snapshot_data.bounds.x
-					total_frame_offset.y += snapshot_data.bounds.y
+		# stale indices would otherwise stay on elements that are no longer in the selector map
+		if previous_cached_state:
+			for node in previous_cached_state.selector_map.values():
+				node.element_index = None
 
-			if 'contentDocument' in node and node['contentDocument']:
-				dom_tree_node.content_document = await _construct_enhanced_node(
-					node['contentDocument'], updated_html_frames, total_frame_offset
-				)
-				dom_tree_node.content_document.parent_node = dom_tree_node
-				# forcefully set the parent node to the content document node (helps traverse the tree)
+		for root in dirty_subtrees:
+			self._relayout_subtree(tracker, root, layouts, ax_tree_lookup)
 
-			if 'shadowRoots' in node and node['shadowRoots']:
-				dom_tree_node.shadow_roots = []
-				for shadow_root in node['shadowRoots']:
-					shadow_root_node = await _construct_enhanced_node(shadow_root, updated_html_frames, total_frame_offset)
-					# forcefully set the parent node to the shadow root node (helps traverse the tree)
-					shadow_root_node.parent_node = dom_tree_node
-					dom_tree_node.shadow_roots.append(shadow_root_node)
-
-			if 'children' in node and node['children']:
-				dom_tree_node.children_nodes = []
-				for child in node['children']:
-					dom_tree_node.children_nodes.append(
-						await _construct_enhanced_node(child, updated_html_frames, total_frame_offset)
-					)
+		tracker.refresh_count += 1
+		self.logger.debug(f'Refreshed {len(dirty_nodes)} changed DOM nodes in {len(dirty_subtrees)} subtrees')
+		return tracker.root
 
-			# Set visibility using the collected HTML frames
-			dom_tree_node.is_visible = self.is_element_visible_according_to_all_parents(dom_tree_node, updated_html_frames)
+	def _relayout_subtree(
+		self,
+		tracker: DOMMutationTracker,
+		root: EnhancedDOMTreeNode,
+		layouts: dict[int, EnhancedSnapshotNode | None],
+		ax_tree_lookup: dict[int, AXNode],
+	) -> None:
+		"""Apply freshly measured layout and accessibility info to a dirty subtree and recompute its visibility."""
+		root_frames, root_offset_x, root_offset_y = tracker.frame_context_of(root)
+		stack: list[tuple[EnhancedDOMTreeNode, tuple[EnhancedDOMTreeNode, ...], float, float]] = [
+			(root, root_frames, root_offset_x, root_offset_y)
+		]
+		visited: list[tuple[EnhancedDOMTreeNode, tuple[EnhancedDOMTreeNode, ...]]] = []
+
+		while stack:
+			node, html_frames, offset_x, offset_y = stack.pop()
+
+			node.snapshot_node = layouts.get(node.node_id)
+			node.absolute_position = self._absolute_position(node.snapshot_node, offset_x, offset_y)
+			ax_node = ax_tree_lookup.get(node.backend_node_id)
+			if ax_node:
+				node.ax_node = self._build_enhanced_ax_node(ax_node)
 
-			# DEBUG: Log visibility info for form elements in iframes
-			if dom_tree_node.tag_name and dom_tree_node.tag_name.upper() in ['INPUT', 'SELECT', 'TEXTAREA', 'LABEL']:
-				attrs = dom_tree_node.attributes or {}
-				elem_id = attrs.get('id', '')
-				elem_name = attrs.get('name', '')
-				if (
-					'city' in elem_id.lower()
-					or 'city' in elem_name.lower()
-					or 'state' in elem_id.lower()
-					or 'state' in elem_name.lower()
-					or 'zip' in elem_id.lower()
-					or 'zip' in elem_name.lower()
-				):
-					self.logger.debug(
-						f"🔍 DEBUG: Form element {dom_tree_node.tag_name} id='{elem_id}' name='{elem_name}' - visible={dom_tree_node.is_visible}, bounds={dom_tree_node.snapshot_node.bounds if dom_tree_node.snapshot_node else 'NO_SNAPSHOT'}"
-					)
+			child_frames, offset_x, offset_y = self._frame_context_for_descendants(node, html_frames, offset_x, offset_y)
+			if child_frames is not html_frames:
+				tracker.frame_contexts[node.node_id] = (child_frames, offset_x, offset_y)
+			else:
+				tracker.frame_contexts.pop(node.node_id, None)
+			visited.append((node, child_frames))
+
+			if node.content_document:
+				stack.append((node.content_document, child_frames, offset_x, offset_y))
+			for child in reversed(node.shadow_roots or []):
+				stack.append((child, child_frames, offset_x, offset_y))
+			for child in reversed(node.children_nodes or []):
+				stack.append((child, child_frames, offset_x, offset_y))
+
+		self._set_visibility(visited)
 
-			# handle cross origin iframe (just recursively call the main function with the proper target if it exists in iframes)
-			# only do this if the iframe is visible (otherwise it's not worth it)
-
-			if (
-				# TODO: hacky way to disable cross origin iframes for now
-				ENABLE_CROSS_ORIGIN_IFRAMES and node['nodeName'].upper() == 'IFRAME' and node.get('contentDocument', None) is None
-			):  # None meaning there is no content
-				# Use get_all_frames to find the iframe's target
-				frame_id = node.get('frameId', None)
-				if frame_id:
-					all_frames, _ = await self.browser_session.get_all_frames()
-					frame_info = all_frames.get(frame_id)
-					iframe_document_target = None
-					if frame_info and frame_info.get('frameTargetId'):
-						# Get the target info for this iframe
-						targets = await self.browser_session.cdp_client.send.Target.getTargets()
-						iframe_document_target = next(
-							(t for t in targets['targetInfos'] if t['targetId'] == frame_info['frameTargetId']), None
+	async def _measure_layout(
+		self, cdp_session: 'CDPSession', nodes: Sequence[EnhancedDOMTreeNode]
+	) -> dict[int, EnhancedSnapshotNode | None]:
+		"""Measure bounds, scroll position and computed styles of single nodes inside the page.
+
+		DOMSnapshot can only capture whole documents, so nodes are resolved to JS objects and measured with one
+		`Runtime.callFunctionOn` per document they live in. Bounds use the same coordinates as the snapshot (relative to
+		their own document, ignoring scroll).
+
+		Returns:
+			NodeId -> snapshot node with the measured layout (None for nodes without a layout box)
+		"""
+		documents: dict[int, list[EnhancedDOMTreeNode]] = {}
+		for node in nodes:
+			if node.node_type not in (NodeType.ELEMENT_NODE, NodeType.TEXT_NODE):
+				continue
+			document = node.parent_node
+			while document is not None and document.node_type != NodeType.DOCUMENT_NODE:
+				document = document.parent_node
+			documents.setdefault(document.node_id if document else 0, []).append(node)
+
+		layouts: dict[int, EnhancedSnapshotNode | None] = {}
+		if not documents:
+			return layouts
+
+		try:
+			for document_nodes in documents.values():
+				resolved = await asyncio.gather(
+					*(
+						cdp_session.cdp_client.send.DOM.resolveNode(
+							params={'nodeId': node.node_id, 'objectGroup': LAYOUT_OBJECT_GROUP}, session_id=cdp_session.session_id
 						)
-				else:
-					iframe_document_target = None
-				# if target actually exists in one of the frames, just recursively build the dom tree for it
-				if iframe_document_target:
-					self.logger.debug(f'Getting content document for iframe {node.get("frameId", None)}')
-					content_document = await self.get_dom_tree(
-						target_id=iframe_document_target.get('targetId'),
-						# TODO: experiment with this values -> not sure whether the whole cross origin iframe should be ALWAYS included as soon as some part of it is visible or not.
-						# Current config: if the cross origin iframe is AT ALL visible, then just include everything inside of it!
-						# initial_html_frames=updated_html_frames,
-						initial_total_frame_offset=total_frame_offset,
+						for node in document_nodes
 					)
+				)
+				object_ids = [result['object']['objectId'] for result in resolved]  # type: ignore[typeddict-item]
+				result = await cdp_session.cdp_client.send.Runtime.callFunctionOn(
+					params={
+						'functionDeclaration': MEASURE_LAYOUT_FUNCTION,
+						'objectId': object_ids[0],
+						'arguments': [
+							{'value': REQUIRED_COMPUTED_STYLES},
+							*({'objectId': object_id} for object_id in object_ids),
+						],
+						'returnByValue': True,
+					},
+					session_id=cdp_session.session_id,
+				)
+				for node, layout in zip(document_nodes, result['result'].get('value') or []):
+					layouts[node.node_id] = self._build_measured_snapshot_node(layout)
+		finally:
+			await cdp_session.cdp_client.send.Runtime.releaseObjectGroup(
+				params={'objectGroup': LAYOUT_OBJECT_GROUP}, session_id=cdp_session.session_id
+			)
 
-					dom_tree_node.content_document = content_document
-					dom_tree_node.content_document.parent_node = dom_tree_node
+		return layouts
 
-			return dom_tree_node
+	@staticmethod
+	def _build_measured_snapshot_node(layout: dict | None) -> EnhancedSnapshotNode | None:
+		if not layout or not layout.get('bounds'):
+			return None
 
-		enhanced_dom_tree_node = await _construct_enhanced_node(dom_tree['root'], initial_html_frames, initial_total_frame_offset)
+		computed_styles = (
+			dict(zip(REQUIRED_COMPUTED_STYLES, map(intern_string, layout['styles']))) if layout.get('styles') else None
+		)
+		return EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=computed_styles.get('cursor') if computed_styles else None,
+			bounds=DOMRect(*layout['bounds']),
+			clientRects=DOMRect(*layout['clientRects']) if layout.get('clientRects') else None,
+			scrollRects=DOMRect(*layout['scrollRects']) if layout.get('scrollRects') else None,
+			computed_styles=computed_styles,
+			paint_order=None,
+			stacking_contexts=None,
+		)
 
-		return enhanced_dom_tree_node
+	@staticmethod
+	def _frame_layout_key(layout: EnhancedSnapshotNode | None) -> tuple:
+		if not layout:
+			return ()
+		return (layout.clientRects, layout.scrollRects)
+
+	async def _get_partial_ax_trees(self, cdp_session: 'CDPSession', nodes: Sequence[EnhancedDOMTreeNode]) -> dict[int, AXNode]:
+		"""Accessibility nodes of single elements, keyed by backend node id."""
+		results = await asyncio.gather(
+			*(
+				cdp_session.cdp_client.send.Accessibility.getPartialAXTree(
+					params={'backendNodeId': node.backend_node_id, 'fetchRelatives': False}, session_id=cdp_session.session_id
+				)
+				for node in nodes
+				if node.node_type == NodeType.ELEMENT_NODE
+			),
+			return_exceptions=True,
+		)
+
+		ax_tree_lookup: dict[int, AXNode] = {}
+		for result in results:
+			if isinstance(result, BaseException):
+				continue
+			for ax_node in result['nodes']:
+				if 'backendDOMNodeId' in ax_node:
+					ax_tree_lookup[ax_node['backendDOMNodeId']] = ax_node
+		return ax_tree_lookup
 
 	async def get_serialized_dom_tree(
 		self, previous_cached_state: SerializedDOMState | None = None
 	) -> tuple[SerializedDOMState, EnhancedDOMTreeNode, dict[str, float]]:
 		"""Get the serialized DOM tree representation for LLM consumption.
 
+		In incremental mode the tree of the previous call is patched from DOM mutation events instead of rebuilt, and
+		only the regions above changed nodes are serialized again.
+
 		Returns:
 			Tuple of (serialized_dom_state, enhanced_dom_tree_root, timing_info)
 		"""
 
 		# Use current target (None means use current)
 		assert self.browser_session.current_target_id is not None
-		enhanced_dom_tree = await self.get_dom_tree(target_id=self.browser_session.current_target_id)
+		target_id = self.browser_session.current_target_id
+
+		start = time.time()
+		enhanced_dom_tree = None
+		tracker = self._mutation_tracker
+		if self.incremental and tracker and tracker.target_id == target_id:
+			try:
+				enhanced_dom_tree = await self._refresh_tracked_tree(tracker, previous_cached_state)
+			except Exception as e:
+				self.logger.debug(f'Incremental DOM refresh failed, rebuilding the DOM tree: {type(e).__name__}: {e}')
+		incremental_timing = {'incremental_dom_refresh': time.time() - start} if enhanced_dom_tree else {}
+
+		ax_timing: dict[str, float] = {}
+		degraded: list[str] = []
+		if enhanced_dom_tree is None:
+			try:
+				enhanced_dom_tree = await self.get_dom_tree(target_id=target_id, track_mutations=self.incremental)
+			finally:
+				self._mutation_buffer = None
+			ax_timing = self._ax_timing
+			degraded = self._degraded
+
+		tracker = self._mutation_tracker if self.incremental else None
 
 		start = time.time()
 		serialized_dom_state, serializer_timing = DOMTreeSerializer(
-			enhanced_dom_tree, previous_cached_state
+			enhanced_dom_tree,
+			previous_cached_state,
+			subtree_cache=tracker.subtree_cache if tracker and tracker.root is enhanced_dom_tree else None,
+			stable_indices=self.stable_indices,
+			collapse_repeated=self.collapse_repeated,
+			paint_order_filtering=self.paint_order_filtering,
 		).serialize_accessible_elements()
 
+		serialized_dom_state.truncated = self._truncated
+		serialized_dom_state.degraded = list(degraded)
+
 		end = time.time()
 		serialize_total_timing = {'serialize_dom_tree_total': end - start}
 
 		# Combine all timing info
-		all_timing = {**serializer_timing, **serialize_total_timing}
+		all_timing = {**incremental_timing, **ax_timing, **serializer_timing, **serialize_total_timing}
 
 		return serialized_dom_state, enhanced_dom_tree, all_timing
@@ -0,0 +1,130 @@
+"""
+DOM tree reconstruction from DOMSnapshot data.
+
+`DOMSnapshot.captureSnapshot` already flattens every document of a page (iframe content documents and shadow roots
+included) into parent-index / node-name / attribute arrays. This module turns those arrays back into the nested
+`DOM.getDocument(depth=-1, pierce=True)` payload the tree builder consumes, so a page can be built from a single
+CDP transfer instead of two.
+
+The reconstructed payload differs from `DOM.getDocument` in a few ways:
+- `nodeId`s are synthetic (unique within the payload, unknown to the browser), so DOM mutation events can't be
+  applied to it
+- `isScrollable` is not set, scrollability comes from the snapshot rects (`is_actually_scrollable`)
+- pseudo elements are left out, as the tree builder ignores them in `DOM.getDocument` payloads as well
+"""
+
+from cdp_use.cdp.dom.commands import GetDocumentReturns
+from cdp_use.cdp.dom.types import Node
+from cdp_use.cdp.domsnapshot.commands import CaptureSnapshotReturns
+from cdp_use.cdp.domsnapshot.types import DocumentSnapshot
+
+from browser_use.dom.views import NodeType
+
+
+def _rare_values(rare_data: dict | None) -> dict[int, int]:
+	"""Node index -> value of CDP rare string/integer data."""
+	if not rare_data:
+		return {}
+	return dict(zip(rare_data.get('index', []), rare_data.get('value', [])))
+
+
+def _string(strings: list[str], index: int) -> str:
+	return strings[index] if 0 <= index < len(strings) else ''
+
+
+def _build_document_nodes(document: DocumentSnapshot, strings: list[str], first_node_id: int) -> list[Node] | None:
+	"""Payload of every node of a snapshot document, by snapshot node index, linked to their parents.
+
+	Content documents are not linked yet (see `build_dom_tree_from_snapshot`). Returns None if a shadow root comes
+	without its type.
+	"""
+	nodes = document['nodes']
+	backend_node_ids = nodes.get('backendNodeId', [])
+	parent_indices = nodes.get('parentIndex', [])
+	node_types = nodes.get('nodeType', [])
+	node_names = nodes.get('nodeName', [])
+	node_values = nodes.get('nodeValue', [])
+	attributes = nodes.get('attributes', [])
+	shadow_root_types = _rare_values(nodes.get('shadowRootType'))
+	pseudo_types = _rare_values(nodes.get('pseudoType'))
+	frame_id = _string(strings, document['frameId']) if 'frameId' in document else ''
+
+	payloads: list[Node | None] = []
+	for index, backend_node_id in enumerate(backend_node_ids):
+		parent_index = parent_indices[index] if index < len(parent_indices) else -1
+		parent = payloads[parent_index] if 0 <= parent_index < index else None
+		# pseudo elements and everything below them are skipped
+		if index in pseudo_types or (parent_index >= 0 and parent is None):
+			payloads.append(None)
+			continue
+
+		node_type = node_types[index]
+		payload: Node = {
+			'nodeId': first_node_id + index,
+			'backendNodeId': backend_node_id,
+			'nodeType': node_type,
+			'nodeName': _string(strings, node_names[index]),
+			'localName': '',
+			'nodeValue': _string(strings, node_values[index]) if index < len(node_values) else '',
+		}
+		if node_type == NodeType.ELEMENT_NODE.value:
+			payload['localName'] = payload['nodeName'].lower()
+			if index < len(attributes) and attributes[index]:
+				payload['attributes'] = [_string(strings, string_index) for string_index in attributes[index]]
+
+		if parent is None:
+			payloads.append(payload)
+			continue
+
+		payload['parentId'] = parent['nodeId']
+		if node_type == NodeType.DOCUMENT_FRAGMENT_NODE.value and parent['nodeType'] == NodeType.ELEMENT_NODE.value:
+			if index not in shadow_root_types:
+				return None
+			payload['shadowRootType'] = _string(strings, shadow_root_types[index])
+			parent.setdefault('shadowRoots', []).append(payload)
+		else:
+			parent.setdefault('children', []).append(payload)
+			# `DOM.getDocument` reports the frame of a document on its document element
+			if parent_index == 0 and node_type == NodeType.ELEMENT_NODE.value and frame_id:
+				payload['frameId'] = frame_id
+		payloads.append(payload)
+
+	return payloads  # type: ignore[return-value]
+
+
+def build_dom_tree_from_snapshot(snapshot: CaptureSnapshotReturns) -> GetDocumentReturns | None:
+	"""Rebuild the `DOM.getDocument(depth=-1, pierce=True)` payload of a page from its DOMSnapshot.
+
+	The first snapshot document is the root, the others are attached to their frame owner elements as
+	`contentDocument`. Returns None when the snapshot is missing data the tree needs (an empty snapshot, or shadow
+	roots without their type), the caller has to fall back to `DOM.getDocument`.
+	"""
+	strings = snapshot['strings']
+	documents = snapshot['documents'] or []
+
+	document_nodes: list[list[Node | None]] = []
+	first_node_id = 1
+	for document in documents:
+		payloads = _build_document_nodes(document, strings, first_node_id)
+		if payloads is None:
+			return None
+		document_nodes.append(payloads)  # type: ignore[arg-type]
+		first_node_id += len(payloads)
+
+	if not document_nodes or not document_nodes[0] or document_nodes[0][0] is None:
+		return None
+
+	for document, payloads in zip(documents, document_nodes):
+		for index, document_index in _rare_values(document['nodes'].get('contentDocumentIndex')).items():
+			owner = payloads[index] if 0 <= index < len(payloads) else None
+			if owner is None or not 0 < document_index < len(document_nodes) or not document_nodes[document_index]:
+				continue
+			content_document = document_nodes[document_index][0]
+			if content_document is None:
+				continue
+			owner['contentDocument'] = content_document
+			if 'frameId' in documents[document_index]:
+				owner['frameId'] = _string(strings, documents[document_index]['frameId'])
+
+	root = document_nodes[0][0]
+	return {'root': root}
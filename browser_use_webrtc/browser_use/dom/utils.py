@@ -1,3 +1,25 @@
+# Strings shared by `intern_string`, cleared when full so that one-off values can't grow it without bound
+_INTERNED_STRINGS: dict[str, str] = {}
+MAX_INTERNED_STRINGS = 50_000
+# Longer strings are mostly unique (text, URLs, inline styles), sharing them saves nothing
+MAX_INTERNED_LENGTH = 100
+
+
+def intern_string(value: str) -> str:
+	"""One shared instance of a short string that repeats across DOM nodes (tag and attribute names, class lists, styles).
+
+	Unlike `sys.intern`, the pool is bounded and its strings can be freed again.
+	"""
+	if len(value) > MAX_INTERNED_LENGTH:
+		return value
+	interned = _INTERNED_STRINGS.get(value)
+	if interned is None:
+		if len(_INTERNED_STRINGS) >= MAX_INTERNED_STRINGS:
+			_INTERNED_STRINGS.clear()
+		interned = _INTERNED_STRINGS[value] = value
+	return interned
+
+
 def cap_text_length(text: str, max_length: int) -> str:
 	"""Cap text length for display."""
 	if len(text) <= max_length:
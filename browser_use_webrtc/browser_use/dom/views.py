@@ -1,5 +1,6 @@
 import hashlib
-from dataclasses import asdict, dataclass, field
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field, replace
 from enum import Enum
 from typing import Any
 
@@ -67,6 +68,8 @@ class TargetAllTrees:
 	ax_tree: GetFullAXTreeReturns
 	device_pixel_ratio: float
 	cdp_timing: dict[str, float]
+	degraded: list[str] = field(default_factory=list)
+	"""Optional CDP requests that were too slow or failed, their data is missing (e.g. 'ax_tree') or stale"""
 
 
 @dataclass(slots=True)
@@ -90,6 +93,10 @@ class SimplifiedNode:
 
 	is_new: bool = False
 	excluded_by_parent: bool = False  # New field for bbox filtering
+	collapsed: bool = False  # Repeats the structure of the siblings before it, serialized as one compact line
+	collapsed_run: int = 0  # On the first collapsed node of a run of similar siblings, the length of the run
+	# Attributes fragment of the line of the node and the include_attributes it was built for, cleared every pass
+	attributes_cache: tuple[list[str], str] | None = None
 
 	def __json__(self) -> dict:
 		original_node_json = self.original_node.__json__()
@@ -202,6 +209,41 @@ class EnhancedSnapshotNode:
 # 	element_index: int | None
 
 
+@dataclass(slots=True)
+class IdentityGeneration:
+	"""Generation of the element identities cached on the nodes of one DOM tree, bumped when the tree changes."""
+
+	value: int = 0
+
+
+def invalidate_element_identities(node: 'EnhancedDOMTreeNode') -> None:
+	"""Drop the identities `compute_element_identities` cached in the DOM tree of a node, after that tree changed.
+
+	Identities cached in other trees (other tabs, other sessions) stay valid.
+	"""
+	while node.parent_node is not None:
+		node = node.parent_node
+	if node._identity_generation is not None:
+		node._identity_generation.value += 1
+
+
+def _short_hash(text: str) -> int:
+	"""First 64 bits of the sha256 of a string."""
+	return int(hashlib.sha256(text.encode()).hexdigest()[:16], 16)
+
+
+@dataclass(slots=True, frozen=True)
+class ElementIdentity:
+	"""Identity of an element computed once per state, see `compute_element_identities`."""
+
+	xpath: str
+	element_hash: int
+	parent_branch_hash: int
+	tree: IdentityGeneration | None
+	"""Generation of the tree the identity was computed in, None for detached elements that have no tree left"""
+	generation: int
+
+
 @dataclass(slots=True)
 class EnhancedDOMTreeNode:
 	"""
@@ -278,6 +320,36 @@ class EnhancedDOMTreeNode:
 
 	uuid: str = field(default_factory=uuid7str)
 
+	_identity: ElementIdentity | None = field(default=None, repr=False, compare=False)
+	"""xpath and hashes cached by `compute_element_identities`, valid until the tree changes"""
+	_identity_generation: IdentityGeneration | None = field(default=None, repr=False, compare=False)
+	"""Only set on the root of a tree: generation of the identities cached on its nodes"""
+
+	@property
+	def _cached_identity(self) -> ElementIdentity | None:
+		identity = self._identity
+		if identity is not None and (identity.tree is None or identity.tree.value == identity.generation):
+			return identity
+		return None
+
+	def detached(self) -> 'EnhancedDOMTreeNode':
+		"""Copy of the element without its links into the tree (parent, children, frames, shadow roots).
+
+		A detached element doesn't keep the tree of its page alive. Its xpath and hashes stay those it had in the tree.
+		"""
+		if self._cached_identity is None:
+			compute_element_identities([self])
+		assert self._identity is not None
+		return replace(
+			self,
+			parent_node=None,
+			children_nodes=None,
+			content_document=None,
+			shadow_roots=None,
+			_identity=replace(self._identity, tree=None),
+			_identity_generation=None,
+		)
+
 	@property
 	def parent(self) -> 'EnhancedDOMTreeNode | None':
 		return self.parent_node
@@ -291,7 +363,7 @@ class EnhancedDOMTreeNode:
 		"""
 		Returns all children nodes, including shadow roots
 		"""
-		children = self.children_nodes or []
+		children = list(self.children_nodes or [])
 		if self.shadow_roots:
 			children.extend(self.shadow_roots)
 		return children
@@ -303,6 +375,9 @@ class EnhancedDOMTreeNode:
 	@property
 	def xpath(self) -> str:
 		"""Generate XPath for this DOM node, stopping at shadow boundaries or iframes."""
+		if identity := self._cached_identity:
+			return identity.xpath
+
 		segments = []
 		current_element = self
 
@@ -628,6 +703,8 @@ class EnhancedDOMTreeNode:
 
 		TODO: migrate this to use only backendNodeId + current SessionId
 		"""
+		if identity := self._cached_identity:
+			return identity.element_hash
 
 		# Get parent branch path
 		parent_branch_path = self._get_parent_branch_path()
@@ -636,22 +713,18 @@ class EnhancedDOMTreeNode:
 		# Get attributes hash
 		attributes_string = ''.join(f'{key}={value}' for key, value in self.attributes.items())
 
-		# Combine both for final hash
-		combined_string = f'{parent_branch_path_string}|{attributes_string}'
-		element_hash = hashlib.sha256(combined_string.encode()).hexdigest()
-
-		# Convert to int for __hash__ return type - use first 16 chars and convert from hex to int
-		return int(element_hash[:16], 16)
+		# Combine both for final hash, first 64 bits of its sha256 as int for the __hash__ return type
+		return _short_hash(f'{parent_branch_path_string}|{attributes_string}')
 
 	def parent_branch_hash(self) -> int:
 		"""
 		Hash the element based on its parent branch path and attributes.
 		"""
-		parent_branch_path = self._get_parent_branch_path()
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		element_hash = hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		if identity := self._cached_identity:
+			return identity.parent_branch_hash
 
-		return int(element_hash[:16], 16)
+		parent_branch_path = self._get_parent_branch_path()
+		return _short_hash('/'.join(parent_branch_path))
 
 	def _get_parent_branch_path(self) -> list[str]:
 		"""Get the parent branch path as a list of tag names from root to current element."""
@@ -667,6 +740,84 @@ class EnhancedDOMTreeNode:
 		return [parent.tag_name for parent in parents]
 
 
+def compute_element_identities(nodes: Iterable[EnhancedDOMTreeNode]) -> None:
+	"""Compute the xpath and hashes of elements in one pass and cache them on the elements.
+
+	Each ancestor's xpath and branch path, and the sibling positions of each parent, are computed once for all the
+	elements below them, instead of walking the ancestors and scanning the siblings again for every element and
+	every access. The cached values are dropped by `invalidate_element_identities`.
+	"""
+	xpaths: dict[int, str] = {}
+	branch_paths: dict[int, str] = {}
+	trees: dict[int, IdentityGeneration] = {}
+	positions: dict[int, dict[int, int]] = {}
+
+	def position_among_siblings(node: EnhancedDOMTreeNode) -> int:
+		parent = node.parent_node
+		if parent is None or not parent.children_nodes:
+			return 0
+		if id(parent) not in positions:
+			by_tag: dict[str, list[EnhancedDOMTreeNode]] = {}
+			for child in parent.children_nodes:
+				if child.node_type == NodeType.ELEMENT_NODE:
+					by_tag.setdefault(child.node_name.lower(), []).append(child)
+			positions[id(parent)] = {
+				id(child): position
+				for siblings in by_tag.values()
+				if len(siblings) > 1
+				for position, child in enumerate(siblings, start=1)
+			}
+		return positions[id(parent)].get(id(node), 0)
+
+	for node in nodes:
+		# ancestors up to the first one computed for an earlier element, then compute downwards from there
+		chain: list[EnhancedDOMTreeNode] = []
+		current: EnhancedDOMTreeNode | None = node
+		while current is not None and id(current) not in xpaths:
+			chain.append(current)
+			current = current.parent_node
+
+		for current in reversed(chain):
+			parent = current.parent_node
+			parent_xpath = xpaths[id(parent)] if parent is not None else ''
+			parent_branch_path = branch_paths[id(parent)] if parent is not None else ''
+
+			if current.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
+				# shadow roots are passed through
+				xpath = parent_xpath
+			elif current.node_type != NodeType.ELEMENT_NODE or (parent is not None and parent.node_name.lower() == 'iframe'):
+				xpath = ''
+			else:
+				position = position_among_siblings(current)
+				segment = f'{current.node_name.lower()}[{position}]' if position > 0 else current.node_name.lower()
+				xpath = f'{parent_xpath}/{segment}' if parent_xpath else segment
+
+			if current.node_type == NodeType.ELEMENT_NODE:
+				branch_path = f'{parent_branch_path}/{current.tag_name}' if parent_branch_path else current.tag_name
+			else:
+				branch_path = parent_branch_path
+
+			if parent is not None:
+				tree = trees[id(parent)]
+			else:
+				if current._identity_generation is None:
+					current._identity_generation = IdentityGeneration()
+				tree = current._identity_generation
+
+			xpaths[id(current)] = xpath
+			branch_paths[id(current)] = branch_path
+			trees[id(current)] = tree
+
+		attributes_string = ''.join(f'{key}={value}' for key, value in node.attributes.items())
+		node._identity = ElementIdentity(
+			xpath=xpaths[id(node)],
+			element_hash=_short_hash(f'{branch_paths[id(node)]}|{attributes_string}'),
+			parent_branch_hash=_short_hash(branch_paths[id(node)]),
+			tree=trees[id(node)],
+			generation=trees[id(node)].value,
+		)
+
+
 DOMSelectorMap = dict[int, EnhancedDOMTreeNode]
 
 
@@ -677,11 +828,64 @@ class SerializedDOMState:
 
 	selector_map: DOMSelectorMap
 
+	truncated: bool = False
+	"""The page has more DOM nodes than the node budget, only the first part of it was processed"""
+
+	degraded: list[str] = field(default_factory=list)
+	"""Optional CDP requests the DOM was built without because they were too slow or failed (e.g. 'ax_tree')"""
+
+	next_index: int = 1
+	"""Lowest interactive index not handed out on the page yet, where stable indices number new elements from"""
+
+	_indices_by_identity: tuple[dict[int, int], dict[str, int]] | None = field(default=None, init=False, repr=False)
+
+	def detached(self) -> 'SerializedDOMState':
+		"""Copy of the state for after a newer state was built, without the DOM tree of the page.
+
+		Keeps what history recording and the is-new and stable index matching of the next step use: the selector map,
+		with detached elements, and `next_index`.
+		"""
+		compute_element_identities(node for node in self.selector_map.values() if node._cached_identity is None)
+		return SerializedDOMState(
+			_root=None,
+			selector_map={index: node.detached() for index, node in self.selector_map.items()},
+			truncated=self.truncated,
+			degraded=list(self.degraded),
+			next_index=self.next_index,
+		)
+
+	def _identity_indices(self) -> tuple[dict[int, int], dict[str, int]]:
+		"""Interactive index of every element hash and xpath of the selector map, the lowest one if several share it."""
+		if self._indices_by_identity is None:
+			by_hash: dict[int, int] = {}
+			by_xpath: dict[str, int] = {}
+			for index, node in sorted(self.selector_map.items()):
+				by_hash.setdefault(node.element_hash, index)
+				by_xpath.setdefault(node.xpath, index)
+			self._indices_by_identity = (by_hash, by_xpath)
+		return self._indices_by_identity
+
+	def index_of_hash(self, element_hash: int) -> int | None:
+		"""Interactive index of the element with this `element_hash`, e.g. of an element from the history."""
+		return self._identity_indices()[0].get(element_hash)
+
+	def index_of_xpath(self, xpath: str) -> int | None:
+		"""Interactive index of the element at this xpath."""
+		return self._identity_indices()[1].get(xpath)
+
 	def llm_representation(
 		self,
 		include_attributes: list[str] | None = None,
+		max_tokens: int | None = None,
+		viewport: DOMRect | None = None,
+		query: str | None = None,
 	) -> str:
-		"""Kinda ugly, but leaving this as an internal method because include_attributes are a parameter on the agent, so we need to leave it as a 2 step process"""
+		"""Kinda ugly, but leaving this as an internal method because include_attributes are a parameter on the agent, so we need to leave it as a 2 step process
+
+		With `max_tokens`, only the most important lines that fit are kept, see `serialize_tree_within_budget`. Lines
+		relevant to `query` (e.g. the task) rank higher then, see `line_relevance`.
+		"""
+		from browser_use.dom.serializer.budget import serialize_tree_within_budget
 		from browser_use.dom.serializer.serializer import DOMTreeSerializer
 
 		if not self._root:
@@ -689,7 +893,15 @@ class SerializedDOMState:
 
 		include_attributes = include_attributes or DEFAULT_INCLUDE_ATTRIBUTES
 
-		return DOMTreeSerializer.serialize_tree(self._root, include_attributes)
+		if max_tokens is not None:
+			representation = serialize_tree_within_budget(
+				self._root, include_attributes, max_tokens, viewport=viewport, query=query
+			)
+		else:
+			representation = DOMTreeSerializer.serialize_tree(self._root, include_attributes)
+		if self.truncated:
+			representation += '\n... page too large, the rest of its elements were not processed ...'
+		return representation
 
 
 @dataclass
@@ -734,7 +946,7 @@ class DOMInteractedElement:
 			node_type=enhanced_dom_tree.node_type,
 			node_value=enhanced_dom_tree.node_value,
 			node_name=enhanced_dom_tree.node_name,
-			attributes=enhanced_dom_tree.attributes,
+			attributes=dict(enhanced_dom_tree.attributes),
 			bounds=enhanced_dom_tree.snapshot_node.bounds if enhanced_dom_tree.snapshot_node else None,
 			x_path=enhanced_dom_tree.xpath,
 			element_hash=hash(enhanced_dom_tree),
@@ -0,0 +1,110 @@
+"""
+Batched visibility computation for the enhanced DOM tree.
+
+A node is visible if its computed styles don't hide it and its bounds intersect the viewport of every HTML frame it
+is checked against. Instead of walking the frames of every node and shifting its bounds frame by frame, the
+viewports of a frame chain are translated once into the coordinates of the nodes checked against it (`frame_clips`).
+All nodes sharing a frame chain are then tested at once with array operations over their bounds. Nothing is written
+back to the snapshot nodes.
+"""
+
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+
+import numpy as np
+
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType
+
+# (left, top, right, bottom) of a frame viewport in the coordinates of the nodes checked against it
+FrameClip = tuple[float, float, float, float]
+
+
+@lru_cache(maxsize=256)
+def _is_transparent(opacity: str) -> bool:
+	try:
+		return float(opacity) <= 0
+	except (ValueError, TypeError):
+		return False
+
+
+def is_hidden_by_style(computed_styles: Mapping[str, str]) -> bool:
+	"""Whether the computed styles of a node alone make it invisible."""
+	return (
+		computed_styles.get('display', '').lower() == 'none'
+		or computed_styles.get('visibility', '').lower() == 'hidden'
+		or _is_transparent(computed_styles.get('opacity', '1'))
+	)
+
+
+def frame_clips(html_frames: Sequence[EnhancedDOMTreeNode]) -> list[FrameClip]:
+	"""Viewports of the HTML documents in a frame chain, in the coordinates of the nodes checked against the chain.
+
+	Going from the innermost frame outwards, IFRAME bounds move the nodes into the coordinates of the embedding
+	document and document scroll positions move them into its viewport.
+	"""
+	clips: list[FrameClip] = []
+	shift_x = shift_y = 0.0
+	for frame in reversed(html_frames):
+		snapshot_node = frame.snapshot_node
+		if frame.node_type != NodeType.ELEMENT_NODE or snapshot_node is None:
+			continue
+
+		if frame.node_name.upper() == 'IFRAME' and snapshot_node.bounds:
+			shift_x += snapshot_node.bounds.x
+			shift_y += snapshot_node.bounds.y
+
+		if frame.node_name == 'HTML' and snapshot_node.scrollRects and snapshot_node.clientRects:
+			left = snapshot_node.scrollRects.x - shift_x
+			top = snapshot_node.scrollRects.y - shift_y
+			clips.append((left, top, left + snapshot_node.clientRects.width, top + snapshot_node.clientRects.height))
+			shift_x -= snapshot_node.scrollRects.x
+			shift_y -= snapshot_node.scrollRects.y
+
+	return clips
+
+
+def compute_visibility(visited: Sequence[tuple[EnhancedDOMTreeNode, Sequence[EnhancedDOMTreeNode]]]) -> np.ndarray:
+	"""Visibility of (node, html frames it is checked against) pairs, as a boolean array in the same order.
+
+	Nodes without a snapshot node or bounds are invisible. Pairs should share the frame tuple objects (as the tree
+	builder does), nodes are grouped by tuple identity so every frame chain is resolved only once.
+	"""
+	visible = np.zeros(len(visited), dtype=np.bool_)
+	candidates: list[int] = []
+	boxes: list[tuple[float, float, float, float]] = []
+	frame_groups: dict[int, tuple[Sequence[EnhancedDOMTreeNode], list[int]]] = {}
+
+	for index, (node, html_frames) in enumerate(visited):
+		snapshot_node = node.snapshot_node
+		if snapshot_node is None or snapshot_node.bounds is None:
+			continue
+		if snapshot_node.computed_styles and is_hidden_by_style(snapshot_node.computed_styles):
+			continue
+
+		group = frame_groups.get(id(html_frames))
+		if group is None:
+			group = frame_groups[id(html_frames)] = (html_frames, [])
+		group[1].append(len(boxes))
+		candidates.append(index)
+		bounds = snapshot_node.bounds
+		boxes.append((bounds.x, bounds.y, bounds.x + bounds.width, bounds.y + bounds.height))
+
+	if not boxes:
+		return visible
+
+	box_array = np.asarray(boxes, dtype=np.float64)
+	inside = np.ones(len(boxes), dtype=np.bool_)
+	for html_frames, members in frame_groups.values():
+		clips = frame_clips(html_frames)
+		if not clips:
+			continue
+
+		rows = np.asarray(members, dtype=np.int64)
+		left, top, right, bottom = box_array[rows].T
+		group_inside = np.ones(len(rows), dtype=np.bool_)
+		for clip_left, clip_top, clip_right, clip_bottom in clips:
+			group_inside &= (left < clip_right) & (right > clip_left) & (top < clip_bottom) & (bottom > clip_top)
+		inside[rows] = group_inside
+
+	visible[np.asarray(candidates, dtype=np.int64)] = inside
+	return visible
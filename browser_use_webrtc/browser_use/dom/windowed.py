@@ -0,0 +1,157 @@
+"""
+Bounded DOM tree construction: viewport windows, hidden subtree pruning and a node budget.
+
+On long (or infinitely scrolling) pages most of the document is far away from the viewport, and the serializer drops
+all of it anyway. With a `DOMWindow`, `DomService` skips building element subtrees whose layout lies entirely outside
+the viewport plus a margin, so the per-step cost of tree construction and clickable detection follows the viewport
+size instead of the document size.
+
+Whether a subtree is outside the window is decided from the snapshot bounds of the element and all its descendants
+(`SnapshotLookup.subtree_extent`), so overflowing, absolutely positioned and fixed descendants keep their ancestors
+in the tree. The root element of a skipped subtree is still built and stays in the tree as a cheap placeholder that
+remembers its `DOM.getDocument` payload, so DOM mutations inside it can be applied later without another CDP round
+trip (the subtree is built first). Scrolling moves the window, the next state is built for the new viewport.
+
+The same placeholders are used to prune subtrees that can't show anything because nothing in them is rendered
+(`display: none`). Transparent (`opacity: 0`) content is kept, pages commonly reveal buttons that way on hover. Content
+that menus, popups and form controls reveal on hover or focus is exempt as well (see `REVEALABLE_TAGS` and friends),
+so it stays available to the actions that look for it. A node budget finally caps the size of the tree on pathological
+pages, the serialized state then says it was truncated.
+"""
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+
+from cdp_use.cdp.dom.types import Node
+
+from browser_use.dom.incremental import FrameContext
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType
+
+# Hidden content below these elements (or their children) typically appears on hover, focus or click
+REVEALABLE_TAGS = frozenset({'SELECT', 'DATALIST', 'OPTGROUP', 'OPTION', 'DETAILS', 'SUMMARY', 'DIALOG', 'NAV', 'MENU'})
+REVEALABLE_ROLES = frozenset(
+	{'menu', 'menubar', 'menuitem', 'listbox', 'combobox', 'tooltip', 'tree', 'dialog', 'tabpanel', 'navigation'}
+)
+REVEALING_ATTRIBUTES = ('aria-haspopup', 'aria-expanded', 'aria-controls', 'popover', 'popovertarget')
+
+# Upload actions look for (usually hidden) file inputs this many levels below the elements around the clicked one
+FILE_INPUT_SEARCH_DEPTH = 3
+
+
+@dataclass(slots=True)
+class LazySubtree:
+	"""Placeholder for an element whose descendants were not built because they are off-screen or hidden."""
+
+	node: EnhancedDOMTreeNode
+	"""The element itself, built and in the tree but without its children, shadow roots or content document"""
+	payload: Node
+	"""`DOM.getDocument` payload of the element, its descendants are built from it on demand"""
+	frame_context: FrameContext
+	"""Frame context the descendants of the element are built with"""
+
+
+@dataclass(slots=True)
+class DOMWindow:
+	"""Limits on which parts of the page `DomService` builds the DOM tree for."""
+
+	rect: DOMRect | None
+	"""Region of the page in the coordinates of `EnhancedDOMTreeNode.absolute_position`, None for the whole page"""
+	subtree_extent: Callable[[int], DOMRect | None]
+	"""Backend node id -> bounds of the node and all its descendants in their document, see `SnapshotLookup`"""
+	lazy_subtrees: dict[int, LazySubtree] = field(default_factory=dict)
+	"""NodeId -> placeholders of the subtrees skipped while building"""
+	prune_hidden: bool = False
+	"""Also skip subtrees that can't be visible, except for content revealed on hover or focus"""
+	max_nodes: int | None = None
+	"""Stop building after this many nodes"""
+	truncated: bool = False
+	"""Set by the builder when it stopped at `max_nodes`"""
+	revealable: set[int] = field(default_factory=set)
+	"""NodeIds of hidden elements that were built anyway because hover or focus can reveal them, and so their
+	hidden descendants are built too"""
+
+	def skip(
+		self, dom_tree_node: EnhancedDOMTreeNode, payload: Node, frame_context: FrameContext, offset_x: float, offset_y: float
+	) -> bool:
+		"""Leave the descendants of a freshly built node unbuilt (recording a placeholder) if they are off-screen or hidden.
+
+		Args:
+			offset_x, offset_y: Frame offset the node itself was built with
+		"""
+		if self.rect is None and not self.prune_hidden:
+			return False
+		if dom_tree_node.node_type != NodeType.ELEMENT_NODE or dom_tree_node.node_name == 'HTML':
+			return False
+		if not (payload.get('children') or payload.get('shadowRoots') or payload.get('contentDocument')):
+			return False
+
+		extent = self.subtree_extent(dom_tree_node.backend_node_id)
+		if self.prune_hidden and is_hidden_subtree(dom_tree_node, extent):
+			parent = dom_tree_node.parent_node
+			if not (parent is not None and parent.node_id in self.revealable) and not can_be_revealed(dom_tree_node, payload):
+				self.lazy_subtrees[dom_tree_node.node_id] = LazySubtree(dom_tree_node, payload, frame_context)
+				return True
+			self.revealable.add(dom_tree_node.node_id)
+
+		if self.rect is None or extent is None:
+			return False  # nothing in the subtree has a layout box, nothing to measure it by
+
+		extent = DOMRect(x=extent.x + offset_x, y=extent.y + offset_y, width=extent.width, height=extent.height)
+		if rects_intersect(extent, self.rect):
+			return False
+
+		self.lazy_subtrees[dom_tree_node.node_id] = LazySubtree(dom_tree_node, payload, frame_context)
+		return True
+
+
+def is_hidden_subtree(dom_tree_node: EnhancedDOMTreeNode, extent: DOMRect | None) -> bool:
+	"""Whether none of the descendants of an element is rendered.
+
+	Transparent (opacity: 0) elements still have a layout box and are kept: hover commonly reveals them.
+
+	Args:
+		extent: Snapshot bounds of the element and all its descendants, None if none of them has a layout box
+	"""
+	if dom_tree_node.snapshot_node is None:
+		return False  # not in the snapshot (inserted after it was captured), nothing is known about its layout
+	return extent is None  # display: none (or an unrendered element) somewhere above every descendant
+
+
+def can_be_revealed(dom_tree_node: EnhancedDOMTreeNode, payload: Node) -> bool:
+	"""Whether hidden content of an element may still be needed: hover/focus menus and popups, form controls."""
+	for element in (dom_tree_node, dom_tree_node.parent_node):
+		if element is None or element.node_type != NodeType.ELEMENT_NODE:
+			continue
+		if element.node_name.upper() in REVEALABLE_TAGS or element.attributes.get('role') in REVEALABLE_ROLES:
+			return True
+		if any(name in element.attributes for name in REVEALING_ATTRIBUTES):
+			return True
+
+	stack = [(child, 1) for child in payload.get('children') or []]
+	while stack:
+		node, depth = stack.pop()
+		if node['nodeName'].upper() == 'INPUT':
+			attributes = node.get('attributes') or []
+			if any(attributes[i] == 'type' and attributes[i + 1].lower() == 'file' for i in range(0, len(attributes) - 1, 2)):
+				return True
+		if depth < FILE_INPUT_SEARCH_DEPTH:
+			stack.extend((child, depth + 1) for child in node.get('children') or [])
+	return False
+
+
+def rects_intersect(a: DOMRect, b: DOMRect) -> bool:
+	"""Whether two rectangles overlap (touching edges do not count)."""
+	return a.x < b.x + b.width and b.x < a.x + a.width and a.y < b.y + b.height and b.y < a.y + a.height
+
+
+def viewport_window(root: Node, snapshot_lookup: Mapping[int, EnhancedSnapshotNode], margin: float) -> DOMRect | None:
+	"""Viewport of the top level document grown by `margin` pixels on every side, None if it has no layout yet."""
+	for child in root.get('children') or []:
+		if child['nodeName'] != 'HTML':
+			continue
+		snapshot_node = snapshot_lookup.get(child['backendNodeId'])
+		if snapshot_node is None or snapshot_node.clientRects is None:
+			return None
+		viewport = snapshot_node.clientRects
+		return DOMRect(x=-margin, y=-margin, width=viewport.width + 2 * margin, height=viewport.height + 2 * margin)
+	return None
@@ -0,0 +1,95 @@
+"""Factories for the DOM nodes, CDP payloads and DomService instances of the DOM tests, which run without a browser."""
+
+import logging
+from types import SimpleNamespace
+
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType, SimplifiedNode
+
+
+def snapshot_node(**fields) -> EnhancedSnapshotNode:
+	"""The layout of a node: a 10x10 box at the origin without styles, unless `fields` say otherwise."""
+	return EnhancedSnapshotNode(
+		**{
+			'is_clickable': None,
+			'cursor_style': None,
+			'bounds': DOMRect(x=0, y=0, width=10, height=10),
+			'clientRects': None,
+			'scrollRects': None,
+			'computed_styles': None,
+			'paint_order': None,
+			'stacking_contexts': None,
+			**fields,
+		}
+	)
+
+
+def dom_node(
+	node_type: NodeType,
+	name: str,
+	value: str = '',
+	children: list[EnhancedDOMTreeNode] | None = None,
+	attributes: dict[str, str] | None = None,
+	**fields,
+) -> EnhancedDOMTreeNode:
+	"""A visible node with the layout of `snapshot_node()`, `fields` override the other fields.
+
+	The node id defaults to the backend node id, and `children` are linked to the node.
+	"""
+	fields.setdefault('node_id', fields.get('backend_node_id', 0))
+	node = EnhancedDOMTreeNode(
+		**{
+			'backend_node_id': 0,
+			'node_type': node_type,
+			'node_name': name,
+			'node_value': value,
+			'attributes': attributes or {},
+			'is_scrollable': None,
+			'is_visible': True,
+			'absolute_position': None,
+			'target_id': 'target',
+			'frame_id': None,
+			'session_id': None,
+			'content_document': None,
+			'shadow_root_type': None,
+			'shadow_roots': None,
+			'parent_node': None,
+			'children_nodes': children,
+			'ax_node': None,
+			'snapshot_node': snapshot_node(),
+			**fields,
+		}
+	)
+	for child in children or []:
+		child.parent_node = node
+	return node
+
+
+def element(name: str, *children: EnhancedDOMTreeNode, **attributes) -> EnhancedDOMTreeNode:
+	return dom_node(NodeType.ELEMENT_NODE, name, children=list(children) or None, attributes=attributes)
+
+
+def text(value: str, **fields) -> SimplifiedNode:
+	return SimplifiedNode(original_node=dom_node(NodeType.TEXT_NODE, '#text', value, **fields), children=[])
+
+
+def cdp_node(node_id: int, name: str, node_type: int = NodeType.ELEMENT_NODE.value, **extra) -> dict:
+	"""A DOM.Node payload like DOM.getDocument returns it, with the same node and backend node id."""
+	return {
+		'nodeId': node_id,
+		'backendNodeId': node_id,
+		'nodeType': node_type,
+		'nodeName': name,
+		'localName': name.lower(),
+		'nodeValue': '',
+		**extra,
+	}
+
+
+def make_browser_session(**fields) -> SimpleNamespace:
+	"""The parts of a BrowserSession DomService uses, without a browser (no agent focus)."""
+	return SimpleNamespace(**{'agent_focus': None, 'logger': logging.getLogger('tests.ci.dom'), **fields})
+
+
+def make_dom_service(browser_session: SimpleNamespace | None = None, **options) -> DomService:
+	return DomService(browser_session=browser_session or make_browser_session(), **options)  # type: ignore[arg-type]
@@ -0,0 +1,123 @@
+"""Tests for the frame tree cache and the BrowserSession frame lookups served from it, without a browser."""
+
+from types import SimpleNamespace
+
+from cdp_use.cdp.target.types import TargetInfo
+
+from browser_use.browser.cdp_transport import MultiplexedCDPClient
+from browser_use.browser.frames import FrameTreeCache
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession, CDPSession
+
+
+def frame_tree(frame_id: str, url: str, *children: dict, parent_id: str | None = None) -> dict:
+	frame = {'id': frame_id, 'url': url, 'loaderId': 'loader', 'securityOrigin': url, 'mimeType': 'text/html'}
+	if parent_id:
+		frame['parentId'] = parent_id
+	return {'frame': frame, 'childFrames': list(children)}
+
+
+class TestFrameTreeCache:
+	def test_frame_events_invalidate_their_session(self):
+		cache = FrameTreeCache()
+		cache.set_tree('session-1', {'frameTree': frame_tree('main', 'https://a.example.com')}, cache.generation)  # type: ignore[arg-type]
+		cache.set_tree('session-2', {'frameTree': frame_tree('other', 'https://b.example.com')}, cache.generation)  # type: ignore[arg-type]
+		cache.set_owner('child', {'backendNodeId': 7}, cache.generation)
+
+		cache.on_frame_navigated({'frame': {}, 'type': 'Navigation'}, 'session-1')  # type: ignore[typeddict-item]
+		assert cache.get_tree('session-1') is None
+		assert cache.get_tree('session-2') is not None
+		assert cache.get_owner('child') == {'backendNodeId': 7}
+
+		cache.on_frame_detached({'frameId': 'child', 'reason': 'remove'}, 'session-2')
+		assert cache.get_tree('session-2') is None
+		assert cache.get_owner('child') is None
+
+	def test_results_requested_before_a_frame_event_are_dropped(self):
+		cache = FrameTreeCache()
+		generation = cache.generation
+		cache.on_frame_attached({'frameId': 'child', 'parentFrameId': 'main'}, 'session-1')
+		cache.set_tree('session-1', {'frameTree': frame_tree('main', 'https://a.example.com')}, generation)  # type: ignore[arg-type]
+		cache.set_owner('child', {'backendNodeId': 7}, generation)
+		assert cache.get_tree('session-1') is None
+		assert cache.get_owner('child') is None
+
+
+class TestBrowserSessionFrames:
+	def make_session(self) -> tuple[BrowserSession, dict[str, list]]:
+		browser_session = BrowserSession(
+			browser_profile=BrowserProfile(cross_origin_iframes=True), cdp_url='ws://127.0.0.1:9/unused'
+		)
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		calls: dict[str, list] = {'getFrameTree': [], 'getFrameOwner': []}
+		frame_trees = {
+			'session-tab': {
+				'frameTree': frame_tree(
+					'main', 'https://a.example.com', frame_tree('child', 'https://a.example.com/ad', parent_id='main')
+				)
+			},
+			'session-oopif': {'frameTree': frame_tree('oopif', 'https://ads.example.com', parent_id='main')},
+		}
+
+		async def get_frame_tree(session_id=None):
+			calls['getFrameTree'].append(session_id)
+			return frame_trees[session_id]
+
+		async def enable(session_id=None):
+			return {}
+
+		async def get_frame_owner(params, session_id=None):
+			calls['getFrameOwner'].append(params['frameId'])
+			return {'backendNodeId': len(calls['getFrameOwner']), 'nodeId': 0}
+
+		client.send = SimpleNamespace(  # type: ignore[assignment]
+			Page=SimpleNamespace(getFrameTree=get_frame_tree),
+			DOM=SimpleNamespace(enable=enable, getFrameOwner=get_frame_owner),
+		)
+		browser_session._cdp_client_root = client
+		browser_session.agent_focus = CDPSession(cdp_client=client, target_id='tab', session_id='session-tab')
+		browser_session._cdp_session_pool['tab'] = browser_session.agent_focus
+		browser_session._cdp_session_pool['oopif-target'] = CDPSession(
+			cdp_client=client, target_id='oopif-target', session_id='session-oopif'
+		)
+		browser_session._targets.seed(
+			[
+				TargetInfo(
+					targetId='tab', type='page', title='A', url='https://a.example.com', attached=True, canAccessOpener=False
+				),
+				TargetInfo(
+					targetId='oopif-target',
+					type='iframe',
+					title='',
+					url='https://ads.example.com',
+					attached=True,
+					canAccessOpener=False,
+				),
+			]
+		)
+		return browser_session, calls
+
+	async def test_unchanged_frames_need_no_roundtrip(self):
+		browser_session, calls = self.make_session()
+
+		all_frames, _ = await browser_session.get_all_frames()
+		assert set(all_frames) == {'main', 'child', 'oopif'}
+		assert sorted(calls['getFrameTree']) == ['session-oopif', 'session-tab']
+		assert sorted(calls['getFrameOwner']) == ['child', 'oopif']
+		owners = {frame_id: all_frames[frame_id]['backendNodeId'] for frame_id in ('child', 'oopif')}
+
+		again, _ = await browser_session.get_all_frames()
+		assert len(calls['getFrameTree']) == 2 and len(calls['getFrameOwner']) == 2
+		assert {frame_id: again[frame_id]['backendNodeId'] for frame_id in ('child', 'oopif')} == owners
+
+	async def test_frame_events_refetch_only_what_changed(self):
+		browser_session, calls = self.make_session()
+		await browser_session.get_all_frames()
+
+		browser_session._frame_trees.on_frame_detached({'frameId': 'child', 'reason': 'remove'}, 'session-tab')
+		await browser_session.get_all_frames()
+		assert sorted(calls['getFrameTree']) == ['session-oopif', 'session-tab', 'session-tab']
+		assert sorted(calls['getFrameOwner']) == ['child', 'child', 'oopif']
+
+		browser_session._on_detached_from_target({'sessionId': 'session-oopif'})
+		assert browser_session._frame_trees.get_tree('session-oopif') is None
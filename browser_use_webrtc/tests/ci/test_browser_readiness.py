@@ -0,0 +1,159 @@
+"""Tests for the event-driven page readiness tracker and post-action settle detection, without a browser."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from browser_use.browser.cdp_transport import MultiplexedCDPClient
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.readiness import PageReadinessTracker
+from browser_use.browser.session import BrowserSession, CDPSession
+
+
+def request(request_id: str, url: str, type: str = 'XHR') -> dict:
+	return {'requestId': request_id, 'request': {'url': url}, 'type': type}
+
+
+class TestPageReadinessTracker:
+	async def test_settled_page_takes_no_wait(self):
+		tracker = PageReadinessTracker()
+		tracker.track('session-1', 'frame-1')
+		start = time.monotonic()
+		assert await tracker.wait_until_idle('session-1', idle_time=0.5, timeout=5)
+		assert await tracker.wait_until_idle('untracked', idle_time=0.5, timeout=5)
+		assert time.monotonic() - start < 0.1
+
+	async def test_waits_for_load_and_requests_then_the_idle_time(self):
+		tracker = PageReadinessTracker()
+		tracker.track('session-1', 'frame-1')
+		tracker.on_lifecycle_event({'frameId': 'frame-1', 'loaderId': 'l', 'name': 'init', 'timestamp': 0}, 'session-1')
+		tracker.on_request_will_be_sent(request('r1', 'https://a.example.com/api'), 'session-1')  # type: ignore[arg-type]
+
+		async def finish_loading():
+			await asyncio.sleep(0.1)
+			tracker.on_lifecycle_event({'frameId': 'frame-1', 'loaderId': 'l', 'name': 'load', 'timestamp': 0}, 'session-1')
+			await asyncio.sleep(0.1)
+			tracker.on_loading_finished({'requestId': 'r1', 'timestamp': 0, 'encodedDataLength': 0}, 'session-1')
+
+		start = time.monotonic()
+		_, idle = await asyncio.gather(finish_loading(), tracker.wait_until_idle('session-1', idle_time=0.1, timeout=5))
+		assert idle
+		assert 0.3 <= time.monotonic() - start < 1
+
+	async def test_ignored_requests_and_other_frames_do_not_delay(self):
+		tracker = PageReadinessTracker(ignored_urls=['google-analytics.com'])
+		tracker.track('session-1', 'frame-1')
+		tracker.on_request_will_be_sent(request('r1', 'https://www.google-analytics.com/collect'), 'session-1')  # type: ignore[arg-type]
+		tracker.on_request_will_be_sent(request('r2', 'wss://a.example.com/live', type='WebSocket'), 'session-1')  # type: ignore[arg-type]
+		tracker.on_lifecycle_event({'frameId': 'iframe', 'loaderId': 'l', 'name': 'init', 'timestamp': 0}, 'session-1')
+		page = tracker.get('session-1')
+		assert page is not None and page.loaded and not page.requests
+
+	async def test_gives_up_at_the_timeout(self):
+		tracker = PageReadinessTracker()
+		tracker.track('session-1', 'frame-1')
+		tracker.on_request_will_be_sent(request('r1', 'https://a.example.com/slow'), 'session-1')  # type: ignore[arg-type]
+		start = time.monotonic()
+		assert not await tracker.wait_until_idle('session-1', idle_time=0.1, timeout=0.2)
+		assert time.monotonic() - start < 0.5
+
+	async def test_stalled_requests_are_waited_for_up_to_the_request_timeout(self):
+		tracker = PageReadinessTracker()
+		page = tracker.track('session-1', 'frame-1')
+		tracker.on_request_will_be_sent(request('r1', 'https://a.example.com/long-poll'), 'session-1')  # type: ignore[arg-type]
+		start = time.monotonic()
+		assert await tracker.wait_until_idle('session-1', idle_time=0.1, timeout=5, request_timeout=0.2)
+		assert 0.2 <= time.monotonic() - start < 0.5
+
+		# one that was sent long before the wait is not waited for at all
+		page.requests['r1'] = time.monotonic() - 10
+		start = time.monotonic()
+		assert await tracker.wait_until_idle('session-1', idle_time=0.1, timeout=5, request_timeout=0.2)
+		assert time.monotonic() - start < 0.1
+
+	async def test_wait_for_navigation(self):
+		tracker = PageReadinessTracker()
+		page = tracker.track('session-1', 'frame-1')
+		navigations = page.navigations
+		asyncio.get_running_loop().call_later(
+			0.05,
+			tracker.on_navigated_within_document,
+			{'frameId': 'frame-1', 'url': 'https://a.example.com/#b', 'navigationType': 'fragment'},
+			'session-1',
+		)
+		assert await tracker.wait_for_navigation('session-1', navigations, timeout=1)
+		assert not await tracker.wait_for_navigation('session-1', page.navigations, timeout=0.05)
+
+
+class TestActionSettle:
+	def make_session(self, wait_between_actions: float = 1.0) -> tuple[BrowserSession, list[str]]:
+		browser_session = BrowserSession(
+			browser_profile=BrowserProfile(wait_between_actions=wait_between_actions, action_grace_period=0.1)
+		)
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		evaluated = []
+
+		async def evaluate(params, session_id=None):
+			evaluated.append(params['expression'])
+			return {'result': {'type': 'boolean', 'value': True}}
+
+		client.send = SimpleNamespace(Runtime=SimpleNamespace(evaluate=evaluate))  # type: ignore[assignment]
+		browser_session._cdp_client_root = client
+		browser_session.agent_focus = CDPSession(cdp_client=client, target_id='tab', session_id='session-tab')
+		browser_session._readiness.track('session-tab', 'tab')
+		return browser_session, evaluated
+
+	async def test_action_without_effects_is_done_after_the_grace_period(self):
+		browser_session, evaluated = self.make_session()
+		started_at = time.monotonic()
+		await browser_session._wait_for_action_to_settle(started_at)
+		assert 0.1 <= time.monotonic() - started_at < 0.3
+		assert len(evaluated) == 1  # DOM changes are checked once the page went quiet
+
+	async def test_waits_for_triggered_requests_and_dialogs_up_to_the_ceiling(self):
+		browser_session, _ = self.make_session()
+		tracker = browser_session._readiness
+
+		async def act():
+			await asyncio.sleep(0.05)
+			tracker.on_javascript_dialog_opening(
+				{'url': '', 'message': 'sure?', 'type': 'confirm', 'hasBrowserHandler': False, 'frameId': 'tab'}, 'session-tab'
+			)
+			tracker.on_request_will_be_sent(request('r1', 'https://a.example.com/submit'), 'session-tab')  # type: ignore[arg-type]
+			await asyncio.sleep(0.2)
+			tracker.on_loading_finished({'requestId': 'r1', 'timestamp': 0, 'encodedDataLength': 0}, 'session-tab')
+
+		started_at = time.monotonic()
+		await asyncio.gather(act(), browser_session._wait_for_action_to_settle(started_at))
+		assert 0.35 <= time.monotonic() - started_at < 0.6
+
+		tracker.on_request_will_be_sent(request('r2', 'https://a.example.com/hanging'), 'session-tab')  # type: ignore[arg-type]
+		browser_session.browser_profile.wait_between_actions = 0.3
+		started_at = time.monotonic()
+		await browser_session._wait_for_action_to_settle(started_at)
+		assert 0.3 <= time.monotonic() - started_at < 0.5
+
+	async def test_tabs_the_page_opens_extend_the_wait(self):
+		browser_session, _ = self.make_session()
+		tracker = browser_session._readiness
+
+		def target_created(target_id: str, type: str = 'page', opener_id: str | None = 'tab') -> dict:
+			target_info = {'targetId': target_id, 'type': type, 'title': '', 'url': 'about:blank', 'attached': False}
+			return {'targetInfo': {**target_info, 'openerId': opener_id} if opener_id else target_info}
+
+		async def act():
+			await asyncio.sleep(0.08)
+			tracker.on_target_created(target_created('popup'))  # type: ignore[arg-type]
+
+		started_at = time.monotonic()
+		await asyncio.gather(act(), browser_session._wait_for_action_to_settle(started_at))
+		assert 0.18 <= time.monotonic() - started_at < 0.4
+
+		# iframes and tabs opened by other pages are not activity of the page
+		page = tracker.get('session-tab')
+		assert page is not None
+		last_activity = page.last_activity
+		tracker.on_target_created(target_created('iframe', type='iframe'))  # type: ignore[arg-type]
+		tracker.on_target_created(target_created('other-popup', opener_id='other-tab'))  # type: ignore[arg-type]
+		tracker.on_target_created(target_created('new-tab', opener_id=None))  # type: ignore[arg-type]
+		assert page.last_activity == last_activity
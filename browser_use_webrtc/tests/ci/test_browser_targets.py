@@ -0,0 +1,72 @@
+"""Tests for the event-driven target registry and the BrowserSession reads served from it, without a browser."""
+
+from cdp_use.cdp.target.types import TargetInfo
+
+from browser_use.browser.cdp_transport import MultiplexedCDPClient
+from browser_use.browser.session import BrowserSession, CDPSession
+from browser_use.browser.targets import TargetRegistry
+
+
+def target(target_id: str, url: str, title: str = '', type: str = 'page') -> TargetInfo:
+	return TargetInfo(targetId=target_id, type=type, title=title, url=url, attached=False, canAccessOpener=False)
+
+
+class TestTargetRegistry:
+	def test_follows_discovery_events_in_creation_order(self):
+		registry = TargetRegistry()
+		registry.on_target_created({'targetInfo': target('new', 'about:blank')})
+		registry.seed([target('first', 'https://a.example.com'), target('new', 'about:blank', title='stale')])
+		assert registry.synced
+		assert [t['targetId'] for t in registry.targets()] == ['new', 'first']
+		# the event that arrived while getTargets was in flight is not overwritten by the older result
+		assert registry.get('new') == target('new', 'about:blank')
+
+		registry.on_target_info_changed({'targetInfo': target('new', 'https://b.example.com', title='B')})
+		registry.on_target_created({'targetInfo': target('frame', 'https://ads.example.com', type='iframe')})
+		registry.on_target_destroyed({'targetId': 'first'})
+		assert [(t['targetId'], t['url']) for t in registry.targets()] == [
+			('new', 'https://b.example.com'),
+			('frame', 'https://ads.example.com'),
+		]
+
+		registry.add(target('frame', 'about:blank', type='iframe'))
+		assert registry.get('frame') == target('frame', 'https://ads.example.com', type='iframe')
+		registry.clear()
+		assert not registry and not registry.synced
+
+
+class TestBrowserSessionReads:
+	def make_session(self) -> BrowserSession:
+		browser_session = BrowserSession()
+		# never started: any CDP roundtrip would raise
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		browser_session._cdp_client_root = client
+		browser_session.agent_focus = CDPSession(cdp_client=client, target_id='tab-1', session_id='session-1')
+		browser_session._targets.seed(
+			[
+				target('tab-1', 'https://a.example.com', title='A'),
+				target('frame', 'https://ads.example.com', type='iframe'),
+				target('tab-2', 'chrome://newtab/'),
+			]
+		)
+		return browser_session
+
+	async def test_tabs_and_current_page_need_no_roundtrip(self):
+		browser_session = self.make_session()
+
+		tabs = await browser_session.get_tabs()
+		assert [(tab.target_id, tab.title) for tab in tabs] == [
+			('tab-1', 'A'),
+			('tab-2', 'ignore this tab and do not use it'),
+		]
+		assert await browser_session.get_current_page_url() == 'https://a.example.com'
+		assert await browser_session.get_current_page_title() == 'A'
+		assert await browser_session.get_most_recently_opened_target_id() == 'tab-2'
+		assert await browser_session.get_target_id_from_tab_id('ab-2') == 'tab-2'
+		assert await browser_session.get_target_info('frame') == target('frame', 'https://ads.example.com', type='iframe')
+
+	async def test_destroyed_targets_leave_the_registry(self):
+		browser_session = self.make_session()
+		browser_session._on_target_destroyed({'targetId': 'tab-2'})
+		assert [page['targetId'] for page in await browser_session._cdp_get_all_pages()] == ['tab-1']
+		assert await browser_session.get_target_info('tab-2') is None
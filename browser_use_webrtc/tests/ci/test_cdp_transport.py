@@ -0,0 +1,103 @@
+"""Tests for the multiplexed CDP transport and the bounded CDP session pool, without a browser."""
+
+import asyncio
+
+from browser_use.browser.cdp_transport import CDPSessionPool, MultiplexedCDPClient
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession, CDPSession
+
+
+def cdp_session(client: MultiplexedCDPClient, target_id: str) -> CDPSession:
+	return CDPSession(cdp_client=client, target_id=target_id, session_id=f'session-{target_id}')
+
+
+class TestMultiplexedEventRegistry:
+	async def test_every_handler_of_a_method_gets_the_event(self):
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		received = []
+		client.register.Page.javascriptDialogOpening(lambda event, session_id: received.append(('first', session_id)))  # type: ignore[arg-type]
+		client.register.Page.javascriptDialogOpening(lambda event, session_id: received.append(('second', session_id)))  # type: ignore[arg-type]
+
+		assert await client.emit_event('Page.javascriptDialogOpening', {'type': 'alert'}, session_id='tab-1')
+		assert received == [('first', 'tab-1'), ('second', 'tab-1')]
+		assert not await client.emit_event('Page.frameNavigated', {})
+
+	async def test_registering_again_replaces_the_handler_of_the_same_owner(self):
+		class Listener:
+			def __init__(self, name: str):
+				self.name = name
+
+			def on_dialog(self, event, session_id):
+				received.append(self.name)
+
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		received = []
+		first, second = Listener('first'), Listener('second')
+		for _ in range(3):
+			client.register.Page.javascriptDialogOpening(first.on_dialog)  # type: ignore[arg-type]
+		client.register.Page.javascriptDialogOpening(second.on_dialog)  # type: ignore[arg-type]
+		await client.emit_event('Page.javascriptDialogOpening', {})
+		assert received == ['first', 'second']
+
+		client._event_registry.unregister('Page.javascriptDialogOpening', first.on_dialog)
+		await client.emit_event('Page.javascriptDialogOpening', {})
+		assert received == ['first', 'second', 'second']
+		client._event_registry.unregister('Page.javascriptDialogOpening', second.on_dialog)
+		assert not await client.emit_event('Page.javascriptDialogOpening', {})
+
+	async def test_async_handlers_do_not_block_the_read_loop(self):
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		response = asyncio.get_running_loop().create_future()
+		handled = []
+
+		async def waits_for_a_response(event, session_id):
+			handled.append(await response)
+
+		client.register.Page.javascriptDialogOpening(waits_for_a_response)  # type: ignore[arg-type]
+		# the read loop awaits handle_event, it has to return before the response it delivers arrives
+		await asyncio.wait_for(client.emit_event('Page.javascriptDialogOpening', {}), timeout=1)
+		response.set_result('accepted')
+		await asyncio.sleep(0)
+		await asyncio.sleep(0)
+		assert handled == ['accepted']
+
+
+class TestCDPSessionPool:
+	def test_evicts_least_recently_used_sessions_except_kept_ones(self):
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		pool = CDPSessionPool()
+		for target_id in ('a', 'b', 'c', 'd'):
+			pool[target_id] = cdp_session(client, target_id)
+		pool.touch('a')
+
+		evicted = pool.evict(2, keep=['b'])
+		assert [session.target_id for session in evicted] == ['c', 'd']
+		assert list(pool) == ['b', 'a']
+		assert pool.evict(2) == []
+
+	def test_pop_session_by_session_id(self):
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		pool = CDPSessionPool(a=cdp_session(client, 'a'), b=cdp_session(client, 'b'))
+		session = pool.pop_session('session-b')
+		assert session is not None and session.target_id == 'b'
+		assert pool.pop_session('session-b') is None
+		assert list(pool) == ['a']
+
+
+class TestBrowserSessionPool:
+	async def test_pool_stays_bounded_and_follows_destroyed_targets(self):
+		browser_session = BrowserSession(browser_profile=BrowserProfile(cdp_session_pool_size=2))
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		browser_session.agent_focus = cdp_session(client, 'focus')
+		pool = browser_session._cdp_session_pool
+		pool['focus'] = browser_session.agent_focus
+		for target_id in ('a', 'b', 'c'):
+			pool[target_id] = cdp_session(client, target_id)
+
+		# detaching needs no running connection, a failed detachFromTarget is ignored
+		await browser_session._evict_cdp_sessions()
+		assert list(pool) == ['focus', 'c']
+
+		browser_session._on_target_destroyed({'targetId': 'c'})
+		browser_session._on_detached_from_target({'sessionId': 'session-focus'})
+		assert not pool
@@ -0,0 +1,154 @@
+"""Tests for the cached and partial accessibility tree fetching in DomService."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from browser_use.browser.cdp_transport import MultiplexedCDPClient
+from browser_use.dom.accessibility import AXTreeCache, is_ax_candidate
+from browser_use.dom.incremental import DOM_MUTATION_EVENTS
+from browser_use.dom.service import DomService
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType
+from tests.ci import dom_factories
+from tests.ci.dom_factories import dom_node, make_browser_session
+
+
+def ax_node(backend_node_id: int, role: str = 'generic', **extra) -> dict:
+	return {
+		'nodeId': str(backend_node_id),
+		'ignored': False,
+		'role': {'value': role},
+		'backendDOMNodeId': backend_node_id,
+		**extra,
+	}
+
+
+def element(
+	backend_node_id: int, tag: str, attributes: dict[str, str] | None = None, visible: bool = True
+) -> EnhancedDOMTreeNode:
+	return dom_node(
+		NodeType.ELEMENT_NODE, tag.upper(), attributes=attributes, backend_node_id=backend_node_id, is_visible=visible
+	)
+
+
+def make_frame_tree(*frame_ids: str) -> dict:
+	return {
+		'frameTree': {'frame': {'id': frame_ids[0]}, 'childFrames': [{'frame': {'id': frame_id}} for frame_id in frame_ids[1:]]}
+	}
+
+
+class FakeCDPClient(SimpleNamespace):
+	"""Weakly referenceable, like a real CDP client, which DomService registers its event handlers on once."""
+
+	__hash__ = object.__hash__
+
+
+def make_dom_service(ax_strategy: str, full_trees: dict[str, list[dict]] | None = None) -> tuple[DomService, SimpleNamespace]:
+	"""A DomService whose CDP session answers accessibility requests from `full_trees` (frame id -> AX nodes)."""
+	full_trees = full_trees or {'main': []}
+	send = SimpleNamespace(
+		Page=SimpleNamespace(getFrameTree=AsyncMock(return_value=make_frame_tree(*full_trees))),
+		Accessibility=SimpleNamespace(
+			getFullAXTree=AsyncMock(side_effect=lambda params, session_id: {'nodes': full_trees[params['frameId']]}),
+			getPartialAXTree=AsyncMock(
+				side_effect=lambda params, session_id: {'nodes': [ax_node(params['backendNodeId'], 'button')]}
+			),
+		),
+	)
+	handlers = {}
+	register = SimpleNamespace(
+		DOM=SimpleNamespace(
+			**{
+				method: lambda handler, method=method: handlers.__setitem__(f'DOM.{method}', handler)
+				for method in DOM_MUTATION_EVENTS
+			}
+		),
+		Accessibility=SimpleNamespace(
+			nodesUpdated=lambda handler: handlers.__setitem__('Accessibility.nodesUpdated', handler),
+			loadComplete=lambda handler: handlers.__setitem__('Accessibility.loadComplete', handler),
+		),
+		Page=SimpleNamespace(frameNavigated=lambda handler: handlers.__setitem__('Page.frameNavigated', handler)),
+	)
+	cdp_session = SimpleNamespace(session_id='session', cdp_client=FakeCDPClient(send=send, register=register), handlers=handlers)
+	browser_session = make_browser_session(get_or_create_cdp_session=AsyncMock(return_value=cdp_session))
+	return dom_factories.make_dom_service(browser_session, ax_strategy=ax_strategy), cdp_session
+
+
+class TestAXTreeCache:
+	def test_invalidation(self):
+		cache = AXTreeCache('target', 'session')
+		cache.store_frame('main', [ax_node(1), ax_node(2)], cache.generation)
+		cache.store_frame('child', [ax_node(3)], cache.generation)
+		cache.store_partial({4: ax_node(4)}, cache.generation)
+		assert set(cache.lookup()) == {1, 2, 3, 4}
+
+		# only the frame of the updated node is dropped, events of other sessions are ignored
+		cache.handle_event('Accessibility.nodesUpdated', {'nodes': [ax_node(3)]}, 'session')
+		cache.handle_event('DOM.attributeModified', {'nodeId': 1}, 'other-session')
+		assert set(cache.frames) == {'main'} and cache.partial == {}
+
+		cache.handle_event('DOM.setChildNodes', {'parentId': 1, 'nodes': []}, 'session')
+		assert set(cache.frames) == {'main'}
+		cache.handle_event('DOM.childNodeInserted', {'parentNodeId': 1}, 'session')
+		assert cache.frames == {} and cache.lookup() == {}
+
+	def test_results_of_invalidated_fetches_are_not_stored(self):
+		cache = AXTreeCache('target', 'session')
+		generation = cache.generation
+		cache.handle_event('Page.frameNavigated', {'frame': {'id': 'main'}}, 'session')
+		cache.store_frame('main', [ax_node(1)], generation)
+		cache.store_partial({2: ax_node(2)}, generation)
+		assert cache.lookup() == {}
+
+	def test_candidates(self):
+		assert is_ax_candidate(element(1, 'button'))
+		assert is_ax_candidate(element(2, 'div', {'aria-expanded': 'false'}))
+		assert is_ax_candidate(element(3, 'span', {'tabindex': '0'}))
+		assert not is_ax_candidate(element(4, 'div', {'class': 'card'}))
+		assert not is_ax_candidate(element(5, 'button', visible=False))
+
+
+class TestAXStrategies:
+	async def test_cached_strategy_fetches_frames_once(self):
+		service, cdp_session = make_dom_service('cached', {'main': [ax_node(1)], 'child': [ax_node(2)]})
+
+		first = await service._get_ax_tree_for_all_frames('target')
+		second = await service._get_ax_tree_for_all_frames('target')
+		assert first == second == {'nodes': [ax_node(1), ax_node(2)]}
+		assert cdp_session.cdp_client.send.Accessibility.getFullAXTree.await_count == 2
+		assert service._ax_timing == {'ax_frames_fetched': 0, 'ax_frames_cached': 2}
+
+		cdp_session.handlers['Accessibility.nodesUpdated']({'nodes': [ax_node(2)]}, 'session')
+		await service._get_ax_tree_for_all_frames('target')
+		assert cdp_session.cdp_client.send.Accessibility.getFullAXTree.await_count == 3
+		assert service._ax_timing == {'ax_frames_fetched': 1, 'ax_frames_cached': 1}
+
+	async def test_new_caches_do_not_stack_event_handlers(self):
+		service, _ = make_dom_service('cached')
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		sessions = [SimpleNamespace(cdp_client=client, session_id=f'session-{i % 2}') for i in range(4)]
+		service.browser_session.get_or_create_cdp_session = AsyncMock(side_effect=sessions)  # type: ignore[attr-defined]
+		for _ in sessions:
+			cache = await service._get_ax_cache('target')
+
+		invalidated = []
+		cache.handle_event = lambda method, event, session_id: invalidated.append(method)  # type: ignore[method-assign]
+		await client.emit_event('Accessibility.nodesUpdated', {'nodes': []}, session_id='session-1')
+		await client.emit_event('Page.frameNavigated', {'frame': {}}, session_id='session-1')
+		assert invalidated == ['Accessibility.nodesUpdated', 'Page.frameNavigated']
+
+	async def test_partial_strategy_fetches_visible_candidates_only(self):
+		service, cdp_session = make_dom_service('partial')
+		nodes = [element(1, 'button'), element(2, 'div'), element(3, 'a', visible=False), element(4, 'input')]
+
+		await service._attach_partial_ax_nodes('target', nodes, {})
+		get_partial = cdp_session.cdp_client.send.Accessibility.getPartialAXTree
+		assert sorted(call.kwargs['params']['backendNodeId'] for call in get_partial.await_args_list) == [1, 4]
+		assert [node.ax_node.role if node.ax_node else None for node in nodes] == ['button', None, None, 'button']
+		assert service._ax_timing['ax_nodes_skipped'] == 2
+
+		# the next step reuses the cached accessibility nodes
+		fresh = [element(1, 'button'), element(4, 'input')]
+		await service._attach_partial_ax_nodes('target', fresh, service._ax_cache.lookup())  # type: ignore[union-attr]
+		assert get_partial.await_count == 2
+		assert all(node.ax_node is not None for node in fresh)
+		assert service._ax_timing['ax_nodes_cached'] == 2
@@ -0,0 +1,111 @@
+"""Tests for the adaptive CDP deadlines and degraded results of DomService._get_all_trees."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from browser_use.dom.deadlines import CDPDeadlines, site_of
+from browser_use.dom.service import DomService
+from tests.ci import dom_factories
+from tests.ci.dom_factories import make_browser_session
+
+SNAPSHOT = {'documents': [], 'strings': []}
+DOM_TREE = {'root': {'nodeId': 1, 'backendNodeId': 1, 'nodeType': 9, 'nodeName': '#document', 'nodeValue': ''}}
+
+
+async def respond_after(seconds: float, result):
+	await asyncio.sleep(seconds)
+	return result
+
+
+def make_dom_service(snapshot_delay: float = 0.0, ax_delay: float = 0.0, ratio_delay: float = 0.0) -> DomService:
+	send = SimpleNamespace(
+		DOMSnapshot=SimpleNamespace(captureSnapshot=lambda params, session_id: respond_after(snapshot_delay, SNAPSHOT)),
+		DOM=SimpleNamespace(getDocument=lambda params, session_id: respond_after(0.0, DOM_TREE)),
+		Runtime=SimpleNamespace(evaluate=AsyncMock(return_value={})),
+	)
+	cdp_session = SimpleNamespace(
+		session_id='session',
+		cdp_client=SimpleNamespace(send=send),
+	)
+	browser_session = make_browser_session(
+		get_or_create_cdp_session=AsyncMock(return_value=cdp_session),
+		get_target_info=AsyncMock(return_value={'url': 'https://slow.example.com/page'}),
+	)
+	service = dom_factories.make_dom_service(browser_session)
+	service._cdp_deadlines = CDPDeadlines(default_deadline=0.3, min_deadline=0.05, max_deadline=0.5)
+	service._get_ax_tree_for_all_frames = lambda target_id: respond_after(ax_delay, {'nodes': []})  # type: ignore[method-assign]
+	service._get_viewport_ratio = lambda target_id: respond_after(ratio_delay, 2.0)  # type: ignore[method-assign]
+	return service
+
+
+class TestCDPDeadlines:
+	def test_deadline_follows_latency_history(self):
+		deadlines = CDPDeadlines(default_deadline=10.0, min_deadline=2.0, max_deadline=10.0, multiplier=3.0)
+		assert deadlines.deadline('example.com', 'ax_tree') == 10.0
+
+		for _ in range(10):
+			deadlines.record('example.com', 'ax_tree', 1.0)
+		assert deadlines.deadline('example.com', 'ax_tree') == 3.0
+		assert deadlines.deadline('other.com', 'ax_tree') == 10.0
+
+		# timeouts are recorded with the time they were given, the deadline grows back
+		for _ in range(5):
+			deadlines.record('example.com', 'ax_tree', 3.0)
+		assert deadlines.deadline('example.com', 'ax_tree') == 9.0
+
+		for _ in range(20):
+			deadlines.record('example.com', 'snapshot', 0.01)
+		assert deadlines.deadline('example.com', 'snapshot') == 2.0
+
+	def test_site_of(self):
+		assert site_of('https://www.example.com/a?b=c') == 'www.example.com'
+		assert site_of('about:blank') == 'about'
+
+
+class TestDegradedTrees:
+	async def test_slow_optional_requests_degrade_instead_of_failing(self):
+		service = make_dom_service()
+		service._device_pixel_ratio = 1.5
+		cancelled = []
+
+		async def never_answers(request: str):
+			try:
+				await asyncio.Event().wait()
+			except asyncio.CancelledError:
+				cancelled.append(request)
+				raise
+
+		service._get_ax_tree_for_all_frames = lambda target_id: never_answers('ax_tree')  # type: ignore[method-assign]
+		service._get_viewport_ratio = lambda target_id: never_answers('device_pixel_ratio')  # type: ignore[method-assign]
+		trees = await service._get_all_trees('target')
+		await asyncio.sleep(0)
+
+		# both were given up on at their deadline, which counts as their latency on this site
+		assert sorted(cancelled) == sorted(trees.degraded) == ['ax_tree', 'device_pixel_ratio']
+		assert service._cdp_deadlines.deadline('slow.example.com', 'ax_tree') == 0.5
+		assert trees.ax_tree == {'nodes': []}
+		assert trees.device_pixel_ratio == 1.5
+		assert trees.dom_tree == DOM_TREE
+
+	async def test_deadlines_adapt_to_the_site(self):
+		service = make_dom_service(ax_delay=0.01)
+		trees = await service._get_all_trees('target')
+		assert trees.degraded == [] and trees.device_pixel_ratio == 2.0
+		assert service._cdp_deadlines.deadline('slow.example.com', 'ax_tree') == 0.05
+
+		# the same request is now given far less time on this site
+		service._get_ax_tree_for_all_frames = lambda target_id: respond_after(0.2, {'nodes': []})  # type: ignore[method-assign]
+		trees = await service._get_all_trees('target')
+		assert trees.degraded == ['ax_tree']
+
+	async def test_required_requests_are_retried_then_fail(self):
+		service = make_dom_service(snapshot_delay=0.4)
+		trees = await service._get_all_trees('target')
+		assert trees.snapshot == SNAPSHOT and trees.degraded == []
+
+		service = make_dom_service(snapshot_delay=5.0)
+		with pytest.raises(TimeoutError, match='snapshot'):
+			await service._get_all_trees('target')
@@ -0,0 +1,54 @@
+"""Differential tests of the compiled interactivity classifier against ClickableElementDetector."""
+
+import random
+
+from browser_use.dom.serializer.classifier import InteractiveElementClassifier
+from browser_use.dom.serializer.clickable_elements import ClickableElementDetector
+from browser_use.dom.views import DOMRect, EnhancedAXNode, EnhancedAXProperty, EnhancedDOMTreeNode, NodeType
+from tests.ci.dom_factories import dom_node, snapshot_node
+
+TAGS = ['DIV', 'SPAN', 'A', 'BUTTON', 'INPUT', 'IFRAME', 'HTML', 'BODY', 'LI', 'SVG', 'LABEL', 'OPTION', 'IMG', 'SUMMARY']
+ATTRIBUTE_NAMES = ['class', 'id', 'role', 'onclick', 'onmousedown', 'tabindex', 'data-action', 'data-role', 'aria-label', 'href']
+ATTRIBUTE_VALUES = ['', 'btn primary', 'Search-Button', 'nav', 'MagnifyingGlass', 'button', 'link', 'listbox', 'x', 'find-me']
+AX_PROPERTIES = ['disabled', 'hidden', 'focusable', 'editable', 'checked', 'expanded', 'required', 'keyshortcuts', 'level']
+AX_ROLES = [None, 'button', 'listbox', 'generic', 'StaticText', 'link', 'searchbox']
+SIZES = [0, 5, 10, 30, 50, 80, 150]
+
+
+def random_node(rng: random.Random) -> EnhancedDOMTreeNode:
+	ax_node = None
+	if rng.random() < 0.6:
+		ax_node = EnhancedAXNode(
+			ax_node_id='ax',
+			ignored=False,
+			role=rng.choice(AX_ROLES),
+			name=None,
+			description=None,
+			properties=[
+				EnhancedAXProperty(name=rng.choice(AX_PROPERTIES), value=rng.choice([True, False, None, '', 'yes']))  # type: ignore[arg-type]
+				for _ in range(rng.randint(0, 3))
+			]
+			or None,
+		)
+	layout = None
+	if rng.random() < 0.8:
+		layout = snapshot_node(
+			cursor_style=rng.choice([None, 'auto', 'pointer']),
+			bounds=DOMRect(x=0, y=0, width=rng.choice(SIZES), height=rng.choice(SIZES)) if rng.random() < 0.9 else None,
+		)
+	return dom_node(
+		NodeType.ELEMENT_NODE if rng.random() < 0.9 else NodeType.TEXT_NODE,
+		rng.choice(TAGS),
+		attributes={rng.choice(ATTRIBUTE_NAMES): rng.choice(ATTRIBUTE_VALUES) for _ in range(rng.randint(0, 4))},
+		ax_node=ax_node,
+		snapshot_node=layout,
+	)
+
+
+class TestInteractiveElementClassifier:
+	def test_decisions_match_the_detector(self):
+		rng = random.Random(0)
+		nodes = [random_node(rng) for _ in range(20_000)]
+		expected = [ClickableElementDetector.is_interactive(node) for node in nodes]
+		assert 0.2 < sum(expected) / len(expected) < 0.8
+		assert [InteractiveElementClassifier.is_interactive(node) for node in nodes] == expected
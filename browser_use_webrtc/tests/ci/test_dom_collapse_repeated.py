@@ -0,0 +1,52 @@
+"""Tests for collapsing runs of structurally identical siblings."""
+
+import re
+
+from browser_use.dom.serializer.collapse import collapse_repeated_siblings
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, SimplifiedNode
+from tests.ci.dom_factories import element, text
+
+
+def item(number: int, tag: str = 'li') -> SimplifiedNode:
+	"""A list item with a product link and its price."""
+	link = SimplifiedNode(
+		original_node=element('A', href=f'/product/{number}', title=f'Product {number}'),
+		children=[text(f'Product {number}')],
+		interactive_index=number,
+	)
+	return SimplifiedNode(original_node=element(tag.upper()), children=[link, text(f'${number}.99')])
+
+
+def listing(*items: SimplifiedNode) -> SimplifiedNode:
+	return SimplifiedNode(original_node=element('UL'), children=list(items))
+
+
+class TestCollapseRepeated:
+	def test_long_runs_are_shortened_and_keep_every_index(self):
+		root = listing(*(item(number) for number in range(1, 11)))
+		assert collapse_repeated_siblings(root) == 7
+
+		lines = DOMTreeSerializer.serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES).splitlines()
+		assert lines[:3] == ['[1]<a title=Product 1 />', '\tProduct 1', '$1.99']
+		assert lines[9:] == [
+			'[4]<a /> Product 4 $4.99 (this and the next 6 similar items are shortened)',
+			*(f'[{number}]<a /> Product {number} ${number}.99' for number in range(5, 11)),
+		]
+		assert sorted(int(index) for index in re.findall(r'\[(\d+)\]', '\n'.join(lines))) == list(range(1, 11))
+
+	def test_only_long_runs_of_the_same_shape_are_collapsed(self):
+		# attribute values and text don't change the shape, the tag of the element does
+		items = [item(number) for number in range(1, 6)] + [item(6, tag='div')] + [item(number) for number in range(7, 12)]
+		root = listing(*items)
+		assert collapse_repeated_siblings(root) == 0
+
+		root = listing(*items, item(12))
+		assert collapse_repeated_siblings(root) == 3
+		assert [child.collapsed for child in root.children[6:]] == [False] * 3 + [True] * 3
+
+	def test_a_new_pass_clears_the_previous_one(self):
+		items = [item(number) for number in range(1, 8)]
+		assert collapse_repeated_siblings(listing(*items)) == 4
+		assert collapse_repeated_siblings(listing(*items[:5])) == 0
+		assert not any(child.collapsed or child.collapsed_run for child in items[:5])
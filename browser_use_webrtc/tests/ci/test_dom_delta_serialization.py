@@ -0,0 +1,112 @@
+"""Tests for serializing DOM states as changes against the last full listing."""
+
+from browser_use.agent.prompts import AgentMessagePrompt, get_dom_listing_message
+from browser_use.browser.views import BrowserStateSummary
+from browser_use.dom.serializer.delta import DOMDeltaSerializer, serialized_lines
+from browser_use.dom.views import NodeType, SerializedDOMState, SimplifiedNode
+from tests.ci.dom_factories import dom_node, text
+
+
+def make_state(buttons: dict[int, str], welcome: str = 'Welcome back') -> SerializedDOMState:
+	"""A body with a text line and one button per (backend node id -> aria-label)."""
+	children = [text(welcome, backend_node_id=2)]
+	for index, (backend_node_id, label) in enumerate(buttons.items(), start=1):
+		button = dom_node(NodeType.ELEMENT_NODE, 'BUTTON', attributes={'aria-label': label}, backend_node_id=backend_node_id)
+		children.append(SimplifiedNode(original_node=button, children=[], interactive_index=index))
+	root = SimplifiedNode(original_node=dom_node(NodeType.ELEMENT_NODE, 'BODY', backend_node_id=1), children=children)
+	return SerializedDOMState(_root=root, selector_map={})
+
+
+class TestDeltaSerialization:
+	def test_lines_match_the_full_listing(self):
+		state = make_state({10: 'Save', 11: 'Cancel'})
+		assert serialized_lines(state) == {
+			2: 'Welcome back',
+			10: '[1]<button aria-label=Save />',
+			11: '[2]<button aria-label=Cancel />',
+		}
+		assert state.llm_representation() == '\n'.join(serialized_lines(state).values())
+
+	def test_delta_against_the_last_full_listing(self):
+		serializer = DOMDeltaSerializer()
+		buttons = {10 + i: f'Button {i}' for i in range(6)}
+
+		first = serializer.serialize(make_state(buttons), 'https://example.com')
+		assert first.full == make_state(buttons).llm_representation()
+
+		unchanged = serializer.serialize(make_state(buttons), 'https://example.com')
+		assert unchanged.full is None and unchanged.llm_representation() == 'No changes since the full listing above'
+
+		changed = {10: 'Renamed', **{key: label for key, label in buttons.items() if key not in (10, 15)}, 20: 'New'}
+		delta = serializer.serialize(make_state(changed), 'https://example.com')
+		assert delta.llm_representation().splitlines() == [
+			'+ [6]<button aria-label=New />',
+			'~ [1]<button aria-label=Renamed />',
+			'- [6]<button aria-label=Button 5 />',
+		]
+
+		# the next delta is still against the first listing, the LLM never keeps the previous delta
+		delta = serializer.serialize(make_state(buttons, welcome='Goodbye'), 'https://example.com')
+		assert delta.llm_representation() == '~ Goodbye'
+
+	def test_lines_left_out_of_the_full_listing_are_added_once_shown(self):
+		serializer = DOMDeltaSerializer(max_delta_ratio=10)
+		labels = ['Save', 'Cancel', 'Delete', 'Archive', 'Export', 'Print']
+		state = make_state({10 + i: label for i, label in enumerate(labels)})
+
+		first = serializer.serialize(state, 'https://example.com', max_tokens=30, query='save the draft')
+		assert first.full is not None and 'Print' not in first.full
+		delta = serializer.serialize(state, 'https://example.com', max_tokens=30, query='print the page')
+		assert delta.llm_representation() == '+ [6]<button aria-label=Print />'
+
+	def test_lines_cut_off_the_full_listing_are_added_once_shown(self):
+		serializer = DOMDeltaSerializer(max_delta_ratio=10)
+		buttons = {10 + i: f'Button {i}' for i in range(6)}
+		listing = make_state(buttons).llm_representation()
+		max_length = len('\n'.join(listing.splitlines()[:3])) + 5  # the fourth line is only partly shown
+
+		assert serializer.serialize(make_state(buttons), 'https://example.com', max_length=max_length).full == listing
+		unchanged = serializer.serialize(make_state(buttons), 'https://example.com', max_length=max_length)
+		assert unchanged.llm_representation() == 'No changes since the full listing above'
+
+		del buttons[10]
+		delta = serializer.serialize(make_state(buttons), 'https://example.com', max_length=max_length)
+		assert delta.llm_representation().splitlines() == [
+			'+ [2]<button aria-label=Button 2 />',
+			'~ [1]<button aria-label=Button 1 />',
+			'- [1]<button aria-label=Button 0 />',
+		]
+
+	def test_full_refresh_policy(self):
+		serializer = DOMDeltaSerializer(full_refresh_every=3, max_delta_ratio=0.5)
+		buttons = {10 + i: f'Button {i}' for i in range(10)}
+
+		assert serializer.serialize(make_state(buttons), 'https://example.com').full is not None
+		assert serializer.serialize(make_state(buttons), 'https://example.com').full is None
+		# navigation
+		assert serializer.serialize(make_state(buttons), 'https://example.com/next').full is not None
+		assert serializer.serialize(make_state(buttons), 'https://example.com/next').full is None
+		assert serializer.serialize(make_state(buttons), 'https://example.com/next').full is None
+		# every third step
+		assert serializer.serialize(make_state(buttons), 'https://example.com/next').full is not None
+		# a delta larger than half the listing
+		assert serializer.serialize(make_state({30: 'Other', 31: 'Buttons'}), 'https://example.com/next').full is not None
+
+	def test_listing_message_is_only_cut_without_a_token_budget(self):
+		listing = '\n'.join(make_state({10 + i: f'Button {i}' for i in range(6)}).llm_representation() for _ in range(3))
+		assert 'truncated to 50 characters' in str(get_dom_listing_message(listing, 50).content)
+		assert listing in str(get_dom_listing_message(listing, None).content)
+
+	def test_changes_are_not_wrapped_like_a_listing(self):
+		serializer = DOMDeltaSerializer()
+		state = make_state({10: 'Save'})
+		browser_state = BrowserStateSummary(dom_state=state, url='https://example.com', title='', tabs=[], pixels_below=500)
+		serializer.serialize(state, 'https://example.com')
+		delta = serializer.serialize(make_state({10: 'Save', 11: 'Cancel'}), 'https://example.com')
+
+		description = AgentMessagePrompt(browser_state, None, dom_delta=delta)._get_browser_state_description()  # type: ignore[arg-type]
+		assert delta.llm_representation() in description
+		assert '[Start of page]' not in description and 'pixels below' not in description
+
+		description = AgentMessagePrompt(browser_state, None)._get_browser_state_description()  # type: ignore[arg-type]
+		assert '[Start of page]' in description and '500 pixels below' in description
@@ -0,0 +1,76 @@
+"""Tests for element identities computed once per state."""
+
+from browser_use.dom.views import (
+	EnhancedDOMTreeNode,
+	NodeType,
+	SerializedDOMState,
+	compute_element_identities,
+	invalidate_element_identities,
+)
+from tests.ci.dom_factories import dom_node, element
+
+
+def make_tree() -> tuple[EnhancedDOMTreeNode, list[EnhancedDOMTreeNode]]:
+	"""A page with a list of links, a lone button and a link inside a shadow root, and the elements to identify."""
+	links = [element('A', href=f'/{number}') for number in range(3)]
+	button = element('BUTTON', type='submit')
+	shadow_link = element('A', href='/shadow')
+	shadow_root = dom_node(NodeType.DOCUMENT_FRAGMENT_NODE, '#document-fragment', children=[shadow_link])
+	host = element('DIV', shadow_root)
+	body = element('BODY', element('UL', *(element('LI', link) for link in links)), element('DIV', button), host)
+	document = dom_node(NodeType.DOCUMENT_NODE, '#document', children=[element('HTML', body)])
+	return document, [*links, button, shadow_link, host]
+
+
+def uncached_identity(node: EnhancedDOMTreeNode) -> tuple[str, int, int]:
+	invalidate_element_identities(node)
+	return node.xpath, node.element_hash, node.parent_branch_hash()
+
+
+class TestElementIdentity:
+	def test_one_pass_matches_the_per_element_computation(self):
+		_, elements = make_tree()
+		expected = [uncached_identity(node) for node in elements]
+		assert expected[0][0] == 'html/body/ul/li[1]/a'
+		assert expected[3][0] == 'html/body/div[1]/button'
+		assert expected[4][0] == 'html/body/div[2]/a'
+
+		compute_element_identities(elements)
+		assert all(node._identity is not None for node in elements)
+		assert [(node.xpath, node.element_hash, node.parent_branch_hash()) for node in elements] == expected
+
+	def test_invalidation_drops_cached_identities(self):
+		_, elements = make_tree()
+		link = elements[0]
+		compute_element_identities([link])
+		cached_hash = link.element_hash
+
+		link.attributes['href'] = '/changed'
+		assert link.element_hash == cached_hash
+		invalidate_element_identities(elements[3])
+		assert link.element_hash != cached_hash
+
+	def test_invalidation_keeps_identities_of_other_trees(self):
+		_, elements = make_tree()
+		_, other_elements = make_tree()
+		compute_element_identities([*elements, *other_elements])
+
+		invalidate_element_identities(other_elements[0])
+		assert elements[0]._cached_identity is not None
+		assert other_elements[0]._cached_identity is None
+
+	def test_detached_elements_keep_their_identity(self):
+		_, elements = make_tree()
+		detached = elements[0].detached()
+		invalidate_element_identities(elements[0])
+		assert detached._cached_identity is not None and detached.xpath == 'html/body/ul/li[1]/a'
+
+	def test_state_finds_elements_by_hash_and_xpath(self):
+		_, elements = make_tree()
+		state = SerializedDOMState(_root=None, selector_map={index: node for index, node in enumerate(elements, start=1)})
+		compute_element_identities(elements)
+
+		assert state.index_of_hash(elements[3].element_hash) == 4
+		assert state.index_of_xpath('html/body/ul/li[2]/a') == 2
+		assert state.index_of_hash(0) is None
+		assert state.index_of_xpath('html/body/form') is None
@@ -0,0 +1,200 @@
+"""Tests for incremental DOM maintenance: DOMMutationTracker patching and the serializer subtree cache."""
+
+from types import SimpleNamespace
+
+from browser_use.browser.cdp_transport import MultiplexedCDPClient
+from browser_use.dom.incremental import DOMMutationTracker, FrameContext
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType
+from tests.ci.dom_factories import cdp_node, make_dom_service, snapshot_node
+
+
+def text_node(node_id: int, parent_id: int, value: str) -> dict:
+	return cdp_node(node_id, '#text', NodeType.TEXT_NODE.value, parentId=parent_id, nodeValue=value)
+
+
+def layout(y: float, cursor: str = 'auto') -> EnhancedSnapshotNode:
+	return snapshot_node(
+		cursor_style=cursor,
+		bounds=DOMRect(x=0, y=y, width=200, height=20),
+		computed_styles={'display': 'block', 'visibility': 'visible', 'opacity': '1', 'cursor': cursor},
+	)
+
+
+def make_page(sections: int) -> tuple[dict, dict[int, EnhancedSnapshotNode]]:
+	"""A document with `sections` divs, each holding a button and a paragraph of text."""
+	children = []
+	snapshot_lookup = {
+		2: snapshot_node(
+			bounds=DOMRect(x=0, y=0, width=1000, height=sections * 100),
+			clientRects=DOMRect(x=0, y=0, width=1000, height=sections * 100),
+			scrollRects=DOMRect(x=0, y=0, width=1000, height=sections * 100),
+		),
+		3: layout(0),
+	}
+	for i in range(sections):
+		base = 10 + i * 10
+		button = cdp_node(base + 1, 'BUTTON', parentId=base, children=[text_node(base + 2, base + 1, f'Button {i}')])
+		paragraph = cdp_node(base + 3, 'P', parentId=base, children=[text_node(base + 4, base + 3, f'Paragraph number {i}')])
+		children.append(cdp_node(base, 'DIV', parentId=3, children=[button, paragraph]))
+		for offset in range(5):
+			snapshot_lookup[base + offset] = layout(i * 100 + offset * 10, cursor='pointer' if offset == 1 else 'auto')
+
+	body = cdp_node(3, 'BODY', parentId=2, children=children)
+	html = cdp_node(2, 'HTML', parentId=1, frameId='main', children=[body])
+	return cdp_node(1, '#document', NodeType.DOCUMENT_NODE.value, children=[html]), snapshot_lookup
+
+
+def make_tracker(sections: int = 5) -> tuple[DomService, DOMMutationTracker]:
+	service = make_dom_service(incremental=True)
+	root_payload, snapshot_lookup = make_page(sections)
+
+	nodes: dict[int, EnhancedDOMTreeNode] = {}
+	frame_contexts: dict[int, FrameContext] = {}
+	root, _ = service._construct_enhanced_tree(
+		root_payload,  # type: ignore[arg-type]
+		'target',
+		{},
+		snapshot_lookup,
+		enhanced_dom_tree_node_lookup=nodes,
+		frame_contexts=frame_contexts,
+	)
+
+	def build_subtree(node, frame_context: FrameContext) -> EnhancedDOMTreeNode:
+		html_frames, offset_x, offset_y = frame_context
+		subtree, _ = service._construct_enhanced_tree(
+			node,
+			'target',
+			{},
+			{},
+			html_frames,
+			DOMRect(x=offset_x, y=offset_y, width=0.0, height=0.0),
+			enhanced_dom_tree_node_lookup=tracker.nodes,
+			frame_contexts=tracker.frame_contexts,
+		)
+		return subtree
+
+	tracker = DOMMutationTracker(
+		root=root,
+		target_id='target',
+		session_id='session',
+		nodes=nodes,
+		frame_contexts=frame_contexts,
+		root_context=((), 0.0, 0.0),
+		build_subtree=build_subtree,
+	)
+	return service, tracker
+
+
+def serialize(root: EnhancedDOMTreeNode, subtree_cache=None) -> tuple[str, list[int]]:
+	state, _ = DOMTreeSerializer(root, subtree_cache=subtree_cache).serialize_accessible_elements()
+	return state.llm_representation(), [node.backend_node_id for node in state.selector_map.values()]
+
+
+class TestDOMMutationTracker:
+	def test_patches_tree_from_mutation_events(self):
+		_, tracker = make_tracker()
+		body = tracker.nodes[3]
+
+		tracker.handle_event(
+			'childNodeInserted',
+			{'parentNodeId': 3, 'previousNodeId': 10, 'node': cdp_node(500, 'A', parentId=3, childNodeCount=2)},
+			'session',
+		)
+		tracker.handle_event('childNodeRemoved', {'parentNodeId': 3, 'nodeId': 30}, 'session')
+		tracker.handle_event('attributeModified', {'nodeId': 21, 'name': 'aria-expanded', 'value': 'true'}, 'session')
+		tracker.handle_event('characterDataModified', {'nodeId': 44, 'characterData': 'Changed text'}, 'session')
+
+		assert [child.node_id for child in body.children] == [10, 500, 20, 40, 50]
+		assert tracker.nodes[500].parent_node is body
+		assert 30 not in tracker.nodes and 31 not in tracker.nodes
+		assert tracker.nodes[21].attributes == {'aria-expanded': 'true'}
+		assert tracker.nodes[44].node_value == 'Changed text'
+		assert tracker.take_pending_children() == [500]
+		assert sorted(node.node_id for node in tracker.take_dirty_subtrees()) == [21, 43, 500]
+		assert tracker.take_dirty_subtrees() == []
+		assert not tracker.invalidated
+
+	def test_set_child_nodes_fills_in_inserted_node(self):
+		_, tracker = make_tracker()
+		tracker.handle_event(
+			'childNodeInserted',
+			{'parentNodeId': 3, 'previousNodeId': 0, 'node': cdp_node(500, 'UL', childNodeCount=1)},
+			'session',
+		)
+		tracker.handle_event(
+			'setChildNodes',
+			{'parentId': 500, 'nodes': [cdp_node(501, 'LI', parentId=500, children=[text_node(502, 501, 'item')])]},
+			'session',
+		)
+
+		inserted = tracker.nodes[500]
+		assert tracker.nodes[3].children[0] is inserted
+		assert [child.node_id for child in inserted.children] == [501]
+		assert inserted.children[0].children[0].node_value == 'item'
+		assert tracker.take_pending_children() == []
+
+	def test_untrackable_events_invalidate(self):
+		_, tracker = make_tracker()
+		tracker.handle_event('attributeModified', {'nodeId': 21, 'name': 'class', 'value': 'x'}, 'other-session')
+		assert tracker.take_dirty_subtrees() == [] and not tracker.invalidated
+
+		tracker.handle_event('attributeModified', {'nodeId': 9999, 'name': 'class', 'value': 'x'}, 'session')
+		assert tracker.invalidated
+
+		_, tracker = make_tracker()
+		tracker.handle_event('documentUpdated', {}, 'session')
+		assert tracker.invalidated
+
+	async def test_rebuilds_do_not_stack_event_handlers(self):
+		"""Every full rebuild listens for mutations again, one event must still reach the tracker once."""
+		service, tracker = make_tracker()
+		client = MultiplexedCDPClient('ws://127.0.0.1:9/unused')
+		cdp_session = SimpleNamespace(cdp_client=client, target_id='target', session_id='session')
+
+		async def get_or_create_cdp_session(target_id=None, focus=True):
+			return cdp_session
+
+		service.browser_session.get_or_create_cdp_session = get_or_create_cdp_session  # type: ignore[attr-defined]
+		for _ in range(3):
+			await service._listen_for_mutations('target')
+		service._mutation_tracker = tracker
+
+		event = {'parentNodeId': 3, 'previousNodeId': 10, 'node': cdp_node(500, 'A', parentId=3)}
+		await client.emit_event('DOM.childNodeInserted', event, session_id='session')
+		assert [child.node_id for child in tracker.nodes[3].children] == [10, 500, 20, 30, 40, 50]
+
+
+class TestIncrementalSerialization:
+	def test_cached_serialization_matches_full_serialization(self):
+		"""After patching, reusing clean subtrees must give exactly what serializing the whole tree gives."""
+		service, tracker = make_tracker(sections=20)
+		assert serialize(tracker.root, tracker.subtree_cache) == serialize(tracker.root)
+
+		tracker.handle_event(
+			'childNodeInserted',
+			{
+				'parentNodeId': 3,
+				'previousNodeId': 50,
+				'node': cdp_node(900, 'BUTTON', parentId=3, children=[text_node(901, 900, 'New button')]),
+			},
+			'session',
+		)
+		tracker.handle_event('childNodeRemoved', {'parentNodeId': 3, 'nodeId': 100}, 'session')
+		tracker.handle_event('characterDataModified', {'nodeId': 154, 'characterData': 'Edited paragraph'}, 'session')
+
+		for root in tracker.take_dirty_subtrees():
+			service._relayout_subtree(
+				tracker, root, {900: layout(550, cursor='pointer'), 901: layout(555), 153: layout(1530), 154: layout(1540)}, {}
+			)
+
+		serializer = DOMTreeSerializer(tracker.root, subtree_cache=tracker.subtree_cache)
+		state, _ = serializer.serialize_accessible_elements()
+		assert serializer._reused_subtrees, 'clean sections should have been reused'
+		assert (state.llm_representation(), [n.backend_node_id for n in state.selector_map.values()]) == serialize(tracker.root)
+		assert 'New button' in state.llm_representation() and 'Edited paragraph' in state.llm_representation()
+		assert 'Button 9' not in state.llm_representation()
+
+		# a second pass without changes reuses everything and still matches
+		assert serialize(tracker.root, tracker.subtree_cache) == serialize(tracker.root)
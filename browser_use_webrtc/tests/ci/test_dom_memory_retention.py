@@ -0,0 +1,134 @@
+"""Memory regression tests for keeping DOM states across agent steps."""
+
+import gc
+import tracemalloc
+from collections import deque
+
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.utils import intern_string
+from browser_use.dom.views import DOMInteractedElement, DOMRect, EnhancedDOMTreeNode, NodeType, SerializedDOMState
+from tests.ci.dom_factories import dom_node, snapshot_node
+
+# bubus keeps the last 50 events, and with them the states their handlers returned
+EVENT_HISTORY_SIZE = 50
+
+
+def page_node(node_id: int, node_type: NodeType, name: str, value: str = '', **attributes) -> EnhancedDOMTreeNode:
+	"""A laid out, displayed node with interned strings, like the tree builder creates them."""
+	bounds = DOMRect(x=0, y=node_id * 20, width=100, height=20)
+	return dom_node(
+		node_type,
+		intern_string(name),
+		value,
+		children=[],
+		attributes={intern_string(key): intern_string(attribute) for key, attribute in attributes.items()},
+		backend_node_id=node_id,
+		absolute_position=bounds,
+		snapshot_node=snapshot_node(bounds=bounds, computed_styles={'display': 'block', 'visibility': 'visible', 'opacity': '1'}),
+	)
+
+
+def append(parent: EnhancedDOMTreeNode, child: EnhancedDOMTreeNode) -> EnhancedDOMTreeNode:
+	child.parent_node = parent
+	assert parent.children_nodes is not None
+	parent.children_nodes.append(child)
+	return child
+
+
+def build_page(step: int, rows: int = 20) -> EnhancedDOMTreeNode:
+	"""A fresh tree like every step builds: a list of rows with a link and a text each, a few of them new."""
+	html = page_node(1, NodeType.ELEMENT_NODE, 'HTML')
+	body = append(html, page_node(2, NodeType.ELEMENT_NODE, 'BODY'))
+	for row in range(rows):
+		node_id = 10 + 3 * (row + step % 5)
+		item = append(body, page_node(node_id, NodeType.ELEMENT_NODE, 'DIV', **{'class': 'result-row'}))
+		link = append(item, page_node(node_id + 1, NodeType.ELEMENT_NODE, 'A', href=f'/item/{row}', **{'class': 'title'}))
+		append(link, page_node(node_id + 2, NodeType.TEXT_NODE, '#text', f'Result number {row}'))
+	return html
+
+
+def run_steps(steps: int, retained: deque[SerializedDOMState], history: list[DOMInteractedElement], detach: bool = True) -> None:
+	for step in range(steps):
+		previous_state = retained[-1] if retained else None
+		state, _ = DOMTreeSerializer(build_page(step), previous_state).serialize_accessible_elements()
+		# the release policy of the DOM watchdog: only the newest state keeps its tree
+		if retained and detach:
+			retained[-1] = retained[-1].detached()
+		retained.append(state)
+		history.append(DOMInteractedElement.load_from_enhanced_dom_tree(state.selector_map[1]))
+
+
+def traced_memory() -> int:
+	gc.collect()
+	return tracemalloc.get_traced_memory()[0]
+
+
+class TestStateRetention:
+	def test_detached_state_keeps_what_the_next_step_needs(self):
+		state, _ = DOMTreeSerializer(build_page(0)).serialize_accessible_elements()
+		detached = state.detached()
+
+		assert detached._root is None and detached.next_index == state.next_index
+		assert detached.selector_map.keys() == state.selector_map.keys()
+		for index, node in state.selector_map.items():
+			copy = detached.selector_map[index]
+			assert copy.parent_node is None and copy.backend_node_id == node.backend_node_id
+			assert (copy.xpath, copy.element_hash, copy.parent_branch_hash()) == (
+				node.xpath,
+				node.element_hash,
+				node.parent_branch_hash(),
+			)
+
+		# the next step marks new elements and matches indices against the detached state as against the full one
+		next_page = build_page(1)
+		full, _ = DOMTreeSerializer(next_page, state, stable_indices=True).serialize_accessible_elements()
+		from_detached, _ = DOMTreeSerializer(next_page, detached, stable_indices=True).serialize_accessible_elements()
+		assert full.llm_representation() == from_detached.llm_representation()
+
+	def test_memory_stays_flat_over_500_steps(self):
+		retained: deque[SerializedDOMState] = deque(maxlen=EVENT_HISTORY_SIZE)
+		history: list[DOMInteractedElement] = []
+
+		tracemalloc.start()
+		try:
+			baseline = traced_memory()
+			run_steps(1, retained, history)
+			one_page = traced_memory() - baseline
+			run_steps(99, retained, history)
+			after_100_steps = traced_memory()
+			run_steps(400, retained, history)
+			after_500_steps = traced_memory()
+
+			before_entry = traced_memory()
+			entry = DOMInteractedElement.load_from_enhanced_dom_tree(retained[-1].selector_map[1])
+			history_entry = traced_memory() - before_entry
+			del entry
+		finally:
+			tracemalloc.stop()
+
+		# once the event history is full, only the agent history grows
+		assert after_500_steps - after_100_steps < 400 * history_entry + one_page
+
+	def test_previous_states_cost_less_than_full_trees(self):
+		def retained_after_100_steps(detach: bool) -> int:
+			tracemalloc.start()
+			try:
+				baseline = traced_memory()
+				retained: deque[SerializedDOMState] = deque(maxlen=EVENT_HISTORY_SIZE)
+				run_steps(100, retained, [], detach)
+				return traced_memory() - baseline
+			finally:
+				tracemalloc.stop()
+
+		assert 2 * retained_after_100_steps(detach=True) < retained_after_100_steps(detach=False)
+
+
+class TestInternString:
+	def test_equal_strings_share_one_object(self):
+		first, second = ''.join(['result', '-row']), ''.join(['result-', 'row'])
+		assert first is not second
+		assert intern_string(first) is intern_string(second)
+
+	def test_long_strings_are_not_pooled(self):
+		value = 'x' * 200
+		assert intern_string(value) is value
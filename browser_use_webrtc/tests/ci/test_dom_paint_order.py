@@ -0,0 +1,85 @@
+"""Tests for the spatial index and paint-order occlusion filtering."""
+
+from browser_use.dom.serializer.paint_order import mark_occluded
+from browser_use.dom.serializer.spatial import SpatialGrid
+from browser_use.dom.views import DOMRect, NodeType, SimplifiedNode
+from tests.ci.dom_factories import dom_node, snapshot_node
+
+OPAQUE = {'background-color': 'rgb(255, 255, 255)', 'opacity': '1'}
+TRANSPARENT = {'background-color': 'rgba(0, 0, 0, 0)', 'opacity': '1'}
+
+
+def element(
+	name: str, rect: DOMRect, paint_order: int, styles: dict[str, str] | None = None, children: list[SimplifiedNode] | None = None
+) -> SimplifiedNode:
+	layout = snapshot_node(bounds=rect, computed_styles=styles or TRANSPARENT, paint_order=paint_order)
+	node = dom_node(NodeType.ELEMENT_NODE, name, absolute_position=rect, snapshot_node=layout)
+	return SimplifiedNode(original_node=node, children=children or [])
+
+
+def button_grid(size: int, width: float = 40, height: float = 20) -> list[SimplifiedNode]:
+	"""A size x size grid of buttons with opaque backgrounds, like the cells of a spreadsheet."""
+	return [
+		element('BUTTON', DOMRect(x=column * width, y=row * height, width=width, height=height), 1 + row * size + column, OPAQUE)
+		for row in range(size)
+		for column in range(size)
+	]
+
+
+class TestSpatialGrid:
+	def test_point_lookups(self):
+		grid = SpatialGrid(cell_size=100)
+		grid.insert(1, DOMRect(x=0, y=0, width=50, height=50))
+		grid.insert(2, DOMRect(x=40, y=40, width=300, height=20))
+		grid.insert(3, DOMRect(x=0, y=0, width=1_000_000, height=1_000_000))
+
+		assert sorted(grid.at_point(45, 45)) == [1, 2, 3]
+		assert sorted(grid.at_point(250, 50)) == [2, 3]
+		assert sorted(grid.at_point(500, 500)) == [3]
+		assert list(grid.at_point(-10, -10)) == []
+		assert len(grid) == 3
+
+
+class TestPaintOrderOcclusion:
+	def test_a_modal_hides_the_page_behind_it(self):
+		modal_button = element('BUTTON', DOMRect(x=250, y=50, width=100, height=30), 102, OPAQUE)
+		modal = element('DIV', DOMRect(x=200, y=0, width=200, height=200), 101, OPAQUE, [modal_button])
+		page = button_grid(10)
+		root = element('BODY', DOMRect(x=0, y=0, width=1000, height=1000), 0, OPAQUE, [*page, modal])
+
+		# the five columns of buttons under the modal are hidden, the rest and the modal's own button are not
+		assert mark_occluded(root) == 5 * 10
+		assert not modal.excluded_by_parent and not modal_button.excluded_by_parent and not root.excluded_by_parent
+		hidden = [button for button in page if button.excluded_by_parent]
+		assert all(200 <= button.original_node.absolute_position.x < 400 for button in hidden)  # type: ignore[union-attr]
+
+	def test_transparent_overlays_and_own_content_do_not_hide(self):
+		label = element('SPAN', DOMRect(x=0, y=0, width=100, height=30), 3, OPAQUE)
+		button = element('BUTTON', DOMRect(x=0, y=0, width=100, height=30), 2, OPAQUE, [label])
+		overlay = element('DIV', DOMRect(x=0, y=0, width=500, height=500), 4, TRANSPARENT)
+		click_through = element('DIV', DOMRect(x=0, y=0, width=500, height=500), 5, {**OPAQUE, 'pointer-events': 'none'})
+		root = element('BODY', DOMRect(x=0, y=0, width=500, height=500), 1, None, [button, overlay, click_through])
+
+		assert mark_occluded(root) == 0
+		assert not button.excluded_by_parent and not label.excluded_by_parent
+
+	def test_candidate_checks_stay_linear_on_large_grids(self, monkeypatch):
+		"""Every element is compared with the few rectangles at its center, not with every other element.
+
+		Timing lives in tests/scripts/benchmark_dom_paint_order.py.
+		"""
+		checks = []
+		at_point = SpatialGrid.at_point
+
+		def counting_at_point(self, x: float, y: float):
+			for item in at_point(self, x, y):
+				checks.append(item)
+				yield item
+
+		monkeypatch.setattr(SpatialGrid, 'at_point', counting_at_point)
+		for size in (50, 100):
+			checks.clear()
+			root = element('BODY', DOMRect(x=0, y=0, width=size * 40, height=size * 20), 0, None, button_grid(size))
+			assert mark_occluded(root) == 0
+			# each button only contains its own center, the body center is the corner of four buttons
+			assert len(checks) == size * size + 4
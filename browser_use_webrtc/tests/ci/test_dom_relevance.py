@@ -0,0 +1,67 @@
+"""Tests for ranking the DOM listing by relevance to the task."""
+
+from browser_use.dom.serializer import budget
+from browser_use.dom.serializer.relevance import bm25_scores, line_relevance, tokenize
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, SerializedDOMState, SimplifiedNode
+from tests.ci.dom_factories import element, text
+
+PRODUCTS = ['Red running shoes', 'Blue denim jacket', 'Green wool sweater', 'Black leather boots', 'White cotton shirt']
+
+
+def make_tree() -> SimplifiedNode:
+	"""A product card per product: a link with the product name and a description below it."""
+	cards = []
+	for index, product in enumerate(PRODUCTS, start=1):
+		link = SimplifiedNode(original_node=element('A', title=product), children=[], interactive_index=index)
+		cards += [link, text(f'Free returns within thirty days for every order of {product.split()[-1]}')]
+	return SimplifiedNode(original_node=element('BODY'), children=cards)
+
+
+class TestRelevance:
+	def test_tokenize(self):
+		assert tokenize('Please find the Blue jackets, size 42!') == ['blue', 'jacket', 'size', '42']
+
+	def test_bm25_prefers_rare_terms(self):
+		documents = [tokenize(document) for document in ('blue jacket', 'blue shirt', 'blue shoes', 'red boots')]
+		scores = bm25_scores(documents, tokenize('blue jacket'))
+		assert scores.index(max(scores)) == 0
+		assert scores[3] == 0
+		assert bm25_scores(documents, []) == [0.0] * 4
+
+	def test_relevance_follows_the_task(self):
+		lines = DOMTreeSerializer.serialize_tree(make_tree(), DEFAULT_INCLUDE_ATTRIBUTES).splitlines()
+		parents = [-1] * len(lines)
+		relevance = line_relevance(lines, parents, 'Buy the leather boots in size 44')
+		links = relevance[0::2]
+		assert round(links[3], 2) == 1.0
+		assert max(links[:3] + links[4:]) == 0.0
+
+		assert line_relevance(lines, parents, 'the') == [0.0] * len(lines)
+
+	def test_lines_inherit_half_the_relevance_of_their_container(self):
+		lines = ['|SCROLL|<section aria-label=Leather boots />', '\tFree returns', 'Newsletter']
+		assert line_relevance(lines, [-1, 0, -1], 'leather boots') == [1.0, 0.5, 0.0]
+
+	def test_relevant_elements_survive_the_token_budget(self):
+		state = SerializedDOMState(_root=make_tree(), selector_map={})
+		listing = state.llm_representation(max_tokens=40, query='Open the denim jacket')
+		assert '[2]<a title=Blue denim jacket />' in listing
+		assert '[1]<a' not in listing
+
+		listing = state.llm_representation(max_tokens=40, query='Open the wool sweater')
+		assert '[3]<a title=Green wool sweater />' in listing
+
+	def test_listings_that_fit_are_not_ranked(self, monkeypatch):
+		ranked = []
+
+		def counting_line_relevance(lines, parents, query):
+			ranked.append(query)
+			return line_relevance(lines, parents, query)
+
+		monkeypatch.setattr(budget, 'line_relevance', counting_line_relevance)
+		state = SerializedDOMState(_root=make_tree(), selector_map={})
+		state.llm_representation(max_tokens=10_000, query='Open the denim jacket')
+		assert ranked == []
+		state.llm_representation(max_tokens=40, query='Open the denim jacket')
+		assert ranked == ['Open the denim jacket']
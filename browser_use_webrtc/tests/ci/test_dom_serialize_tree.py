@@ -0,0 +1,87 @@
+"""Tests for the iterative DOM tree serializer."""
+
+import random
+
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, SimplifiedNode
+from tests.ci.dom_factories import element, text
+
+
+def random_tree(seed: int, size: int = 500) -> SimplifiedNode:
+	"""Elements with and without indices, text, excluded and collapsed nodes, nested at random."""
+	rng = random.Random(seed)
+	root = SimplifiedNode(original_node=element('BODY'), children=[])
+	nodes = [root]
+	for number in range(size):
+		parent = rng.choice(nodes)
+		if rng.random() < 0.3:
+			node = text(f'Text {number}')
+		else:
+			node = SimplifiedNode(
+				original_node=element(rng.choice(['DIV', 'A', 'BUTTON']), title=f'Element {number}'),
+				children=[],
+				interactive_index=number if rng.random() < 0.5 else None,
+				is_new=rng.random() < 0.1,
+				excluded_by_parent=rng.random() < 0.1,
+				collapsed=rng.random() < 0.05,
+			)
+			nodes.append(node)
+		parent.children.append(node)
+	return root
+
+
+def recursive_serialize_tree(node: SimplifiedNode, include_attributes: list[str], depth: int = 0) -> str:
+	"""The previous, recursive implementation, as the reference for the output."""
+	formatted_text = []
+	next_depth = depth
+	line = None if node.excluded_by_parent else DOMTreeSerializer.serialize_node_line(node, include_attributes)
+	if line is not None:
+		formatted_text.append(f'{depth * chr(9)}{line}')
+		next_depth += 1
+	for child in node.children if not node.collapsed else ():
+		child_text = recursive_serialize_tree(child, include_attributes, next_depth)
+		if child_text:
+			formatted_text.append(child_text)
+	return '\n'.join(formatted_text)
+
+
+class TestSerializeTree:
+	def test_output_is_identical_to_the_recursive_serializer(self):
+		for seed in range(5):
+			root = random_tree(seed)
+			expected = recursive_serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES)
+			assert expected
+			assert DOMTreeSerializer.serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES) == expected
+			assert DOMTreeSerializer.serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES, depth=2) == recursive_serialize_tree(
+				root, DEFAULT_INCLUDE_ATTRIBUTES, 2
+			)
+
+	def test_deeply_nested_markup(self):
+		root = node = SimplifiedNode(original_node=element('DIV'), children=[])
+		for _ in range(20_000):
+			child = SimplifiedNode(original_node=element('DIV'), children=[])
+			node.children.append(child)
+			node = child
+		node.children.append(text('Deep down'))
+
+		assert DOMTreeSerializer.serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES) == 'Deep down'
+
+	def test_attribute_fragments_are_cached_per_include_attributes(self):
+		node = SimplifiedNode(original_node=element('A', title='Home', placeholder='Go home'), children=[])
+		node.interactive_index = 1
+		assert (
+			DOMTreeSerializer.serialize_node_line(node, DEFAULT_INCLUDE_ATTRIBUTES) == '[1]<a title=Home placeholder=Go home />'
+		)
+
+		node.original_node.attributes['title'] = 'Changed'
+		assert (
+			DOMTreeSerializer.serialize_node_line(node, DEFAULT_INCLUDE_ATTRIBUTES) == '[1]<a title=Home placeholder=Go home />'
+		)
+		assert DOMTreeSerializer.serialize_node_line(node, ['title']) == '[1]<a title=Changed />'
+
+		# every serializer pass clears the cache of all nodes like this
+		node.attributes_cache = None
+		assert (
+			DOMTreeSerializer.serialize_node_line(node, DEFAULT_INCLUDE_ATTRIBUTES)
+			== '[1]<a title=Changed placeholder=Go home />'
+		)
@@ -0,0 +1,165 @@
+"""Tests for the columnar DOMSnapshot index behind build_snapshot_lookup."""
+
+import random
+
+import pytest
+
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES, DocumentSnapshotIndex, build_snapshot_lookup
+from browser_use.dom.views import DOMRect, EnhancedSnapshotNode
+
+
+def make_snapshot(node_count: int, seed: int = 0, documents: int = 1) -> dict:
+	"""Build a synthetic CaptureSnapshotReturns payload with shuffled layout nodes and ragged rect data."""
+	rng = random.Random(seed)
+	strings = ['block', 'none', 'visible', 'hidden', '1', '0', 'pointer', 'auto', 'static']
+	docs = []
+	backend_node_id = 1
+	for _ in range(documents):
+		backend_ids = list(range(backend_node_id, backend_node_id + node_count))
+		backend_node_id += node_count
+
+		laid_out = [i for i in range(node_count) if rng.random() < 0.8]
+		rng.shuffle(laid_out)
+		layout = {
+			'nodeIndex': laid_out,
+			'bounds': [[rng.uniform(0, 2000), rng.uniform(0, 8000), rng.uniform(0, 300), rng.uniform(0, 80)] for _ in laid_out],
+			'styles': [[rng.randrange(len(strings)) for _ in REQUIRED_COMPUTED_STYLES] for _ in laid_out],
+			'text': [-1 for _ in laid_out],
+			'stackingContexts': {'index': [0, 3, 7]},
+			'paintOrders': [rng.randrange(10_000) for _ in laid_out],
+			'clientRects': [[0, 0, 100, 50] if rng.random() < 0.3 else [] for _ in laid_out],
+			'scrollRects': [[0, rng.uniform(0, 500), 100, 900] if rng.random() < 0.2 else [] for _ in laid_out],
+		}
+		nodes = {
+			'parentIndex': [-1] + [rng.randrange(i) for i in range(1, node_count)],
+			'backendNodeId': backend_ids,
+			'isClickable': {'index': sorted(rng.sample(range(node_count), node_count // 10))},
+		}
+		docs.append({'nodes': nodes, 'layout': layout})
+	return {'documents': docs, 'strings': strings}
+
+
+def reference_lookup(snapshot: dict, device_pixel_ratio: float) -> dict[int, EnhancedSnapshotNode]:
+	"""The original per-node scan over layout['nodeIndex'], kept as the behavioural reference."""
+	lookup = {}
+	strings = snapshot['strings']
+	for document in snapshot['documents']:
+		nodes, layout = document['nodes'], document['layout']
+		for snapshot_index, backend_node_id in enumerate(nodes['backendNodeId']):
+			is_clickable = snapshot_index in nodes['isClickable']['index'] if 'isClickable' in nodes else None
+			bounds = client_rects = scroll_rects = paint_order = stacking_contexts = cursor_style = None
+			computed_styles = {}
+			for layout_idx, node_index in enumerate(layout['nodeIndex']):
+				if node_index == snapshot_index and layout_idx < len(layout['bounds']):
+					raw = layout['bounds'][layout_idx]
+					bounds = DOMRect(*(value / device_pixel_ratio for value in raw[:4]))
+					for i, style_index in enumerate(layout['styles'][layout_idx]):
+						if 0 <= style_index < len(strings):
+							computed_styles[REQUIRED_COMPUTED_STYLES[i]] = strings[style_index]
+					cursor_style = computed_styles.get('cursor')
+					paint_order = layout['paintOrders'][layout_idx]
+					if len(layout['clientRects'][layout_idx]) >= 4:
+						client_rects = DOMRect(*layout['clientRects'][layout_idx][:4])
+					if len(layout['scrollRects'][layout_idx]) >= 4:
+						scroll_rects = DOMRect(*layout['scrollRects'][layout_idx][:4])
+					if layout_idx < len(layout['stackingContexts']):
+						stacking_contexts = layout['stackingContexts']['index'][layout_idx]
+					break
+			lookup[backend_node_id] = EnhancedSnapshotNode(
+				is_clickable=is_clickable,
+				cursor_style=cursor_style,
+				bounds=bounds,
+				clientRects=client_rects,
+				scrollRects=scroll_rects,
+				computed_styles=computed_styles or None,
+				paint_order=paint_order,
+				stacking_contexts=stacking_contexts,
+			)
+	return lookup
+
+
+class TestSnapshotLookup:
+	def test_matches_reference_lookup(self):
+		snapshot = make_snapshot(400, seed=1, documents=2)
+		expected = reference_lookup(snapshot, device_pixel_ratio=2.0)
+		lookup = build_snapshot_lookup(snapshot, device_pixel_ratio=2.0)  # type: ignore[arg-type]
+
+		assert set(lookup) == set(expected)
+		for backend_node_id, expected_node in expected.items():
+			assert lookup[backend_node_id] == expected_node
+
+	def test_nodes_are_materialized_lazily_and_cached(self):
+		snapshot = make_snapshot(50)
+		lookup = build_snapshot_lookup(snapshot)  # type: ignore[arg-type]
+
+		assert len(lookup) == 50
+		assert lookup._materialized == {}
+		first = lookup.get(1)
+		assert first is lookup[1]
+		assert len(lookup._materialized) == 1
+		assert lookup.get(10_000) is None
+
+	def test_empty_snapshot(self):
+		lookup = build_snapshot_lookup({'documents': [], 'strings': []})  # type: ignore[arg-type]
+		assert len(lookup) == 0
+		assert lookup.get(1) is None
+
+	def test_index_build_materializes_no_nodes(self, monkeypatch):
+		"""Building the index and its subtree extents is column work, node objects only exist for looked up ids.
+
+		Timing lives in tests/scripts/benchmark_dom_snapshot_index.py.
+		"""
+		materialized = []
+		materialize = DocumentSnapshotIndex.materialize
+
+		def counting_materialize(self, snapshot_index: int):
+			materialized.append(snapshot_index)
+			return materialize(self, snapshot_index)
+
+		monkeypatch.setattr(DocumentSnapshotIndex, 'materialize', counting_materialize)
+		snapshot = make_snapshot(5_000, seed=3, documents=2)
+		lookup = build_snapshot_lookup(snapshot)  # type: ignore[arg-type]
+		assert len(lookup) == 10_000
+		for backend_node_id in range(1, 10_001, 7):
+			lookup.subtree_extent(backend_node_id)
+			lookup.position(backend_node_id)
+		assert materialized == []
+
+		for backend_node_id in (1, 5_001, 20_000) * 3:
+			lookup.get(backend_node_id)
+		assert len(materialized) == 2
+
+	def test_subtree_extent_covers_all_descendants(self):
+		snapshot = make_snapshot(300, seed=2, documents=2)
+		lookup = build_snapshot_lookup(snapshot, device_pixel_ratio=2.0)  # type: ignore[arg-type]
+
+		for document in snapshot['documents']:
+			backend_ids = document['nodes']['backendNodeId']
+			parents = document['nodes']['parentIndex']
+			expected: dict[int, list[float]] = {}
+			for snapshot_index, backend_node_id in enumerate(backend_ids):
+				bounds = lookup[backend_node_id].bounds
+				if bounds is None:
+					continue
+				ancestor = snapshot_index
+				while ancestor >= 0:
+					left, top, right, bottom = expected.get(ancestor, [float('inf'), float('inf'), -float('inf'), -float('inf')])
+					expected[ancestor] = [
+						min(left, bounds.x),
+						min(top, bounds.y),
+						max(right, bounds.x + bounds.width),
+						max(bottom, bounds.y + bounds.height),
+					]
+					ancestor = parents[ancestor]
+
+			for snapshot_index, backend_node_id in enumerate(backend_ids):
+				extent = lookup.subtree_extent(backend_node_id)
+				if snapshot_index not in expected:
+					assert extent is None
+					continue
+				left, top, right, bottom = expected[snapshot_index]
+				assert extent is not None
+				assert (extent.x, extent.y) == pytest.approx((left, top))
+				assert (extent.x + extent.width, extent.y + extent.height) == pytest.approx((right, bottom))
+
+		assert lookup.subtree_extent(10_000) is None
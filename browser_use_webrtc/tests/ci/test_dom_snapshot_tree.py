@@ -0,0 +1,137 @@
+"""Tests for rebuilding the DOM.getDocument payload from DOMSnapshot data."""
+
+import logging
+from types import SimpleNamespace
+
+from browser_use.dom.enhanced_snapshot import build_snapshot_lookup
+from browser_use.dom.service import DomService
+from browser_use.dom.snapshot_tree import build_dom_tree_from_snapshot
+from browser_use.dom.views import NodeType
+
+STRINGS = [
+	'#document',  # 0
+	'HTML',  # 1
+	'BODY',  # 2
+	'IFRAME',  # 3
+	'DIV',  # 4
+	'#document-fragment',  # 5
+	'#text',  # 6
+	'hello',  # 7
+	'id',  # 8
+	'main',  # 9
+	'open',  # 10
+	'main-frame',  # 11
+	'inner-frame',  # 12
+	'::before',  # 13
+	'before',  # 14
+	'SPAN',  # 15
+	'',  # 16
+]
+
+
+def make_document(frame_id: int, nodes: list[tuple[int, int, int, int, list[int]]], **rare) -> dict:
+	"""A snapshot document from (parent index, node type, node name, node value, attributes) rows."""
+	return {
+		'frameId': frame_id,
+		'nodes': {
+			'parentIndex': [row[0] for row in nodes],
+			'nodeType': [row[1] for row in nodes],
+			'nodeName': [row[2] for row in nodes],
+			'nodeValue': [row[3] for row in nodes],
+			'attributes': [row[4] for row in nodes],
+			'backendNodeId': [frame_id * 100 + index for index in range(len(nodes))],
+			**rare,
+		},
+		'layout': {'nodeIndex': [], 'bounds': [], 'text': [], 'styles': [], 'stackingContexts': {'index': []}},
+	}
+
+
+def make_snapshot(shadow_root_type: bool = True) -> dict:
+	element, document, fragment, text = (
+		NodeType.ELEMENT_NODE.value,
+		NodeType.DOCUMENT_NODE.value,
+		NodeType.DOCUMENT_FRAGMENT_NODE.value,
+		NodeType.TEXT_NODE.value,
+	)
+	main = make_document(
+		11,
+		[
+			(-1, document, 0, -1, []),  # 0 #document
+			(0, element, 1, -1, []),  # 1 HTML
+			(1, element, 2, -1, []),  # 2 BODY
+			(2, element, 4, -1, [8, 9]),  # 3 DIV id=main
+			(3, fragment, 5, -1, []),  # 4 shadow root of the div
+			(4, element, 15, -1, []),  # 5 SPAN in the shadow root
+			(3, element, 13, -1, []),  # 6 ::before pseudo element
+			(6, text, 6, 14, []),  # 7 its text
+			(3, text, 6, 7, []),  # 8 text 'hello'
+			(2, element, 3, -1, []),  # 9 IFRAME
+		],
+		contentDocumentIndex={'index': [9], 'value': [1]},
+		pseudoType={'index': [6], 'value': [13]},
+		**({'shadowRootType': {'index': [4], 'value': [10]}} if shadow_root_type else {}),
+	)
+	inner = make_document(
+		12,
+		[
+			(-1, document, 0, -1, []),  # 0 #document
+			(0, element, 1, -1, []),  # 1 HTML
+			(1, element, 2, -1, []),  # 2 BODY
+		],
+	)
+	return {'documents': [main, inner], 'strings': STRINGS}
+
+
+class TestSnapshotTree:
+	def test_rebuilds_document_payload(self):
+		root = build_dom_tree_from_snapshot(make_snapshot())['root']  # type: ignore[arg-type, index]
+
+		assert root['nodeName'] == '#document' and 'parentId' not in root
+		html = root['children'][0]
+		assert html['frameId'] == 'main-frame' and html['parentId'] == root['nodeId']
+		body = html['children'][0]
+		div, iframe = body['children']
+		assert div['attributes'] == ['id', 'main'] and div['localName'] == 'div'
+
+		# the shadow root hangs off its host, the pseudo element and its text are left out
+		assert [shadow['shadowRootType'] for shadow in div['shadowRoots']] == ['open']
+		assert [child['nodeName'] for child in div['shadowRoots'][0]['children']] == ['SPAN']
+		assert [child['nodeValue'] for child in div['children']] == ['hello']
+
+		inner_document = iframe['contentDocument']
+		assert iframe['frameId'] == 'inner-frame'
+		assert inner_document['backendNodeId'] == 1200
+		assert inner_document['children'][0]['frameId'] == 'inner-frame'
+
+		node_ids = []
+		stack = [root]
+		while stack:
+			node = stack.pop()
+			node_ids.append(node['nodeId'])
+			stack += node.get('children', []) + node.get('shadowRoots', [])
+			if 'contentDocument' in node:
+				stack.append(node['contentDocument'])
+		assert len(node_ids) == len(set(node_ids)) == 11
+
+	def test_missing_shadow_root_type_needs_get_document(self):
+		assert build_dom_tree_from_snapshot(make_snapshot(shadow_root_type=False)) is None  # type: ignore[arg-type]
+		assert build_dom_tree_from_snapshot({'documents': [], 'strings': []}) is None  # type: ignore[arg-type]
+
+	def test_tree_builds_from_snapshot_payload(self):
+		snapshot = make_snapshot()
+		browser_session = SimpleNamespace(agent_focus=None, logger=logging.getLogger('test_dom_snapshot_tree'))
+		service = DomService(browser_session=browser_session, snapshot_only=True)  # type: ignore[arg-type]
+
+		tree, _ = service._construct_enhanced_tree(
+			build_dom_tree_from_snapshot(snapshot)['root'],  # type: ignore[arg-type, index]
+			'target',
+			{},
+			build_snapshot_lookup(snapshot),  # type: ignore[arg-type]
+		)
+
+		body = tree.children[0].children[0]
+		div, iframe = body.children
+		assert div.attributes == {'id': 'main'}
+		assert div.shadow_roots and div.shadow_roots[0].parent_node is div
+		assert iframe.content_document is not None and iframe.content_document.parent_node is iframe
+		assert iframe.content_document.children[0].frame_id == 'inner-frame'
@@ -0,0 +1,75 @@
+"""Tests for keeping interactive indices stable across steps."""
+
+from browser_use.dom.serializer.indices import ElementIndexAllocator
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType, SerializedDOMState, SimplifiedNode
+from tests.ci.dom_factories import dom_node
+
+
+def element(backend_node_id: int, tag: str, parent: EnhancedDOMTreeNode | None = None) -> EnhancedDOMTreeNode:
+	return dom_node(NodeType.ELEMENT_NODE, tag.upper(), backend_node_id=backend_node_id, parent_node=parent)
+
+
+BODY = element(1, 'body')
+
+
+def buttons(*backend_node_ids: int) -> list[EnhancedDOMTreeNode]:
+	return [element(backend_node_id, 'button', BODY) for backend_node_id in backend_node_ids]
+
+
+def state_of(nodes: list[EnhancedDOMTreeNode], indices: list[int], next_index: int) -> SerializedDOMState:
+	return SerializedDOMState(_root=None, selector_map=dict(zip(indices, nodes)), next_index=next_index)
+
+
+class TestElementIndexAllocator:
+	def test_indices_survive_insertions_and_removals(self):
+		first = buttons(10, 11, 12)
+		assert ElementIndexAllocator(None).assign(first) == [1, 2, 3]
+		state = state_of(first, [1, 2, 3], next_index=4)
+
+		# a banner link above the buttons and a removed button don't shift anything
+		banner = element(20, 'a', BODY)
+		allocator = ElementIndexAllocator(state)
+		assert allocator.assign([banner, *buttons(10, 12)]) == [4, 1, 3]
+		assert allocator.next_index == 5
+
+		# the number of the removed button is not handed out again
+		state = state_of([banner, *buttons(10, 12)], [4, 1, 3], next_index=5)
+		assert ElementIndexAllocator(state).assign(buttons(10, 12, 30)) == [1, 3, 5]
+
+	def test_rerendered_elements_keep_their_index_when_unambiguous(self):
+		form = element(2, 'form', BODY)
+		submit = element(10, 'input', form)
+		state = state_of([submit, *buttons(11, 12)], [1, 2, 3], next_index=4)
+
+		# the input and one of the buttons were replaced by new nodes, the two buttons look the same
+		rerendered = [element(20, 'input', form), element(11, 'button', BODY), element(21, 'button', BODY), *buttons(22)]
+		assert ElementIndexAllocator(state).assign(rerendered) == [1, 2, 4, 5]
+
+	def test_numbering_restarts_after_navigation(self):
+		state = state_of(buttons(10, 11), [7, 8], next_index=9)
+		allocator = ElementIndexAllocator(state)
+		assert allocator.assign(buttons(30, 31)) == [1, 2]
+		assert allocator.next_index == 3
+
+
+class TestSerializerIndices:
+	def assign(self, nodes: list[EnhancedDOMTreeNode], previous: SerializedDOMState | None, stable: bool) -> SerializedDOMState:
+		root = SimplifiedNode(original_node=BODY, children=[SimplifiedNode(original_node=node, children=[]) for node in nodes])
+		serializer = DOMTreeSerializer(BODY, previous, stable_indices=stable)
+		serializer._assign_interactive_indices_and_mark_new_nodes(root)
+		return SerializedDOMState(_root=root, selector_map=serializer._selector_map, next_index=serializer._interactive_counter)
+
+	def test_stable_indices(self):
+		previous = self.assign(buttons(10, 11), None, stable=True)
+		assert {index: node.backend_node_id for index, node in previous.selector_map.items()} == {1: 10, 2: 11}
+
+		state = self.assign(buttons(20, 10, 11), previous, stable=True)
+		assert {index: node.backend_node_id for index, node in state.selector_map.items()} == {3: 20, 1: 10, 2: 11}
+		assert [child.is_new for child in state._root.children] == [True, False, False]  # type: ignore[union-attr]
+		assert state.next_index == 4
+
+	def test_default_numbering(self):
+		previous = self.assign(buttons(10, 11), None, stable=False)
+		state = self.assign(buttons(20, 10, 11), previous, stable=False)
+		assert {index: node.backend_node_id for index, node in state.selector_map.items()} == {1: 20, 2: 10, 3: 11}
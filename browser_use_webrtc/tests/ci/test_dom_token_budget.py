@@ -0,0 +1,92 @@
+"""Tests for serializing the DOM within a token budget."""
+
+import re
+
+from browser_use.dom.serializer.budget import estimate_tokens, serialize_tree_within_budget
+from browser_use.dom.serializer.collapse import collapse_repeated_siblings
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, DOMRect, NodeType, SimplifiedNode
+from tests.ci.dom_factories import dom_node, snapshot_node, text
+
+VIEWPORT = DOMRect(x=0, y=0, width=1000, height=800)
+
+
+def at(y: float) -> dict:
+	"""Position fields of a 100x20 node at `y`."""
+	bounds = DOMRect(x=0, y=y, width=100, height=20)
+	return {'absolute_position': bounds, 'snapshot_node': snapshot_node(bounds=bounds)}
+
+
+def button(index: int, y: float, is_new: bool = False) -> SimplifiedNode:
+	node = dom_node(
+		NodeType.ELEMENT_NODE, 'BUTTON', attributes={'aria-label': f'Action number {index}'}, backend_node_id=100 + index, **at(y)
+	)
+	return SimplifiedNode(
+		original_node=node,
+		children=[text(f'Button label {index}', backend_node_id=200 + index, **at(y))],
+		interactive_index=index,
+		is_new=is_new,
+	)
+
+
+def make_tree() -> SimplifiedNode:
+	"""An article with a paragraph of text and 20 buttons, the first 5 in the viewport."""
+	children = [
+		text('A long introduction paragraph that is not very useful for acting on the page ' * 3, backend_node_id=2, **at(0))
+	]
+	children += [button(index, y=index * 200, is_new=index == 17) for index in range(1, 21)]
+	return SimplifiedNode(original_node=dom_node(NodeType.ELEMENT_NODE, 'BODY', backend_node_id=1, **at(0)), children=children)
+
+
+def serialize(max_tokens: int) -> str:
+	return serialize_tree_within_budget(make_tree(), DEFAULT_INCLUDE_ATTRIBUTES, max_tokens, viewport=VIEWPORT)
+
+
+class TestTokenBudget:
+	def test_small_trees_are_serialized_in_full(self):
+		full = DOMTreeSerializer.serialize_tree(make_tree(), DEFAULT_INCLUDE_ATTRIBUTES)
+		assert serialize(10_000) == full
+
+	def test_important_lines_are_kept_within_the_budget(self):
+		representation = serialize(120)
+		assert estimate_tokens(representation) <= 120
+
+		lines = representation.splitlines()
+		# the buttons inside the viewport and the new one rank first, each with its label, the text around them goes first
+		assert lines == [
+			'... 1 more item ...',
+			'[1]<button aria-label=Action number 1 />',
+			'\tButton label 1',
+			'[2]<button aria-label=Action number 2 />',
+			'\tButton label 2',
+			'[3]<button aria-label=Action number 3 />',
+			'\tButton label 3',
+			'... 26 more items (13 interactive) ...',
+			'*[17]<button aria-label=Action number 17 />',
+			'\tButton label 17',
+			'... 6 more items (3 interactive) ...',
+		]
+
+	def test_dropped_lines_are_counted_in_placeholders(self):
+		representation = serialize(60)
+		lines = representation.splitlines()
+		shown = sum(1 for line in lines if not line.lstrip().startswith('...'))
+		dropped = sum(int(line.split()[1]) for line in lines if line.lstrip().startswith('...'))
+		assert shown + dropped == 41
+
+	def test_placeholders_count_the_indices_of_collapsed_items(self):
+		items = [
+			SimplifiedNode(
+				original_node=dom_node(NodeType.ELEMENT_NODE, 'LI', backend_node_id=300 + item, **at(item * 200)),
+				children=[button(2 * item + 1, y=item * 200), button(2 * item + 2, y=item * 200)],
+			)
+			for item in range(10)
+		]
+		root = SimplifiedNode(original_node=dom_node(NodeType.ELEMENT_NODE, 'UL', backend_node_id=1, **at(0)), children=items)
+		assert collapse_repeated_siblings(root) == 7
+
+		lines = serialize_tree_within_budget(root, DEFAULT_INCLUDE_ATTRIBUTES, 60, viewport=VIEWPORT).splitlines()
+		shown = {int(index) for line in lines if not line.lstrip().startswith('...') for index in re.findall(r'\[(\d+)\]', line)}
+		omitted = sum(int(match) for line in lines for match in re.findall(r'\((\d+) interactive\)', line))
+		assert shown and omitted
+		assert len(shown) + omitted == 20
@@ -0,0 +1,72 @@
+"""Tests for the iterative enhanced DOM tree builder in DomService."""
+
+import sys
+
+from browser_use.dom.views import DOMRect, NodeType
+from tests.ci.dom_factories import cdp_node, make_dom_service, snapshot_node
+
+
+class TestEnhancedTreeBuilder:
+	def test_deep_nesting_does_not_recurse(self):
+		"""A DOM far deeper than the recursion limit builds without RecursionError."""
+		depth = sys.getrecursionlimit() * 3
+		root = cdp_node(1, '#document', NodeType.DOCUMENT_NODE.value)
+		current = root
+		for node_id in range(2, depth + 2):
+			child = cdp_node(node_id, 'DIV', parentId=current['nodeId'])
+			current['children'] = [child]
+			current = child
+
+		tree, pending_iframes = make_dom_service()._construct_enhanced_tree(root, 'target', {}, {})
+
+		assert pending_iframes == []
+		node, seen = tree, 1
+		while node.children_nodes:
+			assert node.children_nodes[0].parent_node is node
+			node, seen = node.children_nodes[0], seen + 1
+		assert seen == depth + 1
+
+	def test_iframe_offsets_and_child_order(self):
+		"""Iframe offsets and frame scroll shift absolute positions; content document, shadow roots, children keep order."""
+		inner_div = cdp_node(7, 'DIV', parentId=6)
+		inner_html = cdp_node(6, 'HTML', frameId='inner', children=[inner_div])
+		inner_document = cdp_node(5, '#document', NodeType.DOCUMENT_NODE.value, children=[inner_html])
+		shadow_root = cdp_node(8, '#document-fragment', NodeType.DOCUMENT_FRAGMENT_NODE.value, shadowRootType='open')
+		sibling = cdp_node(9, 'SPAN', parentId=3)
+		iframe = cdp_node(4, 'IFRAME', parentId=3, contentDocument=inner_document)
+		body = cdp_node(3, 'BODY', parentId=2, children=[iframe, sibling], shadowRoots=[shadow_root])
+		html = cdp_node(2, 'HTML', parentId=1, frameId='main', children=[body])
+		root = cdp_node(1, '#document', NodeType.DOCUMENT_NODE.value, children=[html])
+
+		viewport = DOMRect(x=0, y=0, width=1000, height=1000)
+		snapshot_lookup = {
+			2: snapshot_node(
+				bounds=DOMRect(x=0, y=0, width=1000, height=1000),
+				clientRects=viewport,
+				scrollRects=DOMRect(x=0, y=0, width=1000, height=1000),
+			),
+			4: snapshot_node(bounds=DOMRect(x=100, y=50, width=300, height=300)),
+			6: snapshot_node(
+				bounds=DOMRect(x=0, y=0, width=300, height=300),
+				clientRects=viewport,
+				scrollRects=DOMRect(x=0, y=10, width=300, height=900),
+			),
+			7: snapshot_node(bounds=DOMRect(x=5, y=5, width=10, height=10)),
+			9: snapshot_node(bounds=DOMRect(x=500, y=500, width=10, height=10)),
+		}
+
+		tree, _ = make_dom_service()._construct_enhanced_tree(root, 'target', {}, snapshot_lookup)
+
+		body_node = tree.children[0].children[0]
+		assert [child.node_id for child in body_node.children] == [4, 9]
+		assert [shadow.node_id for shadow in body_node.shadow_roots or []] == [8]
+		assert body_node.shadow_roots and body_node.shadow_roots[0].parent_node is body_node
+
+		iframe_node = body_node.children[0]
+		assert iframe_node.content_document is not None
+		assert iframe_node.content_document.parent_node is iframe_node
+
+		div_node = iframe_node.content_document.children[0].children[0]
+		assert div_node.absolute_position == DOMRect(x=105, y=45, width=10, height=10)
+		assert div_node.is_visible is True
+		assert body_node.children[1].absolute_position == DOMRect(x=500, y=500, width=10, height=10)
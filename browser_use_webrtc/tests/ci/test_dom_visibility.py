@@ -0,0 +1,170 @@
+"""Tests for the batched visibility pass behind DomService._set_visibility."""
+
+import copy
+import random
+
+from browser_use.dom import visibility
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, NodeType
+from browser_use.dom.visibility import compute_visibility, frame_clips
+from tests.ci.dom_factories import dom_node, snapshot_node
+
+VIEWPORT = (1000.0, 700.0)
+
+
+def make_node(
+	node_id: int,
+	node_name: str,
+	bounds: DOMRect | None,
+	styles: dict[str, str] | None = None,
+	scroll: DOMRect | None = None,
+	client: DOMRect | None = None,
+	has_snapshot: bool = True,
+) -> EnhancedDOMTreeNode:
+	layout = snapshot_node(bounds=bounds, clientRects=client, scrollRects=scroll, computed_styles=styles)
+	return dom_node(
+		NodeType.ELEMENT_NODE,
+		node_name,
+		backend_node_id=node_id,
+		is_visible=None,
+		frame_id='frame' if node_name == 'HTML' else None,
+		snapshot_node=layout if has_snapshot else None,
+	)
+
+
+def make_page(element_count: int, seed: int = 0) -> list[tuple[EnhancedDOMTreeNode, tuple[EnhancedDOMTreeNode, ...]]]:
+	"""Pre-order (node, html frames) pairs of a scrolled page with nested iframes, like the tree builder visits them."""
+	rng = random.Random(seed)
+	styles = [
+		None,
+		{'display': 'block', 'visibility': 'visible', 'opacity': '1'},
+		{'display': 'none'},
+		{'visibility': 'hidden'},
+		{'opacity': '0'},
+		{'opacity': '0.5'},
+		{'opacity': 'bogus'},
+	]
+
+	def document(node_id: int, frames: tuple, height: float) -> tuple:
+		html = make_node(
+			node_id,
+			'HTML',
+			DOMRect(0, 0, VIEWPORT[0], height),
+			scroll=DOMRect(rng.uniform(0, 50), rng.uniform(0, height - VIEWPORT[1]), VIEWPORT[0], height),
+			client=DOMRect(0, 0, *VIEWPORT),
+		)
+		return html, (*frames, html)
+
+	top, top_frames = document(1, (), 20_000)
+	visited = [(top, top_frames)]
+	content = [top_frames]
+	next_id = 2
+	for _ in range(3):
+		parent_frames = rng.choice(content)
+		iframe = make_node(next_id, 'IFRAME', DOMRect(rng.uniform(0, 600), rng.uniform(0, 20_000), 400, 300))
+		iframe_frames = (*parent_frames, iframe)
+		inner, inner_frames = document(next_id + 1, iframe_frames, 5_000)
+		visited += [(iframe, iframe_frames), (inner, inner_frames)]
+		content.append(inner_frames)
+		next_id += 2
+
+	for node_id in range(next_id, next_id + element_count):
+		bounds = DOMRect(rng.uniform(-100, 1200), rng.uniform(-100, 20_000), rng.uniform(0, 300), rng.uniform(0, 80))
+		node = make_node(
+			node_id,
+			'DIV',
+			None if rng.random() < 0.05 else bounds,
+			styles=rng.choice(styles),
+			has_snapshot=rng.random() > 0.02,
+		)
+		visited.append((node, rng.choice(content)))
+	return visited
+
+
+def reference_visibility(visited: list) -> list[bool]:
+	"""The original per-node check that shifts the node bounds in place, run in the post-order it was run in."""
+
+	def is_visible(node: EnhancedDOMTreeNode, html_frames) -> bool:
+		if not node.snapshot_node:
+			return False
+		computed_styles = node.snapshot_node.computed_styles or {}
+		if computed_styles.get('display', '').lower() == 'none' or computed_styles.get('visibility', '').lower() == 'hidden':
+			return False
+		try:
+			if float(computed_styles.get('opacity', '1')) <= 0:
+				return False
+		except (ValueError, TypeError):
+			pass
+
+		current_bounds = node.snapshot_node.bounds
+		if not current_bounds:
+			return False
+		for frame in reversed(html_frames):
+			if frame.node_name.upper() == 'IFRAME' and frame.snapshot_node and frame.snapshot_node.bounds:
+				current_bounds.x += frame.snapshot_node.bounds.x
+				current_bounds.y += frame.snapshot_node.bounds.y
+			if frame.node_name == 'HTML' and frame.snapshot_node.scrollRects and frame.snapshot_node.clientRects:
+				adjusted_x = current_bounds.x - frame.snapshot_node.scrollRects.x
+				adjusted_y = current_bounds.y - frame.snapshot_node.scrollRects.y
+				if not (
+					adjusted_x < frame.snapshot_node.clientRects.width
+					and adjusted_x + current_bounds.width > 0
+					and adjusted_y < frame.snapshot_node.clientRects.height
+					and adjusted_y + current_bounds.height > 0
+				):
+					return False
+				current_bounds.x -= frame.snapshot_node.scrollRects.x
+				current_bounds.y -= frame.snapshot_node.scrollRects.y
+		return True
+
+	visited = copy.deepcopy(visited)
+	result = [False] * len(visited)
+	for index in reversed(range(len(visited))):
+		result[index] = is_visible(*visited[index])
+	return result
+
+
+class TestComputeVisibility:
+	def test_matches_reference_visibility(self):
+		visited = make_page(3_000, seed=1)
+		visible = compute_visibility(visited).tolist()
+
+		assert visible == reference_visibility(visited)
+		assert 0 < sum(visible) < len(visited)
+
+	def test_bounds_are_not_modified(self):
+		visited = make_page(500, seed=2)
+		before = [copy.copy(node.snapshot_node.bounds) if node.snapshot_node else None for node, _ in visited]
+		compute_visibility(visited)
+		DomService.is_element_visible_according_to_all_parents(*visited[-1])
+
+		assert [node.snapshot_node.bounds if node.snapshot_node else None for node, _ in visited] == before
+
+	def test_single_node_check(self):
+		visited = make_page(200, seed=3)
+		expected = reference_visibility(visited)
+
+		# content of nested frames is checked against every viewport on the way up, in any order
+		for index in random.Random(3).sample(range(len(visited)), 100):
+			assert DomService.is_element_visible_according_to_all_parents(*visited[index]) == expected[index]
+
+	def test_frame_chains_and_styles_are_resolved_once(self, monkeypatch):
+		"""One pass resolves every frame chain and parses every opacity value once, however many nodes share them.
+
+		Timing lives in tests/scripts/benchmark_dom_visibility.py.
+		"""
+		resolved = []
+
+		def counting_frame_clips(html_frames):
+			resolved.append(html_frames)
+			return frame_clips(html_frames)
+
+		monkeypatch.setattr(visibility, 'frame_clips', counting_frame_clips)
+		visibility._is_transparent.cache_clear()
+		visited = make_page(20_000, seed=4)
+		compute_visibility(visited)
+
+		assert (
+			len(resolved) == len({id(html_frames) for _, html_frames in visited}) == 7
+		)  # top document, 3 iframes and their documents
+		assert visibility._is_transparent.cache_info().misses == 4  # '1', '0', '0.5' and 'bogus'
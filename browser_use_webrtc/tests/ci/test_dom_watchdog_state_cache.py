@@ -0,0 +1,122 @@
+"""Tests for the DOMWatchdog page-unchanged fast path that reuses the cached BrowserStateSummary."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from browser_use.browser.dom_watchdog import DOMWatchdog
+from browser_use.browser.events import BrowserStateRequestEvent
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession, CDPSession
+from browser_use.browser.views import BrowserStateSummary, TabInfo
+from browser_use.dom.views import SerializedDOMState
+
+TABS = [TabInfo(url='https://example.com/', title='Example', target_id='target')]
+
+
+@pytest.fixture
+def dom_watchdog():
+	browser_session = BrowserSession(browser_profile=BrowserProfile(headless=True))
+	return DOMWatchdog(event_bus=browser_session.event_bus, browser_session=browser_session)
+
+
+def cache_state(dom_watchdog: DOMWatchdog, fingerprint: str, screenshot: str | None = 'png') -> BrowserStateSummary:
+	state = BrowserStateSummary(
+		dom_state=SerializedDOMState(_root=None, selector_map={}),
+		url='https://example.com/',
+		title='Example',
+		tabs=list(TABS),
+		screenshot=screenshot,
+	)
+	dom_watchdog.browser_session._cached_browser_state_summary = state
+	dom_watchdog._page_fingerprint = (fingerprint, state)
+	return state
+
+
+def frame(frame_id: str, origin: str, children: list | None = None) -> dict:
+	tree = {'frame': {'id': frame_id, 'loaderId': f'loader-{frame_id}', 'url': f'{origin}/{frame_id}', 'securityOrigin': origin}}
+	if children:
+		tree['childFrames'] = children
+	return tree
+
+
+class TestPageUnchangedFastPath:
+	async def test_reuses_cached_state_while_fingerprint_matches(self, dom_watchdog: DOMWatchdog):
+		state = cache_state(dom_watchdog, 'v1')
+
+		with (
+			patch.object(DOMWatchdog, '_get_page_fingerprint', AsyncMock(side_effect=['v1', 'v2', None])),
+			patch.object(BrowserSession, 'get_tabs', AsyncMock(return_value=TABS)),
+		):
+			reused = await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent())
+			assert reused is not None and reused.dom_state is state.dom_state and reused.screenshot == 'png'
+
+			# page mutated, and page can't be fingerprinted (cross-origin frames)
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+
+		assert (dom_watchdog.state_cache_hits, dom_watchdog.state_cache_misses) == (1, 2)
+		assert dom_watchdog.state_cache_hit_rate == pytest.approx(1 / 3)
+
+	async def test_stale_cache_is_never_reused(self, dom_watchdog: DOMWatchdog):
+		fingerprint = AsyncMock(return_value='v1')
+		with (
+			patch.object(DOMWatchdog, '_get_page_fingerprint', fingerprint),
+			patch.object(BrowserSession, 'get_tabs', AsyncMock(return_value=TABS)),
+		):
+			# no screenshot in the cached state but one was requested
+			cache_state(dom_watchdog, 'v1', screenshot=None)
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+
+			# the session replaced its cached state since the fingerprint was taken
+			cache_state(dom_watchdog, 'v1')
+			dom_watchdog.browser_session._cached_browser_state_summary = None
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+
+			# the DOM cache was cleared
+			cache_state(dom_watchdog, 'v1')
+			dom_watchdog.clear_cache()
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+
+		fingerprint.assert_not_awaited()
+
+		# a new tab opened in the background
+		cache_state(dom_watchdog, 'v1')
+		with (
+			patch.object(DOMWatchdog, '_get_page_fingerprint', AsyncMock(return_value='v1')),
+			patch.object(
+				BrowserSession, 'get_tabs', AsyncMock(return_value=[*TABS, TABS[0].model_copy(update={'target_id': 'x'})])
+			),
+		):
+			assert await dom_watchdog._get_unchanged_cached_state(BrowserStateRequestEvent()) is None
+
+		assert dom_watchdog.state_cache_hits == 0
+
+	async def test_page_fingerprint(self, dom_watchdog: DOMWatchdog):
+		page_state = {'version': 3, 'scrollX': 0, 'scrollY': 120, 'width': 1280, 'height': 720, 'childFrames': 1}
+		frame_tree = {'frameTree': frame('main', 'https://example.com', [frame('child', 'https://example.com')])}
+		send = SimpleNamespace(
+			Page=SimpleNamespace(getFrameTree=AsyncMock(return_value=frame_tree)),
+			Runtime=SimpleNamespace(evaluate=AsyncMock(return_value={'result': {'value': page_state}})),
+		)
+		cdp_session = CDPSession.model_construct(target_id='target', session_id='session', cdp_client=SimpleNamespace(send=send))
+		dom_watchdog.browser_session.agent_focus = cdp_session
+
+		with patch.object(BrowserSession, 'get_or_create_cdp_session', AsyncMock(return_value=cdp_session)):
+			fingerprint = await dom_watchdog._get_page_fingerprint()
+			assert fingerprint is not None
+			assert json.loads(fingerprint)[1] == page_state
+
+			# scrolling changes the fingerprint
+			send.Runtime.evaluate.return_value = {'result': {'value': {**page_state, 'scrollY': 0}}}
+			assert await dom_watchdog._get_page_fingerprint() not in (None, fingerprint)
+
+			# a cross-origin child frame can't be tracked
+			frame_tree['frameTree']['childFrames'] = [frame('child', 'https://ads.example.net')]
+			assert await dom_watchdog._get_page_fingerprint() is None
+
+			# neither can one the frame tree doesn't show (out-of-process iframe)
+			frame_tree['frameTree'].pop('childFrames')
+			assert await dom_watchdog._get_page_fingerprint() is None
@@ -0,0 +1,312 @@
+"""Tests for viewport-windowed DOM tree construction and on-demand materialization of off-screen subtrees."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES
+from browser_use.dom.incremental import iter_subtree
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.service import DomService
+from browser_use.dom.views import EnhancedDOMTreeNode, NodeType, TargetAllTrees
+from tests.ci.dom_factories import make_dom_service
+
+VIEWPORT = (1000, 700)
+SCROLL_Y = 3000
+
+
+def element(
+	node_id: int,
+	name: str,
+	bounds: tuple | None,
+	children: list | None = None,
+	cursor: str = 'auto',
+	opacity: str = '1',
+	**extra,
+) -> dict:
+	"""An element payload, `bounds=None` gives it no layout box (display: none)."""
+	node = {
+		'nodeId': node_id,
+		'backendNodeId': node_id,
+		'nodeType': NodeType.ELEMENT_NODE.value,
+		'nodeName': name,
+		'localName': name.lower(),
+		'nodeValue': '',
+		'children': children or [],
+		**extra,
+	}
+	for child in node['children']:
+		child['parentId'] = node_id
+	if bounds is not None:
+		node['_layout'] = {'bounds': list(bounds), 'cursor': cursor, 'opacity': opacity}
+	return node
+
+
+def text(node_id: int, value: str, bounds: tuple | None) -> dict:
+	node = {
+		'nodeId': node_id,
+		'backendNodeId': node_id,
+		'nodeType': NodeType.TEXT_NODE.value,
+		'nodeName': '#text',
+		'localName': '',
+		'nodeValue': value,
+	}
+	if bounds is not None:
+		node['_layout'] = {'bounds': list(bounds)}
+	return node
+
+
+def make_page(sections: int = 200) -> TargetAllTrees:
+	"""A long page scrolled to SCROLL_Y: `sections` 100px tall sections with a button and a paragraph each.
+
+	Section 3 is far above the viewport but holds an absolutely positioned button that is inside it, and a fixed header
+	at the end of the document is painted at the top of the viewport.
+	"""
+	section_nodes = []
+	for i in range(sections):
+		base = 100 + i * 10
+		y = i * 100
+		children = [
+			element(base + 1, 'BUTTON', (0, y, 200, 20), [text(base + 2, f'Button {i}', (0, y, 100, 20))], cursor='pointer'),
+			element(base + 3, 'P', (0, y + 30, 800, 20), [text(base + 4, f'Paragraph number {i}', (0, y + 30, 300, 20))]),
+		]
+		if i == 3:
+			children.append(
+				element(
+					base + 5,
+					'BUTTON',
+					(0, SCROLL_Y + 300, 200, 20),
+					[text(base + 6, 'Overflowing button', (0, SCROLL_Y + 300, 100, 20))],
+					cursor='pointer',
+				)
+			)
+		section_nodes.append(element(base, 'DIV', (0, y, 1000, 100), children))
+
+	header = element(50, 'HEADER', (0, SCROLL_Y, 1000, 50), [text(51, 'Fixed header', (0, SCROLL_Y, 200, 20))])
+	return make_document([*section_nodes, header], height=sections * 100, scroll_y=SCROLL_Y)
+
+
+def make_document(body_children: list, height: float, scroll_y: float = 0) -> TargetAllTrees:
+	body = element(3, 'BODY', (0, 0, 1000, height), body_children)
+	html = element(2, 'HTML', (0, 0, 1000, height), [body], frameId='main')
+	html['_layout'].update(clientRects=[0, 0, *VIEWPORT], scrollRects=[0, scroll_y, 1000, height])
+	root = {
+		'nodeId': 1,
+		'backendNodeId': 1,
+		'nodeType': NodeType.DOCUMENT_NODE.value,
+		'nodeName': '#document',
+		'localName': '',
+		'nodeValue': '',
+		'children': [html],
+	}
+	return TargetAllTrees(
+		snapshot=make_snapshot(root),  # type: ignore[arg-type]
+		dom_tree={'root': root},  # type: ignore[arg-type]
+		ax_tree={'nodes': []},  # type: ignore[arg-type]
+		device_pixel_ratio=1.0,
+		cdp_timing={},
+	)
+
+
+def make_snapshot(root: dict) -> dict:
+	"""DOMSnapshot of a payload, with the layout of every node taken from its `_layout` entry."""
+	strings: list[str] = []
+
+	def string_index(value: str) -> int:
+		if value not in strings:
+			strings.append(value)
+		return strings.index(value)
+
+	nodes: dict[str, list] = {'parentIndex': [], 'backendNodeId': []}
+	layout: dict[str, list] = {'nodeIndex': [], 'bounds': [], 'styles': [], 'clientRects': [], 'scrollRects': []}
+	stack: list[tuple[dict, int]] = [(root, -1)]
+	while stack:
+		node, parent_index = stack.pop()
+		index = len(nodes['backendNodeId'])
+		nodes['parentIndex'].append(parent_index)
+		nodes['backendNodeId'].append(node['backendNodeId'])
+		if '_layout' in node:
+			styles = {
+				'display': 'block',
+				'visibility': 'visible',
+				'opacity': node['_layout'].get('opacity', '1'),
+				'cursor': node['_layout'].get('cursor', 'auto'),
+			}
+			layout['nodeIndex'].append(index)
+			layout['bounds'].append(node['_layout']['bounds'])
+			layout['styles'].append([string_index(styles.get(name, '')) for name in REQUIRED_COMPUTED_STYLES])
+			layout['clientRects'].append(node['_layout'].get('clientRects', []))
+			layout['scrollRects'].append(node['_layout'].get('scrollRects', []))
+		stack.extend((child, index) for child in reversed(node.get('children', [])))
+	return {'documents': [{'nodes': nodes, 'layout': layout}], 'strings': strings}
+
+
+def make_service(window_margin: float | None = None, trees: TargetAllTrees | None = None, **options) -> DomService:
+	service = make_dom_service(window_margin=window_margin, **options)
+	service._get_all_trees = AsyncMock(return_value=trees or make_page())
+	return service
+
+
+def make_hidden_content_page() -> TargetAllTrees:
+	"""A short page with a huge display: none menu, a transparent panel, a hover submenu and a hidden file input."""
+	hidden_links = [element(1000 + i * 2, 'A', None, [text(1001 + i * 2, f'Hidden link {i}', None)]) for i in range(500)]
+	return make_document(
+		[
+			element(10, 'BUTTON', (0, 0, 200, 20), [text(11, 'Open menu', (0, 0, 100, 20))], cursor='pointer'),
+			element(20, 'DIV', None, hidden_links),
+			element(
+				30,
+				'DIV',
+				(0, 100, 500, 100),
+				[element(31, 'BUTTON', (0, 100, 200, 20), [text(32, 'Ghost button', (0, 100, 100, 20))], cursor='pointer')],
+				opacity='0',
+			),
+			element(
+				40,
+				'LI',
+				(0, 200, 200, 20),
+				[element(41, 'UL', None, [element(42, 'LI', None, [text(43, 'Submenu entry', None)])])],
+				attributes=['aria-haspopup', 'true'],
+			),
+			element(
+				50,
+				'LABEL',
+				(0, 300, 200, 20),
+				[
+					text(51, 'Upload', (0, 300, 100, 20)),
+					element(52, 'DIV', None, [element(53, 'INPUT', None, attributes=['type', 'file'])]),
+				],
+			),
+		],
+		height=VIEWPORT[1],
+	)
+
+
+def serialize(root: EnhancedDOMTreeNode) -> tuple[str, list[int]]:
+	state, _ = DOMTreeSerializer(root).serialize_accessible_elements()
+	return state.llm_representation(), [node.backend_node_id for node in state.selector_map.values()]
+
+
+def node_ids(root: EnhancedDOMTreeNode) -> set[int]:
+	return {node.node_id for node in iter_subtree(root)}
+
+
+class TestWindowedDOMTree:
+	async def test_windowed_serialization_matches_full_build(self):
+		full_tree = await make_service(window_margin=None).get_dom_tree('target')
+		service = make_service(window_margin=100)
+		windowed_tree = await service.get_dom_tree('target')
+
+		assert serialize(windowed_tree) == serialize(full_tree)
+		llm_representation, _ = serialize(windowed_tree)
+		assert 'Button 31' in llm_representation and 'Overflowing button' in llm_representation
+		assert 'Fixed header' in llm_representation and 'Button 50' not in llm_representation
+
+		# only the sections within 100px of the viewport (and the one with the overflowing button) were built
+		assert service._window is not None
+		body = windowed_tree.children[0].children[0]
+		sections = [node for node in body.children if node.node_name == 'DIV']
+		assert [(section.node_id - 100) // 10 for section in sections if section.children_nodes] == [3, *range(29, 38)]
+		assert all(section.node_id in service._window.lazy_subtrees for section in sections if not section.children_nodes)
+		assert len(node_ids(windowed_tree)) < len(node_ids(full_tree)) / 4
+
+	async def test_materialized_placeholders_match_the_full_build(self):
+		full_tree = await make_service(window_margin=None).get_dom_tree('target')
+		service = make_service(window_margin=0)
+		windowed_tree = await service.get_dom_tree('target')
+		assert service._window is not None
+		placeholder_count = len(service._window.lazy_subtrees)
+
+		# sections 37 to 43, the first ones by the text of their paragraph, the others by the placeholder itself
+		sections = [100 + i * 10 for i in range(37, 44)]
+		node_ids_to_materialize = [section + 4 for section in sections[:3]] + sections[3:]
+		materialized = [node for node_id in node_ids_to_materialize for node in service._materialize_lazy_node(node_id)]
+		assert sorted(node.node_id for node in materialized) == sections
+		assert len(service._window.lazy_subtrees) == placeholder_count - len(materialized)
+		assert all(node.children_nodes and node.children_nodes[0].parent_node is node for node in materialized)
+
+		# the built sections are identical to the ones of a full build
+		full_nodes = {node.node_id: node for node in iter_subtree(full_tree)}
+		for node in iter_subtree(windowed_tree):
+			expected = full_nodes[node.node_id]
+			assert (node.absolute_position, node.is_visible, node.node_value) == (
+				expected.absolute_position,
+				expected.is_visible,
+				expected.node_value,
+			)
+
+		assert service._materialize_lazy_node(sections[0]) == []
+
+	async def test_mutation_inside_skipped_region_materializes_it(self):
+		service = make_service(window_margin=0)
+		cdp_session = SimpleNamespace(session_id='session', cdp_client=MagicMock())
+		service.browser_session.get_or_create_cdp_session = AsyncMock(return_value=cdp_session)  # type: ignore[attr-defined]
+		service._measure_layout = AsyncMock(return_value={})
+		await service.get_dom_tree('target', track_mutations=True)
+		tracker = service._mutation_tracker
+		assert tracker is not None and service._window is not None
+
+		# text of section 150, which was never built
+		tracker.handle_event('characterDataModified', {'nodeId': 100 + 150 * 10 + 4, 'characterData': 'Edited'}, 'session')
+		assert not tracker.invalidated
+		assert tracker.nodes[100 + 150 * 10 + 4].node_value == 'Edited'
+		assert 100 + 150 * 10 not in service._window.lazy_subtrees
+
+		# removing a placeholder leaves nothing to materialize for it later
+		tracker.handle_event('childNodeRemoved', {'parentNodeId': 3, 'nodeId': 100 + 160 * 10}, 'session')
+		assert not tracker.invalidated and 100 + 160 * 10 not in tracker.nodes
+		assert service._materialize_lazy_node(100 + 160 * 10 + 1) == []
+
+		# nodes that never existed still invalidate the tracker
+		tracker.handle_event('attributeModified', {'nodeId': 99999, 'name': 'class', 'value': 'x'}, 'session')
+		assert tracker.invalidated
+
+
+class TestHiddenSubtreePruning:
+	async def test_prunes_hidden_subtrees_but_keeps_revealable_content(self):
+		full_tree = await make_service(trees=make_hidden_content_page()).get_dom_tree('target')
+		service = make_service(trees=make_hidden_content_page(), prune_hidden=True)
+		pruned_tree = await service.get_dom_tree('target')
+		nodes = {node.node_id: node for node in iter_subtree(pruned_tree)}
+
+		# the display: none menu is a placeholder without descendants
+		assert service._window is not None
+		assert set(service._window.lazy_subtrees) == {20}
+		assert nodes[20].children_nodes is None
+		assert len(nodes) < len(node_ids(full_tree)) / 10
+
+		# hover submenus, the button inside the transparent panel (shown on hover) and hidden file inputs are still there
+		assert 43 in nodes and 31 in nodes and 53 in nodes
+		assert serialize(pruned_tree) == serialize(full_tree)
+		assert serialize(pruned_tree) == (
+			'[1]<button />\n\tOpen menu\n[2]<button />\n\tGhost button\n[3]<label />\n\tUpload',
+			[10, 31, 50],
+		)
+
+	async def test_node_budget_truncates_the_page(self):
+		service = make_service(max_nodes=50)
+		tree = await service.get_dom_tree('target')
+		assert len(node_ids(tree)) == 50
+		assert service._truncated
+
+	async def test_nothing_is_kept_for_builds_that_skipped_nothing(self):
+		# the node budget alone makes every build windowed, the payloads must not outlive a build that fits in it
+		service = make_service(max_nodes=100_000)
+		tree = await service.get_dom_tree('target')
+		assert len(node_ids(tree)) == len(node_ids(await make_service().get_dom_tree('target')))
+		assert service._window is None and service._build_lazy_subtree is None and not service._truncated
+
+	async def test_revealed_hidden_subtree_is_built_by_the_mutation_tracker(self):
+		service = make_service(trees=make_hidden_content_page(), prune_hidden=True)
+		service.browser_session.get_or_create_cdp_session = AsyncMock(  # type: ignore[attr-defined]
+			return_value=SimpleNamespace(session_id='session', cdp_client=MagicMock())
+		)
+		service._measure_layout = AsyncMock(return_value={})
+		await service.get_dom_tree('target', track_mutations=True)
+		tracker = service._mutation_tracker
+		assert tracker is not None
+
+		tracker.handle_event('attributeModified', {'nodeId': 20, 'name': 'style', 'value': 'display: block'}, 'session')
+		assert not tracker.invalidated
+		menu = tracker.nodes[20]
+		assert menu.children_nodes is not None and len(menu.children_nodes) == 500
+		assert [root.node_id for root in tracker.take_dirty_subtrees()] == [20]
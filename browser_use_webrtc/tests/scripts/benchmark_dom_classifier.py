@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of InteractiveElementClassifier against ClickableElementDetector on random element nodes.
+
+Usage: python tests/scripts/benchmark_dom_classifier.py [--nodes 20000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from browser_use.dom.serializer.classifier import InteractiveElementClassifier
+from browser_use.dom.serializer.clickable_elements import ClickableElementDetector
+from browser_use.dom.views import (
+	DOMRect,
+	EnhancedAXNode,
+	EnhancedAXProperty,
+	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
+	NodeType,
+)
+
+TAGS = ['DIV', 'SPAN', 'A', 'BUTTON', 'INPUT', 'IFRAME', 'HTML', 'BODY', 'LI', 'SVG', 'LABEL', 'OPTION', 'IMG', 'SUMMARY']
+ATTRIBUTE_NAMES = ['class', 'id', 'role', 'onclick', 'onmousedown', 'tabindex', 'data-action', 'data-role', 'aria-label', 'href']
+ATTRIBUTE_VALUES = ['', 'btn primary', 'Search-Button', 'nav', 'MagnifyingGlass', 'button', 'link', 'listbox', 'x', 'find-me']
+AX_PROPERTIES = ['disabled', 'hidden', 'focusable', 'editable', 'checked', 'expanded', 'required', 'keyshortcuts', 'level']
+AX_ROLES = [None, 'button', 'listbox', 'generic', 'StaticText', 'link', 'searchbox']
+SIZES = [0, 5, 10, 30, 50, 80, 150]
+
+
+def random_node(rng: random.Random) -> EnhancedDOMTreeNode:
+	ax_node = None
+	if rng.random() < 0.6:
+		ax_node = EnhancedAXNode(
+			ax_node_id='ax',
+			ignored=False,
+			role=rng.choice(AX_ROLES),
+			name=None,
+			description=None,
+			properties=[
+				EnhancedAXProperty(name=rng.choice(AX_PROPERTIES), value=rng.choice([True, False, None, '', 'yes']))  # type: ignore[arg-type]
+				for _ in range(rng.randint(0, 3))
+			]
+			or None,
+		)
+	snapshot_node = None
+	if rng.random() < 0.8:
+		snapshot_node = EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=rng.choice([None, 'auto', 'pointer']),
+			bounds=DOMRect(x=0, y=0, width=rng.choice(SIZES), height=rng.choice(SIZES)) if rng.random() < 0.9 else None,
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=None,
+			paint_order=None,
+			stacking_contexts=None,
+		)
+	return EnhancedDOMTreeNode(
+		node_id=0,
+		backend_node_id=0,
+		node_type=NodeType.ELEMENT_NODE if rng.random() < 0.9 else NodeType.TEXT_NODE,
+		node_name=rng.choice(TAGS),
+		node_value='',
+		attributes={rng.choice(ATTRIBUTE_NAMES): rng.choice(ATTRIBUTE_VALUES) for _ in range(rng.randint(0, 4))},
+		is_scrollable=None,
+		is_visible=True,
+		absolute_position=None,
+		target_id='target',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=ax_node,
+		snapshot_node=snapshot_node,
+	)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--nodes', type=int, default=20_000)
+	parser.add_argument('--repeat', type=int, default=5)
+	args = parser.parse_args()
+
+	rng = random.Random(0)
+	nodes = [random_node(rng) for _ in range(args.nodes)]
+	print(f'{"classifier":<28} {"nodes":>8} {"time (ms)":>10} {"per node (us)":>14}')
+	for name, classify in (
+		('ClickableElementDetector', ClickableElementDetector.is_interactive),
+		('InteractiveElementClassifier', InteractiveElementClassifier.is_interactive),
+	):
+		timings = []
+		for _ in range(args.repeat):
+			gc.collect()
+			start = time.perf_counter()
+			for node in nodes:
+				classify(node)
+			timings.append(time.perf_counter() - start)
+		best = min(timings)
+		print(f'{name:<28} {len(nodes):>8} {best * 1000:>10.1f} {best / len(nodes) * 1e6:>14.2f}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of mark_occluded: paint-order occlusion on grids of opaque buttons, with and without a modal.
+
+The time per element should stay flat as the grid grows, pairwise checks would grow it linearly.
+
+Usage: python tests/scripts/benchmark_dom_paint_order.py [--sizes 50 100 200] [--repeat 3]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from browser_use.dom.serializer.paint_order import mark_occluded
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType, SimplifiedNode
+
+OPAQUE = {'background-color': 'rgb(255, 255, 255)', 'opacity': '1'}
+
+
+def element(name: str, rect: DOMRect, paint_order: int, children: list[SimplifiedNode] | None = None) -> SimplifiedNode:
+	node = EnhancedDOMTreeNode(
+		node_id=paint_order,
+		backend_node_id=paint_order,
+		node_type=NodeType.ELEMENT_NODE,
+		node_name=name,
+		node_value='',
+		attributes={},
+		is_scrollable=None,
+		is_visible=True,
+		absolute_position=rect,
+		target_id='target',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=None,
+		snapshot_node=EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=rect,
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=OPAQUE,
+			paint_order=paint_order,
+			stacking_contexts=None,
+		),
+	)
+	return SimplifiedNode(original_node=node, children=children or [])
+
+
+def page(size: int, modal: bool) -> SimplifiedNode:
+	"""A size x size grid of 40x20 buttons, optionally under a modal covering its middle."""
+	buttons = [
+		element('BUTTON', DOMRect(x=column * 40, y=row * 20, width=40, height=20), 1 + row * size + column)
+		for row in range(size)
+		for column in range(size)
+	]
+	if modal:
+		buttons.append(element('DIV', DOMRect(x=size * 10, y=size * 5, width=size * 20, height=size * 10), size * size + 1))
+	return element('BODY', DOMRect(x=0, y=0, width=size * 40, height=size * 20), 0, buttons)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200])
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	print(f'{"elements":>9} {"modal":<6} {"occluded":>9} {"time (ms)":>10} {"per element (us)":>17}')
+	for size in args.sizes:
+		for modal in (False, True):
+			timings = []
+			for _ in range(args.repeat):
+				root = page(size, modal)  # mark_occluded marks the nodes, every run needs a fresh tree
+				gc.collect()
+				start = time.perf_counter()
+				occluded = mark_occluded(root)
+				timings.append(time.perf_counter() - start)
+			elements = size * size
+			best = min(timings)
+			print(f'{elements:>9} {str(modal):<6} {occluded:>9} {best * 1000:>10.1f} {best / elements * 1e6:>17.2f}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of DOMTreeSerializer.serialize_tree: wall time and memory allocation on synthetic pages.
+
+Usage: python tests/scripts/benchmark_dom_serializer.py [--nodes 50000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import (
+	DEFAULT_INCLUDE_ATTRIBUTES,
+	DOMRect,
+	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
+	NodeType,
+	SimplifiedNode,
+)
+
+
+def make_node(number: int, text: bool = False) -> SimplifiedNode:
+	node = EnhancedDOMTreeNode(
+		node_id=number,
+		backend_node_id=number,
+		node_type=NodeType.TEXT_NODE if text else NodeType.ELEMENT_NODE,
+		node_name='#text' if text else 'BUTTON',
+		node_value=f'Label of element {number}' if text else '',
+		attributes={} if text else {'title': f'Element {number}', 'type': 'button', 'class': 'btn'},
+		is_scrollable=None,
+		is_visible=True,
+		absolute_position=None,
+		target_id='target',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=None,
+		snapshot_node=EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=DOMRect(x=0, y=0, width=10, height=10),
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=None,
+			paint_order=None,
+			stacking_contexts=None,
+		),
+	)
+	return SimplifiedNode(original_node=node, children=[], interactive_index=None if text else number)
+
+
+def wide_page(size: int) -> SimplifiedNode:
+	"""A flat list of buttons with labels, like a product grid or a table."""
+	root = make_node(0)
+	for number in range(1, size, 2):
+		button = make_node(number)
+		button.children.append(make_node(number + 1, text=True))
+		root.children.append(button)
+	return root
+
+
+def deep_page(size: int, depth: int = 2_000) -> SimplifiedNode:
+	"""Chains of buttons nested in each other, deeper than the recursion limit."""
+	root = node = make_node(0)
+	for number in range(1, size):
+		child = make_node(number, text=number % 10 == 0)
+		if number % depth == 0:
+			node = root
+		node.children.append(child)
+		if child.original_node.node_type != NodeType.TEXT_NODE:
+			node = child
+	return root
+
+
+def measure(serialize: Callable[[], str], repeat: int) -> tuple[float, int, int]:
+	"""Best wall time, peak traced memory and number of allocations still alive at the peak of one call."""
+	timings = []
+	for _ in range(repeat):
+		gc.collect()
+		start = time.perf_counter()
+		serialize()
+		timings.append(time.perf_counter() - start)
+
+	gc.collect()
+	tracemalloc.start()
+	serialize()
+	_, peak = tracemalloc.get_traced_memory()
+	allocations = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+	tracemalloc.stop()
+	return min(timings), peak, allocations
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--nodes', type=int, default=50_000)
+	parser.add_argument('--repeat', type=int, default=5)
+	args = parser.parse_args()
+
+	print(f'{"page":<8} {"nodes":>8} {"cache":<6} {"time (ms)":>10} {"peak (KiB)":>11} {"allocations":>12}')
+	for name, build in (('wide', wide_page), ('deep', deep_page)):
+		root = build(args.nodes)
+		for cache in ('cold', 'warm'):
+
+			def serialize() -> str:
+				if cache == 'cold':
+					stack = [root]
+					while stack:
+						node = stack.pop()
+						node.attributes_cache = None
+						stack.extend(node.children)
+				return DOMTreeSerializer.serialize_tree(root, DEFAULT_INCLUDE_ATTRIBUTES)
+
+			wall_time, peak, allocations = measure(serialize, args.repeat)
+			print(f'{name:<8} {args.nodes:>8} {cache:<6} {wall_time * 1000:>10.1f} {peak / 1024:>11.0f} {allocations:>12}')
+
+
+if __name__ == '__main__':
+	main()
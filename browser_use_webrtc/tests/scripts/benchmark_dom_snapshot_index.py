@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of build_snapshot_lookup: index build and lookup time on synthetic DOMSnapshot payloads.
+
+The index build is linear in the node count, so the time per node should stay flat as the page grows.
+
+Usage: python tests/scripts/benchmark_dom_snapshot_index.py [--nodes 5000 40000] [--repeat 5]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES, build_snapshot_lookup
+
+
+def make_snapshot(node_count: int, seed: int = 0) -> dict:
+	"""A CaptureSnapshotReturns payload of one document with shuffled layout nodes and ragged rect data."""
+	rng = random.Random(seed)
+	strings = ['block', 'none', 'visible', 'hidden', '1', '0', 'pointer', 'auto', 'static']
+	laid_out = [i for i in range(node_count) if rng.random() < 0.8]
+	rng.shuffle(laid_out)
+	layout = {
+		'nodeIndex': laid_out,
+		'bounds': [[rng.uniform(0, 2000), rng.uniform(0, 8000), rng.uniform(0, 300), rng.uniform(0, 80)] for _ in laid_out],
+		'styles': [[rng.randrange(len(strings)) for _ in REQUIRED_COMPUTED_STYLES] for _ in laid_out],
+		'text': [-1 for _ in laid_out],
+		'stackingContexts': {'index': [0, 3, 7]},
+		'paintOrders': [rng.randrange(10_000) for _ in laid_out],
+		'clientRects': [[0, 0, 100, 50] if rng.random() < 0.3 else [] for _ in laid_out],
+		'scrollRects': [[0, rng.uniform(0, 500), 100, 900] if rng.random() < 0.2 else [] for _ in laid_out],
+	}
+	nodes = {
+		'parentIndex': [-1] + [rng.randrange(i) for i in range(1, node_count)],
+		'backendNodeId': list(range(1, node_count + 1)),
+		'isClickable': {'index': sorted(rng.sample(range(node_count), node_count // 10))},
+	}
+	return {'documents': [{'nodes': nodes, 'layout': layout}], 'strings': strings}
+
+
+def best_time(run, repeat: int) -> float:
+	timings = []
+	for _ in range(repeat):
+		gc.collect()
+		start = time.perf_counter()
+		run()
+		timings.append(time.perf_counter() - start)
+	return min(timings)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--nodes', type=int, nargs='+', default=[5_000, 40_000])
+	parser.add_argument('--repeat', type=int, default=5)
+	args = parser.parse_args()
+
+	print(f'{"nodes":>8} {"build (ms)":>11} {"per node (us)":>14} {"extents (ms)":>13} {"lookup all (ms)":>16}')
+	for node_count in args.nodes:
+		snapshot = make_snapshot(node_count, seed=node_count)
+		build = best_time(lambda: build_snapshot_lookup(snapshot), args.repeat)  # type: ignore[arg-type]
+		lookup = build_snapshot_lookup(snapshot)  # type: ignore[arg-type]
+		extents = best_time(lambda: build_snapshot_lookup(snapshot).documents[0].subtree_extents, args.repeat) - build  # type: ignore[arg-type]
+		lookup_all = best_time(lambda: [node for node in build_snapshot_lookup(snapshot).values()], args.repeat) - build  # type: ignore[arg-type]
+		assert len(lookup) == node_count
+		print(
+			f'{node_count:>8} {build * 1000:>11.1f} {build / node_count * 1e6:>14.2f} {extents * 1000:>13.1f} {lookup_all * 1000:>16.1f}'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of compute_visibility: one batched pass against the per-node check on synthetic scrolled pages.
+
+Usage: python tests/scripts/benchmark_dom_visibility.py [--nodes 50000] [--frames 3] [--repeat 5]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType
+from browser_use.dom.visibility import compute_visibility
+
+VIEWPORT = (1000.0, 700.0)
+STYLES = [None, {'display': 'block', 'opacity': '1'}, {'display': 'none'}, {'visibility': 'hidden'}, {'opacity': '0.5'}]
+
+
+def make_node(node_id: int, node_name: str, bounds: DOMRect, styles: dict | None = None, scroll: DOMRect | None = None):
+	return EnhancedDOMTreeNode(
+		node_id=node_id,
+		backend_node_id=node_id,
+		node_type=NodeType.ELEMENT_NODE,
+		node_name=node_name,
+		node_value='',
+		attributes={},
+		is_scrollable=None,
+		is_visible=None,
+		absolute_position=None,
+		target_id='target',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=None,
+		snapshot_node=EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=bounds,
+			clientRects=DOMRect(0, 0, *VIEWPORT) if scroll else None,
+			scrollRects=scroll,
+			computed_styles=styles,
+			paint_order=None,
+			stacking_contexts=None,
+		),
+	)
+
+
+def make_page(node_count: int, frame_count: int, seed: int = 0) -> list[tuple[EnhancedDOMTreeNode, tuple]]:
+	"""(node, html frames) pairs of a long scrolled page with `frame_count` iframes, sharing frame tuples."""
+	rng = random.Random(seed)
+	top = make_node(1, 'HTML', DOMRect(0, 0, VIEWPORT[0], 20_000), scroll=DOMRect(0, rng.uniform(0, 19_000), *VIEWPORT))
+	chains = [(top,)]
+	visited: list[tuple[EnhancedDOMTreeNode, tuple]] = [(top, chains[0])]
+	for number in range(frame_count):
+		iframe = make_node(2 + 2 * number, 'IFRAME', DOMRect(rng.uniform(0, 600), rng.uniform(0, 20_000), 400, 300))
+		inner = make_node(3 + 2 * number, 'HTML', DOMRect(0, 0, 400, 5_000), scroll=DOMRect(0, rng.uniform(0, 4_000), 400, 300))
+		chains.append((top, iframe, inner))
+		visited += [(iframe, (top, iframe)), (inner, chains[-1])]
+	for node_id in range(100, 100 + node_count):
+		bounds = DOMRect(rng.uniform(-100, 1200), rng.uniform(-100, 20_000), rng.uniform(0, 300), rng.uniform(0, 80))
+		visited.append((make_node(node_id, 'DIV', bounds, styles=rng.choice(STYLES)), rng.choice(chains)))
+	return visited
+
+
+def best_time(run, repeat: int) -> float:
+	timings = []
+	for _ in range(repeat):
+		gc.collect()
+		start = time.perf_counter()
+		run()
+		timings.append(time.perf_counter() - start)
+	return min(timings)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument('--nodes', type=int, default=50_000)
+	parser.add_argument('--frames', type=int, default=3)
+	parser.add_argument('--repeat', type=int, default=5)
+	args = parser.parse_args()
+
+	visited = make_page(args.nodes, args.frames)
+	batched = best_time(lambda: compute_visibility(visited), args.repeat)
+	per_node = best_time(
+		lambda: [DomService.is_element_visible_according_to_all_parents(node, frames) for node, frames in visited], args.repeat
+	)
+	print(f'{"pass":<10} {"nodes":>8} {"time (ms)":>10}')
+	print(f'{"batched":<10} {len(visited):>8} {batched * 1000:>10.1f}')
+	print(f'{"per node":<10} {len(visited):>8} {per_node * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+	main()